@@ -0,0 +1,175 @@
+"""
+Benchmarks of the Core hot paths on generated CTR data.
+
+Each benchmark measures a single call of its function. Functions operating on a single item
+iterate over a representative part of the dataset, so that the measured time is well above
+the timer resolution and scales with the dataset size.
+"""
+
+from Core.ctr_data import CTRData
+from Core.dataset_generator import generate_product
+from Core.enums import ServingType
+from Core.csv_data_models import (CTRDataModel, CsvDataModel, InformationDataModel, CatalogueDataModel,
+                                  RecipesDataModel, DailyIntakeDataModel)
+
+import os
+import copy
+import random
+import datetime
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Benchmark:
+    """
+    Attributes:
+        name (str): Benchmark name, unique within the suite.
+        function (Callable): Measured function.
+        setup (Callable): Optional function called before each measured call, excluded from the measured time.
+        max_time (float): Optional limit of the minimum time of a call in seconds, checked regardless of the baseline.
+    """
+    name: str
+    function: Callable[[], Any]
+    setup: Callable[[], Any] | None = None
+    max_time: float | None = None
+
+
+def get_savefile_benchmarks(ctr_data: CTRData, directory: str) -> list[Benchmark]:
+    benchmarks = []
+
+    ctr_data_model = CTRDataModel(os.path.join(directory, "Benchmark.ct"))
+    benchmarks.append(Benchmark("Savefile write CTR Data", lambda: ctr_data_model.write_savefile(ctr_data)))
+    benchmarks.append(Benchmark("Savefile read CTR Data", ctr_data_model.read_savefile))
+
+    section_data_models: list[type[CsvDataModel]] = [InformationDataModel, CatalogueDataModel,
+                                                     RecipesDataModel, DailyIntakeDataModel]
+
+    for data_model_type in section_data_models:
+        data_model = data_model_type(os.path.join(directory, f"Benchmark {data_model_type.__name__}"))
+        identifier = data_model.data_model_identifier
+
+        def write_section(data_model: CsvDataModel = data_model):
+            data_model.write_savefile(ctr_data)
+
+        def read_section(data_model: CsvDataModel = data_model):
+            # Recipes reference the products of an already read catalogue, copied as reading clears the catalogue
+            section_data = CTRData()
+            section_data.product_catalogue = dict(ctr_data.product_catalogue)
+            data_model.read_savefile(section_data)
+
+        benchmarks.append(Benchmark(f"Savefile write {identifier}", write_section))
+        benchmarks.append(Benchmark(f"Savefile read {identifier}", read_section))
+
+    return benchmarks
+
+
+def get_recipe_benchmarks(ctr_data: CTRData) -> list[Benchmark]:
+    recipes = [recipe for recipe in ctr_data.recipes_record.values() if recipe.item_id > 0]
+    ingredients = [ingredient for recipe in recipes for ingredient in recipe.ingredients.values()]
+
+    def get_recipes_nutrition_data():
+        for recipe in recipes:
+            recipe.get_total_nutrition_data_per_100g()
+
+    def get_recipe_totals():
+        ctr_data.invalidate_recipe_totals(product_ids=list(ctr_data.product_catalogue))
+        ctr_data.get_recipe_totals()
+
+    def detect_circular_references():
+        for ingredient in ingredients:
+            ingredient.detect_circular_reference()
+
+    ctr_data.get_recipe_totals()
+
+    return [Benchmark("Recipe nutrition data per 100 g, all recipes", get_recipes_nutrition_data),
+            Benchmark("Recipe totals after catalogue edit, recipe matrix", get_recipe_totals),
+            Benchmark("Ingredient circular reference detection, all ingredients", detect_circular_references)]
+
+
+def get_daily_intake_benchmarks(ctr_data: CTRData) -> list[Benchmark]:
+    last_year_intake = [ctr_data.daily_intake_record[date] for date in sorted(ctr_data.daily_intake_record)[-365:]]
+
+    def get_yearly_nutrition_data():
+        for daily_intake in last_year_intake:
+            daily_intake.get_total_consumed_nutrition_data()
+
+    last_date = datetime.date.fromisoformat(last_year_intake[-1].date)
+    duplicate_dates = [(last_date + datetime.timedelta(days=day)).isoformat() for day in range(1, 101)]
+
+    def remove_duplicates():
+        for date in duplicate_dates:
+            ctr_data.daily_intake_record.pop(date, None)
+
+    def duplicate_daily_intake():
+        for date in duplicate_dates:
+            ctr_data.duplicate_daily_intake(last_year_intake[-1].date, date)
+
+    return [Benchmark("Daily intake total nutrition data, 1 year", get_yearly_nutrition_data),
+            Benchmark("Duplicate daily intake, 100 days", duplicate_daily_intake, setup=remove_duplicates)]
+
+
+def get_catalogue_benchmarks(ctr_data: CTRData) -> list[Benchmark]:
+    """
+    Catalogue operations renumber the products, and are run on a copy of the catalogue restored before each call.
+    """
+    catalogue_data = CTRData()
+
+    def restore_catalogue():
+        catalogue_data.product_catalogue = copy.deepcopy(ctr_data.product_catalogue)
+
+    def set_last_product_id():
+        last_product = catalogue_data.product_catalogue[len(catalogue_data.product_catalogue) - 1]
+        catalogue_data.set_product_id(last_product, 1)
+
+    return [Benchmark("Set product ID, last to first", set_last_product_id, setup=restore_catalogue),
+            Benchmark("Duplicate product, first", lambda: catalogue_data.duplicate_product(1),
+                      setup=restore_catalogue)]
+
+
+_SEARCH_CATALOGUE_SIZE = 50000
+
+# Typed, misspelled, manufacturer, combined and unmatched queries, none extending the previous query
+_SEARCH_QUERIES = ["frsh vegtables", "green valley", "fro", "smoked meat", "orgnic fruit 123",
+                   "blu lake fish", "frozen dairy 4", "raw 4999", "acme", "vegetables 12345", "chocolate"]
+
+# Limit of the mean time of a query, including the manufacturer matches
+_SEARCH_QUERY_MAX_TIME = 0.001
+
+
+def get_search_benchmarks() -> list[Benchmark]:
+    """
+    Name search runs on a catalogue of 50000 generated Products regardless of the dataset size,
+    generated and indexed on the first setup call. The search fails its threshold, if the mean time
+    of a query exceeds 1 ms.
+    """
+    search_data = CTRData()
+
+    def setup_catalogue():
+        if len(search_data.product_catalogue) > 1:
+            return
+
+        rng = random.Random(0)
+        date = datetime.date(2025, 1, 1)
+        for item_id in range(1, _SEARCH_CATALOGUE_SIZE + 1):
+            search_data.product_catalogue[item_id] = generate_product(rng, item_id, date)
+        search_data.search_item_names(ServingType.PRODUCT, "index")
+
+    def search_product_names():
+        for query in _SEARCH_QUERIES:
+            search_data.search_item_names(ServingType.PRODUCT, query)
+
+    return [Benchmark(f"Product name search, {len(_SEARCH_QUERIES)} queries, 50k names", search_product_names,
+                      setup=setup_catalogue, max_time=len(_SEARCH_QUERIES) * _SEARCH_QUERY_MAX_TIME)]
+
+
+def get_benchmarks(ctr_data: CTRData, directory: str) -> list[Benchmark]:
+    """
+    Returns the Core benchmarks of the given CTR data.
+    :param directory: Directory of the savefiles written and read by the benchmarks.
+    """
+    return (get_savefile_benchmarks(ctr_data, directory)
+            + get_recipe_benchmarks(ctr_data)
+            + get_daily_intake_benchmarks(ctr_data)
+            + get_catalogue_benchmarks(ctr_data)
+            + get_search_benchmarks())
@@ -0,0 +1,132 @@
+"""
+Benchmarks of the main window page refreshes and interactions on generated CTR data.
+
+Benchmarks run the main window without a display on the Qt offscreen platform.
+Each measured function processes the pending Qt events after the interaction,
+so that the measured time includes the resulting layout and paint work.
+"""
+
+from Core.csv_data_models import CTRDataModel
+from GUI.MainWindow.main_window import CTRMainWindow
+from GUI.MainWindow.page_daily_intake import TableCol as DailyIntakeTableCol
+from GUI.MainWindow.page_recipes import TableCol as RecipesTableCol
+from Benchmarks.core_benchmarks import Benchmark
+
+from PySide6.QtCore import QDate
+from PySide6.QtWidgets import QApplication
+
+from typing import Any, Callable
+
+
+def processing_events(function: Callable[[], Any]) -> Callable[[], None]:
+    def wrapper():
+        function()
+        QApplication.processEvents()
+    return wrapper
+
+
+def open_savefile(mw: CTRMainWindow, filepath: str) -> None:
+    mw.ctr_data = CTRDataModel(filepath=filepath).read_savefile()
+    mw.setup_on_ctr_data_open()
+
+
+def get_typing_function(line_edit, text: str) -> Callable[[], None]:
+    """
+    Returns a function entering the text into the line edit one keystroke at a time.
+    """
+    def type_text():
+        for n in range(1, len(text) + 1):
+            line_edit.setText(text[:n])
+            QApplication.processEvents()
+    return type_text
+
+
+def get_page_refresh_benchmarks(mw: CTRMainWindow) -> list[Benchmark]:
+    page_recipes = mw.page_recipes
+
+    def select_largest_recipe():
+        recipe = max(mw.ctr_data.recipes_record.values(), key=lambda item: len(item.ingredients))
+        page_recipes.selected_recipe_id = recipe.item_id
+
+    return [Benchmark("Daily intake table refresh", processing_events(mw.page_daily_intake.refresh_table)),
+            Benchmark("Catalogue table refresh", processing_events(mw.page_catalogue.refresh_table)),
+            Benchmark("Recipes list refresh", processing_events(page_recipes.refresh_recipes_list)),
+            Benchmark("Recipe ingredients table refresh, largest recipe",
+                      processing_events(page_recipes.refresh_ingredients_table), setup=select_largest_recipe)]
+
+
+def get_search_benchmarks(mw: CTRMainWindow) -> list[Benchmark]:
+    catalogue_search = mw.main_window.lineEdit_catalogue_search
+    recipe_search = mw.main_window.lineEdit_recipe_list_search
+
+    return [Benchmark("Catalogue search, 5 keystrokes", get_typing_function(catalogue_search, "fresh"),
+                      setup=catalogue_search.clear),
+            Benchmark("Recipes list search, 5 keystrokes", get_typing_function(recipe_search, "baked"),
+                      setup=recipe_search.clear)]
+
+
+def get_navigation_benchmarks(mw: CTRMainWindow) -> list[Benchmark]:
+    page_daily_intake = mw.page_daily_intake
+
+    def reset_date():
+        page_daily_intake.selected_date = QDate.currentDate()
+        page_daily_intake.set_current_date()
+
+    def navigate_week_back():
+        for _ in range(7):
+            page_daily_intake.set_previous_date()
+            QApplication.processEvents()
+
+    return [Benchmark("Daily intake date navigation, 7 days back", navigate_week_back, setup=reset_date)]
+
+
+def get_combobox_benchmarks(mw: CTRMainWindow) -> list[Benchmark]:
+    """
+    Item switches select another Product in the first row combobox, as done by scrolling over the combobox.
+    """
+    page_daily_intake = mw.page_daily_intake
+    page_recipes = mw.page_recipes
+
+    def get_switch_function(page, column: int) -> Callable[[], None]:
+        def switch_items():
+            for _ in range(5):
+                page.table.setCurrentCell(0, column)
+                combobox = page.table.cellWidget(0, column)
+                combobox.setCurrentIndex(combobox.currentIndex() % (combobox.count() - 1) + 1)
+                QApplication.processEvents()
+        return switch_items
+
+    def reset_daily_intake():
+        page_daily_intake.selected_date = QDate.currentDate()
+        page_daily_intake.set_current_date()
+        page_daily_intake.refresh_table()
+
+    def select_largest_recipe():
+        recipe = max(mw.ctr_data.recipes_record.values(), key=lambda item: len(item.ingredients))
+        page_recipes.selected_recipe_id = recipe.item_id
+        page_recipes.refresh_ingredients_table()
+
+    name_column = page_daily_intake.column.index(DailyIntakeTableCol.NAME)
+    ingredient_column = page_recipes.column.index(RecipesTableCol.INGREDIENT)
+
+    return [Benchmark("Daily intake product switch, 5 items",
+                      get_switch_function(page_daily_intake, name_column), setup=reset_daily_intake),
+            Benchmark("Recipe ingredient product switch, 5 items",
+                      get_switch_function(page_recipes, ingredient_column), setup=select_largest_recipe)]
+
+
+def get_benchmarks(mw: CTRMainWindow, filepath: str) -> list[Benchmark]:
+    """
+    Opens the CTR Data savefile in the main window and returns the page benchmarks.
+    Pages are constructed before the benchmarks, so that only refreshes are measured.
+    """
+    open_savefile(mw, filepath)
+    for page in [mw.page_daily_intake, mw.page_catalogue, mw.page_recipes]:
+        page.refresh_page()
+    QApplication.processEvents()
+
+    return ([Benchmark("Open CTR Data savefile", processing_events(lambda: open_savefile(mw, filepath)))]
+            + get_page_refresh_benchmarks(mw)
+            + get_search_benchmarks(mw)
+            + get_navigation_benchmarks(mw)
+            + get_combobox_benchmarks(mw))
@@ -0,0 +1,105 @@
+import unittest
+import os
+import tempfile
+import zipfile
+from Core.ctr_data import CTRData
+from Core.enums import ServingType
+from Core.ingredient import Ingredient
+from Core.serving import Serving
+from Core.batch_operations import (BatchTask, run_batch_task, read_ctr_data, write_ctr_data, get_ctr_data_stats,
+                                   validate_ctr_data, get_daily_intake_range, recompute_serving_nutrition_data,
+                                   resync_item_servings)
+
+
+class TestBatchOperations(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+
+        self.apple = self.ctr_data.add_product("Apple")
+        self.apple.nutrition_data.calories = 52
+
+        self.salad = self.ctr_data.add_recipe("Salad")
+        self.salad.add_ingredient(Ingredient(0, self.apple, amount=200))
+
+        for date in ["2024-01-01", "2024-01-02", "2024-01-03"]:
+            serving = Serving(self.apple.item_id, "Apple", ServingType.PRODUCT, portion=100)
+            serving.set_nutrition_data(self.apple)
+            self.ctr_data.add_daily_intake(date).add_consumed_product(serving)
+
+        self.temp_directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_stats(self):
+        stats = get_ctr_data_stats(self.ctr_data)
+
+        self.assertEqual(stats["products"], 1)
+        self.assertEqual(stats["recipes"], 1)
+        self.assertEqual(stats["days"], 3)
+        self.assertEqual(stats["first_date"], "2024-01-01")
+        self.assertEqual(stats["average_daily_calories"], 52)
+
+    def test_validate(self):
+        self.assertEqual(validate_ctr_data(self.ctr_data), [])
+
+        self.ctr_data.daily_intake_record["2024-01-01"].add_consumed_recipe(Serving(7, "Soup", ServingType.RECIPE))
+        self.ctr_data.favorite_products.add(9)
+        self.apple.nutrition_data.fat = -1
+
+        self.assertEqual(len(validate_ctr_data(self.ctr_data)), 3)
+
+    def test_daily_intake_range(self):
+        range_data = get_daily_intake_range(self.ctr_data, start_date="2024-01-02")
+
+        self.assertEqual(list(range_data.daily_intake_record), ["2024-01-02", "2024-01-03"])
+        self.assertIs(range_data.product_catalogue, self.ctr_data.product_catalogue)
+        self.assertEqual(len(self.ctr_data.daily_intake_record), 3)
+
+    def test_recompute(self):
+        self.apple.nutrition_data.calories = 60
+
+        changes = recompute_serving_nutrition_data(self.ctr_data)
+
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(self.ctr_data.get_daily_intake_total("2024-01-01").calories, 60)
+
+    def test_resync_item_servings(self):
+        filepath = os.path.join(self.temp_directory.name, "CTR Savefile.ct")
+        write_ctr_data(self.ctr_data, filepath)
+        ctr_data = read_ctr_data(filepath)
+        ctr_data.product_catalogue[self.apple.item_id].nutrition_data.calories = 60
+
+        dates = resync_item_servings(ctr_data, ServingType.PRODUCT, self.apple.item_id, start_date="2024-01-02")
+
+        self.assertEqual(dates, ["2024-01-02", "2024-01-03"])
+        self.assertEqual(ctr_data.get_daily_intake_total("2024-01-01").calories, 52)
+        self.assertEqual(ctr_data.get_daily_intake_total("2024-01-03").calories, 60)
+        self.assertTrue(ctr_data.daily_intake_record["2024-01-03"].is_compact)
+
+        self.assertEqual(resync_item_servings(ctr_data, ServingType.RECIPE, 99), [])
+
+    def test_write_read_compressed(self):
+        filepath = os.path.join(self.temp_directory.name, "CTR Savefile.ct")
+        write_ctr_data(self.ctr_data, filepath, compression=zipfile.ZIP_DEFLATED)
+
+        with zipfile.ZipFile(filepath) as savefile:
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_DEFLATED for info in savefile.infolist()))
+
+        ctr_data = read_ctr_data(filepath)
+        self.assertEqual(get_ctr_data_stats(ctr_data), get_ctr_data_stats(self.ctr_data))
+
+    def test_run_batch_task(self):
+        filepath = os.path.join(self.temp_directory.name, "CTR Savefile.ct")
+        write_ctr_data(self.ctr_data, filepath)
+
+        result = run_batch_task(BatchTask("export-range", filepath, {"start_date": "2024-01-03"}))
+        self.assertTrue(result.success)
+        self.assertEqual(list(read_ctr_data(result.output_filepath).daily_intake_record), ["2024-01-03"])
+
+        result = run_batch_task(BatchTask("recompute", filepath, {"recipe_id": 99}))
+        self.assertFalse(result.success)
+
+        result = run_batch_task(BatchTask("info", filepath + ".missing"))
+        self.assertFalse(result.success)
@@ -0,0 +1,25 @@
+import unittest
+import subprocess
+import sys
+import os
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+class TestCoreImports(unittest.TestCase):
+
+    def test_core_imports_without_qt(self):
+        core_modules = [filename.removesuffix(".py") for filename in os.listdir(os.path.join(PROJECT_ROOT, "Core"))
+                        if filename.endswith(".py")]
+
+        # Blocking PySide6 in sys.modules makes any import of it raise ImportError
+        code = ("import sys; sys.modules['PySide6'] = None\n"
+                + "\n".join(f"import Core.{module}" for module in core_modules))
+
+        environment = {key: value for key, value in os.environ.items() if key != "USERPROFILE"}
+
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=environment,
+                                capture_output=True, text=True)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
@@ -1,9 +1,13 @@
+import os
+import tempfile
 import unittest
-from PySide6.QtCore import QDate, Qt
+import datetime
 from Core.daily_intake import DailyIntake
 from Core.serving import Serving
-from Core.enums import ProductCategory, RecipeCategory
-from Core.product import Product
+from Core.enums import ProductCategory, RecipeCategory, ServingType
+from Core.product import Product, NutritionData, AdditionalData
+from Core.ingredient import Ingredient, AmountDefinition
+from Core.csv_data_models import CTRDataModel, RecipesDataModel
 from Core.ctr_data import CTRData
 
 
@@ -129,7 +133,7 @@ class TestCTRData(unittest.TestCase):
         self.assertEqual(ctr_data.recipes_record[2].name, "Curry")
 
     def test_duplicate_todays_daily_intake(self):
-        today = QDate.currentDate().toString(Qt.DateFormat.ISODate)
+        today = datetime.date.today().isoformat()
         new_date = "2024-02-10"
 
         self.ctr_data.add_daily_intake(today)
@@ -138,6 +142,25 @@ class TestCTRData(unittest.TestCase):
         self.assertIn(new_date, self.ctr_data.daily_intake_record)
         self.assertEqual(self.ctr_data.daily_intake_record[new_date].date, new_date)
 
+    def test_daily_intake_total_cache(self):
+        date_str = "2024-02-01"
+        self.assertIsNone(self.ctr_data.get_daily_intake_total(date_str))
+
+        intake = self.ctr_data.add_daily_intake(date_str)
+        serving = Serving(1, "Apple", portion=200)
+        serving.nutrition_data.calories = 50
+        intake.add_consumed_product(serving)
+
+        self.assertAlmostEqual(self.ctr_data.get_daily_intake_total(date_str).calories, 100)
+
+        serving.portion = 400
+        self.assertAlmostEqual(self.ctr_data.get_daily_intake_total(date_str).calories, 100)
+        self.ctr_data.invalidate_daily_intake_totals([date_str])
+        self.assertAlmostEqual(self.ctr_data.get_daily_intake_total(date_str).calories, 200)
+
+        self.ctr_data.add_daily_intake(date_str)
+        self.assertAlmostEqual(self.ctr_data.get_daily_intake_total(date_str).calories, 0)
+
     def test_clear_data(self):
         ctr_data = CTRData()
 
@@ -152,3 +175,172 @@ class TestCTRData(unittest.TestCase):
         self.assertEqual(len(ctr_data.product_catalogue), 1)
         self.assertEqual(len(ctr_data.recipes_record), 1)
         self.assertEqual(len(ctr_data.daily_intake_record), 0)
+
+
+class TestCatalogueMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+        self.apple = self.ctr_data.add_product("Apple")
+        self.apple.nutrition_data = NutritionData(calories=52.0, carbs=14.0)
+        self.bread = self.ctr_data.add_product("Bread")
+
+        self.imported = CTRData()
+        self.imported.product_catalogue.update({
+            1: Product(1, "  apple ", nutrition_data=NutritionData(calories=52.0, carbs=14.0)),
+            2: Product(2, "Čokolada", additional_data=AdditionalData(manufacturer="Kraš")),
+            3: Product(3, "cokolada", additional_data=AdditionalData(manufacturer="kras")),
+            5: Product(5, "Apple", nutrition_data=NutritionData(calories=60.0)),
+        })
+
+    def test_merge_catalogue(self):
+        product_remap = self.ctr_data.merge_catalogue_data(self.imported.product_catalogue)
+
+        self.assertEqual(product_remap, {0: 0, 1: 1, 2: 3, 3: 3, 5: 4})
+        self.assertEqual(len(self.ctr_data.product_catalogue), 5)
+        self.assertIs(self.ctr_data.product_catalogue[3], self.imported.product_catalogue[2])
+        self.assertEqual(self.ctr_data.product_catalogue[4].item_id, 4)
+        self.assertEqual(self.ctr_data.search_item_names(ServingType.PRODUCT, "cokolada", limit=1), [3])
+
+    def test_relink_imported_recipes_and_servings(self):
+        recipe = self.imported.add_recipe("Pie")
+        apple = recipe.add_ingredient(Ingredient(0, self.imported.product_catalogue[1], amount=200))
+        chocolate = recipe.add_ingredient(Ingredient(0, self.imported.product_catalogue[3], amount=50))
+        chocolate.amount_relative_to = apple
+
+        intake_data = self.imported.add_daily_intake("2024-02-01")
+        intake_data.add_consumed_product(Serving(3, "Cokolada", ServingType.PRODUCT, 30))
+        intake_data.add_consumed_recipe(Serving(3, "Pie", ServingType.RECIPE, 30))
+        intake_data.compact()
+
+        product_remap = self.ctr_data.merge_catalogue_data(self.imported.product_catalogue)
+        n_relinked = self.ctr_data.relink_ingredients(self.imported.recipes_record.values(), product_remap)
+        changed_dates = self.ctr_data.remap_serving_items(ServingType.PRODUCT, product_remap,
+                                                          self.imported.daily_intake_record)
+
+        self.assertEqual(n_relinked, 2)
+        self.assertIs(apple.product, self.apple)
+        self.assertIs(chocolate.product, self.ctr_data.product_catalogue[3])
+        self.assertIs(chocolate.amount_relative_to, apple)
+
+        self.assertEqual(changed_dates, [])
+        self.assertTrue(intake_data.is_compact)
+        self.assertEqual(intake_data.get_item_counts(), {(ServingType.PRODUCT, 3): 1, (ServingType.RECIPE, 3): 1})
+
+        self.ctr_data.remap_serving_items(ServingType.PRODUCT, {3: 4}, self.imported.daily_intake_record)
+        self.assertEqual(intake_data.get_item_counts(), {(ServingType.PRODUCT, 4): 1, (ServingType.RECIPE, 3): 1})
+
+        # Items missing from the remap are remapped to the null entry, as the relinked ingredients
+        intake_data.materialize()
+        self.ctr_data.remap_serving_items(ServingType.RECIPE, {0: 0}, self.imported.daily_intake_record)
+        self.assertEqual(intake_data.get_item_counts(), {(ServingType.PRODUCT, 4): 1, (ServingType.RECIPE, 0): 1})
+
+    def add_pie(self, ctr_data: CTRData, apple: Product, bread: Product):
+        pie = ctr_data.add_recipe("Pie")
+        apple_ingredient = pie.add_ingredient(Ingredient(0, apple, amount=200))
+        bread_ingredient = pie.add_ingredient(Ingredient(0, bread, amount=25,
+                                                         amount_definition=AmountDefinition.RELATIVE_TO_AMOUNT))
+        bread_ingredient.amount_relative_to = apple_ingredient
+        return pie
+
+    def test_merge_recipes(self):
+        self.add_pie(self.ctr_data, self.apple, self.bread)
+
+        imported_bread = self.imported.add_product("bread")
+        self.imported.add_recipe("Empty")
+        duplicate_pie = self.add_pie(self.imported, self.imported.product_catalogue[1], imported_bread)
+        chocolate_pie = self.add_pie(self.imported, self.imported.product_catalogue[2], imported_bread)
+        self.add_pie(self.imported, self.imported.product_catalogue[3], imported_bread)
+
+        product_remap = self.ctr_data.merge_catalogue_data(self.imported.product_catalogue)
+        recipe_remap = self.ctr_data.merge_recipe_data(self.imported.recipes_record, product_remap)
+
+        self.assertEqual(product_remap[imported_bread.item_id], self.bread.item_id)
+        self.assertEqual(recipe_remap, {0: 0, 1: 2, 2: 1, 3: 3, 4: 3})
+        self.assertEqual(len(self.ctr_data.recipes_record), 4)
+        self.assertIsNot(self.ctr_data.recipes_record[1], duplicate_pie)
+        self.assertIs(self.ctr_data.recipes_record[3], chocolate_pie)
+
+        ingredients = list(chocolate_pie.ingredients.values())
+        self.assertIs(ingredients[0].product, self.ctr_data.product_catalogue[3])
+        self.assertIs(ingredients[1].product, self.bread)
+        self.assertIs(ingredients[1].amount_relative_to, ingredients[0])
+        self.assertAlmostEqual(ingredients[1].get_mass(), 50.0)
+
+        self.assertEqual(self.ctr_data.search_item_names(ServingType.RECIPE, "empty", limit=1), [2])
+        self.assertIn(3, self.ctr_data.get_recipe_totals())
+
+    def test_merge_recipes_with_removed_products(self):
+        self.add_pie(self.imported, self.imported.product_catalogue[5], self.imported.product_catalogue[2])
+
+        product_remap = self.ctr_data.merge_catalogue_data(self.imported.product_catalogue)
+        self.ctr_data.product_catalogue.pop(product_remap[5])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "Imported.rcp")
+            RecipesDataModel(filepath).write_savefile(self.imported)
+            RecipesDataModel(filepath, merge=True, product_remap=product_remap).read_savefile(self.ctr_data)
+
+        merged_pie = self.ctr_data.recipes_record[1]
+        ingredients = list(merged_pie.ingredients.values())
+        self.assertIs(ingredients[0].product, self.ctr_data.product_catalogue[0])
+        self.assertIs(ingredients[1].product, self.ctr_data.product_catalogue[3])
+
+    def test_merge_savefile(self):
+        self.add_pie(self.ctr_data, self.apple, self.bread)
+
+        imported_bread = self.imported.add_product("Bread")
+        self.add_pie(self.imported, self.imported.product_catalogue[5], imported_bread)
+        self.add_pie(self.imported, self.imported.product_catalogue[1], imported_bread)
+
+        self.ctr_data.add_daily_intake("2024-02-01").add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100))
+        self.ctr_data.daily_intake_record["2024-02-01"].compact()
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 4), [])
+
+        intake_data = self.imported.add_daily_intake("2024-02-01")
+        intake_data.add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100.0))
+        intake_data.add_consumed_product(Serving(5, "Apple", ServingType.PRODUCT, 50.0))
+        intake_data.add_consumed_recipe(Serving(1, "Pie", ServingType.RECIPE, 200.0))
+        intake_data = self.imported.add_daily_intake("2024-02-02")
+        intake_data.add_consumed_product(Serving(imported_bread.item_id, "Bread", ServingType.PRODUCT, 30.0))
+        intake_data.add_consumed_recipe(Serving(2, "Pie", ServingType.RECIPE, 100.0))
+        intake_data.add_consumed_product(Serving(42, "Unknown", ServingType.PRODUCT, 10.0))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "Imported.ctr")
+            CTRDataModel(filepath).write_savefile(self.imported)
+            CTRDataModel(filepath).merge_savefile(self.ctr_data)
+
+        self.assertEqual(len(self.ctr_data.product_catalogue), 5)
+        self.assertEqual(len(self.ctr_data.recipes_record), 3)
+
+        merged_pie = self.ctr_data.recipes_record[2]
+        ingredients = list(merged_pie.ingredients.values())
+        self.assertIs(ingredients[0].product, self.ctr_data.product_catalogue[4])
+        self.assertIs(ingredients[1].product, self.bread)
+        self.assertIs(ingredients[1].amount_relative_to, ingredients[0])
+
+        # Servings are remapped to the merged IDs, servings already consumed on the date are skipped
+        self.assertEqual(self.ctr_data.daily_intake_record["2024-02-01"].get_item_counts(),
+                         {(ServingType.PRODUCT, 1): 1, (ServingType.PRODUCT, 4): 1, (ServingType.RECIPE, 2): 1})
+        self.assertEqual(self.ctr_data.daily_intake_record["2024-02-02"].get_item_counts(),
+                         {(ServingType.PRODUCT, self.bread.item_id): 1, (ServingType.PRODUCT, 0): 1,
+                          (ServingType.RECIPE, 1): 1})
+        self.assertTrue(all(intake_data.is_compact for intake_data in self.ctr_data.daily_intake_record.values()))
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 4), ["2024-02-01"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.RECIPE, 1), ["2024-02-02"])
+
+    def test_merge_savefile_into_itself(self):
+        intake_data = self.ctr_data.add_daily_intake("2024-02-01")
+        intake_data.add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100.0))
+        intake_data.add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100.0))
+        intake_data.compact()
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "Savefile.ctr")
+            CTRDataModel(filepath).write_savefile(self.ctr_data)
+            CTRDataModel(filepath).merge_savefile(self.ctr_data)
+
+        self.assertIs(self.ctr_data.daily_intake_record["2024-02-01"], intake_data)
+        self.assertTrue(intake_data.is_compact)
+        self.assertEqual(intake_data.get_item_counts(), {(ServingType.PRODUCT, 1): 2})
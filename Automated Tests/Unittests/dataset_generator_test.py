@@ -0,0 +1,48 @@
+import unittest
+import os
+import tempfile
+from Core.ingredient import AmountDefinition
+from Core.batch_operations import read_ctr_data, validate_ctr_data, get_ctr_data_stats
+from Core.dataset_generator import DatasetSize, generate_ctr_data, write_generated_savefiles
+
+
+class TestDatasetGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.size = DatasetSize(products=50, recipes=10, years=0.1, relative_ingredient_ratio=0.8)
+
+    def test_size(self):
+        ctr_data = generate_ctr_data(self.size)
+
+        # Catalogue and recipes include the null entries
+        self.assertEqual(len(ctr_data.product_catalogue), 51)
+        self.assertEqual(len(ctr_data.recipes_record), 11)
+        self.assertLessEqual(len(ctr_data.daily_intake_record), 36)
+        self.assertEqual(list(ctr_data.daily_intake_record)[-1], "2025-01-01")
+
+    def test_reproducible(self):
+        stats = get_ctr_data_stats(generate_ctr_data(self.size, seed=1))
+
+        self.assertEqual(get_ctr_data_stats(generate_ctr_data(self.size, seed=1)), stats)
+        self.assertNotEqual(get_ctr_data_stats(generate_ctr_data(self.size, seed=2)), stats)
+
+    def test_relative_ingredients(self):
+        ctr_data = generate_ctr_data(self.size)
+
+        relative_ingredients = [ingredient for recipe in ctr_data.recipes_record.values()
+                                for ingredient in recipe.ingredients.values()
+                                if ingredient.amount_definition is not AmountDefinition.GRAMS]
+
+        self.assertTrue(relative_ingredients)
+        self.assertTrue(all(ingredient.amount_relative_to is not None for ingredient in relative_ingredients))
+        self.assertEqual(validate_ctr_data(ctr_data), [])
+
+    def test_write_savefiles(self):
+        ctr_data = generate_ctr_data(self.size)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepaths = write_generated_savefiles(ctr_data, directory)
+
+            self.assertEqual([os.path.splitext(filepath)[1] for filepath in filepaths],
+                             [".ct", ".ctc", ".ctr", ".ctd"])
+            self.assertEqual(get_ctr_data_stats(read_ctr_data(filepaths[0])), get_ctr_data_stats(ctr_data))
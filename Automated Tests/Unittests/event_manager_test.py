@@ -0,0 +1,65 @@
+import unittest
+from GUI.Common.event_manager import event_manager, ChangeEntity, DataChangeEvent
+
+from PySide6.QtCore import QCoreApplication
+
+
+class TestEventManager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.event_manager = event_manager()
+        self.event_manager.dispatch_pending_changes()
+        self.dispatched: list[list[DataChangeEvent]] = []
+
+    def tearDown(self):
+        self.event_manager.unsubscribe(self.on_changes)
+        self.event_manager.dispatch_pending_changes()
+
+    def on_changes(self, changes: list[DataChangeEvent]):
+        self.dispatched.append(changes)
+
+    def test_merge_change_events(self):
+        change = DataChangeEvent(ChangeEntity.CATALOGUE, item_ids={1}, dates={"2024-01-01"}, messages=["First"])
+        change.merge(DataChangeEvent(ChangeEntity.CATALOGUE, item_ids={2}, structural=True, messages=["Second"]))
+        change.merge(DataChangeEvent(ChangeEntity.CATALOGUE, item_ids={1}, dates={"2024-01-02"}))
+
+        self.assertEqual(change.item_ids, {1, 2})
+        self.assertEqual(change.dates, {"2024-01-01", "2024-01-02"})
+        self.assertTrue(change.structural)
+        self.assertEqual(change.messages, ["First", "Second"])
+
+    def test_coalesce_pending_changes(self):
+        self.event_manager.subscribe(self.on_changes, entities=[ChangeEntity.CATALOGUE, ChangeEntity.DAILY_INTAKE])
+
+        self.event_manager.emit_data_changed("Name changed", ChangeEntity.CATALOGUE, item_ids=[1])
+        self.event_manager.emit_data_changed("Price changed", ChangeEntity.CATALOGUE, item_ids=[2])
+        self.event_manager.emit_data_changed("Portion changed", ChangeEntity.DAILY_INTAKE, dates=["2024-01-01"])
+        self.event_manager.emit_data_changed("Recipe renamed", ChangeEntity.RECIPES, item_ids=[3])
+        self.assertTrue(self.event_manager.has_pending_changes())
+        self.assertEqual(self.dispatched, [])
+
+        self.event_manager.dispatch_pending_changes()
+        self.assertFalse(self.event_manager.has_pending_changes())
+        self.assertEqual(len(self.dispatched), 1)
+
+        changes = {change.entity: change for change in self.dispatched[0]}
+        self.assertEqual(set(changes), {ChangeEntity.CATALOGUE, ChangeEntity.DAILY_INTAKE})
+        self.assertEqual(changes[ChangeEntity.CATALOGUE].item_ids, {1, 2})
+        self.assertEqual(changes[ChangeEntity.CATALOGUE].messages, ["Name changed", "Price changed"])
+        self.assertEqual(changes[ChangeEntity.DAILY_INTAKE].dates, {"2024-01-01"})
+
+    def test_dispatch_only_subscribed_entities(self):
+        self.event_manager.subscribe(self.on_changes, entities=[ChangeEntity.RECIPES])
+
+        self.event_manager.emit_data_changed("Name changed", ChangeEntity.CATALOGUE, item_ids=[1])
+        self.event_manager.dispatch_pending_changes()
+        self.assertEqual(self.dispatched, [])
+
+        self.event_manager.emit_data_changed("Recipe removed", ChangeEntity.RECIPES, item_ids=[3], structural=True)
+        self.event_manager.dispatch_pending_changes()
+        self.assertEqual(len(self.dispatched), 1)
+        self.assertTrue(self.dispatched[0][0].structural)
@@ -0,0 +1,84 @@
+import unittest
+import os
+import json
+import tempfile
+from Core.instrumentation import Instrumentation, instrumentation, timed, get_percentile
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation(verbose=False)
+
+    def test_span_stats(self):
+        for duration in [0.001 * n for n in range(1, 101)]:
+            self.instrumentation.record_span("Refresh", start=0.0, duration=duration)
+
+        stats = self.instrumentation.get_span_stats("Refresh")
+        self.assertEqual(stats.count, 100)
+        self.assertAlmostEqual(stats.p50, 0.05)
+        self.assertAlmostEqual(stats.p95, 0.095)
+        self.assertAlmostEqual(stats.max, 0.1)
+        self.assertIsNone(self.instrumentation.get_span_stats("Save"))
+
+    def test_percentile(self):
+        self.assertEqual(get_percentile([], 50), 0.0)
+        self.assertEqual(get_percentile([3.0], 95), 3.0)
+        self.assertEqual(get_percentile([1.0, 2.0, 3.0, 4.0], 50), 2.0)
+
+    def test_disabled(self):
+        self.instrumentation.enabled = False
+
+        with self.instrumentation.span("Refresh"):
+            pass
+        self.instrumentation.count("Rows")
+
+        self.assertEqual(self.instrumentation.get_all_span_stats(), [])
+        self.assertEqual(self.instrumentation.counters, {})
+
+    def test_no_trace_events_without_tracing(self):
+        with self.instrumentation.span("Load", rows=3):
+            self.instrumentation.count("Rows", 3)
+
+        self.assertEqual(self.instrumentation.get_span_stats("Load").count, 1)
+        self.assertEqual(self.instrumentation.get_counter("Rows"), 3)
+        self.assertEqual(self.instrumentation.get_chrome_trace()["traceEvents"], [])
+
+    def test_counters_and_chrome_trace(self):
+        self.instrumentation.tracing = True
+
+        with self.instrumentation.span("Load", rows=3):
+            self.instrumentation.count("Rows", 3)
+        self.instrumentation.count("Rows", 2)
+
+        self.assertEqual(self.instrumentation.get_counter("Rows"), 5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "trace.json")
+            self.instrumentation.export_chrome_trace(filepath)
+            with open(filepath, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+
+        self.assertEqual([event["ph"] for event in events], ["C", "X", "C"])
+        self.assertEqual(events[1]["args"], {"rows": 3})
+
+    def test_timed_decorator(self):
+        @timed("Calculate")
+        def calculate(value):
+            return value * 2
+
+        instance = instrumentation()
+        enabled = instance.enabled
+        instance.enabled = True
+        try:
+            instance.reset()
+            self.assertEqual(calculate(2), 4)
+            self.assertEqual(instance.get_span_stats("Calculate").count, 1)
+        finally:
+            instance.enabled = enabled
+            instance.reset()
+
+    def test_shared_instance_disabled_by_default(self):
+        if os.environ.get("CTR_INSTRUMENTATION", "0") == "0":
+            self.assertFalse(instrumentation().enabled)
+            self.assertFalse(instrumentation().tracing)
@@ -0,0 +1,80 @@
+import unittest
+from Core.ctr_data import CTRData
+from Core.serving import Serving
+from Core.intake_history import IntakeHistory, downsample_min_max, get_month
+
+
+class TestIntakeHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+
+        for date, calories in [("2024-01-03", 300), ("2024-01-01", 100), ("2024-01-02", 200)]:
+            serving = Serving(1, "Apple", portion=100)
+            serving.nutrition_data.calories = calories
+            self.ctr_data.add_daily_intake(date).add_consumed_product(serving)
+
+        self.ctr_data.add_daily_intake("2024-01-04")
+
+    def test_from_ctr_data(self):
+        history = IntakeHistory.from_ctr_data(self.ctr_data)
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.days, sorted(history.days))
+        self.assertEqual(history.values["calories"], [100, 200, 300])
+
+    def test_update_dates(self):
+        history = IntakeHistory.from_ctr_data(self.ctr_data)
+
+        self.ctr_data.remove_daily_intake("2024-01-02")
+        serving = Serving(1, "Apple", portion=200)
+        serving.nutrition_data.calories = 50
+        self.ctr_data.daily_intake_record["2024-01-04"].add_consumed_product(serving)
+
+        history.update_dates(self.ctr_data, ["2024-01-02", "2024-01-04"])
+
+        self.assertEqual(history.days, [IntakeHistory.get_day(date)
+                                        for date in ["2024-01-01", "2024-01-03", "2024-01-04"]])
+        self.assertEqual(history.values["calories"], [100, 300, 100])
+
+    def test_get_series_range(self):
+        history = IntakeHistory.from_ctr_data(self.ctr_data)
+        start = IntakeHistory.get_day("2024-01-02")
+
+        days, values = history.get_series("calories", start, start + 10)
+        self.assertEqual(days, [start, start + 1])
+        self.assertEqual(values, [200, 300])
+
+    def test_downsample_min_max(self):
+        days = list(range(70, 84))
+        values = [5, 1, 9, 3, 3, 3, 3, 4, 4, 4, 2, 4, 4, 8]
+
+        sampled_days, sampled_values = downsample_min_max(days, values, bucket_days=7)
+
+        self.assertEqual(sampled_days, [71, 72, 80, 83])
+        self.assertEqual(sampled_values, [1, 9, 2, 8])
+
+    def test_downsample_calendar_months(self):
+        # January 30 and 31 share the 30 day bucket of February 1, but not its calendar month
+        days = [IntakeHistory.get_day(date) for date in ["2024-01-30", "2024-01-31", "2024-02-01", "2024-02-29"]]
+        values = [1, 5, 3, 2]
+
+        self.assertEqual(days[0] // 30, days[2] // 30)
+        self.assertEqual(get_month(days[1]), 2024 * 12 + 1)
+
+        sampled_days, sampled_values = downsample_min_max(days, values, bucket_days=1, bucket_months=1)
+
+        self.assertEqual(sampled_days, days)
+        self.assertEqual(sampled_values, [1, 5, 3, 2])
+
+        sampled_days, sampled_values = downsample_min_max(days, values, bucket_days=1, bucket_months=2)
+
+        self.assertEqual(sampled_days, [days[0], days[1]])
+        self.assertEqual(sampled_values, [1, 5])
+
+    def test_downsample_constant_bucket(self):
+        sampled_days, sampled_values = downsample_min_max([7, 8, 9], [2, 2, 2], bucket_days=7)
+
+        self.assertEqual(sampled_days, [7])
+        self.assertEqual(sampled_values, [2])
+
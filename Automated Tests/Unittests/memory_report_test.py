@@ -0,0 +1,63 @@
+import unittest
+import os
+import tempfile
+from Core.ctr_data import CTRData
+from Core.ingredient import Ingredient
+from Core.batch_operations import write_ctr_data
+from Core.memory_report import (get_memory_usage, get_ctr_data_memory_usage, trace_allocations,
+                                get_savefile_memory_report, format_size)
+
+
+class TestMemoryReport(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+        self.apple = self.ctr_data.add_product("Apple")
+        self.salad = self.ctr_data.add_recipe("Salad")
+        self.salad.add_ingredient(Ingredient(0, self.apple, amount=200))
+        self.ctr_data.add_daily_intake("2024-01-01")
+
+    def test_shared_objects_counted_once(self):
+        shared = [1.5, 2.5]
+        seen = set()
+
+        first = get_memory_usage("First", {"a": shared}, seen)
+        second = get_memory_usage("Second", {"b": shared}, seen)
+
+        self.assertGreater(first.objects, second.objects)
+        self.assertGreater(first.bytes, second.bytes)
+
+    def test_sections(self):
+        sections = {section.name: section for section in get_ctr_data_memory_usage(self.ctr_data)}
+
+        self.assertEqual(list(sections), ["Catalogue", "Recipes", "Daily intake", "Daily intake totals cache", "Other"])
+        self.assertTrue(all(section.bytes > 0 for section in sections.values()))
+
+        # Ingredient Product is counted in the catalogue, not in the recipes
+        catalogue_only = get_memory_usage("Catalogue", self.ctr_data.product_catalogue)
+        self.assertEqual(sections["Catalogue"].bytes, catalogue_only.bytes)
+
+    def test_trace_allocations(self):
+        result, size, peak, sites = trace_allocations(lambda: [str(n) * 10 for n in range(10000)], top=3)
+
+        self.assertEqual(len(result), 10000)
+        self.assertGreater(size, 0)
+        self.assertGreaterEqual(peak, size)
+        self.assertLessEqual(len(sites), 3)
+        self.assertTrue(sites[0].filename.endswith("memory_report_test.py"))
+
+    def test_savefile_memory_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "CTR Savefile.ct")
+            write_ctr_data(self.ctr_data, filepath)
+
+            report, ctr_data = get_savefile_memory_report(filepath)
+
+        self.assertEqual(len(ctr_data.product_catalogue), 2)
+        self.assertGreater(report.traced_bytes, 0)
+        self.assertEqual(len(report.sections), 5)
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 kB")
+        self.assertEqual(format_size(3 * 1024 ** 2), "3.0 MB")
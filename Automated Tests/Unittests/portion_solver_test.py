@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+from Core.ctr_data import CTRData
+from Core.enums import ServingType
+from Core.product import NutritionData
+from Core.recipe import Ingredient
+from Core.portion_solver import get_portion_candidates, solve_nnls, solve_portions, rank_single_candidates
+
+
+class TestPortionSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+
+        self.chicken = self.ctr_data.add_product("Chicken")
+        self.chicken.nutrition_data = NutritionData(calories=120.0, fat=2.0, carbs=0.0, protein=25.0)
+        self.rice = self.ctr_data.add_product("Rice")
+        self.rice.nutrition_data = NutritionData(calories=130.0, fat=0.0, carbs=30.0, protein=2.0)
+        self.oil = self.ctr_data.add_product("Oil")
+        self.oil.nutrition_data = NutritionData(calories=900.0, fat=100.0, carbs=0.0, protein=0.0)
+        self.ctr_data.add_product("Water")
+
+        self.bowl = self.ctr_data.add_recipe("Bowl")
+        self.bowl.add_ingredient(Ingredient(0, self.rice, amount=100))
+
+        self.ctr_data.favorite_products = {1, 2, 3, 4}
+        self.ctr_data.favorite_recipes = {1}
+
+        self.candidates = get_portion_candidates(
+            self.ctr_data, [(ServingType.PRODUCT, 1), (ServingType.PRODUCT, 2), (ServingType.PRODUCT, 3)])
+
+    def test_candidates(self):
+        candidates = get_portion_candidates(self.ctr_data)
+
+        self.assertEqual([(candidate.item_type, candidate.item_id) for candidate in candidates],
+                         [(ServingType.PRODUCT, 1), (ServingType.PRODUCT, 2), (ServingType.PRODUCT, 3),
+                          (ServingType.RECIPE, 1)])
+        self.assertEqual(candidates[3].nutrition_data, self.rice.nutrition_data)
+        self.assertIsNot(candidates[0].nutrition_data, self.chicken.nutrition_data)
+
+    def test_nnls(self):
+        a = np.array([[1.0, 0.0], [0.0, 1.0]])
+        np.testing.assert_allclose(solve_nnls(a, np.array([2.0, -1.0])), [2.0, 0.0])
+        np.testing.assert_allclose(solve_nnls(a, np.array([2.0, 3.0])), [2.0, 3.0])
+
+    def test_exact_solution(self):
+        portions = np.array([200.0, 300.0, 10.0])
+        targets = NutritionData()
+        for candidate, portion in zip(self.candidates, portions):
+            targets += candidate.nutrition_data * (portion / 100)
+
+        solution = solve_portions(NutritionData(), targets, self.candidates)
+
+        self.assertEqual([solved.candidate.name for solved in solution.portions], ["Rice", "Chicken", "Oil"])
+        np.testing.assert_allclose([solved.portion for solved in solution.portions], [300.0, 200.0, 10.0])
+        self.assertAlmostEqual(solution.deviation.calories, 0.0)
+        self.assertAlmostEqual(solution.total.protein, targets.protein)
+
+    def test_consumed_and_limits(self):
+        targets = NutritionData(calories=0.0, fat=0.0, carbs=0.0, protein=100.0)
+        consumed = NutritionData(protein=50.0)
+
+        solution = solve_portions(consumed, targets, self.candidates, max_portion=190.0)
+
+        self.assertEqual([solved.candidate.name for solved in solution.portions], ["Chicken", "Rice"])
+        self.assertAlmostEqual(solution.portions[0].portion, 190.0)
+        self.assertAlmostEqual(solution.portions[1].portion, 125.0)
+        self.assertAlmostEqual(solution.total.protein, 100.0)
+        self.assertEqual(solution.deviation.calories, 0.0)
+
+        solution = solve_portions(NutritionData(protein=120.0), targets, self.candidates)
+        self.assertEqual(solution.portions, [])
+
+    def test_rank_single_candidates(self):
+        targets = NutritionData(calories=240.0, fat=4.0, carbs=0.0, protein=50.0)
+
+        ranked = rank_single_candidates(NutritionData(), targets, self.candidates)
+
+        best, deviation = ranked[0]
+        self.assertEqual(best.candidate.name, "Chicken")
+        self.assertAlmostEqual(best.portion, 200.0)
+        self.assertAlmostEqual(deviation, 0.0)
+        self.assertEqual(len(ranked), 3)
@@ -1,6 +1,6 @@
 
 import unittest
-from Core.product import Product, AdditionalData, NutritionData
+from Core.product import Product, AdditionalData, NutritionData, get_prices_per_gram, get_prices_for_masses
 from Core.enums import ProductCategory, ServingType
 from Core.units import MeasurementUnit
 from GUI.Common.gui_util_functions import strip_forbidden_characters
@@ -90,6 +90,32 @@ class TestProduct(unittest.TestCase):
         self.assertEqual(data.get_mass_in_grams(1), 1030)
         self.assertEqual(data.get_mass_in_grams(0.5), 515)
 
+        data.packaging_unit = MeasurementUnit.TBSP
+        self.assertAlmostEqual(data.get_mass_in_grams(2), 30.9)
+
+    def test_cached_price_per_gram(self):
+        self.assertAlmostEqual(self.additional.get_price_per_gram(), 5.99 / 500)
+
+        self.additional.packaging_unit = MeasurementUnit.KG
+        self.assertAlmostEqual(self.additional.get_price_per_gram(), 5.99 / 500000)
+
+        self.additional.price = 11.98
+        self.assertAlmostEqual(self.additional.get_price_for_mass(1000), 0.02396)
+
+        self.additional.packaging_unit = MeasurementUnit.ML
+        self.additional.density = 0.5
+        self.assertAlmostEqual(self.additional.get_price_per_gram(), 11.98 / 250)
+
+    def test_vectorized_prices(self):
+        products = [self.additional,
+                    AdditionalData(packaging_amount=1, packaging_unit=MeasurementUnit.L, density=1.03, price=1.5),
+                    AdditionalData(packaging_amount=0, packaging_unit=MeasurementUnit.KG, price=2.0)]
+
+        self.assertEqual(list(get_prices_per_gram(products)), [data.get_price_per_gram() for data in products])
+        self.assertEqual(list(get_prices_for_masses(products, [250, 100, 50])),
+                         [data.get_price_for_mass(mass) for data, mass in zip(products, [250, 100, 50])])
+        self.assertEqual(len(get_prices_per_gram([])), 0)
+
 
 class TestProductEdgeCases(unittest.TestCase):
 
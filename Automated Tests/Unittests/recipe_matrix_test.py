@@ -0,0 +1,110 @@
+import unittest
+from Core.ctr_data import CTRData
+from Core.recipe_matrix import RecipeMatrix
+from Core.ingredient import Ingredient, AmountDefinition, NetAmountDefinition
+from Core.units import MeasurementUnit
+
+
+class TestRecipeMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+
+        self.flour = self.ctr_data.add_product("Flour")
+        self.flour.nutrition_data.calories = 364.0
+        self.flour.nutrition_data.carbs = 76.3
+        self.flour.additional_data.packaging_amount = 1.0
+        self.flour.additional_data.packaging_unit = MeasurementUnit.KG
+        self.flour.additional_data.price = 1.2
+
+        self.water = self.ctr_data.add_product("Water")
+
+        self.butter = self.ctr_data.add_product("Butter")
+        self.butter.nutrition_data.calories = 717.0
+        self.butter.nutrition_data.fat = 81.1
+        self.butter.additional_data.packaging_amount = 250.0
+        self.butter.additional_data.packaging_unit = MeasurementUnit.G
+        self.butter.additional_data.price = 2.5
+
+        self.bread = self.ctr_data.add_recipe("Bread")
+        flour = self.bread.add_ingredient(Ingredient(0, self.flour, amount=500.0))
+        water = Ingredient(0, self.water, amount=65.0, amount_definition=AmountDefinition.RELATIVE_TO_AMOUNT)
+        water.amount_relative_to = flour
+        self.bread.add_ingredient(water)
+        self.bread.net_mass_data.measured_value = 700.0
+        self.bread.net_mass_data.reduction = 50.0
+        self.bread.net_mass_data.adjust_for_evaporation = True
+
+        self.pastry = self.ctr_data.add_recipe("Pastry")
+        self.pastry.add_ingredient(Ingredient(0, self.flour, amount=200.0))
+        self.pastry.add_ingredient(Ingredient(0, self.butter, amount=120.0, net_amount=90.0,
+                                              net_amount_definition=NetAmountDefinition.RELATIVE_TO_AMOUNT))
+
+        self.ctr_data.add_recipe("Empty")
+
+    def assert_recipe_totals(self):
+        recipe_totals = self.ctr_data.get_recipe_totals()
+
+        for recipe in self.ctr_data.recipes_record.values():
+            self.assertEqual(recipe_totals.get_nutrition_data_per_100g(recipe.item_id),
+                             recipe.get_total_nutrition_data_per_100g())
+            self.assertEqual(recipe_totals.get_price_per_100g(recipe.item_id), recipe.get_price_per_100g())
+
+    def test_recipe_totals(self):
+        recipe_totals = self.ctr_data.get_recipe_totals()
+
+        self.assertEqual(list(recipe_totals.recipe_ids), [0, 1, 2, 3])
+        self.assertAlmostEqual(recipe_totals.net_mass[1], 825.0)
+        self.assertAlmostEqual(recipe_totals.price[2], 1.44)
+        self.assertIsNone(recipe_totals.get_price_per_100g(4))
+        self.assert_recipe_totals()
+
+    def test_ingredient_edits(self):
+        self.ctr_data.get_recipe_totals()
+
+        self.bread.ingredients[1].amount = 600.0
+        self.ctr_data.invalidate_recipe_totals(recipe_ids=[self.bread.item_id])
+        self.assert_recipe_totals()
+
+        self.butter.nutrition_data.fat = 82.0
+        self.butter.additional_data.price = 3.0
+        self.ctr_data.invalidate_recipe_totals(product_ids=[self.butter.item_id])
+        self.assert_recipe_totals()
+
+    def test_added_and_removed_recipes(self):
+        self.ctr_data.get_recipe_totals()
+
+        duplicate = self.ctr_data.duplicate_recipe(self.pastry.item_id)
+        self.ctr_data.remove_recipe(self.bread.item_id)
+
+        recipe_totals = self.ctr_data.get_recipe_totals()
+        self.assertIn(duplicate.item_id, recipe_totals)
+        self.assertNotIn(self.bread.item_id, recipe_totals)
+        self.assert_recipe_totals()
+
+    def test_unreferenced_product_columns(self):
+        recipe_matrix = RecipeMatrix()
+        recipe_matrix.synchronize(self.ctr_data.recipes_record)
+        recipe_matrix.compute()
+        self.assertEqual(recipe_matrix.n_columns, 3)
+
+        # Replaced Products, such as after a catalogue import, are no longer referenced by the rows
+        rye_flour = self.ctr_data.add_product("Rye Flour")
+        rye_flour.nutrition_data.calories = 325.0
+        for recipe in [self.bread, self.pastry]:
+            for ingredient in recipe.ingredients.values():
+                if ingredient.product is self.flour:
+                    ingredient.product = rye_flour
+        self.ctr_data.remove_product(self.flour.item_id)
+
+        recipe_matrix.synchronize(self.ctr_data.recipes_record, [self.bread.item_id, self.pastry.item_id])
+        self.assertEqual(recipe_matrix.n_columns, 3)
+
+        recipe_matrix.remove_recipe(self.pastry.item_id)
+        recipe_matrix.synchronize({self.bread.item_id: self.bread})
+        self.assertEqual(recipe_matrix.n_columns, 2)
+
+        recipe_totals = recipe_matrix.compute()
+        self.assertEqual(recipe_totals.get_nutrition_data_per_100g(self.bread.item_id),
+                         self.bread.get_total_nutrition_data_per_100g())
+        self.assertEqual(recipe_totals.get_price_per_100g(self.bread.item_id), self.bread.get_price_per_100g())
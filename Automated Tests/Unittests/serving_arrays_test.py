@@ -0,0 +1,75 @@
+import unittest
+import copy
+from Core.serving import Serving
+from Core.product import NutritionData
+from Core.enums import ServingType
+from Core.daily_intake import DailyIntake
+from Core.serving_arrays import ServingArrays
+
+
+class TestServingArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.daily_intake = DailyIntake("2025-02-07")
+
+        apple = Serving(item_id=1, item_name="Apple", item_type=ServingType.PRODUCT, portion=150.0)
+        apple.nutrition_data = NutritionData(calories=52.0, protein=0.3, carbs=14.0, fat=0.2)
+        bread = Serving(item_id=3, item_name="Bread", item_type=ServingType.PRODUCT, portion=0.1)
+        bread.nutrition_data = NutritionData(calories=265.3, protein=9.1, carbs=49.4, fat=3.2)
+        smoothie = Serving(item_id=2, item_name="Smoothie", item_type=ServingType.RECIPE, portion=200.0)
+        smoothie.nutrition_data = NutritionData(calories=90.0, protein=2.0, carbs=18.0, fat=1.0)
+
+        self.daily_intake.add_consumed_product(apple)
+        self.daily_intake.add_consumed_product(bread)
+        self.daily_intake.add_consumed_recipe(smoothie)
+
+    def get_compact_copy(self) -> DailyIntake:
+        return DailyIntake.convert_from_csv(self.daily_intake.convert_to_csv())
+
+    def test_serving_round_trip(self):
+        servings = self.daily_intake.consumed_products + self.daily_intake.consumed_recipes
+        serving_arrays = ServingArrays.from_servings(servings)
+
+        self.assertEqual(len(serving_arrays), 3)
+        for index, serving in enumerate(servings):
+            self.assertEqual(serving_arrays.get_serving_csv(index), serving.convert_to_csv())
+            self.assertEqual(serving_arrays.get_serving(index).convert_to_csv(), serving.convert_to_csv())
+
+    def test_loaded_record_is_compact(self):
+        compact_intake = self.get_compact_copy()
+
+        self.assertTrue(compact_intake.is_compact)
+        self.assertTrue(compact_intake.has_data)
+        self.assertEqual(compact_intake.n_consumed_products, 2)
+        self.assertEqual(compact_intake.n_consumed_recipes, 1)
+        self.assertEqual(compact_intake.convert_to_csv(), self.daily_intake.convert_to_csv())
+        self.assertEqual(compact_intake.get_total_consumed_nutrition_data(),
+                         self.daily_intake.get_total_consumed_nutrition_data())
+        self.assertTrue(compact_intake.is_compact)
+
+    def test_materialize_on_access(self):
+        compact_intake = self.get_compact_copy()
+
+        recipes = compact_intake.consumed_recipes
+        self.assertFalse(compact_intake.is_compact)
+        self.assertEqual([serving.item_name for serving in compact_intake.consumed_products], ["Apple", "Bread"])
+        self.assertEqual([serving.item_type for serving in recipes], [ServingType.RECIPE])
+
+        compact_intake.add_consumed_recipe(Serving(4, "Soup", ServingType.RECIPE, 300))
+        self.assertEqual(compact_intake.n_consumed_recipes, 2)
+
+    def test_compact(self):
+        expected_csv = self.daily_intake.convert_to_csv()
+        self.daily_intake.compact()
+
+        self.assertTrue(self.daily_intake.is_compact)
+        self.assertEqual(self.daily_intake.convert_to_csv(), expected_csv)
+
+    def test_deepcopy_compact_record(self):
+        compact_intake = self.get_compact_copy()
+        intake_copy = copy.deepcopy(compact_intake)
+
+        intake_copy.consumed_products.pop()
+        self.assertTrue(compact_intake.is_compact)
+        self.assertEqual(compact_intake.n_consumed_products, 2)
+        self.assertEqual(intake_copy.n_consumed_products, 1)
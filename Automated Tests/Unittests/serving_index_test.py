@@ -0,0 +1,90 @@
+import unittest
+from Core.ctr_data import CTRData
+from Core.daily_intake import DailyIntake
+from Core.enums import ServingType
+from Core.serving import Serving
+
+
+class TestServingIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+
+        for date in ["2024-01-01", "2024-01-02", "2024-01-03"]:
+            self.ctr_data.add_daily_intake(date).add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100))
+
+        self.ctr_data.daily_intake_record["2024-01-02"].add_consumed_recipe(Serving(1, "Salad", ServingType.RECIPE, 300))
+
+    def test_get_serving_dates(self):
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1),
+                         ["2024-01-01", "2024-01-02", "2024-01-03"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.RECIPE, 1), ["2024-01-02"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1, "2024-01-02", "2024-01-02"),
+                         ["2024-01-02"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 2), [])
+
+    def test_add_and_remove_servings(self):
+        self.ctr_data.get_serving_dates(ServingType.PRODUCT, 2)
+
+        intake_data = self.ctr_data.daily_intake_record["2024-01-03"]
+        intake_data.add_consumed_product(Serving(2, "Pear", ServingType.PRODUCT, 100))
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 2), ["2024-01-03"])
+
+        self.assertTrue(intake_data.remove_consumed_product(intake_data.consumed_products[-1]))
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 2), [])
+        self.assertFalse(intake_data.remove_consumed_product(Serving(2, "Pear", ServingType.PRODUCT, 100)))
+
+    def test_replaced_and_removed_records(self):
+        self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1)
+
+        record = DailyIntake("2024-01-01")
+        record.add_consumed_product(Serving(3, "Bread", ServingType.PRODUCT, 50))
+        self.ctr_data.daily_intake_record = {"2024-01-01": DailyIntake.convert_from_csv(record.convert_to_csv()),
+                                             "2024-01-02": self.ctr_data.daily_intake_record["2024-01-02"]}
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1), ["2024-01-02"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 3), ["2024-01-01"])
+
+        self.ctr_data.remove_daily_intake("2024-01-02")
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.RECIPE, 1), [])
+
+    def test_invalidate_modified_servings(self):
+        self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1)
+
+        serving = self.ctr_data.daily_intake_record["2024-01-01"].consumed_products[0]
+        serving.item_id = 4
+        self.ctr_data.invalidate_daily_intake_totals(["2024-01-01"])
+
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 4), ["2024-01-01"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1), ["2024-01-02", "2024-01-03"])
+
+    def test_synchronize_changed_dates(self):
+        self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1)
+
+        # Records without changes are not indexed again
+        record = self.ctr_data.daily_intake_record["2024-01-01"]
+        record.consumed_products[0].item_id = 5
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 5), [])
+
+        self.ctr_data.daily_intake_record["2024-01-02"].add_consumed_product(Serving(5, "Plum", ServingType.PRODUCT, 80))
+        self.ctr_data.add_daily_intake("2024-01-04").add_consumed_product(Serving(5, "Plum", ServingType.PRODUCT, 80))
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 5), ["2024-01-02", "2024-01-04"])
+
+        self.ctr_data.duplicate_daily_intake("2024-01-04", "2024-01-05")
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 5),
+                         ["2024-01-02", "2024-01-04", "2024-01-05"])
+
+        # Duplicated records are tracked by their own dates
+        self.ctr_data.daily_intake_record["2024-01-05"].add_consumed_product(Serving(6, "Fig", ServingType.PRODUCT, 40))
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 6), ["2024-01-05"])
+
+    def test_synchronize_inserted_records(self):
+        self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1)
+
+        record = DailyIntake("2024-01-04")
+        record.add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100))
+        self.ctr_data.daily_intake_record["2024-01-04"] = record
+        self.ctr_data.invalidate_daily_intake_totals(["2024-01-04"])
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 1, "2024-01-04"), ["2024-01-04"])
+
+        record.add_consumed_product(Serving(7, "Kiwi", ServingType.PRODUCT, 60))
+        self.assertEqual(self.ctr_data.get_serving_dates(ServingType.PRODUCT, 7), ["2024-01-04"])
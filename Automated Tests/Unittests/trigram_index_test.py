@@ -0,0 +1,104 @@
+import unittest
+from Core.ctr_data import CTRData
+from Core.enums import ServingType
+from Core.trigram_index import TrigramIndex, normalize_text, get_trigrams
+
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.synchronize({1: "Apple Juice", 2: "Green Apple", 3: "Pineapple", 4: "Čokolada", 5: "Apricot Jam"})
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("Čokolada Šećer"), "cokolada secer")
+        self.assertEqual(get_trigrams("ab"), {"  a", " ab", "ab "})
+        self.assertEqual(get_trigrams("ab", partial_last_word=True), {"  a", " ab"})
+
+    def test_prefix_and_substring(self):
+        self.assertEqual(self.index.search("apple")[:2], [1, 2])
+        self.assertIn(3, self.index.search("apple"))
+        self.assertEqual(self.index.search("apr")[0], 5)
+
+    def test_typos_and_word_order(self):
+        self.assertEqual(self.index.search("aple juce")[0], 1)
+        self.assertEqual(self.index.search("apple green")[0], 2)
+        self.assertEqual(self.index.search("cokolada")[0], 4)
+        self.assertEqual(self.index.search("xyz"), [])
+
+    def test_incremental_updates(self):
+        self.index.search("app")
+
+        self.index.add(6, "Apple Pie")
+        self.assertIn(6, self.index.search("apple p"))
+
+        self.index.add(6, "Cherry Pie")
+        self.assertNotIn(6, self.index.search("apple p"))
+        self.assertEqual(self.index.search("cherry")[0], 6)
+
+        self.assertTrue(self.index.remove(6))
+        self.assertFalse(self.index.remove(6))
+        self.assertEqual(self.index.search("cherry"), [])
+
+        self.index.synchronize({1: "Apple Juice"})
+        self.assertEqual(len(self.index), 1)
+
+    def test_exact_match_limit(self):
+        index = TrigramIndex(exact_match_limit=5)
+        index.synchronize({item_id: f"Frozen Meal {item_id}" for item_id in range(1, 21)})
+
+        self.assertEqual(index.search("frozen", limit=3), [1, 2, 3])
+        self.assertEqual(index.search("frozen meal 17", limit=3)[0], 17)
+
+    def test_candidate_budget(self):
+        index = TrigramIndex(candidate_budget=10, exact_match_limit=5)
+        texts = {item_id: f"Fresh Vegetable {item_id}" for item_id in range(1, 41)}
+        texts.update({item_id: f"Frozen Fruit {item_id}" for item_id in range(41, 81)})
+        index.synchronize(texts)
+
+        self.assertEqual(index.search("frsh vegtable 17", limit=3)[0], 17)
+        self.assertTrue(all(key <= 40 for key in index.search("frsh vegtable", limit=10)))
+        self.assertEqual(index.search("fre", limit=3), [1, 2, 3])
+
+    def test_narrowed_candidates_shortest(self):
+        index = TrigramIndex(candidate_budget=10)
+        index.synchronize({item_id: f"Fresh Vegetable {item_id}" for item_id in range(1, 41)})
+
+        query_trigrams = get_trigrams("fresh")
+        candidates = index._narrow_candidates([set(range(1, 41))], query_trigrams)
+        self.assertEqual(len(candidates), 10)
+        self.assertTrue(set(range(1, 10)) <= candidates)
+
+    def test_ctr_data_manufacturer_search(self):
+        ctr_data = CTRData()
+        apple = ctr_data.add_product("Apple")
+        apple.additional_data.manufacturer = "Orchard Farms"
+        green_apple = ctr_data.add_product("Green Apple")
+        pear = ctr_data.add_product("Pear")
+        pear.additional_data.manufacturer = "Green Valley"
+        beans = ctr_data.add_product("Green Beans")
+        beans.additional_data.manufacturer = "Orchard Farms"
+
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "orchard"), [apple.item_id, beans.item_id])
+        self.assertEqual(set(ctr_data.search_item_names(ServingType.PRODUCT, "green")[:2]),
+                         {green_apple.item_id, beans.item_id})
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "green")[2], pear.item_id)
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "green valley")[0], pear.item_id)
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "orchard beans")[0], beans.item_id)
+
+    def test_ctr_data_name_search(self):
+        ctr_data = CTRData()
+        apple = ctr_data.add_product("Apple")
+        apple.additional_data.manufacturer = "Orchard Farms"
+        ctr_data.add_recipe("Apple Pie")
+
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "orchard"), [apple.item_id])
+        self.assertEqual(ctr_data.search_item_names(ServingType.RECIPE, "pie"), [1])
+
+        apple.name = "Pear"
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "pear"), [])
+        ctr_data.invalidate_name_index(ServingType.PRODUCT)
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "pear"), [apple.item_id])
+
+        ctr_data.remove_product(apple.item_id)
+        self.assertEqual(ctr_data.search_item_names(ServingType.PRODUCT, "pear"), [])
@@ -0,0 +1,86 @@
+import unittest
+from Core.ctr_data import CTRData
+from Core.undo_stack import UndoStack, DictInsert, DictRemove, ListRemove
+
+
+class TestUndoStack(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+        self.product = self.ctr_data.add_product("Apple")
+        self.undo_stack = UndoStack(max_size=3)
+
+    def test_set_attribute_undo_redo(self):
+        self.assertTrue(self.undo_stack.set_attribute(self.product, "name", "Pear"))
+        self.assertFalse(self.undo_stack.set_attribute(self.product, "name", "Pear"))
+        self.assertEqual(len(self.undo_stack), 1)
+
+        self.undo_stack.undo()
+        self.assertEqual(self.product.name, "Apple")
+        self.assertTrue(self.undo_stack.can_redo())
+
+        self.undo_stack.redo()
+        self.assertEqual(self.product.name, "Pear")
+        self.assertIsNone(self.undo_stack.redo())
+
+    def test_merge_consecutive_edits(self):
+        self.undo_stack.set_attribute(self.product, "name", "Pear")
+        self.undo_stack.set_attribute(self.product, "name", "Plum")
+        self.assertEqual(len(self.undo_stack), 1)
+
+        self.undo_stack.set_attribute(self.product.nutrition_data, "calories", 52)
+        self.undo_stack.set_attribute(self.product, "name", "Peach")
+        self.assertEqual(len(self.undo_stack), 3)
+
+        self.undo_stack.undo()
+        self.undo_stack.undo()
+        self.undo_stack.undo()
+        self.assertEqual(self.product.name, "Apple")
+        self.assertEqual(self.product.nutrition_data.calories, 0)
+
+    def test_eviction_of_oldest_edits(self):
+        for calories in [10, 20, 30, 40]:
+            self.undo_stack.set_attribute(self.product.nutrition_data, "calories", calories)
+            self.undo_stack.push(DictInsert({}, calories, calories))
+
+        self.assertEqual(len(self.undo_stack), 3)
+
+        while self.undo_stack.can_undo():
+            self.undo_stack.undo()
+        self.assertEqual(self.product.nutrition_data.calories, 30)
+
+    def test_new_edit_clears_redo(self):
+        self.undo_stack.set_attribute(self.product, "name", "Pear")
+        self.undo_stack.undo()
+        self.undo_stack.set_attribute(self.product, "category", None)
+
+        self.assertFalse(self.undo_stack.can_redo())
+
+    def test_structural_edits(self):
+        catalogue = self.ctr_data.product_catalogue
+        removed_product = catalogue.pop(self.product.item_id)
+        self.undo_stack.push(DictRemove(catalogue, self.product.item_id, removed_product))
+
+        self.undo_stack.undo()
+        self.assertIs(catalogue[self.product.item_id], self.product)
+        self.undo_stack.redo()
+        self.assertNotIn(self.product.item_id, catalogue)
+
+        values = [1, 2, 3]
+        values.pop(1)
+        self.undo_stack.push(ListRemove(values, 1, 2))
+        self.undo_stack.undo()
+        self.assertEqual(values, [1, 2, 3])
+
+    def test_group(self):
+        with self.undo_stack.group("Paste", context="catalogue"):
+            self.undo_stack.set_attribute(self.product, "name", "Pear")
+            self.undo_stack.set_attribute(self.product.nutrition_data, "calories", 52)
+
+        self.assertEqual(len(self.undo_stack), 1)
+        self.assertEqual(self.undo_stack.undo_description(), "Paste")
+
+        command = self.undo_stack.undo()
+        self.assertEqual(command.get_contexts(), ["catalogue"])
+        self.assertEqual(self.product.name, "Apple")
+        self.assertEqual(self.product.nutrition_data.calories, 0)
@@ -0,0 +1,63 @@
+import unittest
+from Core.ctr_data import CTRData
+from Core.enums import ServingType
+from Core.serving import Serving
+from Core.usage_stats import ItemUsage, UsageRanking
+
+
+class TestUsageStats(unittest.TestCase):
+
+    def setUp(self):
+        self.ctr_data = CTRData()
+        for name in ["Apple", "Bread", "Cheese"]:
+            self.ctr_data.add_product(name)
+
+        servings = {"2024-01-01": [1, 2, 2], "2024-01-02": [2], "2024-03-01": [3, 0]}
+        for date, product_ids in servings.items():
+            intake_data = self.ctr_data.add_daily_intake(date)
+            for product_id in product_ids:
+                intake_data.add_consumed_product(Serving(product_id, "", ServingType.PRODUCT, 100))
+
+    def test_ranking_order(self):
+        ranking = UsageRanking(recency_days=30)
+        ranking.set_usage(1, ItemUsage(1, "2024-01-01"))
+        ranking.set_usage(2, ItemUsage(3, "2024-01-01"))
+        ranking.set_usage(3, ItemUsage(1, "2024-03-01"))
+
+        self.assertEqual(list(ranking), [3, 2, 1])
+        self.assertEqual(ranking.get_top(2), [3, 2])
+        self.assertEqual(ranking.get_rank(1), 2)
+        self.assertEqual(ranking.get_factor(3), 1.0)
+
+        ranking.set_usage(3, None)
+        self.assertEqual(list(ranking), [2, 1])
+        self.assertEqual(ranking.get_factor(3), 0.0)
+
+    def test_usage_from_history(self):
+        self.assertEqual(self.ctr_data.get_item_usage(ServingType.PRODUCT, 2), ItemUsage(3, "2024-01-02"))
+        self.assertIsNone(self.ctr_data.get_item_usage(ServingType.PRODUCT, 0))
+        self.assertEqual(self.ctr_data.get_frequent_items(ServingType.PRODUCT), [3, 2, 1])
+        self.assertEqual(self.ctr_data.get_frequent_items(ServingType.RECIPE), [])
+
+    def test_incremental_updates(self):
+        self.ctr_data.get_frequent_items(ServingType.PRODUCT)
+
+        intake_data = self.ctr_data.add_daily_intake("2024-04-01")
+        intake_data.add_consumed_product(Serving(1, "Apple", ServingType.PRODUCT, 100))
+        self.assertEqual(self.ctr_data.get_item_usage(ServingType.PRODUCT, 1), ItemUsage(2, "2024-04-01"))
+        self.assertEqual(self.ctr_data.get_frequent_items(ServingType.PRODUCT, limit=1), [1])
+
+        self.ctr_data.remove_daily_intake("2024-04-01")
+        self.assertEqual(self.ctr_data.get_item_usage(ServingType.PRODUCT, 1), ItemUsage(1, "2024-01-01"))
+
+        cheese_serving = self.ctr_data.daily_intake_record["2024-03-01"].consumed_products[0]
+        self.ctr_data.daily_intake_record["2024-03-01"].remove_consumed_product(cheese_serving)
+        self.assertIsNone(self.ctr_data.get_item_usage(ServingType.PRODUCT, 3))
+        self.assertEqual(self.ctr_data.get_frequent_items(ServingType.PRODUCT), [2, 1])
+
+    def test_search_prefers_used_items(self):
+        self.ctr_data.add_product("Apple Pie")
+        self.ctr_data.add_daily_intake("2024-05-01").add_consumed_product(Serving(4, "", ServingType.PRODUCT, 100))
+
+        self.assertEqual(self.ctr_data.search_item_names(ServingType.PRODUCT, "apple"), [4, 1])
+        self.assertEqual(self.ctr_data.search_item_names(ServingType.PRODUCT, ""), [4, 3, 2, 1])
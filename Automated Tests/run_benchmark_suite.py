@@ -0,0 +1,232 @@
+"""
+Python module for benchmarking the Core hot paths on generated datasets of several sizes.
+With --gui, the main window page refreshes and interactions are benchmarked instead,
+on the Qt offscreen platform unless another platform is set by QT_QPA_PLATFORM.
+
+Benchmark results are compared to a JSON baseline and the run fails, if the minimum time
+of any benchmark exceeds its baseline by more than the tolerance, or exceeds the time limit
+of the benchmark, such as the name search latency. Baselines are machine
+specific, and are written with --save-baseline. Runs over multiple sizes also report
+the scaling of each benchmark with the dataset size.
+
+    python run_benchmark_suite.py --sizes small medium --save-baseline
+    python run_benchmark_suite.py --sizes small medium --tolerance 0.2
+    python run_benchmark_suite.py --gui --sizes small medium large
+
+"""
+
+import os
+import sys
+import json
+import math
+import datetime
+import argparse
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Core.dataset_generator import DATASET_PRESETS, generate_ctr_data, write_generated_savefiles
+from Core.instrumentation import instrumentation
+from Benchmarks.core_benchmarks import Benchmark, get_benchmarks
+
+
+BENCHMARKS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Benchmarks")
+
+
+def measure_benchmark(benchmark: Benchmark, repeat: int) -> dict[str, float]:
+    """
+    Returns the median and minimum time of the repeated benchmark calls, in seconds.
+    The measured calls follow an unmeasured warmup call. Progress messages printed by
+    the measured functions are discarded.
+    """
+    times = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for n in range(repeat + 1):
+            if benchmark.setup is not None:
+                benchmark.setup()
+
+            start = timer()
+            benchmark.function()
+            if n > 0:
+                times.append(timer() - start)
+
+    return {"median": statistics.median(times), "min": min(times)}
+
+
+def get_gui_benchmarks_function():
+    """
+    Returns the GUI benchmarks function of a main window shown on the Qt offscreen platform.
+    The main window is created once and opens the generated savefile of each dataset.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PySide6.QtWidgets import QApplication
+    from GUI.MainWindow.main_window import CTRMainWindow, setup_initial_theme
+    from Settings.app_env import WindowTheme
+    from Benchmarks import gui_benchmarks
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        mw = CTRMainWindow(app, setup_initial_theme(app, WindowTheme.DARK))
+
+    def get_gui_benchmarks(ctr_data, directory: str) -> list[Benchmark]:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            filepath = write_generated_savefiles(ctr_data, directory, extensions=[".ct"])[0]
+            return gui_benchmarks.get_benchmarks(mw, filepath)
+
+    return get_gui_benchmarks
+
+
+def run_benchmarks(sizes: list[str], repeat: int, name_filter: str = "",
+                   gui: bool = False) -> tuple[dict[str, dict[str, float]], list[str]]:
+    """
+    Runs the benchmarks on the datasets of the given size presets.
+    :param gui: Run the main window benchmarks, on datasets with daily intake records ending today.
+    :return: Results keyed by "size/benchmark name", and the names of benchmarks exceeding their time limit.
+    """
+    results = {}
+    exceeded = []
+
+    benchmarks_function = get_gui_benchmarks_function() if gui else get_benchmarks
+    end_date = datetime.date.today() if gui else None
+
+    for size in sizes:
+        ctr_data = generate_ctr_data(DATASET_PRESETS[size], end_date=end_date)
+        print(f"Dataset '{size}': {len(ctr_data.product_catalogue) - 1} products, "
+              f"{len(ctr_data.recipes_record) - 1} recipes, {len(ctr_data.daily_intake_record)} days")
+        print(f"    {'Benchmark':<60} {'Min':>13} {'Median':>13}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            for benchmark in benchmarks_function(ctr_data, directory):
+                if name_filter.lower() not in benchmark.name.lower():
+                    continue
+
+                result = measure_benchmark(benchmark, repeat)
+                results[f"{size}/{benchmark.name}"] = result
+                print(f"    {benchmark.name:<60} {result['min'] * 1000:>10.3f} ms {result['median'] * 1000:>10.3f} ms")
+
+                if benchmark.max_time is not None and result["min"] > benchmark.max_time:
+                    exceeded.append(f"{size}/{benchmark.name}")
+                    print(f"    Time limit exceeded: {benchmark.name} {result['min'] * 1000:.3f} ms "
+                          f"> {benchmark.max_time * 1000:.3f} ms")
+
+    return results, exceeded
+
+
+def print_scaling_report(results: dict[str, dict[str, float]], sizes: list[str]) -> None:
+    """
+    Prints the minimum time of each benchmark over the dataset sizes, with the scaling exponent
+    relative to the number of catalogue products between the smallest and largest dataset.
+    Exponent 1 indicates linear scaling, 2 quadratic scaling.
+    """
+    if len(sizes) < 2:
+        return
+
+    sizes = sorted(sizes, key=lambda size: DATASET_PRESETS[size].products)
+    product_ratio = DATASET_PRESETS[sizes[-1]].products / DATASET_PRESETS[sizes[0]].products
+
+    names = list(dict.fromkeys(name.split("/", 1)[1] for name in results))
+
+    print("Scaling, minimum time in ms:")
+    print(f"    {'Benchmark':<60}" + "".join(f"{size:>12}" for size in sizes) + f"{'Exponent':>10}")
+    for name in names:
+        times = [results.get(f"{size}/{name}", {}).get("min", None) for size in sizes]
+        line = f"    {name:<60}" + "".join(f"{t * 1000:>12.3f}" if t is not None else f"{'-':>12}" for t in times)
+
+        if times[0] and times[-1] and product_ratio > 1:
+            line += f"{math.log(times[-1] / times[0]) / math.log(product_ratio):>10.2f}"
+        print(line)
+
+
+def compare_to_baseline(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+                        tolerance: float, min_difference: float) -> list[str]:
+    """
+    Returns the names of benchmarks with minimum time exceeding the baseline minimum by more than
+    the relative tolerance. The minimum of the repeated calls is the least affected by other load
+    on the machine, and differences below the absolute minimum difference are considered noise.
+    """
+    regressions = []
+
+    for name, result in results.items():
+        baseline_result = baseline.get(name, None)
+        if baseline_result is None:
+            continue
+
+        difference = result["min"] - baseline_result["min"]
+        if difference > tolerance * baseline_result["min"] and difference > min_difference:
+            regressions.append(name)
+            print(f"Regression: {name} {baseline_result['min'] * 1000:.3f} ms -> {result['min'] * 1000:.3f} ms "
+                  f"({difference / baseline_result['min']:+.0%})")
+
+    return regressions
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks of the CTR Core hot paths.")
+    parser.add_argument("--gui", action="store_true",
+                        help="Benchmark the main window pages instead of the Core functions")
+    parser.add_argument("--sizes", nargs="+", choices=list(DATASET_PRESETS), default=["small", "medium"],
+                        help="Generated dataset size presets, default: small medium")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured calls per benchmark, default: 5")
+    parser.add_argument("--filter", dest="name_filter", default="",
+                        help="Run only the benchmarks containing the given text")
+    parser.add_argument("--baseline", help="Baseline JSON file, default: Benchmarks/baseline.json, "
+                                           "or Benchmarks/gui_baseline.json with --gui")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write the results to the baseline file instead of comparing them")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative increase of the minimum time, default: 0.25")
+    parser.add_argument("--min-difference", type=float, default=0.002,
+                        help="Ignored absolute increase of the minimum time in seconds, default: 0.002")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Enable the instrumentation and write a Chrome trace JSON file of the benchmark runs")
+    return parser
+
+
+def main(arguments: list[str] | None = None) -> int:
+    args = get_argument_parser().parse_args(arguments)
+
+    # Benchmarks measure the uninstrumented code paths, unless traced
+    instrumentation().enabled = args.trace is not None
+    instrumentation().tracing = args.trace is not None
+
+    if args.baseline is None:
+        args.baseline = os.path.join(BENCHMARKS_DIRECTORY, "gui_baseline.json" if args.gui else "baseline.json")
+
+    results, exceeded = run_benchmarks(args.sizes, args.repeat, args.name_filter, args.gui)
+    print_scaling_report(results, args.sizes)
+
+    if args.trace is not None:
+        instrumentation().export_chrome_trace(args.trace)
+        print(f"Chrome trace of the benchmark runs written to {args.trace}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=4)
+        print(f"Baseline with {len(results)} results written to {args.baseline}")
+        return 1 if exceeded else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline {args.baseline} does not exist, run with --save-baseline to create it.")
+        return 1 if exceeded else 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_difference)
+    print(f"{len(results) - len(regressions)} of {len(results)} benchmarks within tolerance of the baseline.")
+
+    return 1 if regressions or exceeded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,406 @@
+
+from Core.csv_data_models import (CTRDataModel, CsvDataModel, InformationDataModel, CatalogueDataModel,
+                                  RecipesDataModel, DailyIntakeDataModel)
+from Core.ctr_data import CTRData, SavefileExtension
+from Core.enums import ServingType
+from Core.product import NutritionData
+from Core.serving import Serving
+from Core.instrumentation import instrumentation
+
+import io
+import copy
+import os
+import sys
+import datetime
+import zipfile
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+
+ZIP_COMPRESSION_METHODS: dict[str, int] = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+_CSV_DATA_MODELS: dict[str, type[CsvDataModel]] = {
+    SavefileExtension.INFORMATION.value: InformationDataModel,
+    SavefileExtension.CATALOGUE.value: CatalogueDataModel,
+    SavefileExtension.RECIPES.value: RecipesDataModel,
+    SavefileExtension.DAILY_INTAKE.value: DailyIntakeDataModel,
+}
+
+SAVEFILE_EXTENSIONS: list[str] = [SavefileExtension.CTR_DATA.value] + list(_CSV_DATA_MODELS)
+
+
+@dataclass
+class BatchTask:
+    """
+    Batch operation on a single savefile, processed independently of other files
+    so that multiple tasks can be distributed over a process pool.
+
+    Attributes:
+        command (str): Operation name - info, validate, convert, export-range or recompute.
+        filepath (str): Input savefile path.
+        options (dict): Operation options, such as the output directory, format and date range.
+        verbose (bool): Keep the progress messages printed by the savefile data models.
+        trace (bool): Return the instrumentation trace events recorded while processing the file.
+    """
+    command: str
+    filepath: str
+    options: dict[str, Any] = field(default_factory=dict)
+    verbose: bool = False
+    trace: bool = False
+
+
+@dataclass
+class BatchResult:
+    filepath: str
+    success: bool = True
+    messages: list[str] = field(default_factory=list)
+    output_filepath: str = ""
+    trace_events: list[dict] = field(default_factory=list)
+
+
+def get_savefile_extension(filepath: str) -> str:
+    return os.path.splitext(filepath)[1].lower()
+
+
+def read_ctr_data(filepath: str) -> CTRData:
+    """
+    Reads the CTR data from a CTR Data savefile, or from a single exported catalogue, recipes,
+    daily intake or information savefile.
+
+    Note: Recipes read from a standalone recipes savefile reference the null catalogue Product.
+    """
+    extension = get_savefile_extension(filepath)
+
+    if extension == SavefileExtension.CTR_DATA.value:
+        return CTRDataModel(filepath).read_savefile()
+
+    data_model_type = _CSV_DATA_MODELS.get(extension, None)
+    if data_model_type is None:
+        raise ValueError(f"Unsupported savefile extension '{extension}' of file {filepath}!")
+
+    ctr_data = CTRData(filename=os.path.splitext(os.path.basename(filepath))[0])
+    data_model_type(filepath).read_savefile(ctr_data)
+    return ctr_data
+
+
+def write_ctr_data(ctr_data: CTRData, filepath: str, compression: int = zipfile.ZIP_STORED) -> None:
+    """
+    Writes the CTR data to the savefile type given by the file extension.
+    :param compression: Zip compression method, used only for CTR Data savefiles.
+    """
+    extension = get_savefile_extension(filepath)
+
+    if extension == SavefileExtension.CTR_DATA.value:
+        CTRDataModel(filepath, compression=compression).write_savefile(ctr_data)
+        return
+
+    data_model_type = _CSV_DATA_MODELS.get(extension, None)
+    if data_model_type is None:
+        raise ValueError(f"Unsupported savefile extension '{extension}' of file {filepath}!")
+
+    data_model_type(filepath).write_savefile(ctr_data)
+
+
+def get_output_filepath(filepath: str, output_directory: str | None = None,
+                        extension: str | None = None, suffix: str = "") -> str:
+    """
+    Returns the output savefile path for the input savefile.
+    :param output_directory: Output directory, directory of the input file if None.
+    :param extension: Output savefile extension, extension of the input file if None.
+    :param suffix: Suffix appended to the input file name.
+    """
+    directory, filename = os.path.split(filepath)
+    name, input_extension = os.path.splitext(filename)
+
+    if output_directory is not None:
+        directory = output_directory
+
+    return os.path.join(directory, f"{name}{suffix}{extension or input_extension}")
+
+
+def get_ctr_data_stats(ctr_data: CTRData) -> dict[str, Any]:
+    """
+    Returns summary statistics of the CTR data, excluding the null catalogue and recipe entries.
+    """
+    dates = sorted(date for date, intake_data in ctr_data.daily_intake_record.items() if intake_data.has_data)
+
+    n_servings = 0
+    total = NutritionData()
+    for date in dates:
+        intake_data = ctr_data.daily_intake_record[date]
+        n_servings += intake_data.n_consumed_products + intake_data.n_consumed_recipes
+        total += ctr_data.get_daily_intake_total(date)
+
+    n_days = len(dates)
+    average = total / n_days if n_days else NutritionData()
+
+    return {
+        "products": len([item_id for item_id in ctr_data.product_catalogue if item_id != 0]),
+        "recipes": len([item_id for item_id in ctr_data.recipes_record if item_id != 0]),
+        "ingredients": sum(len(recipe.ingredients) for recipe in ctr_data.recipes_record.values()),
+        "days": n_days,
+        "servings": n_servings,
+        "first_date": dates[0] if dates else "",
+        "last_date": dates[-1] if dates else "",
+        "average_daily_calories": round(average.calories, 1),
+        "favorite_products": len(ctr_data.favorite_products),
+        "favorite_recipes": len(ctr_data.favorite_recipes),
+    }
+
+
+def _get_negative_fields(data: Any) -> list[str]:
+    return [data_field.name for data_field in fields(data)
+            if isinstance(getattr(data, data_field.name), (int, float)) and getattr(data, data_field.name) < 0]
+
+
+def validate_ctr_data(ctr_data: CTRData) -> list[str]:
+    """
+    Checks the consistency of the CTR data and returns a list of the found issues.
+    """
+    issues: list[str] = []
+
+    for item_id, product in ctr_data.product_catalogue.items():
+        if item_id != product.item_id:
+            issues.append(f"Product {product.identifier_string} is stored under ID {item_id}")
+        for name in _get_negative_fields(product.nutrition_data):
+            issues.append(f"Product {product.identifier_string} has negative {name}")
+
+    for item_id, recipe in ctr_data.recipes_record.items():
+        if item_id != recipe.item_id:
+            issues.append(f"Recipe {recipe.identifier_string} is stored under ID {item_id}")
+
+        for ingredient in recipe.ingredients.values():
+            if ingredient.product.item_id == 0:
+                issues.append(f"Recipe {recipe.identifier_string} ingredient {ingredient.item_id} "
+                              f"has no catalogue Product")
+            elif ingredient.product is not ctr_data.product_catalogue.get(ingredient.product.item_id, None):
+                issues.append(f"Recipe {recipe.identifier_string} ingredient {ingredient.identifier_string} "
+                              f"references a Product not in the catalogue")
+
+            if ingredient.amount < 0 or ingredient.net_amount < 0:
+                issues.append(f"Recipe {recipe.identifier_string} ingredient {ingredient.identifier_string} "
+                              f"has a negative amount")
+
+            if ingredient.amount_relative_to_id is not None and ingredient.amount_relative_to is None:
+                issues.append(f"Recipe {recipe.identifier_string} ingredient {ingredient.identifier_string} "
+                              f"is relative to missing ingredient {ingredient.amount_relative_to_id}")
+            elif ingredient.detect_circular_reference():
+                issues.append(f"Recipe {recipe.identifier_string} ingredient {ingredient.identifier_string} "
+                              f"has a circular relative amount reference")
+
+    for date, intake_data in ctr_data.daily_intake_record.items():
+        try:
+            datetime.date.fromisoformat(date)
+        except ValueError:
+            issues.append(f"Daily intake record date '{date}' is not a valid ISO date")
+
+        if date != intake_data.date:
+            issues.append(f"Daily intake record for {intake_data.date} is stored under date {date}")
+
+        for serving in intake_data.consumed_products + intake_data.consumed_recipes:
+            if serving.item_type is ServingType.RECIPE:
+                items = ctr_data.recipes_record
+            else:
+                items = ctr_data.product_catalogue
+
+            if serving.item_id not in items:
+                issues.append(f"{date}: {serving.item_type.value} serving {serving.identifier_string} "
+                              f"references a missing item")
+            if serving.portion < 0:
+                issues.append(f"{date}: Serving {serving.identifier_string} has a negative portion")
+
+    for item_id in ctr_data.favorite_products.difference(ctr_data.product_catalogue):
+        issues.append(f"Favorite Product ID {item_id} not found in the catalogue")
+
+    for item_id in ctr_data.favorite_recipes.difference(ctr_data.recipes_record):
+        issues.append(f"Favorite Recipe ID {item_id} not found in the recipes")
+
+    return issues
+
+
+def get_daily_intake_range(ctr_data: CTRData, start_date: str | None = None,
+                           end_date: str | None = None) -> CTRData:
+    """
+    Returns a copy of the CTR data containing only the daily intake records within the date range.
+    Catalogue, recipes, favorites and nutrition targets are shared with the original data.
+    :param start_date: First included date in ISO format, unbounded if None.
+    :param end_date: Last included date in ISO format, unbounded if None.
+    """
+    range_data = CTRData(ctr_data.filename)
+    range_data.filepath = ctr_data.filepath
+    range_data.product_catalogue = ctr_data.product_catalogue
+    range_data.recipes_record = ctr_data.recipes_record
+    range_data.favorite_products = ctr_data.favorite_products
+    range_data.favorite_recipes = ctr_data.favorite_recipes
+    range_data.nutrition_targets = ctr_data.nutrition_targets
+
+    range_data.daily_intake_record = {
+        date: intake_data for date, intake_data in ctr_data.daily_intake_record.items()
+        if (start_date is None or date >= start_date) and (end_date is None or date <= end_date)
+    }
+    return range_data
+
+
+def recompute_serving_nutrition_data(ctr_data: CTRData) -> list[str]:
+    """
+    Updates the nutrition data of all servings to the current catalogue and recipe data.
+    Servings referencing items that no longer exist are left unchanged.
+    Returns a list of the changed servings.
+    """
+    changes: list[str] = []
+
+    # Recipe nutrition data per 100 g is computed for all recipes at once, instead of once per serving
+    recipe_totals = ctr_data.get_recipe_totals()
+
+    for date, intake_data in ctr_data.daily_intake_record.items():
+        for serving in intake_data.consumed_products + intake_data.consumed_recipes:
+            if serving.item_type is ServingType.RECIPE:
+                nutrition_data = recipe_totals.get_nutrition_data_per_100g(serving.item_id)
+            else:
+                item = ctr_data.product_catalogue.get(serving.item_id, None)
+                nutrition_data = None if item is None else copy.copy(item.nutrition_data)
+
+            if nutrition_data is None or serving.item_id == 0:
+                continue
+
+            previous_data = serving.nutrition_data
+            serving.nutrition_data = nutrition_data
+            if serving.nutrition_data != previous_data:
+                changes.append(f"{date}: {serving.identifier_string}")
+
+    ctr_data.invalidate_daily_intake_totals()
+    return changes
+
+
+def resync_item_servings(ctr_data: CTRData, item_type: ServingType, item_id: int,
+                         start_date: str | None = None, end_date: str | None = None) -> list[str]:
+    """
+    Updates the nutrition data of the servings of a single Product or Recipe within the date range
+    to its current catalogue or recipe data. Only the daily intake records with servings of the item,
+    found by the serving index, are updated, and compact records are updated without materializing.
+    :param start_date: First included date in ISO format, unbounded if None.
+    :param end_date: Last included date in ISO format, unbounded if None.
+    :return: Dates of the records with changed servings.
+    """
+    items = ctr_data.recipes_record if item_type is ServingType.RECIPE else ctr_data.product_catalogue
+    item = items.get(item_id, None)
+
+    if item is None or item_id == 0:
+        print(f"Error: {item_type.value} ID {item_id} not found in CTR data!")
+        return []
+
+    nutrition_data = Serving.get_item_nutrition_data(item)
+
+    changed_dates = []
+    for date in ctr_data.get_serving_dates(item_type, item_id, start_date, end_date):
+        if ctr_data.daily_intake_record[date].set_item_nutrition_data(item_type, item_id, nutrition_data):
+            changed_dates.append(date)
+
+    ctr_data.invalidate_daily_intake_totals(changed_dates)
+    return changed_dates
+
+
+def _run_batch_task(task: BatchTask) -> BatchResult:
+    result = BatchResult(task.filepath)
+    options = task.options
+
+    if not os.path.exists(task.filepath):
+        result.success = False
+        result.messages.append(f"Error: Path {task.filepath} does not exist!")
+        return result
+
+    ctr_data = read_ctr_data(task.filepath)
+
+    if task.command == "info":
+        for key, value in get_ctr_data_stats(ctr_data).items():
+            result.messages.append(f"{key}: {value}")
+
+    elif task.command == "validate":
+        issues = validate_ctr_data(ctr_data)
+        result.success = not issues
+        result.messages.extend(issues if issues else ["No issues found"])
+
+    elif task.command == "convert":
+        result.output_filepath = get_output_filepath(task.filepath, options.get("output_directory"),
+                                                     options.get("extension"))
+        if os.path.abspath(result.output_filepath) == os.path.abspath(task.filepath):
+            result.output_filepath = get_output_filepath(task.filepath, options.get("output_directory"),
+                                                         options.get("extension"), suffix="_converted")
+        write_ctr_data(ctr_data, result.output_filepath,
+                       compression=ZIP_COMPRESSION_METHODS[options.get("compression", "stored")])
+        result.messages.append(f"Converted to {result.output_filepath}")
+
+    elif task.command == "export-range":
+        start_date, end_date = options.get("start_date"), options.get("end_date")
+        range_data = get_daily_intake_range(ctr_data, start_date, end_date)
+        result.output_filepath = get_output_filepath(
+            task.filepath, options.get("output_directory"),
+            options.get("extension") or SavefileExtension.DAILY_INTAKE.value,
+            suffix=f"_{start_date or 'start'}_{end_date or 'end'}")
+        write_ctr_data(range_data, result.output_filepath)
+        result.messages.append(f"Exported {len(range_data.daily_intake_record)} daily intake records "
+                               f"to {result.output_filepath}")
+
+    elif task.command == "recompute":
+        if options.get("product_id") is not None or options.get("recipe_id") is not None:
+            if options.get("recipe_id") is not None:
+                item_type, item_id, items = ServingType.RECIPE, options["recipe_id"], ctr_data.recipes_record
+            else:
+                item_type, item_id, items = ServingType.PRODUCT, options["product_id"], ctr_data.product_catalogue
+
+            if item_id == 0 or item_id not in items:
+                result.success = False
+                result.messages.append(f"Error: {item_type.value} ID {item_id} not found!")
+                return result
+
+            dates = resync_item_servings(ctr_data, item_type, item_id,
+                                         options.get("start_date"), options.get("end_date"))
+            result.messages.append(f"Recomputed {item_type.value} ID {item_id} servings "
+                                   f"in {len(dates)} daily intake records")
+        else:
+            changes = recompute_serving_nutrition_data(ctr_data)
+            result.messages.append(f"Recomputed nutrition data of {len(changes)} servings")
+        if options.get("in_place", False):
+            result.output_filepath = task.filepath
+        else:
+            result.output_filepath = get_output_filepath(task.filepath, options.get("output_directory"),
+                                                         suffix="_recomputed")
+        write_ctr_data(ctr_data, result.output_filepath)
+
+    else:
+        result.success = False
+        result.messages.append(f"Error: Unknown batch command '{task.command}'!")
+
+    return result
+
+
+def run_batch_task(task: BatchTask) -> BatchResult:
+    """
+    Runs the batch task, returning the result instead of raising on errors,
+    so that a single invalid savefile does not abort the processing of other files.
+    Progress messages of the data models are suppressed unless the task is verbose.
+    """
+    if task.trace:
+        instrumentation().enabled = True
+        instrumentation().tracing = True
+        instrumentation().reset()
+
+    output = io.StringIO()
+    try:
+        with redirect_stdout(sys.stdout if task.verbose else output):
+            with instrumentation().span(f"Batch {task.command}", filepath=task.filepath):
+                result = _run_batch_task(task)
+
+    except Exception as error:
+        result = BatchResult(task.filepath, success=False, messages=[f"Error: {type(error).__name__}: {error}"])
+
+    if task.trace:
+        result.trace_events = instrumentation().get_chrome_trace()["traceEvents"]
+
+    return result
@@ -1,17 +1,18 @@
 
 from Core.daily_intake import DailyIntake
+from Core.enums import ServingType
 from Core.product import Product, NutritionData
 from Core.recipe import Recipe
 from Core.savefile_functions import savefile_header, dict_to_dataclass
 from Core.ctr_data import CTRData, SavefileExtension
-from Settings.app_env import Program_Version
+from Core.instrumentation import instrumentation
+from Settings.version import Program_Version
 
 
 import os
 import json
 import zipfile
 from io import TextIOWrapper
-from timeit import default_timer as timer
 
 
 class CsvDataModel:
@@ -34,24 +35,17 @@ class CsvDataModel:
 
     def write_savefile(self, ctr_data: CTRData) -> None:
         print(f"Exporting {self.data_model_identifier}... filepath {self.filepath}")
-        start = timer()
 
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            f.write(self.csv_data(ctr_data))
-        f.close()
-
-        end = timer()
-        print(f"{self.data_model_identifier} saved in", end - start, "s")
+        with instrumentation().span(f"{self.data_model_identifier} saved", log=True):
+            with open(self.filepath, "w", encoding="utf-8") as f:
+                f.write(self.csv_data(ctr_data))
 
     def read_savefile(self, ctr_data: CTRData) -> None:
         print(f"Importing {self.data_model_identifier}... filepath {self.filepath}")
-        start = timer()
-
-        with open(self.filepath, "r", encoding="utf-8") as f:
-            self.read_csv_data(csv_file=f.readlines(), ctr_data=ctr_data)
 
-        end = timer()
-        print(f"{self.data_model_identifier} imported in", end - start, "s")
+        with instrumentation().span(f"{self.data_model_identifier} imported", log=True):
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                self.read_csv_data(csv_file=f.readlines(), ctr_data=ctr_data)
 
 
 class InformationDataModel(CsvDataModel):
@@ -63,7 +57,7 @@ class InformationDataModel(CsvDataModel):
 
     @property
     def data_model_identifier(self) -> str:
-        return "Daily Intake Data"
+        return "CTR Information Data"
 
     def csv_data(self, ctr_data: CTRData) -> str:
         data = savefile_header(savefile_type="Information", program_version=Program_Version)
@@ -88,11 +82,19 @@ class InformationDataModel(CsvDataModel):
 
 
 class DailyIntakeDataModel(CsvDataModel):
-    def __init__(self, filepath: str = "", delimiter: str = ";"):
+    def __init__(self, filepath: str = "", delimiter: str = ";", merge: bool = False,
+                 product_remap: dict[int, int] | None = None, recipe_remap: dict[int, int] | None = None):
         """
         Daily intake data model for exporting and importing the Daily intake record.
+        :param merge: Merge the imported records by date into the daily intake record, instead of replacing it.
+        :param product_remap: Remap of the serving Product IDs to the catalogue IDs, from a catalogue merge.
+        :param recipe_remap: Remap of the serving recipe IDs to the recipe record IDs, from a recipes merge.
+        Serving item IDs are read as catalogue and recipe record IDs if None.
         """
         super().__init__(filepath, delimiter)
+        self.merge = merge
+        self.product_remap = product_remap
+        self.recipe_remap = recipe_remap
 
     @property
     def data_model_identifier(self) -> str:
@@ -121,16 +123,33 @@ class DailyIntakeDataModel(CsvDataModel):
             intake_data = DailyIntake.convert_from_csv(csv_line, delimiter=self.delimiter)
             catalogue_data[intake_data.date] = intake_data
 
+        instrumentation().count("Daily intake records read", n_items)
+
+        if self.merge:
+            for item_type, remap in [(ServingType.PRODUCT, self.product_remap),
+                                     (ServingType.RECIPE, self.recipe_remap)]:
+                if remap is not None:
+                    ctr_data.remap_serving_items(item_type, remap, catalogue_data)
+
+            changed_dates = ctr_data.merge_daily_intake_data(catalogue_data)
+            print(f"Merged daily intake records of {len(changed_dates)} dates into the daily intake record.")
+            return
+
         ctr_data.clear_daily_intake_data()
         ctr_data.daily_intake_record = catalogue_data
 
 
 class CatalogueDataModel(CsvDataModel):
-    def __init__(self, filepath: str = "", delimiter: str = ";"):
+    def __init__(self, filepath: str = "", delimiter: str = ";", merge: bool = False):
         """
         Catalogue data model for exporting and importing the Product catalogue.
+        :param merge: Merge the imported Products into the catalogue, instead of replacing the catalogue.
         """
         super().__init__(filepath, delimiter)
+        self.merge = merge
+
+        # Remap of the imported Product IDs to the catalogue IDs, after a merge
+        self.product_remap: dict[int, int] = {}
 
     @property
     def data_model_identifier(self) -> str:
@@ -159,16 +178,35 @@ class CatalogueDataModel(CsvDataModel):
             item = Product.convert_from_csv(csv_line, delimiter=self.delimiter)
             catalogue_data[item.item_id] = item
 
+        instrumentation().count("Products read", n_items)
+
+        if self.merge:
+            n_products = len(ctr_data.product_catalogue)
+            self.product_remap = ctr_data.merge_catalogue_data(catalogue_data)
+            n_added = len(ctr_data.product_catalogue) - n_products
+            print(f"Merged {n_added} new Products into the catalogue, "
+                  f"{len(self.product_remap) - 1 - n_added} Products already exist.")
+            return
+
         ctr_data.clear_catalogue_data()
         ctr_data.product_catalogue = ctr_data.product_catalogue | catalogue_data
 
 
 class RecipesDataModel(CsvDataModel):
-    def __init__(self, filepath: str = "", delimiter: str = ";"):
+    def __init__(self, filepath: str = "", delimiter: str = ";", merge: bool = False,
+                 product_remap: dict[int, int] | None = None):
         """
         Recipe data model for exporting and importing the Products catalogue.
+        :param merge: Merge the imported recipes into the recipes record, instead of replacing the recipes.
+        :param product_remap: Remap of the ingredient Product IDs to the catalogue IDs, from a catalogue merge.
+        Ingredient Product IDs are read as catalogue IDs if None.
         """
         super().__init__(filepath, delimiter)
+        self.merge = merge
+        self.product_remap = product_remap
+
+        # Remap of the imported recipe IDs to the recipe record IDs, after a merge
+        self.recipe_remap: dict[int, int] = {}
 
     @property
     def data_model_identifier(self) -> str:
@@ -189,6 +227,15 @@ class RecipesDataModel(CsvDataModel):
     def read_csv_data(self, csv_file, ctr_data: CTRData) -> None:
         recipe_data: dict[int, Recipe] = {}
 
+        # Ingredients are linked to the catalogue Products directly through the remapped Product IDs,
+        # IDs not remapped, or remapped to Products no longer in the catalogue, are linked to the null Product
+        product_catalogue = ctr_data.product_catalogue
+        if self.product_remap is not None:
+            null_product = product_catalogue[0]
+            product_catalogue = {product_id: product_catalogue.get(catalogue_id, null_product)
+                                 for product_id, catalogue_id in self.product_remap.items()}
+            product_catalogue.setdefault(0, null_product)
+
         n_line = 4
         n_items = int(csv_file[n_line])
 
@@ -196,18 +243,34 @@ class RecipesDataModel(CsvDataModel):
             csv_line = csv_file[n]
             recipe = Recipe.convert_from_csv(
                 csv_line,
-                product_catalogue=ctr_data.product_catalogue,
+                product_catalogue=product_catalogue,
                 delimiter=self.delimiter)
             recipe_data[recipe.item_id] = recipe
 
+        instrumentation().count("Recipes read", n_items)
+
+        if self.merge:
+            n_recipes = len(ctr_data.recipes_record)
+            self.recipe_remap = ctr_data.merge_recipe_data(recipe_data)
+            n_added = len(ctr_data.recipes_record) - n_recipes
+            print(f"Merged {n_added} new recipes into the recipes record, "
+                  f"{len(self.recipe_remap) - 1 - n_added} recipes already exist.")
+            return
+
         ctr_data.clear_recipe_data()
         ctr_data.recipes_record = ctr_data.recipes_record | recipe_data
 
 
 class CTRDataModel:
-    def __init__(self, filepath: str = "", delimiter: str = ";"):
+    def __init__(self, filepath: str = "", delimiter: str = ";", compression: int = zipfile.ZIP_STORED):
+        """
+        CTR Data savefile model, storing the information, catalogue, recipes and daily intake data
+        as separate csv files in a single zip archive.
+        :param compression: Zip archive compression method used when writing the savefile, stored by default.
+        """
         self.filepath = filepath
         self.delimiter = delimiter
+        self.compression = compression
 
         self.ctr_info_filename = f"CTR Information{SavefileExtension.INFORMATION.value}"
         self.product_catalogue_filename = f"Product Catalogue{SavefileExtension.CATALOGUE.value}"
@@ -216,34 +279,30 @@ class CTRDataModel:
 
         self.report_messages: list[str] = []
 
+    def get_savefile_data_models(self) -> list[tuple[str, CsvDataModel]]:
+        """
+        Returns the archived savefile names with the data models of their content, in reading order.
+        """
+        return [(self.ctr_info_filename, InformationDataModel(self.filepath, self.delimiter)),
+                (self.product_catalogue_filename, CatalogueDataModel(self.filepath, self.delimiter)),
+                (self.recipes_filename, RecipesDataModel(self.filepath, self.delimiter)),
+                (self.daily_intake_filename, DailyIntakeDataModel(self.filepath, self.delimiter))]
+
     def write_savefile(self, ctr_data: CTRData):
         print(f"Saving CTR Data file to {self.filepath}.")
-        start = timer()
-
-        ctr_data.filepath = str(self.filepath)
-        with zipfile.ZipFile(self.filepath, "w") as ctr_savefile:
-            ctr_info = InformationDataModel(self.filepath).csv_data(ctr_data)
-            ctr_savefile.writestr(zinfo_or_arcname=self.ctr_info_filename, data=ctr_info)
-
-            product_catalogue_data = CatalogueDataModel(self.filepath).csv_data(ctr_data)
-            ctr_savefile.writestr(zinfo_or_arcname=self.product_catalogue_filename, data=product_catalogue_data)
-
-            recipes_data = RecipesDataModel(self.filepath).csv_data(ctr_data)
-            ctr_savefile.writestr(zinfo_or_arcname=self.recipes_filename, data=recipes_data)
-
-            daily_intake_data = DailyIntakeDataModel(self.filepath).csv_data(ctr_data)
-            ctr_savefile.writestr(zinfo_or_arcname=self.daily_intake_filename, data=daily_intake_data)
 
-        end = timer()
-        print("CTR Data saved in", end - start, "s")
+        with instrumentation().span("CTR Data saved", log=True):
+            ctr_data.filepath = str(self.filepath)
+            with zipfile.ZipFile(self.filepath, "w", compression=self.compression) as ctr_savefile:
+                for filename, data_model in self.get_savefile_data_models():
+                    with instrumentation().span(f"{data_model.data_model_identifier} written"):
+                        ctr_savefile.writestr(zinfo_or_arcname=filename, data=data_model.csv_data(ctr_data))
 
     def read_savefile(self):
         msg = f"Opening CTR Data savefile {self.filepath}."
         # self.report_messages.append(msg)
         print(msg)
 
-        start = timer()
-
         ctr_data = CTRData("CTR Savefile")
 
         if not os.path.exists(self.filepath):
@@ -252,35 +311,59 @@ class CTRDataModel:
             print(msg)
             return ctr_data
 
-        with zipfile.ZipFile(self.filepath, "r") as ctr_savefile:
-            file_list: list[zipfile.ZipInfo] = ctr_savefile.filelist
-            filenames = [file.filename for file in file_list]
-
-            if self.ctr_info_filename in filenames:
-                # print(f"CTR Information data is in file list at index {filenames.index(self.ctr_info_filename)}")
-                with ctr_savefile.open(self.ctr_info_filename, mode="r") as savefile:
-                    csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
-                    InformationDataModel().read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
-
-            if self.product_catalogue_filename in filenames:
-                # print(f"Product catalogue is in file list at index {filenames.index(self.product_catalogue_filename)}")
-                with ctr_savefile.open(self.product_catalogue_filename, mode="r") as savefile:
-                    csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
-                    CatalogueDataModel().read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
-
-            if self.recipes_filename in filenames:
-                # print(f"Recipes data is in file list at index {filenames.index(self.recipes_filename)}")
-                with ctr_savefile.open(self.recipes_filename, mode="r") as savefile:
-                    csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
-                    RecipesDataModel().read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
-
-            if self.daily_intake_filename in filenames:
-                # print(f"Daily intake data is in file list at index {filenames.index(self.daily_intake_filename)}")
-                with ctr_savefile.open(self.daily_intake_filename, mode="r") as savefile:
-                    csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
-                    DailyIntakeDataModel().read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
-
-        end = timer()
-        print("CTR Data opened in", end - start, "s")
+        with instrumentation().span("CTR Data opened", log=True):
+            with zipfile.ZipFile(self.filepath, "r") as ctr_savefile:
+                file_list: list[zipfile.ZipInfo] = ctr_savefile.filelist
+                filenames = [file.filename for file in file_list]
+
+                # Savefile data models are read in order, recipes reference the already read product catalogue
+                for filename, data_model in self.get_savefile_data_models():
+                    if filename not in filenames:
+                        continue
+
+                    with instrumentation().span(f"{data_model.data_model_identifier} read"):
+                        with ctr_savefile.open(filename, mode="r") as savefile:
+                            csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
+                            data_model.read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
 
         return ctr_data
+
+    def merge_savefile(self, ctr_data: CTRData) -> None:
+        """
+        Merges the product catalogue, the recipes and the daily intake data of the savefile into the CTR data.
+        Recipe ingredients are linked through the Product ID remap of the catalogue merge, daily intake servings
+        through the Product and recipe ID remaps, and the daily intake records are merged by date.
+        """
+        print(f"Merging CTR Data savefile {self.filepath}.")
+
+        if not os.path.exists(self.filepath):
+            print(f"Error: Path {self.filepath} does not exist!")
+            return
+
+        catalogue_data_model = CatalogueDataModel(self.filepath, self.delimiter, merge=True)
+        recipes_data_model = RecipesDataModel(self.filepath, self.delimiter, merge=True)
+
+        with instrumentation().span("CTR Data merged", log=True):
+            with zipfile.ZipFile(self.filepath, "r") as ctr_savefile:
+                filenames = [file.filename for file in ctr_savefile.filelist]
+
+                if self.product_catalogue_filename in filenames:
+                    with ctr_savefile.open(self.product_catalogue_filename, mode="r") as savefile:
+                        csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
+                        catalogue_data_model.read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
+
+                if self.recipes_filename in filenames:
+                    # Without a merged catalogue, ingredient Product IDs are read as catalogue IDs
+                    recipes_data_model.product_remap = catalogue_data_model.product_remap or None
+                    with ctr_savefile.open(self.recipes_filename, mode="r") as savefile:
+                        csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
+                        recipes_data_model.read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
+
+                if self.daily_intake_filename in filenames:
+                    daily_intake_data_model = DailyIntakeDataModel(
+                        self.filepath, self.delimiter, merge=True,
+                        product_remap=catalogue_data_model.product_remap or None,
+                        recipe_remap=recipes_data_model.recipe_remap or None)
+                    with ctr_savefile.open(self.daily_intake_filename, mode="r") as savefile:
+                        csv_data = list(TextIOWrapper(savefile, encoding="utf-8", newline="\n"))
+                        daily_intake_data_model.read_csv_data(csv_file=csv_data, ctr_data=ctr_data)
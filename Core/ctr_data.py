@@ -1,6 +1,10 @@
-from PySide6.QtCore import QDate
 
 from Core.daily_intake import DailyIntake
+from Core.serving_index import ServingIndex
+from Core.recipe_matrix import RecipeMatrix, RecipeTotals
+from Core.trigram_index import TrigramIndex, normalize_text
+from Core.instrumentation import instrumentation
+from Core.usage_stats import ItemUsage, UsageRanking
 from Core.savefile_functions import dataclass_to_dict
 from Core.serving import Serving
 from Core.enums import ProductCategory, RecipeCategory, ServingType
@@ -9,8 +13,10 @@ from Core.product import Product, NutritionData
 
 import json
 import copy
+import datetime
 from enum import Enum
-from PySide6.QtCore import Qt
+from itertools import chain
+from typing import Iterable
 
 
 class SavefileExtension(Enum):
@@ -41,6 +47,26 @@ class CTRData:
         self.favorite_recipes: set[int] = set()
         self.nutrition_targets = NutritionData()
 
+        self._daily_intake_totals: dict[str, tuple[DailyIntake, NutritionData]] = {}
+        self._serving_index = ServingIndex()
+
+        # Serving index is synchronized to the dates of the changed records, and to all records of a replaced record
+        self._indexed_record: dict[str, DailyIntake] | None = None
+        self._changed_dates: set[str] = set()
+
+        # Name search indexes, synchronized to the item names on the first search after invalidation
+        self._name_indexes: dict[ServingType, TrigramIndex] = {item_type: TrigramIndex() for item_type in ServingType}
+        self._indexed_items: dict[ServingType, dict | None] = {item_type: None for item_type in ServingType}
+
+        # Product manufacturers are indexed separately, with the IDs of their Products in catalogue order
+        self._manufacturer_index = TrigramIndex()
+        self._manufacturer_products: dict[str, list[int]] = {}
+        self._product_manufacturers: dict[int, str] = {}
+
+        # Recipe composition matrix, with the IDs of the edited recipes updated on the next computation
+        self._recipe_matrix = RecipeMatrix()
+        self._edited_recipe_ids: set[int] = set()
+
         self.add_null_catalogue_entry()
         self.add_null_recipe_entry()
 
@@ -77,8 +103,79 @@ class CTRData:
     def add_daily_intake(self, date: str) -> DailyIntake:
         new_daily_intake = DailyIntake(date)
         self.daily_intake_record[date] = new_daily_intake
+        self._changed_dates.add(date)
         return new_daily_intake
 
+    def _synchronize_serving_index(self) -> None:
+        """
+        Updates the serving index to the changed daily intake records. Records report their own revisions to
+        the changed dates, other changes are marked by the CTR data methods and the daily intake invalidation.
+        All records are indexed again when the daily intake record was replaced.
+        """
+        records = self.daily_intake_record
+        changed_dates = self._changed_dates
+
+        if self._indexed_record is not records:
+            for intake_data in records.values():
+                intake_data.changed_dates = changed_dates
+            self._serving_index.synchronize(records)
+            self._indexed_record = records
+
+        elif changed_dates:
+            for date in changed_dates:
+                intake_data = records.get(date, None)
+                if intake_data is not None:
+                    intake_data.changed_dates = changed_dates
+            self._serving_index.synchronize(records, changed_dates)
+
+        changed_dates.clear()
+
+    def get_daily_intake_total(self, date: str) -> NutritionData | None:
+        """
+        Returns the total consumed nutrition data of the daily intake record for the given date,
+        or None if there is no record for the date. Totals are cached per date and reused for as
+        long as the record is not replaced or invalidated, returned data should not be modified.
+        :param date: Date string in ISO format, such as '2024-12-31'
+        """
+        intake_data = self.daily_intake_record.get(date, None)
+        if intake_data is None:
+            return None
+
+        cached = self._daily_intake_totals.get(date, None)
+        if cached is not None and cached[0] is intake_data:
+            return cached[1]
+
+        total = intake_data.get_total_consumed_nutrition_data()
+        self._daily_intake_totals[date] = (intake_data, total)
+        return total
+
+    def invalidate_daily_intake_totals(self, dates: Iterable[str] | None = None) -> None:
+        """
+        Invalidates cached daily intake totals and serving index entries after the servings of the records were modified.
+        :param dates: Dates of the modified records, all cached totals are invalidated if None.
+        """
+        if dates is None:
+            self._daily_intake_totals.clear()
+            self._serving_index.invalidate()
+            self._indexed_record = None
+            return
+
+        dates = list(dates)
+        for date in dates:
+            self._daily_intake_totals.pop(date, None)
+        self._serving_index.invalidate(dates)
+        self._changed_dates.update(dates)
+
+    def get_serving_dates(self, item_type: ServingType, item_id: int,
+                          start_date: str | None = None, end_date: str | None = None) -> list[str]:
+        """
+        Returns the sorted dates of the daily intake records with servings of the Product or Recipe.
+        :param start_date: First included date in ISO format, unbounded if None.
+        :param end_date: Last included date in ISO format, unbounded if None.
+        """
+        self._synchronize_serving_index()
+        return self._serving_index.get_dates(item_type, item_id, start_date, end_date)
+
     def duplicate_daily_intake(self, date_string: str, override_date_string: str) -> None:
         """
         Copies daily intake data of the given date string and assigns it to the override date string.
@@ -97,6 +194,7 @@ class CTRData:
         intake_record.date = override_date_string
 
         self.daily_intake_record[override_date_string] = intake_record
+        self._changed_dates.add(override_date_string)
 
     def duplicate_todays_daily_intake(self, date_string: str) -> None:
         """
@@ -106,8 +204,7 @@ class CTRData:
             print(f"Error: Daily intake record for date {date_string} already exists!")
             return
 
-        current_date: QDate = QDate.currentDate()
-        current_date_string = current_date.toString(Qt.DateFormat.ISODate)
+        current_date_string = datetime.date.today().isoformat()
 
         if current_date_string not in self.daily_intake_record.keys():
             print(f"Daily intake record for todays' date {current_date_string} not found in CTR data! "
@@ -119,6 +216,7 @@ class CTRData:
         intake_record.date = date_string
 
         self.daily_intake_record[date_string] = intake_record
+        self._changed_dates.add(date_string)
 
     def add_product(
             self,
@@ -137,6 +235,7 @@ class CTRData:
             category=category)
 
         self.product_catalogue[new_product.item_id] = new_product
+        self.invalidate_name_index(ServingType.PRODUCT)
         return new_product
 
     def add_recipe(
@@ -158,6 +257,7 @@ class CTRData:
         new_recipe.additional_data.description = description
 
         self.recipes_record[new_recipe.item_id] = new_recipe
+        self.invalidate_name_index(ServingType.RECIPE)
         return new_recipe
 
     def toggle_favorite_serving(self, serving: Serving) -> bool:
@@ -205,6 +305,7 @@ class CTRData:
             self.product_catalogue[key + 1].item_id = key + 1
 
         self.product_catalogue[new_product.item_id] = new_product
+        self.invalidate_name_index(ServingType.PRODUCT)
         return new_product
 
     def duplicate_recipe(self, recipe_id: int) -> Recipe | None:
@@ -217,6 +318,7 @@ class CTRData:
         new_id = sorted(self.recipes_record.keys())[-1] + 1
         new_recipe.item_id = new_id
         self.recipes_record[new_id] = new_recipe
+        self.invalidate_name_index(ServingType.RECIPE)
 
         return new_recipe
 
@@ -335,6 +437,7 @@ class CTRData:
             return False
 
         self.daily_intake_record.pop(date_string)
+        self._changed_dates.add(date_string)
         return True
 
     def remove_product(self, product_id: int) -> bool:
@@ -343,6 +446,7 @@ class CTRData:
             return False
 
         self.product_catalogue.pop(product_id)
+        self.invalidate_name_index(ServingType.PRODUCT)
         return True
 
     def remove_recipe(self, recipe_id: int) -> bool:
@@ -351,6 +455,7 @@ class CTRData:
             return False
 
         self.recipes_record.pop(recipe_id)
+        self.invalidate_name_index(ServingType.RECIPE)
         return True
 
     def get_all_product_names(self) -> list[str]:
@@ -359,19 +464,270 @@ class CTRData:
     def get_all_recipe_names(self) -> list[str]:
         return [item.name for item in self.recipes_record.values()]
 
-    def merge_catalogue_data(self, catalogue: dict[int, Product]) -> None:
-        raise NotImplementedError
+    def invalidate_name_index(self, item_type: ServingType | None = None) -> None:
+        """
+        Marks the name search index for synchronization after Products or Recipes were added, removed or renamed.
+        :param item_type: Type of the changed items, both indexes are invalidated if None.
+        """
+        for index_type in ServingType if item_type is None else [item_type]:
+            self._indexed_items[index_type] = None
+
+    def invalidate_recipe_totals(self, recipe_ids: Iterable[int] | None = None,
+                                 product_ids: Iterable[int] | None = None) -> None:
+        """
+        Marks the recipe matrix rows and product columns for update after recipe ingredients or Products were edited.
+        Added, removed and replaced recipes are detected without invalidation.
+        :param recipe_ids: IDs of the recipes with edited ingredients or net mass data.
+        :param product_ids: IDs of the Products with edited nutrition data or price.
+        If both are None, the matrix is built again.
+        """
+        if recipe_ids is None and product_ids is None:
+            self._recipe_matrix.clear()
+            self._edited_recipe_ids.clear()
+            return
+
+        if recipe_ids is not None:
+            self._edited_recipe_ids.update(recipe_ids)
+        if product_ids is not None:
+            self._recipe_matrix.invalidate_products(self.product_catalogue[product_id] for product_id in product_ids
+                                                    if product_id in self.product_catalogue)
+
+    def get_recipe_totals(self) -> RecipeTotals:
+        """
+        Returns the total nutrition data, price and the values per 100 g of all recipes, computed in one pass.
+        """
+        with instrumentation().span("Recipe totals computed", recipes=len(self.recipes_record)):
+            self._recipe_matrix.synchronize(self.recipes_record, self._edited_recipe_ids)
+            self._edited_recipe_ids.clear()
+            return self._recipe_matrix.compute()
+
+    def get_item_usage(self, item_type: ServingType, item_id: int) -> ItemUsage | None:
+        """
+        Returns the number of servings and the last date of use of the Product or Recipe, None if not used.
+        """
+        self._synchronize_serving_index()
+        return self._serving_index.get_ranking(item_type).get_usage(item_id)
+
+    def get_frequent_items(self, item_type: ServingType, limit: int = 50) -> list[int]:
+        """
+        Returns the IDs of the Products or Recipes ranked by the usage frequency and recency, from the most used.
+        """
+        self._synchronize_serving_index()
+        return [item_id for item_id in self._serving_index.get_ranking(item_type).get_top(limit)
+                if item_id in (self.recipes_record if item_type is ServingType.RECIPE else self.product_catalogue)]
+
+    def search_item_names(self, item_type: ServingType, query: str, limit: int = 50) -> list[int]:
+        """
+        Returns the IDs of the Products or Recipes best matching the query, ranked from the best match.
+        Matching tolerates typos and word order, Products are matched by the name and manufacturer.
+        Frequently and recently used items are preferred, and returned for an empty query.
+        Null entries are not matched.
+        """
+        if not query.strip():
+            return self.get_frequent_items(item_type, limit)
+
+        items = self.recipes_record if item_type is ServingType.RECIPE else self.product_catalogue
+        name_index = self._name_indexes[item_type]
+
+        if self._indexed_items[item_type] is not items:
+            name_index.synchronize({item_id: item.name for item_id, item in items.items() if item_id != 0})
+            if item_type is ServingType.PRODUCT:
+                self._synchronize_manufacturer_index()
+            self._indexed_items[item_type] = items
+
+        self._synchronize_serving_index()
+        ranking = self._serving_index.get_ranking(item_type)
+        keys = name_index.search(query, limit, ranking=ranking)
+
+        if item_type is ServingType.PRODUCT:
+            keys = self._add_manufacturer_matches(keys, query, limit, ranking)
+        return keys
+
+    def _synchronize_manufacturer_index(self) -> None:
+        manufacturer_products: dict[str, list[int]] = {}
+        product_manufacturers: dict[int, str] = {}
+        for item_id, product in self.product_catalogue.items():
+            manufacturer = product.additional_data.manufacturer.strip()
+            if item_id != 0 and manufacturer:
+                manufacturer_products.setdefault(manufacturer, []).append(item_id)
+                product_manufacturers[item_id] = manufacturer
+
+        self._manufacturer_index.synchronize({manufacturer: manufacturer for manufacturer in manufacturer_products})
+        self._manufacturer_products = manufacturer_products
+        self._product_manufacturers = product_manufacturers
+
+    def _add_manufacturer_matches(self, keys: list[int], query: str, limit: int, ranking: UsageRanking) -> list[int]:
+        """
+        Returns the name search results merged with the Products of the manufacturers matching the query.
+        Names containing the query are kept first, followed by the name matches of the matched manufacturers,
+        the other Products of the manufacturers, most used first, and the remaining name matches.
+        """
+        manufacturers = self._manufacturer_index.search(query, limit)
+        if not manufacturers:
+            return keys
+
+        matched = set(manufacturers)
+        product_manufacturers = self._product_manufacturers
+        name_index = self._name_indexes[ServingType.PRODUCT]
+        normalized_query = normalize_text(query).strip()
+
+        result = [key for key in keys if normalized_query in name_index.get_normalized_text(key)]
+        selected = set(result)
+        result.extend(key for key in keys if key not in selected and product_manufacturers.get(key, None) in matched)
+        selected.update(result)
+
+        for key in chain(ranking, *(self._manufacturer_products[manufacturer] for manufacturer in manufacturers)):
+            if len(result) >= limit:
+                break
+            if key not in selected and product_manufacturers.get(key, None) in matched:
+                result.append(key)
+                selected.add(key)
+
+        result.extend(key for key in keys if key not in selected)
+        return result[:limit]
+
+    def merge_catalogue_data(self, catalogue: dict[int, Product]) -> dict[int, int]:
+        """
+        Merges the Products of another catalogue into the product catalogue. Products are matched by their
+        fingerprints in a hash map, merged Products equal to an existing Product, or to an already merged Product,
+        are skipped. Other Products are moved into the catalogue and renumbered, following the last catalogue ID.
+
+        :param catalogue: Merged catalogue, such as read from a shared catalogue savefile. Its null entry is skipped.
+        :return: Remap of the merged catalogue Product IDs to the catalogue Product IDs, including the null entry.
+        """
+        fingerprints = {product.get_fingerprint(): product_id
+                        for product_id, product in self.product_catalogue.items() if product_id != 0}
+        next_id = max(self.product_catalogue, default=0) + 1
+        product_remap = {0: 0}
+
+        for product_id, product in catalogue.items():
+            if product_id == 0:
+                continue
+
+            fingerprint = product.get_fingerprint()
+            catalogue_id = fingerprints.get(fingerprint, None)
+            if catalogue_id is None:
+                catalogue_id = next_id
+                next_id += 1
+
+                product.item_id = catalogue_id
+                self.product_catalogue[catalogue_id] = product
+                fingerprints[fingerprint] = catalogue_id
+
+            product_remap[product_id] = catalogue_id
+
+        self.invalidate_name_index(ServingType.PRODUCT)
+        return product_remap
+
+    def relink_ingredients(self, recipes: Iterable[Recipe], product_remap: dict[int, int]) -> int:
+        """
+        Links the ingredients of the recipes read with a merged catalogue to the product catalogue Products.
+        Ingredients of the Products moved into the catalogue by the merge are already linked, the other ingredients
+        are linked by the remapped Product ID, or to the null Product if the ID is not remapped.
+        Returns the number of relinked ingredients.
+        """
+        catalogue = self.product_catalogue
+        n_relinked = 0
+
+        for recipe in recipes:
+            for ingredient in recipe.ingredients.values():
+                product = ingredient.product
+                if catalogue.get(product.item_id, None) is product:
+                    continue
+
+                ingredient.product = catalogue.get(product_remap.get(product.item_id, 0), catalogue[0])
+                n_relinked += 1
+
+        return n_relinked
+
+    @staticmethod
+    def remap_serving_items(item_type: ServingType, remap: dict[int, int],
+                            daily_intake_record: dict[str, DailyIntake]) -> list[str]:
+        """
+        Replaces the item IDs of the servings of the given type by the remapped IDs.
+        :param daily_intake_record: Imported daily intake records, read with the IDs of the merged items.
+        :return: Dates of the records with changed servings.
+        """
+        return [date for date, intake_data in daily_intake_record.items() if intake_data.remap_item_ids(item_type, remap)]
+
+    def merge_recipe_data(self, recipes: dict[int, Recipe], product_remap: dict[int, int] | None = None) -> dict[int, int]:
+        """
+        Merges the recipes of another recipe collection into the recipes record. Ingredients are first relinked
+        to the product catalogue by the Product ID remap, then the recipes are matched by their content fingerprints
+        in a hash map, merged recipes equal to an existing recipe, or to an already merged recipe, are skipped.
+        Other recipes are moved into the record and renumbered, following the last recipe ID.
+        Ingredient objects are kept, relative amount references between the ingredients remain intact.
+
+        :param recipes: Merged recipes, such as read from a shared recipes savefile. Its null entry is skipped.
+        :param product_remap: Remap returned by the catalogue merge, None if the ingredients are already linked.
+        :return: Remap of the merged recipe IDs to the recipe record IDs, including the null entry.
+        """
+        merged_recipes = [recipe for recipe_id, recipe in recipes.items() if recipe_id != 0]
+        if product_remap is not None:
+            self.relink_ingredients(merged_recipes, product_remap)
+
+        fingerprints = {recipe.get_fingerprint(): recipe_id
+                        for recipe_id, recipe in self.recipes_record.items() if recipe_id != 0}
+        next_id = max(self.recipes_record, default=0) + 1
+        recipe_remap = {0: 0}
+        added_ids: list[int] = []
+
+        for recipe in merged_recipes:
+            merged_id = recipe.item_id
+            fingerprint = recipe.get_fingerprint()
+            recipe_id = fingerprints.get(fingerprint, None)
+            if recipe_id is None:
+                recipe_id = next_id
+                next_id += 1
+
+                recipe.item_id = recipe_id
+                self.recipes_record[recipe_id] = recipe
+                fingerprints[fingerprint] = recipe_id
+                added_ids.append(recipe_id)
+
+            recipe_remap[merged_id] = recipe_id
+
+        self.invalidate_name_index(ServingType.RECIPE)
+        self.invalidate_recipe_totals(recipe_ids=added_ids)
+        return recipe_remap
+
+    def merge_daily_intake_data(self, daily_intake_record: dict[str, DailyIntake]) -> list[str]:
+        """
+        Merges the daily intake records of another daily intake record by date. Records of new dates are moved into
+        the daily intake record, servings of the existing dates are added to the existing records, except for
+        the servings already consumed on that date, such as when merging the same savefile again.
+        Compact records are merged without materializing their servings.
+        Serving item IDs are expected to be remapped to the catalogue and recipe IDs beforehand.
+
+        :param daily_intake_record: Merged daily intake records, such as read from a shared savefile.
+        :return: Dates of the added and changed records.
+        """
+        changed_dates: list[str] = []
+
+        for date, merged_data in daily_intake_record.items():
+            intake_data = self.daily_intake_record.get(date, None)
+            if intake_data is None:
+                self.daily_intake_record[date] = merged_data
+                changed_dates.append(date)
+                continue
+
+            if intake_data.merge_servings(merged_data):
+                changed_dates.append(date)
 
-    def merge_recipe_data(self, recipes: dict[int, Recipe]) -> None:
-        raise NotImplementedError
+        self.invalidate_daily_intake_totals(changed_dates)
+        return changed_dates
 
     def clear_daily_intake_data(self) -> None:
         self.daily_intake_record.clear()
+        self._serving_index.invalidate()
+        self._indexed_record = None
 
     def clear_catalogue_data(self) -> None:
         self.product_catalogue.clear()
+        self.invalidate_name_index(ServingType.PRODUCT)
         self.add_null_catalogue_entry()
 
     def clear_recipe_data(self) -> None:
         self.recipes_record.clear()
+        self.invalidate_name_index(ServingType.RECIPE)
         self.add_null_recipe_entry()
@@ -1,9 +1,13 @@
 
 
 from Core.serving import Serving
+from Core.serving_arrays import ServingArrays
 from Core.product import NutritionData
+from Core.enums import ServingType
 
+import copy
 import json
+from collections import Counter
 
 
 class DailyIntake:
@@ -15,31 +19,133 @@ class DailyIntake:
         Object holding daily calorie intake, separated into Recipes and
         individual food Product items for a particular calendar date.
 
+        Servings are either held as lists of Serving objects, or in compact ServingArrays storage,
+        as done for records read from savefiles. Compact servings are materialized into Serving
+        objects on first access of the consumed products or recipes lists, typically only for
+        the records being edited. Totals, savefile data and serving counts are provided from
+        the compact storage directly.
+
         :param date: Date string in ISO format, such as '2024-12-31'
         """
         self.date = date
 
-        self.consumed_products: list[Serving] = []
-        self.consumed_recipes: list[Serving] = []
+        self._consumed_products: list[Serving] = []
+        self._consumed_recipes: list[Serving] = []
+
+        # Compact storage of the consumed products followed by the consumed recipes
+        self._serving_arrays: ServingArrays | None = None
+        self._n_compact_products: int = 0
+
+        # Incremented by the DailyIntake methods adding or removing servings
+        self.revision: int = 0
+
+        # Changed dates of the records of the owning CTR data, the date is added on each revision
+        self.changed_dates: set[str] | None = None
+
+    def __getstate__(self) -> dict:
+        """
+        Copies of the record, such as duplicated records, are not tracked by the changed dates of the original.
+        """
+        state = self.__dict__.copy()
+        state["changed_dates"] = None
+        return state
+
+    def _increment_revision(self) -> None:
+        self.revision += 1
+        if self.changed_dates is not None:
+            self.changed_dates.add(self.date)
+
+    @property
+    def consumed_products(self) -> list[Serving]:
+        if self._serving_arrays is not None:
+            self.materialize()
+        return self._consumed_products
+
+    @consumed_products.setter
+    def consumed_products(self, servings: list[Serving]) -> None:
+        if self._serving_arrays is not None:
+            self.materialize()
+        self._consumed_products = servings
+
+    @property
+    def consumed_recipes(self) -> list[Serving]:
+        if self._serving_arrays is not None:
+            self.materialize()
+        return self._consumed_recipes
+
+    @consumed_recipes.setter
+    def consumed_recipes(self, servings: list[Serving]) -> None:
+        if self._serving_arrays is not None:
+            self.materialize()
+        self._consumed_recipes = servings
+
+    @property
+    def is_compact(self) -> bool:
+        return self._serving_arrays is not None
+
+    @property
+    def n_consumed_products(self) -> int:
+        if self._serving_arrays is not None:
+            return self._n_compact_products
+        return len(self._consumed_products)
+
+    @property
+    def n_consumed_recipes(self) -> int:
+        if self._serving_arrays is not None:
+            return len(self._serving_arrays) - self._n_compact_products
+        return len(self._consumed_recipes)
 
     @property
     def has_data(self) -> bool:
         """
         Returns True if daily intake record has consumed products or recipes added to respective lists.
         """
-        if self.consumed_products or self.consumed_recipes:
+        if self.n_consumed_products or self.n_consumed_recipes:
             return True
         else:
             return False
 
+    def compact(self) -> None:
+        """
+        Moves the servings into compact storage, releasing the Serving objects.
+        Serving objects and lists referenced elsewhere, such as by the undo stack, are detached from the record,
+        records being edited should not be compacted.
+        """
+        if self._serving_arrays is not None:
+            return
+
+        self._serving_arrays = ServingArrays.from_servings(self._consumed_products + self._consumed_recipes)
+        self._n_compact_products = len(self._consumed_products)
+        self._consumed_products = []
+        self._consumed_recipes = []
+
+    def materialize(self) -> None:
+        """
+        Creates the Serving objects of the servings in compact storage.
+        """
+        if self._serving_arrays is None:
+            return
+
+        self._consumed_products = self._serving_arrays.to_servings(0, self._n_compact_products)
+        self._consumed_recipes = self._serving_arrays.to_servings(self._n_compact_products)
+        self._serving_arrays = None
+        self._n_compact_products = 0
+
     def convert_to_csv(self, delimiter: str = ";") -> str:
         """
         Returns the string representation of the object data for saving into a CSV save file.
         """
-        consumed_product_data = {index: serving.convert_to_csv()
-                                 for index, serving in enumerate(self.consumed_products)}
-        consumed_recipes_data = {index: serving.convert_to_csv()
-                                 for index, serving in enumerate(self.consumed_recipes)}
+        if self._serving_arrays is not None:
+            serving_arrays, n_products = self._serving_arrays, self._n_compact_products
+            consumed_product_data = {index: serving_arrays.get_serving_csv(index)
+                                     for index in range(n_products)}
+            consumed_recipes_data = {index - n_products: serving_arrays.get_serving_csv(index)
+                                     for index in range(n_products, len(serving_arrays))}
+        else:
+            consumed_product_data = {index: serving.convert_to_csv()
+                                     for index, serving in enumerate(self._consumed_products)}
+            consumed_recipes_data = {index: serving.convert_to_csv()
+                                     for index, serving in enumerate(self._consumed_recipes)}
 
         csv_data = [self.date,
                     json.dumps(consumed_product_data),
@@ -52,7 +158,7 @@ class DailyIntake:
     @classmethod
     def convert_from_csv(cls, csv_line: str, delimiter: str = ";"):
         """
-        Returns the object from a CSV line.
+        Returns the object from a CSV line, with the servings in compact storage.
         """
         split_line = csv_line.split(delimiter)
 
@@ -62,27 +168,143 @@ class DailyIntake:
 
         daily_intake = cls(date_string)
 
-        for product_data in consumed_products_dict.values():
-            daily_intake.add_consumed_product(Serving.convert_from_csv(product_data))
+        serving_arrays = ServingArrays()
+        for serving_data in list(consumed_products_dict.values()) + list(consumed_recipes_dict.values()):
+            serving_arrays.append_csv(serving_data)
 
-        for recipe_data in consumed_recipes_dict.values():
-            daily_intake.add_consumed_recipe(Serving.convert_from_csv(recipe_data))
+        daily_intake._serving_arrays = serving_arrays
+        daily_intake._n_compact_products = len(consumed_products_dict)
 
         return daily_intake
 
     def add_consumed_product(self, serving: Serving) -> None:
         self.consumed_products.append(serving)
+        self._increment_revision()
 
     def add_consumed_recipe(self, serving: Serving) -> None:
         self.consumed_recipes.append(serving)
+        self._increment_revision()
+
+    def remove_consumed_product(self, serving: Serving) -> bool:
+        return self._remove_serving(self.consumed_products, serving)
+
+    def remove_consumed_recipe(self, serving: Serving) -> bool:
+        return self._remove_serving(self.consumed_recipes, serving)
+
+    def _remove_serving(self, servings: list[Serving], serving: Serving) -> bool:
+        for index, item in enumerate(servings):
+            if item is serving:
+                servings.pop(index)
+                self._increment_revision()
+                return True
+
+        print(f"Serving {serving.identifier_string} not found in daily intake record for {self.date}!")
+        return False
+
+    def get_serving_keys(self) -> list[tuple]:
+        """
+        Returns the item type, item ID, item name, portion and nutrition data of each serving as a tuple,
+        consumed products followed by consumed recipes, without materializing compact servings.
+        """
+        if self._serving_arrays is not None:
+            return self._serving_arrays.get_serving_keys()
+
+        return [(serving.item_type, serving.item_id, serving.item_name, serving.portion,
+                 serving.nutrition_data.calories, serving.nutrition_data.fat,
+                 serving.nutrition_data.carbs, serving.nutrition_data.protein)
+                for serving in self._consumed_products + self._consumed_recipes]
+
+    def merge_servings(self, intake_data: "DailyIntake") -> int:
+        """
+        Adds the servings of another record of the same date, except the servings equal to the servings already
+        in the record, such as when merging the same savefile again. Compact records remain compact, and the merged
+        record is not materialized. Returns the number of added servings.
+        """
+        existing_keys = Counter(self.get_serving_keys())
+        n_products = intake_data.n_consumed_products
+        added_indices: list[int] = []
+
+        for index, serving_key in enumerate(intake_data.get_serving_keys()):
+            if existing_keys[serving_key] > 0:
+                existing_keys[serving_key] -= 1
+            else:
+                added_indices.append(index)
+
+        if not added_indices:
+            return 0
+
+        if intake_data._serving_arrays is not None:
+            servings = [intake_data._serving_arrays.get_serving(index) for index in added_indices]
+        else:
+            merged_servings = intake_data._consumed_products + intake_data._consumed_recipes
+            servings = [merged_servings[index] for index in added_indices]
+
+        is_compact = self.is_compact
+        self.materialize()
+        for index, serving in zip(added_indices, servings):
+            (self._consumed_products if index < n_products else self._consumed_recipes).append(serving)
+        if is_compact:
+            self.compact()
+
+        self._increment_revision()
+        return len(added_indices)
+
+    def get_item_counts(self) -> dict[tuple[ServingType, int], int]:
+        """
+        Returns the number of servings of each item in the record, by item type and item ID.
+        """
+        if self._serving_arrays is not None:
+            return self._serving_arrays.get_item_counts()
+
+        return dict(Counter((serving.item_type, serving.item_id)
+                            for serving in self._consumed_products + self._consumed_recipes))
+
+    def set_item_nutrition_data(self, item_type: ServingType, item_id: int, nutrition_data: NutritionData) -> int:
+        """
+        Sets the nutrition data of all servings of the item, without materializing compact servings.
+        Returns the number of changed servings.
+        """
+        if self._serving_arrays is not None:
+            return self._serving_arrays.set_item_nutrition_data(item_type, item_id, nutrition_data)
+
+        n_changed = 0
+        for serving in self._consumed_products + self._consumed_recipes:
+            if serving.item_type is item_type and serving.item_id == item_id and serving.nutrition_data != nutrition_data:
+                serving.nutrition_data = copy.copy(nutrition_data)
+                n_changed += 1
+
+        return n_changed
+
+    def remap_item_ids(self, item_type: ServingType, remap: dict[int, int]) -> int:
+        """
+        Replaces the item IDs of the servings of the given type by the remapped IDs, such as after merging catalogues,
+        without materializing compact servings. IDs not in the remap, such as of the items missing from the merged
+        catalogue, are replaced by the null entry ID. Returns the number of changed servings.
+        """
+        if self._serving_arrays is not None:
+            n_changed = self._serving_arrays.remap_item_ids(item_type, remap)
+        else:
+            n_changed = 0
+            for serving in self._consumed_products + self._consumed_recipes:
+                new_id = remap.get(serving.item_id, 0)
+                if serving.item_type is item_type and new_id != serving.item_id:
+                    serving.item_id = new_id
+                    n_changed += 1
+
+        if n_changed:
+            self._increment_revision()
+        return n_changed
 
     def get_total_consumed_nutrition_data(self) -> NutritionData:
         data = NutritionData()
 
-        for serving in self.consumed_products:
+        if self._serving_arrays is not None:
+            return self._serving_arrays.add_consumed_nutrition_data(data)
+
+        for serving in self._consumed_products:
             data += serving.get_consumed_nutrition_values()
 
-        for serving in self.consumed_recipes:
+        for serving in self._consumed_recipes:
             data += serving.get_consumed_nutrition_values()
 
         return data
@@ -0,0 +1,200 @@
+
+from Core.ctr_data import CTRData, SavefileExtension
+from Core.product import Product, NutritionData, AdditionalData
+from Core.recipe import Recipe, RecipeNetMassData
+from Core.ingredient import Ingredient, AmountDefinition, NetAmountDefinition
+from Core.serving import Serving
+from Core.enums import ProductCategory, RecipeCategory, ServingType
+from Core.units import MeasurementUnit
+
+import os
+import random
+import datetime
+from dataclasses import dataclass
+
+
+_PRODUCT_ADJECTIVES = ["Fresh", "Organic", "Frozen", "Smoked", "Dried", "Light", "Whole", "Roasted", "Raw", "Canned"]
+_STORES = ["Market", "Grocer", "Supermarket", "Farmers Market", "Discount Store"]
+_MANUFACTURERS = ["Acme Foods", "Green Valley", "Blue Lake", "Sunny Farms", "Northern Mills"]
+_PACKAGING_UNITS = [MeasurementUnit.G, MeasurementUnit.KG, MeasurementUnit.L, MeasurementUnit.ML]
+_RECIPE_STYLES = ["Baked", "Grilled", "Stewed", "Fried", "Steamed", "Braised", "Spicy", "Creamy"]
+
+
+@dataclass
+class DatasetSize:
+    """
+    Size and shape of a generated CTR dataset.
+
+    Attributes:
+        products (int): Number of catalogue Products.
+        recipes (int): Number of Recipes.
+        years (float): Length of the daily intake record in years, ending on the end date.
+        ingredients_per_recipe (tuple): Minimum and maximum number of ingredients of a recipe.
+        product_servings_per_day (tuple): Minimum and maximum number of product servings per day.
+        recipe_servings_per_day (tuple): Minimum and maximum number of recipe servings per day.
+        relative_ingredient_ratio (float): Share of ingredients defined relative to another ingredient.
+        skipped_day_ratio (float): Share of days without a daily intake record.
+    """
+    products: int = 500
+    recipes: int = 100
+    years: float = 1.0
+    ingredients_per_recipe: tuple[int, int] = (3, 12)
+    product_servings_per_day: tuple[int, int] = (2, 8)
+    recipe_servings_per_day: tuple[int, int] = (0, 3)
+    relative_ingredient_ratio: float = 0.3
+    skipped_day_ratio: float = 0.05
+
+
+DATASET_PRESETS: dict[str, DatasetSize] = {
+    "small": DatasetSize(products=100, recipes=20, years=0.25),
+    "medium": DatasetSize(products=1000, recipes=200, years=2.0),
+    "large": DatasetSize(products=5000, recipes=1000, years=5.0),
+    "huge": DatasetSize(products=20000, recipes=5000, years=10.0),
+}
+
+
+def generate_nutrition_data(rng: random.Random) -> NutritionData:
+    """
+    Returns random nutrition data per 100 g, with calories consistent with the macronutrients.
+    """
+    fat = round(rng.uniform(0, 40) * rng.random(), 1)
+    protein = round(rng.uniform(0, 30) * rng.random(), 1)
+    carbs = round(min(rng.uniform(0, 80) * rng.random(), 100 - fat - protein), 1)
+    calories = round(9 * fat + 4 * carbs + 4 * protein + rng.uniform(-5, 5), 1)
+    return NutritionData(calories=max(calories, 0.0), fat=fat, carbs=max(carbs, 0.0), protein=protein)
+
+
+def generate_product(rng: random.Random, item_id: int, date: datetime.date) -> Product:
+    category = rng.choice(list(ProductCategory))
+    name = f"{rng.choice(_PRODUCT_ADJECTIVES)} {category.value} {item_id}"
+
+    packaging_unit = rng.choice(_PACKAGING_UNITS)
+    packaging_amount = rng.choice([0.25, 0.5, 1.0, 2.0]) if packaging_unit in [MeasurementUnit.KG, MeasurementUnit.L] \
+        else rng.choice([100.0, 200.0, 250.0, 500.0])
+
+    additional_data = AdditionalData(
+        description=f"Generated {category.value.lower()} product",
+        store=rng.choice(_STORES),
+        manufacturer=rng.choice(_MANUFACTURERS),
+        packaging_amount=packaging_amount,
+        packaging_unit=packaging_unit,
+        density=round(rng.uniform(0.8, 1.2), 2),
+        price=round(rng.uniform(0.5, 20.0), 2),
+        last_update_date=(date - datetime.timedelta(days=rng.randrange(365))).isoformat())
+
+    return Product(item_id, name, category, generate_nutrition_data(rng), additional_data)
+
+
+def generate_recipe(rng: random.Random, item_id: int, products: list[Product], size: DatasetSize) -> Recipe:
+    """
+    Returns a recipe of random catalogue products. Some ingredient amounts are defined relative to the
+    amount or net mass of a previous ingredient, forming nested chains of relative amount definitions.
+    """
+    category = rng.choice(list(RecipeCategory))
+    recipe = Recipe(item_id, f"{rng.choice(_RECIPE_STYLES)} {category.value} {item_id}", category)
+
+    n_ingredients = min(rng.randint(*size.ingredients_per_recipe), len(products))
+    for product in rng.sample(products, n_ingredients):
+        ingredient = recipe.add_ingredient(Ingredient(0, product))
+
+        if len(recipe.ingredients) > 1 and rng.random() < size.relative_ingredient_ratio:
+            # Referencing the previous ingredient makes nested relative amount chains likely
+            ingredient.amount_definition = rng.choice([AmountDefinition.RELATIVE_TO_AMOUNT,
+                                                       AmountDefinition.RELATIVE_TO_NET_MASS])
+            ingredient.amount = round(rng.uniform(5, 100), 1)
+            ingredient.amount_relative_to_id = ingredient.item_id - 1
+        else:
+            ingredient.amount = round(rng.uniform(5, 500), 1)
+
+        net_amount_definition = rng.choices(list(NetAmountDefinition), weights=[1, 6, 3])[0]
+        ingredient.net_amount_definition = net_amount_definition
+        if net_amount_definition is NetAmountDefinition.RELATIVE_TO_AMOUNT:
+            ingredient.net_amount = round(rng.uniform(60, 100), 1)
+        elif net_amount_definition is NetAmountDefinition.GRAMS:
+            ingredient.net_amount = round(ingredient.amount * rng.uniform(0.6, 1.0), 1)
+
+    recipe.update_ingredient_references()
+
+    if rng.random() < 0.5:
+        total_net_mass = recipe.get_total_net_mass()
+        recipe.net_mass_data = RecipeNetMassData(measured_value=round(total_net_mass * rng.uniform(0.7, 0.95), 1),
+                                                 adjust_for_evaporation=True)
+
+    return recipe
+
+
+def generate_ctr_data(size: DatasetSize, seed: int = 0, end_date: datetime.date | None = None) -> CTRData:
+    """
+    Returns reproducible synthetic CTR data of the given size for benchmarks and load tests.
+    :param seed: Random generator seed, equal seeds and sizes produce equal data.
+    :param end_date: Date of the last daily intake record, 2025-01-01 by default.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date(2025, 1, 1)
+
+    ctr_data = CTRData(filename=f"Generated CTR Data {seed}")
+    ctr_data.nutrition_targets = NutritionData(calories=2200, fat=70, carbs=250, protein=130)
+
+    products = [generate_product(rng, item_id, end_date) for item_id in range(1, size.products + 1)]
+    for product in products:
+        ctr_data.product_catalogue[product.item_id] = product
+
+    recipes = [generate_recipe(rng, item_id, products, size) for item_id in range(1, size.recipes + 1)]
+    for recipe in recipes:
+        ctr_data.recipes_record[recipe.item_id] = recipe
+
+    ctr_data.favorite_products = {product.item_id for product in rng.sample(products, min(len(products), 20))}
+    ctr_data.favorite_recipes = {recipe.item_id for recipe in rng.sample(recipes, min(len(recipes), 10))}
+
+    # Recipe nutrition data per 100 g is calculated once for all recipes, servings hold independent copies
+    recipe_nutrition_data = ctr_data.get_recipe_totals().get_all_nutrition_data_per_100g()
+
+    n_days = int(size.years * 365)
+    for day in range(n_days, 0, -1):
+        if rng.random() < size.skipped_day_ratio:
+            continue
+
+        date = (end_date - datetime.timedelta(days=day - 1)).isoformat()
+        intake_data = ctr_data.add_daily_intake(date)
+
+        if products:
+            for _ in range(rng.randint(*size.product_servings_per_day)):
+                product = rng.choice(products)
+                serving = Serving(product.item_id, product.name, ServingType.PRODUCT, round(rng.uniform(10, 300)))
+                serving.nutrition_data = NutritionData(**vars(product.nutrition_data))
+                intake_data.add_consumed_product(serving)
+
+        if recipes:
+            for _ in range(rng.randint(*size.recipe_servings_per_day)):
+                recipe = rng.choice(recipes)
+                serving = Serving(recipe.item_id, recipe.name, ServingType.RECIPE, round(rng.uniform(100, 500)))
+                serving.nutrition_data = NutritionData(**vars(recipe_nutrition_data[recipe.item_id]))
+                intake_data.add_consumed_recipe(serving)
+
+        # Stored compact, as are the daily intake records read from savefiles
+        intake_data.compact()
+
+    return ctr_data
+
+
+def write_generated_savefiles(ctr_data: CTRData, directory: str, name: str = "Generated",
+                              extensions: list[str] | None = None) -> list[str]:
+    """
+    Writes the CTR data to savefiles of the given types and returns their paths.
+    :param extensions: Savefile extensions, CTR Data, catalogue, recipes and daily intake savefiles by default.
+    """
+    from Core.batch_operations import write_ctr_data
+
+    if extensions is None:
+        extensions = [SavefileExtension.CTR_DATA.value, SavefileExtension.CATALOGUE.value,
+                      SavefileExtension.RECIPES.value, SavefileExtension.DAILY_INTAKE.value]
+
+    os.makedirs(directory, exist_ok=True)
+
+    filepaths = []
+    for extension in extensions:
+        filepath = os.path.join(directory, f"{name}{extension}")
+        write_ctr_data(ctr_data, filepath)
+        filepaths.append(filepath)
+
+    return filepaths
@@ -0,0 +1,254 @@
+
+import os
+import json
+import math
+import functools
+import threading
+from collections import deque
+from dataclasses import dataclass
+from timeit import default_timer as timer
+from typing import Any, Callable
+
+
+_MAX_SAMPLES_PER_SPAN = 10000
+_MAX_TRACE_EVENTS = 100000
+
+
+@dataclass
+class SpanStats:
+    """
+    Aggregated durations of a named span, in seconds.
+    Percentiles are computed from the most recent samples of the span.
+    """
+    name: str
+    count: int
+    total: float
+    p50: float
+    p95: float
+    max: float
+
+
+def get_percentile(sorted_values: list[float], percentile: float) -> float:
+    """
+    Returns the nearest-rank percentile of the sorted values, 0.0 for an empty list.
+    :param percentile: Percentile in range [0, 100].
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _Span:
+    """
+    Context manager measuring a single execution of a named span.
+    """
+    __slots__ = ("instrumentation", "name", "log", "args", "start")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str, log: bool, args: dict | None):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.log = log
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record_span(self.name, self.start, timer() - self.start, self.args, self.log)
+        return False
+
+
+class _DisabledSpan:
+    """
+    Shared no-op span returned while the instrumentation is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_DISABLED_SPAN = _DisabledSpan()
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = True, verbose: bool = True, tracing: bool = False):
+        """
+        Lightweight timing instrumentation with named spans and counters.
+
+        Span durations are aggregated in memory (count, total, p50, p95, max). While tracing,
+        spans and counters are also kept as trace events, which can be exported in the Chrome
+        trace event format and viewed in chrome://tracing or Perfetto. While disabled, spans
+        and counters cost a single attribute check and record nothing.
+
+        :param enabled: Record spans and counters.
+        :param verbose: Print the duration of completed spans measured with logging enabled.
+        :param tracing: Keep the trace events of the recorded spans and counters.
+        """
+        self.enabled = enabled
+        self.verbose = verbose
+        self.tracing = tracing
+
+        self._lock = threading.Lock()
+        self._span_counts: dict[str, int] = {}
+        self._span_totals: dict[str, float] = {}
+        self._span_maxima: dict[str, float] = {}
+        self._span_samples: dict[str, deque[float]] = {}
+        self._counters: dict[str, float] = {}
+        self._trace_events: deque[dict] = deque(maxlen=_MAX_TRACE_EVENTS)
+
+    def span(self, name: str, log: bool = False, **args):
+        """
+        Returns a context manager measuring the duration of the enclosed code.
+        :param name: Span name, executions of spans with the same name are aggregated.
+        :param log: Print the span duration on completion, if the instrumentation is verbose.
+        :param args: Optional data stored with the trace event, e.g. the number of processed items.
+        """
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return _Span(self, name, log, args or None)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """
+        Increments the named counter by the given value.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            total = self._counters.get(name, 0) + value
+            self._counters[name] = total
+            if self.tracing:
+                self._trace_events.append({"name": name, "ph": "C", "ts": self._get_timestamp(timer()),
+                                           "pid": os.getpid(), "tid": threading.get_ident(),
+                                           "args": {name: total}})
+
+    def record_span(self, name: str, start: float, duration: float, args: dict | None = None,
+                    log: bool = False) -> None:
+        with self._lock:
+            self._span_counts[name] = self._span_counts.get(name, 0) + 1
+            self._span_totals[name] = self._span_totals.get(name, 0.0) + duration
+            self._span_maxima[name] = max(self._span_maxima.get(name, 0.0), duration)
+
+            samples = self._span_samples.get(name, None)
+            if samples is None:
+                samples = self._span_samples[name] = deque(maxlen=_MAX_SAMPLES_PER_SPAN)
+            samples.append(duration)
+
+            if self.tracing:
+                event = {"name": name, "ph": "X", "ts": self._get_timestamp(start), "dur": duration * 1e6,
+                         "pid": os.getpid(), "tid": threading.get_ident()}
+                if args:
+                    event["args"] = args
+                self._trace_events.append(event)
+
+        if log and self.verbose:
+            print(f"{name} in {duration} s")
+
+    @staticmethod
+    def _get_timestamp(time: float) -> float:
+        """
+        Returns the trace event timestamp in microseconds. Timestamps are not offset to the start of
+        the instrumentation, so that traces of worker processes can be merged on the same timeline.
+        """
+        return time * 1e6
+
+    def get_span_stats(self, name: str) -> SpanStats | None:
+        with self._lock:
+            if name not in self._span_counts:
+                return None
+
+            samples = sorted(self._span_samples[name])
+            return SpanStats(name=name,
+                             count=self._span_counts[name],
+                             total=self._span_totals[name],
+                             p50=get_percentile(samples, 50),
+                             p95=get_percentile(samples, 95),
+                             max=self._span_maxima[name])
+
+    def get_all_span_stats(self) -> list[SpanStats]:
+        with self._lock:
+            names = list(self._span_counts)
+        return [self.get_span_stats(name) for name in names]
+
+    def get_counter(self, name: str) -> float:
+        return self._counters.get(name, 0)
+
+    @property
+    def counters(self) -> dict[str, float]:
+        return dict(self._counters)
+
+    def get_report(self) -> str:
+        lines = [f"{'Span':<50} {'Count':>8} {'Total [ms]':>12} {'p50 [ms]':>10} {'p95 [ms]':>10} {'Max [ms]':>10}"]
+        for stats in self.get_all_span_stats():
+            lines.append(f"{stats.name:<50} {stats.count:>8} {stats.total * 1000:>12.3f} {stats.p50 * 1000:>10.3f} "
+                         f"{stats.p95 * 1000:>10.3f} {stats.max * 1000:>10.3f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<50} {value:>8}")
+        return "\n".join(lines)
+
+    def get_chrome_trace(self) -> dict[str, Any]:
+        with self._lock:
+            return {"traceEvents": list(self._trace_events), "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filepath: str) -> None:
+        """
+        Writes the recorded spans and counters to a Chrome trace event format JSON file.
+        """
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.get_chrome_trace(), f)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._span_counts.clear()
+            self._span_totals.clear()
+            self._span_maxima.clear()
+            self._span_samples.clear()
+            self._counters.clear()
+            self._trace_events.clear()
+
+
+_instrumentation = None
+
+
+def instrumentation() -> Instrumentation:
+    """
+    Initialization function for the shared instrumentation instance.
+    Instrumentation is disabled, unless enabled by setting the CTR_INSTRUMENTATION environment variable to 1,
+    or to "trace" to also keep the trace events. Command line tools enable it for tracing and benchmark runs.
+    """
+    global _instrumentation
+    if _instrumentation is None:
+        mode = os.environ.get("CTR_INSTRUMENTATION", "0")
+        _instrumentation = Instrumentation(enabled=mode in ["1", "trace"], tracing=mode == "trace")
+    return _instrumentation
+
+
+def timed(name: str | None = None) -> Callable:
+    """
+    Decorator measuring each call of the decorated function as a span of the shared instrumentation instance.
+    :param name: Span name, qualified name of the function if None.
+    """
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            instance = instrumentation()
+            if not instance.enabled:
+                return function(*args, **kwargs)
+
+            start = timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                instance.record_span(span_name, start, timer() - start)
+
+        return wrapper
+    return decorator
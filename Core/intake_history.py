@@ -0,0 +1,151 @@
+
+from Core.ctr_data import CTRData
+
+import datetime
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+
+HISTORY_METRICS = ["calories", "fat", "carbs", "protein"]
+
+
+class IntakeHistory:
+    def __init__(self):
+        """
+        Daily intake totals stored as parallel lists sorted by date,
+        with dates represented as proleptic Gregorian ordinals.
+
+        Only dates with consumed servings are included in the history.
+        """
+        self.days: list[int] = []
+        self.values: dict[str, list[float]] = {metric: [] for metric in HISTORY_METRICS}
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @staticmethod
+    def get_day(date: str) -> int:
+        """
+        Returns the day ordinal of a date string in ISO format, such as '2024-12-31'.
+        """
+        return datetime.date.fromisoformat(date).toordinal()
+
+    @classmethod
+    def from_ctr_data(cls, ctr_data: CTRData):
+        """
+        Builds the history from the cached daily intake totals of the CTR data.
+        """
+        history = cls()
+
+        totals = []
+        for date, intake_data in ctr_data.daily_intake_record.items():
+            if intake_data.has_data:
+                totals.append((cls.get_day(date), ctr_data.get_daily_intake_total(date)))
+        totals.sort(key=lambda entry: entry[0])
+
+        history.days = [day for day, _ in totals]
+        for metric in HISTORY_METRICS:
+            history.values[metric] = [getattr(total, metric) for _, total in totals]
+
+        return history
+
+    def update_dates(self, ctr_data: CTRData, dates: Iterable[str]) -> None:
+        """
+        Updates the history only for the given dates, adding, replacing or removing their totals.
+        """
+        for date in dates:
+            day = self.get_day(date)
+            index = bisect_left(self.days, day)
+            exists = index < len(self.days) and self.days[index] == day
+
+            intake_data = ctr_data.daily_intake_record.get(date, None)
+            if intake_data is None or not intake_data.has_data:
+                if exists:
+                    self.days.pop(index)
+                    for metric in HISTORY_METRICS:
+                        self.values[metric].pop(index)
+                continue
+
+            total = ctr_data.get_daily_intake_total(date)
+            if exists:
+                for metric in HISTORY_METRICS:
+                    self.values[metric][index] = getattr(total, metric)
+            else:
+                self.days.insert(index, day)
+                for metric in HISTORY_METRICS:
+                    self.values[metric].insert(index, getattr(total, metric))
+
+    def get_index_range(self, start_day: int, end_day: int) -> tuple[int, int]:
+        """
+        Returns the start and end (exclusive) indices of the days within the given range.
+        """
+        return bisect_left(self.days, start_day), bisect_right(self.days, end_day)
+
+    def get_series(self, metric: str, start_day: int, end_day: int,
+                   bucket_days: int = 1, bucket_months: int = 0) -> tuple[list[int], list[float]]:
+        """
+        Returns days and values of the metric within the given range of days.
+
+        If bucket_days is larger than 1, the series is downsampled by splitting the days into buckets
+        of the given length, keeping only the minimum and maximum value of each bucket in date order.
+        If bucket_months is given, the buckets are calendar months instead.
+        Peaks of the series are preserved at every zoom level, while the number of points is
+        limited to two per bucket.
+        :param metric: Nutrition metric, one of HISTORY_METRICS.
+        :param start_day: First day ordinal of the range.
+        :param end_day: Last day ordinal of the range.
+        :param bucket_days: Number of days in a downsampling bucket.
+        :param bucket_months: Number of calendar months in a downsampling bucket, replacing bucket_days.
+        """
+        start, end = self.get_index_range(start_day, end_day)
+        days = self.days[start:end]
+        values = self.values[metric][start:end]
+
+        if (bucket_days <= 1 and bucket_months <= 0) or not days:
+            return days, values
+
+        return downsample_min_max(days, values, bucket_days, bucket_months)
+
+
+def get_month(day: int) -> int:
+    """
+    Returns the calendar month number of a day ordinal, counted as year * 12 + month.
+    """
+    date = datetime.date.fromordinal(day)
+    return date.year * 12 + date.month
+
+
+def downsample_min_max(days: list[int], values: list[float], bucket_days: int,
+                       bucket_months: int = 0) -> tuple[list[int], list[float]]:
+    """
+    Downsamples a series sorted by day, keeping the minimum and maximum value of each bucket of days.
+    Buckets are aligned to day ordinals, or to calendar months if bucket_months is given,
+    so the same days always fall into the same bucket.
+    """
+    if bucket_months > 0:
+        bucket_keys = [(get_month(day) - 1) // bucket_months for day in days]
+    else:
+        bucket_keys = [day // bucket_days for day in days]
+
+    sampled_days: list[int] = []
+    sampled_values: list[float] = []
+
+    index = 0
+    count = len(days)
+    while index < count:
+        bucket = bucket_keys[index]
+        min_index = max_index = index
+
+        index += 1
+        while index < count and bucket_keys[index] == bucket:
+            if values[index] < values[min_index]:
+                min_index = index
+            elif values[index] > values[max_index]:
+                max_index = index
+            index += 1
+
+        for i in sorted({min_index, max_index}):
+            sampled_days.append(days[i])
+            sampled_values.append(values[i])
+
+    return sampled_days, sampled_values
@@ -0,0 +1,225 @@
+
+from Core.ctr_data import CTRData
+
+import os
+import sys
+import ctypes
+import types
+import tracemalloc
+from enum import Enum
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+# Shared objects not owned by the CTR data, such as classes, enum members and functions
+_EXCLUDED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, Enum)
+
+
+@dataclass
+class MemoryUsage:
+    """
+    Memory used by a section of the program data.
+
+    Attributes:
+        name (str): Section name.
+        bytes (int): Deep size of the section objects, or resident memory increase for Qt objects, bytes.
+        objects (int): Number of Python objects, or number of Qt items.
+    """
+    name: str
+    bytes: int = 0
+    objects: int = 0
+
+
+@dataclass
+class AllocationSite:
+    filename: str
+    lineno: int
+    bytes: int
+    count: int
+
+
+@dataclass
+class MemoryReport:
+    """
+    Memory footprint of a loaded CTR Data savefile.
+
+    Attributes:
+        filepath (str): Savefile path.
+        traced_bytes (int): Memory allocated by Python while loading the savefile and still in use after loading.
+        peak_bytes (int): Peak memory allocated by Python while loading the savefile.
+        sections (list): Deep size and object count of the CTR data sections.
+        allocation_sites (list): Source lines with the largest memory allocated while loading.
+        qt_sections (list): Resident memory increase and item count of the main window tables, if measured.
+    """
+    filepath: str
+    traced_bytes: int = 0
+    peak_bytes: int = 0
+    sections: list[MemoryUsage] = field(default_factory=list)
+    allocation_sites: list[AllocationSite] = field(default_factory=list)
+    qt_sections: list[MemoryUsage] = field(default_factory=list)
+
+
+def get_resident_memory() -> int | None:
+    """
+    Returns the resident memory of the current process in bytes, None if not available on the platform.
+    Unlike traced Python allocations, resident memory includes the memory allocated by Qt.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def release_free_memory() -> None:
+    """
+    Returns the freed heap memory to the operating system where supported (glibc), so that
+    a following resident memory measurement is not hidden by reused freed memory.
+    """
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def get_memory_usage(name: str, obj: Any, seen: set[int] | None = None) -> MemoryUsage:
+    """
+    Returns the deep size and number of objects reachable from the given object.
+    Objects already in the seen set are not counted again, so that objects shared between
+    sections are attributed to the first measured section.
+    """
+    if seen is None:
+        seen = set()
+
+    usage = MemoryUsage(name)
+    stack = [obj]
+
+    while stack:
+        obj = stack.pop()
+        obj_id = id(obj)
+        if obj_id in seen or isinstance(obj, _EXCLUDED_TYPES):
+            continue
+        seen.add(obj_id)
+
+        usage.bytes += sys.getsizeof(obj)
+        usage.objects += 1
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+        elif hasattr(obj, "__slots__"):
+            stack.extend(getattr(obj, slot) for slot in obj.__slots__ if hasattr(obj, slot))
+
+    return usage
+
+
+def get_object_size(obj, seen=None) -> int:
+    """
+    Recursively find the size of objects including referenced objects, bytes.
+    """
+    return get_memory_usage("", obj, seen).bytes
+
+
+def get_ctr_data_memory_usage(ctr_data: CTRData) -> list[MemoryUsage]:
+    """
+    Returns the memory usage of the catalogue, recipes, daily intake, cached daily intake totals
+    and remaining CTR data. Recipe ingredients reference the catalogue Products, which are counted
+    in the catalogue.
+    """
+    seen: set[int] = set()
+
+    sections = [get_memory_usage("Catalogue", ctr_data.product_catalogue, seen),
+                get_memory_usage("Recipes", ctr_data.recipes_record, seen),
+                get_memory_usage("Daily intake", ctr_data.daily_intake_record, seen),
+                get_memory_usage("Daily intake totals cache", ctr_data._daily_intake_totals, seen),
+                get_memory_usage("Other", ctr_data, seen)]
+
+    return sections
+
+
+def trace_allocations(function: Callable[[], Any], top: int = 10) -> tuple[Any, int, int, list[AllocationSite]]:
+    """
+    Calls the function while tracing the Python memory allocations.
+    :param top: Number of returned allocation sites with the largest allocated memory.
+    :return: Function result, allocated memory still in use, peak allocated memory and the top allocation sites.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    start_snapshot = tracemalloc.take_snapshot()
+    start_size, _ = tracemalloc.get_traced_memory()
+
+    result = function()
+
+    size, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+
+    if not was_tracing:
+        tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+               tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")]
+    statistics = snapshot.filter_traces(filters).compare_to(start_snapshot.filter_traces(filters), "lineno")
+
+    sites = [AllocationSite(stat.traceback[0].filename, stat.traceback[0].lineno, stat.size_diff, stat.count_diff)
+             for stat in statistics if stat.size_diff > 0][:top]
+
+    return result, size - start_size, peak - start_size, sites
+
+
+def get_savefile_memory_report(filepath: str, top: int = 10) -> tuple[MemoryReport, CTRData]:
+    """
+    Loads the CTR Data savefile and returns its memory report with the loaded data.
+    """
+    from Core.batch_operations import read_ctr_data
+
+    ctr_data, traced_bytes, peak_bytes, sites = trace_allocations(lambda: read_ctr_data(filepath), top)
+
+    report = MemoryReport(filepath, traced_bytes, peak_bytes, get_ctr_data_memory_usage(ctr_data), sites)
+    return report, ctr_data
+
+
+def format_size(n_bytes: float) -> str:
+    if abs(n_bytes) < 1024:
+        return f"{n_bytes} B"
+
+    for unit in ["kB", "MB", "GB"]:
+        n_bytes /= 1024
+        if abs(n_bytes) < 1024 or unit == "GB":
+            return f"{n_bytes:.1f} {unit}"
+
+
+def format_memory_report(report: MemoryReport) -> list[str]:
+    """
+    Returns the lines of a readable memory report.
+    """
+    lines = [f"Allocated while loading: {format_size(report.traced_bytes)}, "
+             f"peak {format_size(report.peak_bytes)}",
+             f"{'Section':<30} {'Size':>12} {'Objects':>10}"]
+
+    for section in report.sections:
+        lines.append(f"{section.name:<30} {format_size(section.bytes):>12} {section.objects:>10}")
+
+    total = sum(section.bytes for section in report.sections)
+    lines.append(f"{'Total':<30} {format_size(total):>12} {sum(s.objects for s in report.sections):>10}")
+
+    if report.allocation_sites:
+        lines.append("Top allocation sites after loading:")
+        for site in report.allocation_sites:
+            location = f"{site.filename}:{site.lineno}"
+            lines.append(f"    {location:<60} {format_size(site.bytes):>12} {site.count:>10}")
+
+    if report.qt_sections:
+        lines.append(f"{'Qt table':<30} {'Resident':>12} {'Items':>10}")
+        for section in report.qt_sections:
+            size = format_size(section.bytes) if section.bytes is not None else "n/a"
+            lines.append(f"{section.name:<30} {size:>12} {section.objects:>10}")
+
+    return lines
@@ -0,0 +1,204 @@
+
+from Core.ctr_data import CTRData
+from Core.enums import ServingType
+from Core.product import NutritionData
+from Core.serving import Serving
+
+import numpy as np
+from dataclasses import dataclass, field, fields
+from typing import Iterable
+
+
+NUTRIENTS = [data_field.name for data_field in fields(NutritionData)]
+
+
+@dataclass
+class PortionCandidate:
+    """
+    Product or Recipe considered for a serving by the portion solver.
+
+    Attributes:
+        item_type (ServingType): Type of the item.
+        item_id (int): Product or Recipe ID.
+        name (str): Item name.
+        nutrition_data (NutritionData): Nutrition data per 100 g, as assigned to the item servings.
+    """
+    item_type: ServingType
+    item_id: int
+    name: str
+    nutrition_data: NutritionData
+
+
+@dataclass
+class SolvedPortion:
+    candidate: PortionCandidate
+    portion: float
+
+
+@dataclass
+class PortionSolution:
+    """
+    Portions of the candidate items closing the gap between the consumed nutrition data and the targets.
+
+    Attributes:
+        portions (list): Candidates with non-zero portions in grams, from the largest portion.
+        total (NutritionData): Consumed nutrition data with the solved portions added.
+        deviation (NutritionData): Difference of the total from the targets, zero for nutrients without a target.
+    """
+    portions: list[SolvedPortion] = field(default_factory=list)
+    total: NutritionData = field(default_factory=NutritionData)
+    deviation: NutritionData = field(default_factory=NutritionData)
+
+
+def get_portion_candidates(ctr_data: CTRData,
+                           item_keys: Iterable[tuple[ServingType, int]] | None = None) -> list[PortionCandidate]:
+    """
+    Returns the portion candidates of the given items, or of the favorite Products and Recipes if None.
+    Null entries, missing items and items without nutrition data are skipped. Candidates hold copies
+    of the nutrition data, and can be solved on a worker thread while the CTR data is edited.
+    """
+    if item_keys is None:
+        item_keys = ([(ServingType.PRODUCT, item_id) for item_id in sorted(ctr_data.favorite_products)]
+                     + [(ServingType.RECIPE, item_id) for item_id in sorted(ctr_data.favorite_recipes)])
+
+    candidates = []
+    for item_type, item_id in item_keys:
+        items = ctr_data.recipes_record if item_type is ServingType.RECIPE else ctr_data.product_catalogue
+        item = items.get(item_id, None)
+        if item is None or item_id == 0:
+            continue
+
+        nutrition_data = NutritionData(**vars(Serving.get_item_nutrition_data(item)))
+        if nutrition_data == NutritionData():
+            continue
+
+        candidates.append(PortionCandidate(item_type, item_id, item.name, nutrition_data))
+
+    return candidates
+
+
+def solve_nnls(a: np.ndarray, b: np.ndarray, tolerance: float = 1e-10,
+               max_iterations: int | None = None) -> np.ndarray:
+    """
+    Returns x >= 0 minimizing ||a x - b||, solved by the Lawson-Hanson active set method.
+    """
+    n = a.shape[1]
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    max_iterations = 3 * n if max_iterations is None else max_iterations
+
+    gradient = a.T @ (b - a @ x)
+    n_iterations = 0
+
+    while not passive.all() and np.max(np.where(passive, -np.inf, gradient)) > tolerance:
+        passive[np.argmax(np.where(passive, -np.inf, gradient))] = True
+
+        while n_iterations < max_iterations:
+            n_iterations += 1
+            solution = np.zeros(n)
+            solution[passive] = np.linalg.lstsq(a[:, passive], b, rcond=None)[0]
+
+            if np.all(solution[passive] > tolerance):
+                x = solution
+                break
+
+            # Step towards the solution until the first passive variable reaches zero
+            blocking = passive & (solution <= tolerance)
+            step = np.min(x[blocking] / (x[blocking] - solution[blocking]))
+            x = x + step * (solution - x)
+            passive &= x > tolerance
+            x[~passive] = 0.0
+
+        if n_iterations >= max_iterations:
+            break
+
+        gradient = a.T @ (b - a @ x)
+
+    return x
+
+
+def _get_weighted_system(consumed: NutritionData, targets: NutritionData,
+                         candidates: list[PortionCandidate]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the candidate nutrition per gram and the remaining nutrition to the targets, as relative to the targets,
+    so that the deviations of all nutrients are weighted equally. Nutrients without a target are excluded.
+    """
+    rows = [nutrient for nutrient in NUTRIENTS if getattr(targets, nutrient) > 0]
+    target_values = np.array([getattr(targets, nutrient) for nutrient in rows], dtype=float)
+
+    a = np.array([[getattr(candidate.nutrition_data, nutrient) / 100 for candidate in candidates]
+                  for nutrient in rows], dtype=float).reshape(len(rows), len(candidates))
+    b = np.array([getattr(targets, nutrient) - getattr(consumed, nutrient) for nutrient in rows], dtype=float)
+
+    return a / target_values[:, None], b / target_values
+
+
+def _get_solution(consumed: NutritionData, targets: NutritionData, candidates: list[PortionCandidate],
+                  portions: np.ndarray) -> PortionSolution:
+    solution = PortionSolution(total=NutritionData(**vars(consumed)))
+
+    for index in np.argsort(-portions):
+        if portions[index] <= 0:
+            break
+        candidate = candidates[index]
+        solution.portions.append(SolvedPortion(candidate, float(portions[index])))
+        solution.total += candidate.nutrition_data * (float(portions[index]) / 100)
+
+    for nutrient in NUTRIENTS:
+        target = getattr(targets, nutrient)
+        setattr(solution.deviation, nutrient, getattr(solution.total, nutrient) - target if target > 0 else 0.0)
+
+    return solution
+
+
+def solve_portions(consumed: NutritionData, targets: NutritionData, candidates: list[PortionCandidate],
+                   max_portion: float = 500.0, min_portion: float = 1.0) -> PortionSolution:
+    """
+    Returns the non-negative portions of the candidates minimizing the deviation of the day's total from
+    the nutrition targets, relative to the targets. Solution of the non-negative least squares problem
+    uses few of the candidates, portions exceeding the maximum portion are fixed at the maximum and
+    the remaining portions solved again.
+
+    :param consumed: Nutrition data already consumed during the day.
+    :param max_portion: Maximum portion of a single candidate, grams.
+    :param min_portion: Portions smaller than the minimum portion are omitted, grams.
+    """
+    portions = np.zeros(len(candidates))
+    a, b = _get_weighted_system(consumed, targets, candidates)
+
+    if candidates and a.shape[0]:
+        free = np.ones(len(candidates), dtype=bool)
+
+        while free.any():
+            remaining = b - a[:, ~free] @ portions[~free]
+            portions[free] = solve_nnls(a[:, free], remaining)
+
+            exceeding = free & (portions > max_portion)
+            if not exceeding.any():
+                break
+            portions[exceeding] = max_portion
+            free &= ~exceeding
+
+        portions[portions < min_portion] = 0.0
+
+    return _get_solution(consumed, targets, candidates, portions)
+
+
+def rank_single_candidates(consumed: NutritionData, targets: NutritionData, candidates: list[PortionCandidate],
+                           max_portion: float = 500.0) -> list[tuple[SolvedPortion, float]]:
+    """
+    Returns the best portion of each candidate used alone and the remaining relative deviation from the targets,
+    sorted from the candidate closing the most of the gap. All candidates are evaluated at once.
+    """
+    a, b = _get_weighted_system(consumed, targets, candidates)
+    if not candidates or not a.shape[0]:
+        return []
+
+    norms = np.einsum("ij,ij->j", a, a)
+    portions = np.divide(a.T @ b, norms, out=np.zeros(len(candidates)), where=norms > 0)
+    portions = np.clip(portions, 0.0, max_portion)
+
+    deviations = np.linalg.norm(b[:, None] - a * portions[None, :], axis=0)
+
+    return [(SolvedPortion(candidates[index], float(portions[index])), float(deviations[index]))
+            for index in np.argsort(deviations, kind="stable")]
@@ -1,11 +1,14 @@
 
 from Core.consumable_abc import ConsumableItem
 from Core.enums import ServingType, ProductCategory, get_product_category
-from Core.units import MeasurementUnit
+from Core.units import MeasurementUnit, UNIT_CONVERSIONS, convert_to_grams
 from Core.savefile_functions import dataclass_to_dict, dict_to_dataclass
+from Core.trigram_index import normalize_text
 
 import json
+import numpy as np
 from dataclasses import dataclass
+from typing import Iterable
 
 
 @dataclass
@@ -26,47 +29,46 @@ class AdditionalData:
     """
     description: str = ""
     store: str = ""
-    manufacturer: str = "",
+    manufacturer: str = ""
     packaging_amount: float = 0.0
     packaging_unit: MeasurementUnit = MeasurementUnit.KG
     density: float = 1.0
     price: float = 0.0
     last_update_date: str = "2025-01-01"
 
+    def __setattr__(self, name, value):
+        if name in _PRICE_PER_GRAM_FIELDS:
+            self.__dict__.pop("_price_per_gram", None)
+        object.__setattr__(self, name, value)
+
     def get_mass_in_grams(self, item_amount: float) -> float:
         """
         Returns the mass in grams for the given product amount.
         """
-        if self.packaging_unit is MeasurementUnit.G:
-            return item_amount
-        elif self.packaging_unit is MeasurementUnit.KG:
-            return item_amount * 1000
-        elif self.packaging_unit is MeasurementUnit.L:
-            return item_amount * self.density * 1000
-        elif self.packaging_unit is MeasurementUnit.ML:
-            return item_amount * self.density
+        mass = convert_to_grams(item_amount, self.packaging_unit, self.density)
+        if mass is None:
+            print(f"Measurement unit {self.packaging_unit} not supported for unit conversions!")
+            return 0.0
+        return mass
 
     def get_price_per_gram(self) -> float:
         """
         Returns the price per gram of the product.
+        Price per gram is cached until the packaging amount, unit, density or price is changed.
         """
-        if self.packaging_unit is MeasurementUnit.G:
-            mass = self.packaging_amount
-        elif self.packaging_unit is MeasurementUnit.KG:
-            mass = self.packaging_amount * 1000
-        elif self.packaging_unit is MeasurementUnit.L:
-            mass = self.packaging_amount * self.density * 1000
-        elif self.packaging_unit is MeasurementUnit.ML:
-            mass = self.packaging_amount * self.density
-        else:
+        price_per_gram = self.__dict__.get("_price_per_gram", None)
+        if price_per_gram is not None:
+            return price_per_gram
+
+        mass = convert_to_grams(self.packaging_amount, self.packaging_unit, self.density)
+        if mass is None:
             print(f"Measurement unit {self.packaging_unit} not supported for unit conversions "
                   f"in price per gram calculation method!")
             mass = 0.0
 
-        if mass == 0.0:
-            return 0
-
-        return self.price / mass
+        price_per_gram = 0 if mass == 0.0 else self.price / mass
+        self.__dict__["_price_per_gram"] = price_per_gram
+        return price_per_gram
 
     def get_price_for_mass(self, item_mass: float):
         """
@@ -76,6 +78,38 @@ class AdditionalData:
         return price_per_gram * item_mass
 
 
+# Fields of the additional data invalidating the cached price per gram when changed
+_PRICE_PER_GRAM_FIELDS = frozenset(["packaging_amount", "packaging_unit", "density", "price"])
+
+
+def get_prices_per_gram(additional_data: Iterable[AdditionalData]) -> np.ndarray:
+    """
+    Returns the price per gram of each product, computed for all products at once.
+    Prices of the products with a zero packaging mass or an unsupported unit are zero.
+    """
+    packaging = [(data.packaging_amount, data.packaging_unit, data.density, data.price) for data in additional_data]
+    if not packaging:
+        return np.zeros(0)
+
+    amounts, units, densities, prices = zip(*packaging)
+    conversions = [UNIT_CONVERSIONS.get(unit, None) for unit in units]
+    grams = np.array([0.0 if conversion is None else conversion.grams for conversion in conversions])
+    volume = np.array([conversion is not None and conversion.volume for conversion in conversions])
+
+    amounts = np.array(amounts, dtype=float)
+    masses = np.where(volume, amounts * np.array(densities, dtype=float), amounts) * grams
+    prices = np.array(prices, dtype=float)
+
+    return np.divide(prices, masses, out=np.zeros(len(prices)), where=masses != 0.0)
+
+
+def get_prices_for_masses(additional_data: Iterable[AdditionalData], masses: Iterable[float]) -> np.ndarray:
+    """
+    Returns the prices of the given masses of the products in grams, such as for ingredients or a shopping list.
+    """
+    return get_prices_per_gram(additional_data) * np.fromiter(masses, dtype=float)
+
+
 @dataclass
 class NutritionData:
     """
@@ -161,6 +195,18 @@ class Product(ConsumableItem):
     def item_type(self) -> ServingType:
         return ServingType.PRODUCT
 
+    def get_fingerprint(self) -> tuple:
+        """
+        Returns the identity of the Product for merging catalogues, equal for the same Product entered by different
+        users: the normalized name and manufacturer, ignoring case, diacritics and whitespace, and the nutrition data
+        rounded to 3 decimals.
+        """
+        name = " ".join(normalize_text(self.name).split())
+        manufacturer = " ".join(normalize_text(self.additional_data.manufacturer).split())
+        data = self.nutrition_data
+        return (name, manufacturer,
+                round(data.calories, 3), round(data.fat, 3), round(data.carbs, 3), round(data.protein, 3))
+
     def convert_to_csv(self, delimiter: str = ";") -> str:
         """
         Returns the string representation of the object data for saving into a CSV save file.
@@ -4,6 +4,7 @@ from Core.ingredient import Ingredient
 from Core.product import Product, NutritionData
 from Core.enums import ServingType, RecipeCategory, get_recipe_category
 from Core.savefile_functions import (dataclass_to_dict, dict_to_dataclass)
+from Core.trigram_index import normalize_text
 
 import json
 from dataclasses import dataclass
@@ -75,6 +76,23 @@ class Recipe(ConsumableItem):
     def item_type(self) -> ServingType:
         return ServingType.RECIPE
 
+    def get_fingerprint(self) -> tuple:
+        """
+        Returns the content identity of the recipe for merging recipe collections: the normalized name, category,
+        net mass data and the ingredients in order, with their Product IDs, amounts and relative amount references.
+        Ingredients must be linked to the Products of the catalogue the recipes are merged into.
+        """
+        name = " ".join(normalize_text(self.name).split())
+        net_mass_data = self.net_mass_data
+        ingredients = tuple((ingredient.item_id, ingredient.product.item_id,
+                             round(ingredient.amount, 3), round(ingredient.net_amount, 3),
+                             ingredient.amount_definition.name, ingredient.net_amount_definition.name,
+                             ingredient.relative_amount_ingredient_id)
+                            for ingredient in self.ingredients.values())
+        return (name, self.category.name,
+                round(net_mass_data.measured_value, 3), round(net_mass_data.reduction, 3),
+                net_mass_data.adjust_for_evaporation, ingredients)
+
     def convert_to_csv(self, delimiter: str = ";") -> str:
         """
         Returns the string representation of the object data for saving into a CSV save file.
@@ -0,0 +1,257 @@
+
+from Core.product import NutritionData, Product, get_prices_per_gram
+from Core.recipe import Recipe
+
+import numpy as np
+from dataclasses import dataclass, fields
+from typing import Iterable
+
+
+NUTRIENTS = [data_field.name for data_field in fields(NutritionData)]
+
+
+@dataclass
+class RecipeTotals:
+    """
+    Nutrition data and prices of all recipes, computed in one pass of the recipe matrix.
+    Rows of the arrays correspond to the recipe IDs, nutrition data columns to the NutritionData fields.
+
+    Attributes:
+        recipe_ids (np.ndarray): Recipe IDs, ascending.
+        net_mass (np.ndarray): Total net mass of the recipe ingredients, g.
+        nutrition_data (np.ndarray): Total nutrition data of the recipe ingredients.
+        price (np.ndarray): Total price of the recipe ingredients.
+        nutrition_data_per_100g (np.ndarray): Nutrition data per 100 g, adjusted for evaporation.
+        price_per_100g (np.ndarray): Price per 100 g, adjusted for evaporation.
+    """
+    recipe_ids: np.ndarray
+    net_mass: np.ndarray
+    nutrition_data: np.ndarray
+    price: np.ndarray
+    nutrition_data_per_100g: np.ndarray
+    price_per_100g: np.ndarray
+
+    def __post_init__(self):
+        self._rows = {int(recipe_id): row for row, recipe_id in enumerate(self.recipe_ids)}
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._rows
+
+    def get_nutrition_data_per_100g(self, recipe_id: int) -> NutritionData | None:
+        row = self._rows.get(recipe_id, None)
+        if row is None:
+            return None
+        return NutritionData(*(float(value) for value in self.nutrition_data_per_100g[row]))
+
+    def get_price_per_100g(self, recipe_id: int) -> float | None:
+        row = self._rows.get(recipe_id, None)
+        if row is None:
+            return None
+        return float(self.price_per_100g[row])
+
+    def get_all_nutrition_data_per_100g(self) -> dict[int, NutritionData]:
+        return {int(recipe_id): NutritionData(*values)
+                for recipe_id, values in zip(self.recipe_ids.tolist(), self.nutrition_data_per_100g.tolist())}
+
+
+class RecipeMatrix:
+    def __init__(self):
+        """
+        Sparse recipes by products matrix of the resolved ingredient masses, multiplied with the
+        catalogue nutrition data and price arrays to compute the totals of all recipes at once.
+
+        Matrix rows are stored per recipe, as the product columns and the net and gross masses of its
+        ingredients, and updated individually after ingredient edits. Rows are concatenated into
+        the coordinate arrays of the whole matrix on the next computation after a row update.
+
+        Product columns are assigned to the Product objects referenced by the ingredients, and hold the
+        nutrition data and price per gram of the product. Column values are read again after the
+        Products were edited, without updating the matrix rows. Columns no longer referenced by any row,
+        such as the columns of removed or replaced Products, are dropped after the rows were updated.
+
+        Sums over the ingredients are accumulated in the ingredient order, and the results are
+        equal to the results of the Recipe methods computed ingredient by ingredient.
+        """
+        self._recipes: dict[int, Recipe] = {}
+
+        # Recipe ID: (product columns, net masses, gross masses, adjust for evaporation, net measured mass)
+        self._rows: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray, bool, float]] = {}
+
+        self._column_indices: dict[int, int] = {}
+        self._column_products: list[Product] = []
+        self._product_nutrition = np.zeros((0, len(NUTRIENTS)))
+        self._product_price = np.zeros(0)
+        self._stale_columns: set[int] = set()
+
+        # Coordinate arrays of the matrix, assembled from the rows, None after a row update
+        self._coordinates: tuple[np.ndarray, ...] | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def n_entries(self) -> int:
+        return sum(len(row[0]) for row in self._rows.values())
+
+    @property
+    def n_columns(self) -> int:
+        return len(self._column_products)
+
+    def _get_column(self, product: Product) -> int:
+        column = self._column_indices.get(id(product), None)
+        if column is None:
+            column = len(self._column_products)
+            self._column_indices[id(product)] = column
+            self._column_products.append(product)
+            self._stale_columns.add(column)
+        return column
+
+    def update_recipe(self, recipe: Recipe) -> None:
+        """
+        Updates the matrix row of the recipe from its ingredients and net mass data.
+        """
+        ingredients = list(recipe.ingredients.values())
+
+        columns = np.array([self._get_column(ingredient.product) for ingredient in ingredients], dtype=np.int64)
+        net_masses = np.array([ingredient.get_net_mass() for ingredient in ingredients], dtype=float)
+        gross_masses = np.array([ingredient.get_mass() for ingredient in ingredients], dtype=float)
+
+        self._recipes[recipe.item_id] = recipe
+        self._rows[recipe.item_id] = (columns, net_masses, gross_masses,
+                                      recipe.net_mass_data.adjust_for_evaporation, recipe.get_net_measured_mass())
+        self._coordinates = None
+
+    def remove_recipe(self, recipe_id: int) -> None:
+        if self._rows.pop(recipe_id, None) is not None:
+            self._recipes.pop(recipe_id)
+            self._coordinates = None
+
+    def invalidate_products(self, products: Iterable[Product] | None = None) -> None:
+        """
+        Marks the product columns for reading the nutrition data and price again.
+        :param products: Edited Products, all columns are marked if None.
+        """
+        if products is None:
+            self._stale_columns.update(range(len(self._column_products)))
+            return
+
+        for product in products:
+            column = self._column_indices.get(id(product), None)
+            if column is not None:
+                self._stale_columns.add(column)
+
+    def clear(self) -> None:
+        self._recipes.clear()
+        self._rows.clear()
+        self._column_indices.clear()
+        self._column_products.clear()
+        self._product_nutrition = np.zeros((0, len(NUTRIENTS)))
+        self._product_price = np.zeros(0)
+        self._stale_columns.clear()
+        self._coordinates = None
+
+    def synchronize(self, recipes_record: dict[int, Recipe], recipe_ids: Iterable[int] | None = None) -> None:
+        """
+        Updates the rows of the added, replaced and removed recipes, and of the given edited recipes.
+        :param recipe_ids: IDs of the recipes with edited ingredients or net mass data.
+        """
+        for recipe_id in [recipe_id for recipe_id in self._rows if recipe_id not in recipes_record]:
+            self.remove_recipe(recipe_id)
+
+        edited_ids = set() if recipe_ids is None else set(recipe_ids)
+        for recipe_id, recipe in recipes_record.items():
+            if recipe_id in edited_ids or self._recipes.get(recipe_id, None) is not recipe:
+                self.update_recipe(recipe)
+
+        if self._coordinates is None:
+            self._remove_unreferenced_columns()
+
+    def _remove_unreferenced_columns(self) -> None:
+        """
+        Drops the product columns not referenced by the matrix rows, and renumbers the remaining columns.
+        """
+        columns = self._get_coordinates()[2]
+        referenced = np.zeros(len(self._column_products), dtype=bool)
+        referenced[columns] = True
+        if referenced.all():
+            return
+
+        kept_columns = np.flatnonzero(referenced)
+        column_map = np.full(len(referenced), -1, dtype=np.int64)
+        column_map[kept_columns] = np.arange(len(kept_columns))
+
+        for recipe_id, row in self._rows.items():
+            self._rows[recipe_id] = (column_map[row[0]], *row[1:])
+        self._coordinates = (*self._coordinates[:2], column_map[columns], *self._coordinates[3:])
+
+        self._column_products = [self._column_products[column] for column in kept_columns.tolist()]
+        self._column_indices = {id(product): column for column, product in enumerate(self._column_products)}
+
+        # Product values are only allocated up to the columns read so far
+        n_allocated = len(self._product_price)
+        allocated_columns = kept_columns[kept_columns < n_allocated]
+        self._product_nutrition = self._product_nutrition[allocated_columns]
+        self._product_price = self._product_price[allocated_columns]
+        self._stale_columns = {int(column_map[column]) for column in self._stale_columns if referenced[column]}
+
+    def _update_product_columns(self) -> None:
+        n_columns = len(self._column_products)
+        if len(self._product_price) < n_columns:
+            self._product_nutrition = np.resize(self._product_nutrition, (n_columns, len(NUTRIENTS)))
+            self._product_price = np.resize(self._product_price, n_columns)
+
+        columns = sorted(self._stale_columns)
+        products = [self._column_products[column] for column in columns]
+        for column, product in zip(columns, products):
+            nutrition_data = product.nutrition_data
+            self._product_nutrition[column] = [getattr(nutrition_data, nutrient) for nutrient in NUTRIENTS]
+        self._product_price[columns] = get_prices_per_gram(product.additional_data for product in products)
+        self._stale_columns.clear()
+
+    def _get_coordinates(self) -> tuple[np.ndarray, ...]:
+        """
+        Returns the recipe IDs, and the row indices, product columns, net and gross masses of the matrix entries,
+        and the evaporation adjustment flags and net measured masses of the rows.
+        """
+        if self._coordinates is None:
+            recipe_ids = np.array(sorted(self._rows), dtype=np.int64)
+            rows = [self._rows[int(recipe_id)] for recipe_id in recipe_ids]
+
+            row_indices = np.repeat(np.arange(len(rows)), [len(row[0]) for row in rows])
+            columns = np.concatenate([row[0] for row in rows]) if rows else np.zeros(0, dtype=np.int64)
+            net_masses = np.concatenate([row[1] for row in rows]) if rows else np.zeros(0)
+            gross_masses = np.concatenate([row[2] for row in rows]) if rows else np.zeros(0)
+            adjust_for_evaporation = np.array([row[3] for row in rows], dtype=bool)
+            net_measured_masses = np.array([row[4] for row in rows], dtype=float)
+
+            self._coordinates = (recipe_ids, row_indices, columns, net_masses, gross_masses,
+                                 adjust_for_evaporation, net_measured_masses)
+
+        return self._coordinates
+
+    def compute(self) -> RecipeTotals:
+        """
+        Returns the totals, nutrition data and price per 100 g of all recipes in the matrix.
+        """
+        self._update_product_columns()
+        (recipe_ids, row_indices, columns, net_masses, gross_masses,
+         adjust_for_evaporation, net_measured_masses) = self._get_coordinates()
+        n_rows = len(recipe_ids)
+
+        # Weighted bincount sums the entries of each row in the ingredient order
+        net_mass = np.bincount(row_indices, weights=net_masses, minlength=n_rows)
+        nutrition_data = np.column_stack([
+            np.bincount(row_indices, weights=self._product_nutrition[columns, index] * (net_masses / 100),
+                        minlength=n_rows)
+            for index in range(len(NUTRIENTS))]).reshape(n_rows, len(NUTRIENTS))
+        price = np.bincount(row_indices, weights=self._product_price[columns] * gross_masses, minlength=n_rows)
+
+        valid = (net_mass != 0.0) & ~(adjust_for_evaporation & (net_measured_masses == 0.0))
+        divisor = np.where(valid, net_mass, 1.0)
+        adjusted = adjust_for_evaporation & valid
+        ratio = np.where(adjusted, net_mass / np.where(adjusted, net_measured_masses, 1.0), 1.0)
+
+        nutrition_data_per_100g = np.where(valid[:, None], nutrition_data / divisor[:, None] * ratio[:, None] * 100, 0.0)
+        price_per_100g = np.where(valid, price / divisor * ratio * 100, 0.0)
+
+        return RecipeTotals(recipe_ids, net_mass, nutrition_data, price, nutrition_data_per_100g, price_per_100g)
@@ -4,9 +4,9 @@ import json
 from enum import Enum
 from datetime import datetime
 from dataclasses import fields
+from functools import lru_cache
 from typing import Type, TypeVar
-from PySide6.QtGui import QColor
-from Settings.app_env import Program_Version
+from Settings.version import Program_Version
 
 
 DataclassType = TypeVar("DataclassType")
@@ -62,30 +62,6 @@ def savefile_header(savefile_type: str = "", program_version: str = "0.0.0") ->
             f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
 
-def convert_to_color_at_index(split_line: list, index: int, default_value=QColor(0, 0, 0, 255)) -> QColor:
-    """
-    Function returns a QColor from the split line list containing RGBA values at the given index.
-    Returns the default value when attempting to convert a value at an index that is not contained in the list.
-
-    :param split_line: CSV savefile line.
-    :param index: Index in the CSV savefile line.
-    :param default_value: Default return value, black (RGBA = 0, 0, 0, 255).
-    """
-    if index >= len(split_line):
-        return default_value
-
-    else:
-        try:
-            rgba_list = split_line[index].strip("\n").strip("[]").split(", ")
-            return QColor(*[int(val) for val in rgba_list])
-
-        except ValueError:
-            return default_value
-
-        except TypeError:
-            return default_value
-
-
 def convert_to_str_at_index(split_line: list, index: int, default_value=None) -> str:
     """
     Function returns the string value in the split line list at the given index.
@@ -235,15 +211,22 @@ def dict_to_dataclass(dataclass: Type[DataclassType], data: dict) -> DataclassTy
     Handles only basic data types (int, str, float, Enum).
     """
     init_args = {}
-    for field in fields(dataclass):
-        field_type = field.type
-        value = data.get(field.name, None)
+    for name, enum_type in _get_field_enum_types(dataclass):
+        value = data.get(name, None)
         if value is None:
             continue
 
-        if issubclass(field_type, Enum):
-            init_args[field.name] = field_type[value]
+        if enum_type is not None:
+            init_args[name] = enum_type[value]
         else:
-            init_args[field.name] = value
+            init_args[name] = value
 
     return dataclass(**init_args)
+
+
+@lru_cache(maxsize=None)
+def _get_field_enum_types(dataclass: type) -> tuple[tuple[str, Type[Enum] | None], ...]:
+    """
+    Returns the field names of the dataclass with the field Enum types, None for other field types.
+    """
+    return tuple((field.name, field.type if issubclass(field.type, Enum) else None) for field in fields(dataclass))
@@ -84,26 +84,24 @@ class Serving:
         self.item_name = new_item_name
         self.item_type = new_item_type
 
-        if isinstance(item, Product):
-            data = item.nutrition_data
-        elif isinstance(item, Recipe):
-            data = item.get_total_nutrition_data_per_100g()
-        else:
-            print(f"Error: Incompatible item {item} for {Serving}")
-            data = NutritionData()
-
-        self.nutrition_data = copy.copy(data)
+        self.set_nutrition_data(item)
 
     def set_nutrition_data(self, item: ConsumableItem):
+        self.nutrition_data = copy.copy(self.get_item_nutrition_data(item))
+
+    @staticmethod
+    def get_item_nutrition_data(item: ConsumableItem) -> NutritionData:
+        """
+        Returns the nutrition data per 100 g of the Product or Recipe, as assigned to its servings.
+        Returned Product nutrition data is not copied and should not be modified.
+        """
         if isinstance(item, Product):
-            data = item.nutrition_data
+            return item.nutrition_data
         elif isinstance(item, Recipe):
-            data = item.get_total_nutrition_data_per_100g()
+            return item.get_total_nutrition_data_per_100g()
         else:
             print(f"Error: Incompatible item {item} for {Serving}")
-            data = NutritionData()
-
-        self.nutrition_data = copy.copy(data)
+            return NutritionData()
 
     def get_consumed_nutrition_values(self) -> NutritionData:
         return self.nutrition_data * (self.portion / 100)
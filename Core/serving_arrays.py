@@ -0,0 +1,168 @@
+
+from Core.serving import Serving
+from Core.product import NutritionData
+from Core.enums import ServingType, get_serving_type
+from Core.savefile_functions import convert_to_float_at_index
+
+import sys
+import json
+from array import array
+from collections import Counter
+
+
+_SERVING_TYPES: list[ServingType | None] = [None] + list(ServingType)
+_SERVING_TYPE_CODES: dict[ServingType | None, int] = {serving_type: code
+                                                      for code, serving_type in enumerate(_SERVING_TYPES)}
+
+
+class ServingArrays:
+    __slots__ = ("item_ids", "item_names", "item_types", "portions", "calories", "fat", "carbs", "protein")
+
+    def __init__(self):
+        """
+        Compact storage of a list of servings as parallel typed arrays, without a Serving object per serving.
+        Item names are interned, so that the names of servings of the same item share a single string.
+        """
+        self.item_ids = array("q")
+        self.item_names: list[str] = []
+        self.item_types = array("b")
+        self.portions = array("d")
+        self.calories = array("d")
+        self.fat = array("d")
+        self.carbs = array("d")
+        self.protein = array("d")
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    @classmethod
+    def from_servings(cls, servings: list[Serving]):
+        serving_arrays = cls()
+        for serving in servings:
+            serving_arrays.append(serving.item_id, serving.item_name, serving.item_type, serving.portion,
+                                  serving.nutrition_data)
+        return serving_arrays
+
+    def append(self, item_id: int, item_name: str, item_type: ServingType | None, portion: float,
+               nutrition_data: NutritionData) -> None:
+        self.item_ids.append(item_id)
+        self.item_names.append(sys.intern(item_name))
+        self.item_types.append(_SERVING_TYPE_CODES[item_type])
+        self.portions.append(portion)
+        self.calories.append(nutrition_data.calories)
+        self.fat.append(nutrition_data.fat)
+        self.carbs.append(nutrition_data.carbs)
+        self.protein.append(nutrition_data.protein)
+
+    def append_csv(self, csv_line: str, delimiter: str = "|") -> None:
+        """
+        Appends the serving from a Serving CSV line, without creating the Serving object.
+        """
+        split_line = csv_line.split(delimiter)
+
+        nutrition_data_dict: dict = json.loads(split_line[4])
+        nutrition_data = NutritionData(calories=nutrition_data_dict.get("calories", 0.0),
+                                       fat=nutrition_data_dict.get("fat", 0.0),
+                                       carbs=nutrition_data_dict.get("carbs", 0.0),
+                                       protein=nutrition_data_dict.get("protein", 0.0))
+
+        self.append(item_id=int(split_line[0]),
+                    item_name=split_line[1],
+                    item_type=get_serving_type(split_line[2]),
+                    portion=convert_to_float_at_index(split_line, index=3, default_value=0.0),
+                    nutrition_data=nutrition_data)
+
+    def get_serving(self, index: int) -> Serving:
+        serving = Serving(self.item_ids[index], self.item_names[index], _SERVING_TYPES[self.item_types[index]],
+                          self.portions[index])
+        serving.nutrition_data = NutritionData(calories=self.calories[index], fat=self.fat[index],
+                                               carbs=self.carbs[index], protein=self.protein[index])
+        return serving
+
+    def to_servings(self, start: int = 0, stop: int | None = None) -> list[Serving]:
+        return [self.get_serving(index) for index in range(start, len(self) if stop is None else stop)]
+
+    def get_serving_csv(self, index: int, serving_delimiter: str = "|") -> str:
+        """
+        Returns the serving at the given index as a Serving CSV line.
+        """
+        serving_type = _SERVING_TYPES[self.item_types[index]]
+
+        # Same keys and order as the NutritionData fields written by Serving.convert_to_csv
+        nutrition_data = {"calories": self.calories[index], "fat": self.fat[index],
+                          "carbs": self.carbs[index], "protein": self.protein[index]}
+
+        csv_data = [self.item_ids[index],
+                    self.item_names[index],
+                    serving_type.name if serving_type is not None else None,
+                    self.portions[index],
+                    json.dumps(nutrition_data)]
+
+        return serving_delimiter.join([str(n) for n in csv_data])
+
+    def get_serving_keys(self) -> list[tuple]:
+        """
+        Returns the item type, item ID, item name, portion and nutrition data of each serving as a tuple,
+        equal to the keys of the equal Serving objects.
+        """
+        return [(_SERVING_TYPES[item_type], *values) for item_type, *values in zip(
+            self.item_types, self.item_ids, self.item_names, self.portions,
+            self.calories, self.fat, self.carbs, self.protein)]
+
+    def get_item_counts(self) -> dict[tuple[ServingType | None, int], int]:
+        return dict(Counter((_SERVING_TYPES[item_type], item_id)
+                            for item_type, item_id in zip(self.item_types, self.item_ids)))
+
+    def set_item_nutrition_data(self, item_type: ServingType, item_id: int, nutrition_data: NutritionData) -> int:
+        """
+        Sets the nutrition data of all servings of the item, returns the number of changed servings.
+        """
+        type_code = _SERVING_TYPE_CODES[item_type]
+        n_changed = 0
+
+        for index, (serving_type, serving_id) in enumerate(zip(self.item_types, self.item_ids)):
+            if serving_type != type_code or serving_id != item_id:
+                continue
+
+            values = (nutrition_data.calories, nutrition_data.fat, nutrition_data.carbs, nutrition_data.protein)
+            if values != (self.calories[index], self.fat[index], self.carbs[index], self.protein[index]):
+                self.calories[index], self.fat[index], self.carbs[index], self.protein[index] = values
+                n_changed += 1
+
+        return n_changed
+
+    def remap_item_ids(self, item_type: ServingType, remap: dict[int, int]) -> int:
+        """
+        Replaces the item IDs of the servings of the given type by the remapped IDs, IDs not in the remap
+        are replaced by the null entry ID. Returns the number of changed servings.
+        """
+        type_code = _SERVING_TYPE_CODES[item_type]
+        item_ids = self.item_ids
+        n_changed = 0
+
+        for index, (serving_type, serving_id) in enumerate(zip(self.item_types, item_ids)):
+            if serving_type != type_code:
+                continue
+
+            new_id = remap.get(serving_id, 0)
+            if new_id != serving_id:
+                item_ids[index] = new_id
+                n_changed += 1
+
+        return n_changed
+
+    def add_consumed_nutrition_data(self, data: NutritionData) -> NutritionData:
+        """
+        Returns the given nutrition data with the consumed nutrition values of all servings added.
+        """
+        calories, fat, carbs, protein = data.calories, data.fat, data.carbs, data.protein
+
+        for portion, serving_calories, serving_fat, serving_carbs, serving_protein in zip(
+                self.portions, self.calories, self.fat, self.carbs, self.protein):
+            scalar = portion / 100
+            calories += serving_calories * scalar
+            fat += serving_fat * scalar
+            carbs += serving_carbs * scalar
+            protein += serving_protein * scalar
+
+        return NutritionData(calories=calories, fat=fat, carbs=carbs, protein=protein)
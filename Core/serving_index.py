@@ -0,0 +1,133 @@
+
+from Core.daily_intake import DailyIntake
+from Core.enums import ServingType
+from Core.usage_stats import ItemUsage, UsageRanking
+
+from typing import Iterable
+
+
+ItemKey = tuple[ServingType, int]
+
+
+class ServingIndex:
+    def __init__(self):
+        """
+        Index of the daily intake dates with servings of a particular Product or Recipe,
+        keyed by the serving item type and item ID.
+
+        Index entries are stored per date, together with the indexed daily intake record and its
+        revision. Records added or removed through DailyIntake methods change their revision,
+        replaced records their identity, and are indexed again on the next query. Servings
+        modified directly, such as by the table editing, are indexed again after invalidation.
+
+        Item usage, the number of servings and the last date, is maintained with the index entries
+        and ranked per item type, excluding the null entries.
+        """
+        self._item_dates: dict[ItemKey, set[str]] = {}
+        self._date_entries: dict[str, tuple[DailyIntake, int, dict[ItemKey, int]]] = {}
+
+        self._item_counts: dict[ItemKey, int] = {}
+        self._last_dates: dict[ItemKey, str] = {}
+        self._rankings: dict[ServingType, UsageRanking] = {item_type: UsageRanking() for item_type in ServingType}
+
+    def __len__(self) -> int:
+        return len(self._date_entries)
+
+    def add_record(self, intake_data: DailyIntake) -> None:
+        """
+        Indexes the servings of the daily intake record, replacing the previous entry for its date.
+        """
+        date = intake_data.date
+        self.remove_date(date)
+
+        item_counts = intake_data.get_item_counts()
+        for item_key, count in item_counts.items():
+            self._item_dates.setdefault(item_key, set()).add(date)
+            self._item_counts[item_key] = self._item_counts.get(item_key, 0) + count
+            if date > self._last_dates.get(item_key, ""):
+                self._last_dates[item_key] = date
+            self._update_ranking(item_key)
+
+        self._date_entries[date] = (intake_data, intake_data.revision, item_counts)
+
+    def remove_date(self, date: str) -> None:
+        entry = self._date_entries.pop(date, None)
+        if entry is None:
+            return
+
+        for item_key, count in entry[2].items():
+            dates = self._item_dates[item_key]
+            dates.discard(date)
+            self._item_counts[item_key] -= count
+
+            if not dates:
+                self._item_dates.pop(item_key)
+                self._item_counts.pop(item_key)
+                self._last_dates.pop(item_key)
+            elif self._last_dates[item_key] == date:
+                self._last_dates[item_key] = max(dates)
+
+            self._update_ranking(item_key)
+
+    def _update_ranking(self, item_key: ItemKey) -> None:
+        item_type, item_id = item_key
+        if item_type not in self._rankings or item_id == 0:
+            return
+
+        count = self._item_counts.get(item_key, 0)
+        usage = ItemUsage(count, self._last_dates[item_key]) if count > 0 else None
+        self._rankings[item_type].set_usage(item_id, usage)
+
+    def get_ranking(self, item_type: ServingType) -> UsageRanking:
+        return self._rankings[item_type]
+
+    def invalidate(self, dates: Iterable[str] | None = None) -> None:
+        """
+        Removes the index entries of the given dates, indexed again on the next synchronization.
+        :param dates: Dates of the modified records, all entries are removed if None.
+        """
+        if dates is None:
+            self._item_dates.clear()
+            self._date_entries.clear()
+            self._item_counts.clear()
+            self._last_dates.clear()
+            for ranking in self._rankings.values():
+                ranking.clear()
+            return
+
+        for date in dates:
+            self.remove_date(date)
+
+    def synchronize(self, daily_intake_record: dict[str, DailyIntake], dates: Iterable[str] | None = None) -> None:
+        """
+        Updates the index entries of the added, replaced, modified and removed daily intake records.
+        :param dates: Dates of the changed records, all records are checked if None.
+        """
+        if dates is not None:
+            for date in dates:
+                intake_data = daily_intake_record.get(date, None)
+                entry = self._date_entries.get(date, None)
+                if intake_data is None:
+                    self.remove_date(date)
+                elif entry is None or entry[0] is not intake_data or entry[1] != intake_data.revision:
+                    self.add_record(intake_data)
+            return
+
+        for date in [date for date in self._date_entries if date not in daily_intake_record]:
+            self.remove_date(date)
+
+        for intake_data in daily_intake_record.values():
+            entry = self._date_entries.get(intake_data.date, None)
+            if entry is None or entry[0] is not intake_data or entry[1] != intake_data.revision:
+                self.add_record(intake_data)
+
+    def get_dates(self, item_type: ServingType, item_id: int,
+                  start_date: str | None = None, end_date: str | None = None) -> list[str]:
+        """
+        Returns the sorted dates with servings of the item within the date range.
+        :param start_date: First included date in ISO format, unbounded if None.
+        :param end_date: Last included date in ISO format, unbounded if None.
+        """
+        dates = self._item_dates.get((item_type, item_id), set())
+        return sorted(date for date in dates
+                      if (start_date is None or date >= start_date) and (end_date is None or date <= end_date))
@@ -0,0 +1,348 @@
+
+from Core.usage_stats import UsageRanking
+
+import re
+import heapq
+import unicodedata
+from collections import Counter
+from itertools import islice
+from typing import Callable, Hashable, Iterable
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Number of posting items sampled to estimate the share of the query trigrams in the items of a posting
+_SAMPLE_SIZE = 32
+
+
+def normalize_text(text: str) -> str:
+    """
+    Returns the case folded text without diacritics, such as 'cokolada' for 'Čokolada'.
+    """
+    folded = text.casefold()
+    if folded.isascii():
+        return folded
+
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(character for character in decomposed if not unicodedata.combining(character))
+
+
+def get_trigrams(text: str, partial_last_word: bool = False) -> set[str]:
+    """
+    Returns the trigrams of the words of the normalized text, padded at the word boundaries.
+    Trigrams are collected per word, so that matching does not depend on the word order.
+    :param partial_last_word: Last word is incomplete, as while typing, and is not padded at its end.
+    """
+    words = _WORD_PATTERN.findall(text)
+    trigrams = set()
+
+    for index, word in enumerate(words):
+        if partial_last_word and index == len(words) - 1:
+            padded = f"  {word}"
+        else:
+            padded = f"  {word} "
+        trigrams.update(padded[n:n + 3] for n in range(len(padded) - 2))
+
+    return trigrams
+
+
+class TrigramIndex:
+    def __init__(self, candidate_budget: int = 500, min_coverage: float = 0.3, exact_match_limit: int = 500):
+        """
+        Trigram index of item names, with ranked fuzzy matching tolerant to typos and word order.
+
+        Items containing all query trigrams are found by intersecting the trigram postings. When there are
+        more of them than the exact match limit, as for short and common queries, the shortest are returned
+        without scoring. Otherwise, candidate items are collected from the postings of the rarest query
+        trigrams, until the number of visited postings exceeds the candidate budget, and ranked by the share
+        of the query trigrams found in the item text, with a bonus for items containing the query.
+        When the rarest trigram alone exceeds the budget, its items are narrowed to the items found in the postings
+        of the other trigrams, so that the number of scored items never exceeds the candidate budget.
+
+        :param candidate_budget: Number of visited trigram postings, after which less selective trigrams are skipped,
+            and the maximum number of scored items.
+        :param min_coverage: Minimum share of the query trigrams found in a matched item text.
+        :param exact_match_limit: Number of items containing all query trigrams, above which items are not scored.
+        """
+        self.candidate_budget = candidate_budget
+        self.min_coverage = min_coverage
+        self.exact_match_limit = exact_match_limit
+
+        self._texts: dict[Hashable, str] = {}
+        self._normalized_texts: dict[Hashable, str] = {}
+        self._item_trigrams: dict[Hashable, frozenset[str]] = {}
+        self._postings: dict[str, set[Hashable]] = {}
+
+        # Keys by normalized text length, in insertion order
+        self._length_buckets: dict[int, dict[Hashable, None]] = {}
+
+        # Query trigrams and exact matches of the last search, refined while the query is typed
+        self._last_exact_matches: tuple[set[str], set[Hashable]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._texts
+
+    def get_text(self, key: Hashable) -> str | None:
+        return self._texts.get(key, None)
+
+    def get_normalized_text(self, key: Hashable) -> str | None:
+        return self._normalized_texts.get(key, None)
+
+    def add(self, key: Hashable, text: str) -> None:
+        """
+        Adds the item text to the index, replacing the previously indexed text of the key, as on rename.
+        """
+        if self._texts.get(key, None) == text:
+            return
+
+        self.remove(key)
+        self._last_exact_matches = None
+
+        normalized_text = normalize_text(text)
+        trigrams = frozenset(get_trigrams(normalized_text))
+
+        self._texts[key] = text
+        self._normalized_texts[key] = normalized_text
+        self._item_trigrams[key] = trigrams
+
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, set()).add(key)
+
+        self._length_buckets.setdefault(len(normalized_text), {})[key] = None
+
+    def remove(self, key: Hashable) -> bool:
+        if key not in self._texts:
+            return False
+
+        self._last_exact_matches = None
+        for trigram in self._item_trigrams.pop(key):
+            keys = self._postings[trigram]
+            keys.discard(key)
+            if not keys:
+                self._postings.pop(trigram)
+
+        self._texts.pop(key)
+        length = len(self._normalized_texts.pop(key))
+        bucket = self._length_buckets[length]
+        bucket.pop(key)
+        if not bucket:
+            self._length_buckets.pop(length)
+        return True
+
+    def clear(self) -> None:
+        self._texts.clear()
+        self._normalized_texts.clear()
+        self._item_trigrams.clear()
+        self._postings.clear()
+        self._length_buckets.clear()
+        self._last_exact_matches = None
+
+    def synchronize(self, texts: dict[Hashable, str]) -> None:
+        """
+        Updates the index to the given item texts, re-indexing only the added, renamed and removed items.
+        """
+        for key in [key for key in self._texts if key not in texts]:
+            self.remove(key)
+
+        indexed_texts = self._texts
+        for key, text in texts.items():
+            if indexed_texts.get(key, None) != text:
+                self.add(key, text)
+
+    def search(self, query: str, limit: int = 50, keys: Iterable[Hashable] | None = None,
+               ranking: UsageRanking | None = None, ranking_weight: float = 0.25) -> list[Hashable]:
+        """
+        Returns the keys of the items best matching the query, ranked from the best match.
+        :param limit: Maximum number of returned keys.
+        :param keys: Optional keys of the items the search is restricted to.
+        :param ranking: Optional usage ranking of the items, preferring frequently and recently used items.
+        :param ranking_weight: Score of the most used item added to its match score, proportional to its ranking.
+        """
+        normalized_query = normalize_text(query).strip()
+        query_trigrams = get_trigrams(normalized_query, partial_last_word=not query[-1:].isspace())
+        if not query_trigrams:
+            return []
+
+        postings = self._postings
+        empty = set()
+        trigram_postings = sorted((postings.get(trigram, empty) for trigram in query_trigrams), key=len)
+
+        # Matches of short and common queries are not collected, the shortest items are checked for the query trigrams
+        item_trigrams = self._item_trigrams
+        if keys is None and self._is_common_query(trigram_postings[0], query_trigrams):
+            self._last_exact_matches = None
+            return self._get_shortest(trigram_postings[0], limit, ranking,
+                                      lambda key: query_trigrams <= item_trigrams[key])
+
+        exact_matches = self._get_exact_matches(query_trigrams)
+        if keys is not None:
+            exact_matches.intersection_update(keys)
+
+        if len(exact_matches) > self.exact_match_limit:
+            return self._get_shortest(exact_matches, limit, ranking)
+
+        if len(exact_matches) >= limit:
+            candidates = exact_matches
+        else:
+            candidates = self._get_fuzzy_candidates(trigram_postings, query_trigrams)
+            if keys is not None:
+                candidates.intersection_update(keys)
+
+        # Shared trigram counts of the candidates, counted by the C implementation of Counter
+        shared_counts = Counter()
+        for trigram_keys in trigram_postings:
+            if trigram_keys:
+                shared_counts.update(trigram_keys & candidates)
+
+        n_query = len(query_trigrams)
+        min_shared = self.min_coverage * n_query
+        normalized_texts = self._normalized_texts
+
+        scored = []
+        for key, shared in shared_counts.most_common(4 * limit):
+            if shared < min_shared:
+                break
+
+            score = shared / n_query + 0.5 * shared / len(item_trigrams[key])
+            if normalized_query in normalized_texts[key]:
+                score += 1.0
+            if ranking is not None:
+                score += ranking_weight * ranking.get_factor(key)
+            scored.append((score, key))
+
+        return [key for _, key in heapq.nlargest(limit, scored, key=lambda item: item[0])]
+
+    def _get_exact_matches(self, query_trigrams: set[str]) -> set[Hashable]:
+        """
+        Returns a new set of the items containing all query trigrams. Items matching a query extended
+        by typing are found among the exact matches of the previous query, when its trigrams are a subset.
+        """
+        postings = self._postings
+        empty = set()
+
+        if self._last_exact_matches is not None and self._last_exact_matches[0] <= query_trigrams:
+            last_trigrams, last_matches = self._last_exact_matches
+            exact_matches = last_matches.intersection(*sorted((postings.get(trigram, empty)
+                                                               for trigram in query_trigrams - last_trigrams),
+                                                              key=len))
+        else:
+            trigram_postings = sorted((postings.get(trigram, empty) for trigram in query_trigrams), key=len)
+            rarest_keys, other_postings = trigram_postings[0], trigram_postings[1:]
+
+            # Postings of the trigrams of the same word contain mostly the same items, the postings containing
+            # the fewest of the sampled rarest items are intersected first
+            if len(rarest_keys) > self.candidate_budget:
+                sample = list(islice(rarest_keys, _SAMPLE_SIZE))
+                other_postings.sort(key=lambda trigram_keys: sum(key in trigram_keys for key in sample))
+            exact_matches = rarest_keys.intersection(*other_postings)
+
+        self._last_exact_matches = (query_trigrams, exact_matches)
+        return set(exact_matches)
+
+    def _is_common_query(self, rarest_keys: set[Hashable], query_trigrams: set[str]) -> bool:
+        """
+        Returns True if the number of items containing all query trigrams, estimated on a sample of the items
+        of the rarest query trigram, is well above the exact match limit.
+        """
+        if len(rarest_keys) <= self.exact_match_limit:
+            return False
+
+        item_trigrams = self._item_trigrams
+        sample = list(islice(rarest_keys, _SAMPLE_SIZE))
+        n_matched = sum(query_trigrams <= item_trigrams[key] for key in sample)
+        return n_matched / len(sample) * len(rarest_keys) > 2 * self.exact_match_limit
+
+    def _get_fuzzy_candidates(self, trigram_postings: list[set[Hashable]], query_trigrams: set[str]) -> set[Hashable]:
+        """
+        Returns a new set of the items of the postings of the rarest trigrams, sorted by the number of items,
+        within the candidate budget. Items of a rarest trigram found in the index exceeding the budget are narrowed.
+        """
+        postings = [trigram_keys for trigram_keys in trigram_postings if trigram_keys]
+        if postings and len(postings[0]) > self.candidate_budget:
+            return self._narrow_candidates(postings, query_trigrams)
+
+        candidates = set()
+        n_visited = 0
+
+        for trigram_keys in postings:
+            if n_visited + len(trigram_keys) > self.candidate_budget:
+                break
+            candidates.update(trigram_keys)
+            n_visited += len(trigram_keys)
+
+        return candidates
+
+    def _narrow_candidates(self, postings: list[set[Hashable]], query_trigrams: set[str]) -> set[Hashable]:
+        """
+        Returns a new set of at most the candidate budget of items, starting from the posting with the best share
+        of the query trigrams in its items, and keeping the items found in the postings of the other trigrams.
+        Postings are estimated on a sample of the starting items, postings containing all of them are skipped,
+        and the others are intersected from the most shared, as long as any items remain.
+        Items with the shortest texts are kept, if there are still more items than the budget.
+        """
+        item_trigrams = self._item_trigrams
+
+        def get_sampled_coverage(trigram_keys: set[Hashable]) -> float:
+            sample = list(islice(trigram_keys, _SAMPLE_SIZE))
+            return sum(len(item_trigrams[key] & query_trigrams) for key in sample) / len(sample)
+
+        start = max(postings, key=get_sampled_coverage)
+        if len(start) <= self.candidate_budget:
+            return set(start)
+
+        sample = list(islice(start, _SAMPLE_SIZE))
+        sampled_postings = [(sum(key in trigram_keys for key in sample), trigram_keys)
+                            for trigram_keys in postings if trigram_keys is not start]
+
+        candidates = start
+        for n_sampled, trigram_keys in sorted(sampled_postings, key=lambda item: item[0], reverse=True):
+            if n_sampled == len(sample):
+                continue
+            narrowed = candidates & trigram_keys
+            if not narrowed:
+                continue
+            candidates = narrowed
+            if len(candidates) <= self.candidate_budget:
+                return candidates
+
+        # Length buckets are walked from the shortest, instead of sorting all remaining items by their text length
+        shortest = set()
+        for length in sorted(self._length_buckets):
+            bucket_candidates = self._length_buckets[length].keys() & candidates
+            shortest.update(islice(bucket_candidates, self.candidate_budget - len(shortest)))
+            if len(shortest) == self.candidate_budget:
+                break
+        return shortest
+
+    def _get_shortest(self, candidates: set[Hashable], limit: int, ranking: UsageRanking | None = None,
+                      is_match: Callable[[Hashable], bool] | None = None) -> list[Hashable]:
+        """
+        Returns up to the limit of the matched keys, the most used first if ranked, followed by the shortest texts.
+        :param candidates: Keys of the matched items, or of the items checked by the match function.
+        :param is_match: Optional match function of the candidate keys, all candidates are matched by default.
+        """
+        result = []
+        if ranking is not None:
+            result = list(islice((key for key in ranking if key in candidates and (is_match is None or is_match(key))),
+                                 limit))
+            if len(result) == limit:
+                return result
+        selected = set(result)
+
+        # Candidates of a length bucket are found by the C implementation of the set intersection,
+        # and kept in the bucket insertion order
+        for length in sorted(self._length_buckets):
+            bucket = self._length_buckets[length]
+            bucket_candidates = bucket.keys() & candidates
+            if not bucket_candidates:
+                continue
+
+            for key in filter(bucket_candidates.__contains__, bucket):
+                if key not in selected and (is_match is None or is_match(key)):
+                    result.append(key)
+                    if len(result) == limit:
+                        return result
+        return result
@@ -0,0 +1,256 @@
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+class EditCommand:
+    def __init__(self, description: str = "", context: Any = None):
+        """
+        Base class of a recorded edit of the CTR data.
+
+        Commands store only the delta of the edit, enough to apply it forward (redo) and backward (undo).
+        :param description: Descriptive message of the edit.
+        :param context: Optional data describing the edit for the user interface, e.g. the changed entity.
+        """
+        self.description = description
+        self.context = context
+
+    def undo(self) -> None:
+        raise NotImplementedError
+
+    def redo(self) -> None:
+        raise NotImplementedError
+
+    def merge(self, other: "EditCommand") -> bool:
+        """
+        Merges the following command into this command, returns True if the commands were merged.
+        """
+        return False
+
+    def get_contexts(self) -> list[Any]:
+        return [self.context] if self.context is not None else []
+
+
+class AttributeEdit(EditCommand):
+    def __init__(self, target: Any, attribute: str, old_value: Any, new_value: Any,
+                 description: str = "", context: Any = None):
+        """
+        Change of a single attribute value of an object.
+        Consecutive changes of the same attribute of the same object are merged into one command.
+        """
+        super().__init__(description, context)
+        self.target = target
+        self.attribute = attribute
+        self.old_value = old_value
+        self.new_value = new_value
+
+    def undo(self) -> None:
+        setattr(self.target, self.attribute, self.old_value)
+
+    def redo(self) -> None:
+        setattr(self.target, self.attribute, self.new_value)
+
+    def merge(self, other: EditCommand) -> bool:
+        if (not isinstance(other, AttributeEdit) or other.target is not self.target
+                or other.attribute != self.attribute):
+            return False
+
+        self.new_value = other.new_value
+        return True
+
+
+class DictInsert(EditCommand):
+    def __init__(self, container: dict, key: Any, value: Any, description: str = "", context: Any = None):
+        """
+        Insertion of a value into a dictionary under the given key.
+        """
+        super().__init__(description, context)
+        self.container = container
+        self.key = key
+        self.value = value
+
+    def undo(self) -> None:
+        self.container.pop(self.key, None)
+
+    def redo(self) -> None:
+        self.container[self.key] = self.value
+
+
+class DictRemove(DictInsert):
+    """
+    Removal of the value stored under the given key from a dictionary.
+    """
+    def undo(self) -> None:
+        super().redo()
+
+    def redo(self) -> None:
+        super().undo()
+
+
+class ListInsert(EditCommand):
+    def __init__(self, container: list, index: int, value: Any, description: str = "", context: Any = None):
+        """
+        Insertion of a value into a list at the given index.
+        """
+        super().__init__(description, context)
+        self.container = container
+        self.index = index
+        self.value = value
+
+    def undo(self) -> None:
+        self.container.pop(self.index)
+
+    def redo(self) -> None:
+        self.container.insert(self.index, self.value)
+
+
+class ListRemove(ListInsert):
+    """
+    Removal of the value at the given index from a list.
+    """
+    def undo(self) -> None:
+        super().redo()
+
+    def redo(self) -> None:
+        super().undo()
+
+
+class CompositeEdit(EditCommand):
+    def __init__(self, commands: list[EditCommand], description: str = "", context: Any = None):
+        """
+        Group of commands undone and redone as a single edit, e.g. a clipboard paste.
+        """
+        super().__init__(description, context)
+        self.commands = commands
+
+    def undo(self) -> None:
+        for command in reversed(self.commands):
+            command.undo()
+
+    def redo(self) -> None:
+        for command in self.commands:
+            command.redo()
+
+    def get_contexts(self) -> list[Any]:
+        contexts = super().get_contexts()
+        for command in self.commands:
+            contexts.extend(command.get_contexts())
+        return contexts
+
+
+class UndoStack:
+    def __init__(self, max_size: int = 200):
+        """
+        Undo / redo history of the recorded edits.
+
+        Only the oldest edits are evicted once the history exceeds the maximum size,
+        so memory usage is bounded by the number and size of recorded deltas.
+        :param max_size: Maximum number of edits kept in the undo history.
+        """
+        self._undo_commands: deque[EditCommand] = deque(maxlen=max_size)
+        self._redo_commands: list[EditCommand] = []
+        self._group_commands: list[EditCommand] | None = None
+        self._merge_allowed: bool = False
+
+    @property
+    def max_size(self) -> int:
+        return self._undo_commands.maxlen
+
+    def __len__(self) -> int:
+        return len(self._undo_commands)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo_commands)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_commands)
+
+    def undo_description(self) -> str:
+        return self._undo_commands[-1].description if self._undo_commands else ""
+
+    def redo_description(self) -> str:
+        return self._redo_commands[-1].description if self._redo_commands else ""
+
+    def clear(self) -> None:
+        self._undo_commands.clear()
+        self._redo_commands.clear()
+        self._merge_allowed = False
+
+    def push(self, command: EditCommand) -> None:
+        """
+        Records an already applied edit. Clears the redo history.
+        """
+        if self._group_commands is not None:
+            self._group_commands.append(command)
+            return
+
+        self._redo_commands.clear()
+
+        if self._merge_allowed and self._undo_commands and self._undo_commands[-1].merge(command):
+            return
+
+        self._undo_commands.append(command)
+        self._merge_allowed = True
+
+    def set_attribute(self, target: Any, attribute: str, value: Any,
+                      description: str = "", context: Any = None) -> bool:
+        """
+        Sets the attribute value of the target object and records the edit.
+        Returns False without recording if the value is unchanged.
+        """
+        old_value = getattr(target, attribute)
+        if old_value == value:
+            return False
+
+        setattr(target, attribute, value)
+        self.push(AttributeEdit(target, attribute, old_value, value, description, context))
+        return True
+
+    @contextmanager
+    def group(self, description: str = "", context: Any = None) -> Iterator[None]:
+        """
+        Context manager recording all edits pushed within the context as a single edit.
+        Nested groups are merged into the outermost group.
+        """
+        if self._group_commands is not None:
+            yield
+            return
+
+        self._group_commands = []
+        try:
+            yield
+        finally:
+            commands = self._group_commands
+            self._group_commands = None
+
+            if len(commands) == 1 and context is None:
+                self.push(commands[0])
+            elif commands:
+                self.push(CompositeEdit(commands, description, context))
+
+    def undo(self) -> EditCommand | None:
+        """
+        Reverts the last recorded edit and returns it, or None if there is nothing to undo.
+        """
+        if not self._undo_commands:
+            return None
+
+        command = self._undo_commands.pop()
+        command.undo()
+        self._redo_commands.append(command)
+        self._merge_allowed = False
+        return command
+
+    def redo(self) -> EditCommand | None:
+        """
+        Reapplies the last reverted edit and returns it, or None if there is nothing to redo.
+        """
+        if not self._redo_commands:
+            return None
+
+        command = self._redo_commands.pop()
+        command.redo()
+        self._undo_commands.append(command)
+        self._merge_allowed = False
+        return command
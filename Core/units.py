@@ -1,6 +1,7 @@
 
 
 from enum import Enum
+from dataclasses import dataclass
 
 
 class MeasurementUnit(Enum):
@@ -8,3 +9,42 @@ class MeasurementUnit(Enum):
     KG = "kg"
     L = "l"
     ML = "ml"
+    TBSP = "tbsp"
+    CUP = "cup"
+
+
+@dataclass(frozen=True)
+class UnitConversion:
+    """
+    Conversion of an amount in the measurement unit to mass in grams.
+
+    Attributes:
+        grams (float): Grams per unit, or grams per unit at the density of 1 kg/l for volume units.
+        volume (bool): Unit of volume, amount is multiplied with the product density.
+    """
+    grams: float
+    volume: bool = False
+
+
+UNIT_CONVERSIONS: dict[MeasurementUnit, UnitConversion] = {
+    MeasurementUnit.G: UnitConversion(grams=1.0),
+    MeasurementUnit.KG: UnitConversion(grams=1000.0),
+    MeasurementUnit.L: UnitConversion(grams=1000.0, volume=True),
+    MeasurementUnit.ML: UnitConversion(grams=1.0, volume=True),
+    MeasurementUnit.TBSP: UnitConversion(grams=15.0, volume=True),
+    MeasurementUnit.CUP: UnitConversion(grams=240.0, volume=True),
+}
+
+
+def convert_to_grams(amount: float, unit: MeasurementUnit, density: float = 1.0) -> float | None:
+    """
+    Returns the mass in grams of the amount in the given unit, None if the unit has no conversion.
+    :param density: Density of the product in kilograms per liter, used for volume units.
+    """
+    conversion = UNIT_CONVERSIONS.get(unit, None)
+    if conversion is None:
+        return None
+
+    if conversion.volume:
+        amount = amount * density
+    return amount * conversion.grams
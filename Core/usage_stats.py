@@ -0,0 +1,102 @@
+
+import math
+import datetime
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass
+class ItemUsage:
+    """
+    Usage of a Product or Recipe in the daily intake records.
+
+    Attributes:
+        count (int): Number of servings of the item.
+        last_date (str): Date of the last daily intake record with a serving of the item, ISO format.
+    """
+    count: int = 0
+    last_date: str = ""
+
+
+class UsageRanking:
+    def __init__(self, recency_days: float = 30.0):
+        """
+        Ranking of items by usage frequency and recency, kept sorted on each usage update.
+
+        Score of an item is the day of its last use divided by the recency period, increased by
+        the base 2 logarithm of its number of servings, so that doubling the number of servings
+        is worth as much as a use one recency period later. The score does not depend on the current
+        date, and the ranking order changes only with the item usage, not with the passing of time.
+
+        :param recency_days: Recency period in days.
+        """
+        self.recency_days = recency_days
+
+        self._usage: dict[int, ItemUsage] = {}
+        self._scores: dict[int, float] = {}
+
+        # Ascending (-score, item ID), the most used item first
+        self._ranking: list[tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterates over the item IDs, from the most used item.
+        """
+        return (item_id for _, item_id in self._ranking)
+
+    def get_score(self, usage: ItemUsage) -> float:
+        day = datetime.date.fromisoformat(usage.last_date).toordinal()
+        return day / self.recency_days + math.log2(usage.count + 1)
+
+    def get_usage(self, item_id: int) -> ItemUsage | None:
+        return self._usage.get(item_id, None)
+
+    def set_usage(self, item_id: int, usage: ItemUsage | None) -> None:
+        """
+        Sets the usage of the item and moves it to its ranking position, removes the item if None.
+        """
+        previous_score = self._scores.pop(item_id, None)
+        if previous_score is not None:
+            del self._ranking[bisect_left(self._ranking, (-previous_score, item_id))]
+            self._usage.pop(item_id)
+
+        if usage is None or usage.count <= 0:
+            return
+
+        score = self.get_score(usage)
+        self._usage[item_id] = usage
+        self._scores[item_id] = score
+        insort(self._ranking, (-score, item_id))
+
+    def clear(self) -> None:
+        self._usage.clear()
+        self._scores.clear()
+        self._ranking.clear()
+
+    def get_top(self, limit: int) -> list[int]:
+        """
+        Returns the IDs of the most used items, from the most used item.
+        """
+        return [item_id for _, item_id in self._ranking[:limit]]
+
+    def get_rank(self, item_id: int) -> int | None:
+        """
+        Returns the ranking position of the item, starting from 0 for the most used item, None if not used.
+        """
+        score = self._scores.get(item_id, None)
+        if score is None:
+            return None
+        return bisect_left(self._ranking, (-score, item_id))
+
+    def get_factor(self, item_id: int) -> float:
+        """
+        Returns the relative ranking position of the item, from 1.0 for the most used item to 0.0 for unused items.
+        """
+        rank = self.get_rank(item_id)
+        if rank is None:
+            return 0.0
+        return 1.0 - rank / len(self._ranking)
@@ -5,8 +5,9 @@ from GUI.Common.gui_util_functions import COLOR_EDITABLE_ITEM_DARK
 from Settings.app_env import get_light_icon
 
 from PySide6.QtCore import (Qt, QEvent, QLocale, QModelIndex, QPropertyAnimation, QEasingCurve, QSortFilterProxyModel,
-                            QRect, QAbstractTableModel, Signal, QPoint, QObject)
-from PySide6.QtGui import QFontMetrics, QStandardItem, QKeySequence, QColor, QBrush, QFont, QAction
+                            QRect, QAbstractTableModel, Signal, QPoint, QObject, QDate, QStringListModel)
+from PySide6.QtGui import (QFontMetrics, QStandardItem, QKeySequence, QColor, QBrush, QFont, QAction,
+                           QTextCharFormat)
 from PySide6.QtWidgets import (QTableWidget, QTableWidgetItem, QComboBox, QHeaderView, QDoubleSpinBox,
                                QStyledItemDelegate, QApplication, QWidget, QVBoxLayout, QToolButton,
                                QLabel, QHBoxLayout, QPushButton, QSpinBox, QAbstractSpinBox, QFrame,
@@ -16,7 +17,9 @@ from PySide6.QtWidgets import (QTableWidget, QTableWidgetItem, QComboBox, QHeade
 
 from typing import Any
 from enum import Enum
-from collections.abc import Callable
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterable
 
 
 class ScrollableMenu(QWidget):
@@ -235,8 +238,37 @@ class SearchableComboBox(QComboBox):
         self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
         self.setCompleter(self.completer)
 
-        self.lineEdit().textEdited.connect(self.filter_model.setFilterFixedString)
-        self.completer.activated.connect(self.on_completer_activated)
+        self.lineEdit().textEdited.connect(self.on_text_edited)
+        self.completer.activated[QModelIndex].connect(self.on_completer_index_activated)
+
+        # Ranked search of the item rows, replacing the substring filter if set
+        self.search_function: Callable[[str], list[int]] | None = None
+        self.search_model = QStringListModel(self)
+        self.search_rows: list[int] = []
+
+    def set_search_function(self, search_function: Callable[[str], list[int]] | None) -> None:
+        """
+        Sets the function returning the ranked combobox rows matching the entered text,
+        displayed by the completer popup instead of the rows filtered by substring.
+        Function is also called for a cleared text, to suggest rows without a query.
+        """
+        self.search_function = search_function
+        self.completer.setModel(self.filter_model if search_function is None else self.search_model)
+
+    def on_text_edited(self, text: str) -> None:
+        if self.search_function is None:
+            self.filter_model.setFilterFixedString(text)
+            return
+
+        self.search_rows = self.search_function(text)
+        self.search_model.setStringList([self.itemText(row) for row in self.search_rows])
+        self.completer.complete()
+
+    def on_completer_index_activated(self, index: QModelIndex) -> None:
+        if self.search_function is None:
+            self.on_completer_activated(index.data())
+        elif 0 <= index.row() < len(self.search_rows):
+            self.setCurrentIndex(self.search_rows[index.row()])
 
     def set_colors(self, text: QColor, background: QColor):
         self.setStyleSheet(f"QComboBox {{"
@@ -261,7 +293,7 @@ class SearchableComboBox(QComboBox):
     def setModel(self, model):
         super(SearchableComboBox, self).setModel(model)
         self.filter_model.setSourceModel(model)
-        self.completer.setModel(self.filter_model)
+        self.completer.setModel(self.filter_model if self.search_function is None else self.search_model)
 
     def setModelColumn(self, column):
         self.completer.setCompletionColumn(column)
@@ -427,23 +459,89 @@ class NoStepDoubleSpinBox(QDoubleSpinBox):
             super().keyPressEvent(event)
 
 
+class CompletionModel(QStringListModel):
+    """
+    String list model of unique values ranked by the number of occurrences, most frequent first.
+
+    Value counts are updated incrementally, only the rows of the changed values are moved,
+    so the model can be kept up to date with the edited data without rebuilding it.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._counts: dict[str, int] = {}
+        self._ranked_keys: list[tuple[int, str]] = []
+
+    def set_values(self, values: Iterable[str]) -> None:
+        """
+        Rebuilds the model from all occurrences of the values, empty values are ignored.
+        """
+        self._counts = dict(Counter(value for value in values if isinstance(value, str) and value))
+        self._ranked_keys = sorted((-count, value) for value, count in self._counts.items())
+        self.setStringList([value for _, value in self._ranked_keys])
+
+    def get_count(self, value: str) -> int:
+        return self._counts.get(value, 0)
+
+    def add_value(self, value: str) -> None:
+        if isinstance(value, str) and value:
+            self._set_count(value, self.get_count(value) + 1)
+
+    def remove_value(self, value: str) -> None:
+        if isinstance(value, str) and value:
+            self._set_count(value, self.get_count(value) - 1)
+
+    def replace_value(self, old_value: str, new_value: str) -> None:
+        if old_value == new_value:
+            return
+        self.remove_value(old_value)
+        self.add_value(new_value)
+
+    def _set_count(self, value: str, count: int) -> None:
+        previous_count = self._counts.get(value, 0)
+
+        if previous_count > 0:
+            row = bisect_left(self._ranked_keys, (-previous_count, value))
+            self._ranked_keys.pop(row)
+            self.removeRows(row, 1)
+
+        if count > 0:
+            self._counts[value] = count
+            row = bisect_left(self._ranked_keys, (-count, value))
+            self._ranked_keys.insert(row, (-count, value))
+            self.insertRows(row, 1)
+            self.setData(self.index(row), value)
+        else:
+            self._counts.pop(value, None)
+
+
 class AutoCompleteDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
+        """
+        Line edit delegate with auto-completion of values from a per-column CompletionModel.
+        Completion models are filled and kept up to date by the owner of the table data.
+        """
         super().__init__(parent)
         self.parent = parent
 
+        self._completers: dict[int, QCompleter] = {}
+
+    def get_completion_model(self, column: int) -> CompletionModel:
+        """
+        Returns the completion model of the column, creating an empty model on first access.
+        """
+        completer = self._completers.get(column, None)
+        if completer is None:
+            completer = QCompleter(CompletionModel(self), self)
+            completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+            self._completers[column] = completer
+
+        return completer.model()
+
     def createEditor(self, parent, option, index):
         editor = QLineEdit(parent)
-        column = index.column()
-        unique_items = set()
-        for row in range(self.parent.rowCount()):
-            item = self.parent.item(row, column)
-            if item:
-                unique_items.add(item.text())
 
-        completer = QCompleter(list(unique_items), parent)
-        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        editor.setCompleter(completer)
+        self.get_completion_model(index.column())
+        editor.setCompleter(self._completers[index.column()])
 
         editor.editingFinished.connect(lambda: self.commitData.emit(editor))
         editor.editingFinished.connect(lambda: self.closeEditor.emit(editor,
@@ -606,6 +704,8 @@ class CustomDataTable(QTableWidget):
 
         self._on_lmb_press_event_method = None
         self._on_rmb_press_event_method = None
+        self._on_bulk_paste_method = None
+        self._copied_value_method = None
 
         self._scroll_bar_position: int = 0
 
@@ -1096,81 +1196,170 @@ class CustomDataTable(QTableWidget):
         else:
             super().keyPressEvent(event)
 
+    def set_bulk_paste_method(self, method: Callable[[list[tuple[int, int]]], None]):
+        """
+        Sets the method applying pasted clipboard data to the tracker data in a single batch.
+        Method is called once per paste with a list of (row, column) indices of all pasted cells.
+        If not set, pasted cells are applied one by one through the table itemChanged signal.
+        """
+        self._on_bulk_paste_method = method
+
+    def set_copied_value_method(self, method: Callable[[int, int], Any]):
+        """
+        Sets the method returning the tracker data value of the table cell at the given (row, column) for copying,
+        instead of the displayed, rounded cell text. Method returns None for cells without a tracker data value,
+        such as labels, copied as displayed.
+        """
+        self._copied_value_method = method
+
+    def get_clipboard_locale(self) -> QLocale:
+        locale = QLocale.system()
+        locale.setNumberOptions(QLocale.NumberOption.OmitGroupSeparator)
+        return locale
+
+    def is_numeric_column(self, column: int) -> bool:
+        return column in self.numeric_input_columns or column in self.numeric_display_columns
+
+    @staticmethod
+    def format_copied_value(value: Any, locale: QLocale) -> str:
+        """
+        Returns the clipboard text of a tracker data value, numeric values are formatted with the given locale
+        to 12 significant digits, enumerations by their displayed value.
+        """
+        if isinstance(value, Enum):
+            return str(value.value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return locale.toString(float(value), 'g', 12)
+        return str(value)
+
+    def get_cell_text(self, row: int, column: int, locale: QLocale) -> str:
+        """
+        Returns the clipboard text of the table cell, read from the tracker data value of the cell if available,
+        otherwise from the table model data. Numeric values are formatted with the given locale.
+        """
+        if self._copied_value_method is not None:
+            value = self._copied_value_method(row, column)
+            if value is not None:
+                return self.format_copied_value(value, locale)
+
+        cell_widget = self.cellWidget(row, column)
+        if isinstance(cell_widget, QComboBox):
+            return cell_widget.currentText()
+
+        data = self.model().index(row, column).data(Qt.ItemDataRole.DisplayRole)
+        if data is None:
+            return ""
+
+        if self.is_numeric_column(column):
+            try:
+                return locale.toString(float(data), 'f', 2)
+            except (TypeError, ValueError):
+                pass
+
+        return str(data)
+
     def copy_selection(self):
         selected_ranges = self.selectedRanges()
         if not selected_ranges:
             return
 
-        locale = QLocale.system()
-        locale.setNumberOptions(QLocale.NumberOption.OmitGroupSeparator)
+        locale = self.get_clipboard_locale()
 
         clipboard_text = []
         for selected_range in selected_ranges:
-            top_row = selected_range.topRow()
-            bottom_row = selected_range.bottomRow()
-            left_column = selected_range.leftColumn()
-            right_column = selected_range.rightColumn()
+            columns = range(selected_range.leftColumn(), selected_range.rightColumn() + 1)
 
-            for row in range(top_row, bottom_row + 1):
-                row_data = []
-                for col in range(left_column, right_column + 1):
-                    item = self.item(row, col)
-                    if item is not None:
-                        item_data = item.data(Qt.ItemDataRole.DisplayRole)
-
-                        if item_data is None or item_data is type(None):
-                            row_data.append(item.text())
-
-                        else:
-                            if col in self.numeric_input_columns or col in self.numeric_display_columns:
-                                try:
-                                    formatted_number = locale.toString(float(item_data), 'f', 2)
-                                    row_data.append(str(formatted_number))
-                                except ValueError:
-                                    row_data.append(str(item_data))
-                            else:
-                                row_data.append(str(item_data))
-                    else:
-                        row_data.append("")
-                clipboard_text.append("\t".join(row_data))
+            for row in range(selected_range.topRow(), selected_range.bottomRow() + 1):
+                clipboard_text.append("\t".join(self.get_cell_text(row, col, locale) for col in columns))
 
         clipboard = QApplication.clipboard()
         clipboard.setText("\n".join(clipboard_text))
 
+    @staticmethod
+    def parse_clipboard_text(clipboard_text: str) -> list[list[str]]:
+        """
+        Splits the clipboard text into rows of tab separated values, as copied from spreadsheets.
+        """
+        rows = clipboard_text.splitlines()
+        while rows and not rows[-1]:
+            rows.pop()
+        return [row.split("\t") for row in rows]
+
+    def get_pasted_values(self, clipboard_text: str, top_row: int,
+                          left_column: int) -> list[tuple[int, int, str | float]]:
+        """
+        Returns a list of (row, column, value) of the clipboard data pasted from the given table cell.
+        Cells outside the table, non-editable cells and invalid numeric values are skipped.
+        """
+        locale = self.get_clipboard_locale()
+        row_count = self.rowCount()
+        column_count = self.columnCount()
+
+        pasted_values = []
+        for row_offset, row_data in enumerate(self.parse_clipboard_text(clipboard_text)):
+            row = top_row + row_offset
+            if row >= row_count:
+                break
+
+            for column_offset, value in enumerate(row_data):
+                column = left_column + column_offset
+                if column >= column_count:
+                    break
+
+                current_item = self.item(row, column)
+                if self.cellWidget(row, column) is not None or (
+                        current_item is not None and Qt.ItemFlag.ItemIsEditable not in current_item.flags()):
+                    continue
+
+                if self.is_numeric_column(column):
+                    numeric_value, success = locale.toFloat(value.strip())
+                    if not success:
+                        print(f"Pasted value '{value}' at row {row} column {column} is not a number!")
+                        continue
+                    value = numeric_value
+
+                pasted_values.append((row, column, value))
+
+        return pasted_values
+
     def paste_selection(self):
         clipboard = QApplication.clipboard()
-        clipboard_text = clipboard.text().strip()
+        clipboard_text = clipboard.text()
 
         selected_ranges = self.selectedRanges()
         if not selected_ranges:
             return
 
         top_range = selected_ranges[0]
-        top_row = top_range.topRow()
-        left_column = top_range.leftColumn()
-
-        rows = clipboard_text.split("\n")
-        for row, row_data in enumerate(rows):
-            cols = row_data.split("\t")
-            for column, value in enumerate(cols):
-                if top_row + row < self.rowCount() and left_column + column < self.columnCount():
-                    item_row = top_row + row
-                    item_column = left_column + column
-
-                    current_item = self.item(item_row, item_column)
-                    if current_item is not None and Qt.ItemFlag.ItemIsEditable not in current_item.flags():
-                        print("Item is not editable!")
-                        continue
+        pasted_values = self.get_pasted_values(clipboard_text, top_range.topRow(), top_range.leftColumn())
+        if not pasted_values:
+            return
+
+        if self._on_bulk_paste_method is None:
+            for row, column, value in pasted_values:
+                self.set_pasted_value(row, column, value)
+            return
+
+        # Sorting is suspended to keep the pasted rows in place until the data is applied
+        sorting_enabled = self.isSortingEnabled()
+        self.setSortingEnabled(False)
+
+        self.blockSignals(True)
+        for row, column, value in pasted_values:
+            self.set_pasted_value(row, column, value)
+        self.blockSignals(False)
 
-                    if item_column in self.numeric_input_columns or item_column in self.numeric_display_columns:
-                        locale = QLocale.system()
-                        numeric_value, success = locale.toFloat(value)
-                        if success:
-                            value = numeric_value
+        self._on_bulk_paste_method([(row, column) for row, column, _ in pasted_values])
+        self.setSortingEnabled(sorting_enabled)
 
-                    item = new_table_item(value=value)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.setItem(item_row, item_column, item)
+    def set_pasted_value(self, row: int, column: int, value: str | float):
+        item = self.item(row, column)
+        if item is None:
+            item = new_table_item(value=value)
+            item.setTextAlignment(Qt.AlignCenter)
+            self.setItem(row, column, item)
+        else:
+            item.setData(Qt.ItemDataRole.DisplayRole, value)
 
 
 class CustomListWidget(QListWidget):
@@ -1624,6 +1813,13 @@ class CollapsibleSectionWidget(QFrame):
 
 
 class CustomCalendarWidget(QCalendarWidget):
+    """
+    Calendar widget with incremental highlighting of dates.
+
+    Highlighted dates are stored as highlight levels (indices into the list of highlight
+    formats) mapped to ISO date strings. Only the dates of the currently displayed month
+    are formatted eagerly, formats of other dates are applied once their month is shown.
+    """
     def __init__(self):
         super().__init__()
 
@@ -1632,11 +1828,78 @@ class CustomCalendarWidget(QCalendarWidget):
 
         self.clicked.connect(self.handle_date_click)
         # self.selectionChanged.connect(self.handle_date_changed)
+        self.currentPageChanged.connect(self.apply_visible_highlights)
         self._on_rmb_press_event_method: Callable[[QPoint, str], None] | None = None
 
+        self.highlight_formats: list[QTextCharFormat] = []
+        self._highlight_levels: dict[str, int] = {}
+        self._applied_levels: dict[str, int] = {}
+
     def set_rmb_action_method(self, method: Callable[[QPoint, str], None]):
         self._on_rmb_press_event_method = method
 
+    def set_highlight_formats(self, formats: list[QTextCharFormat]):
+        """
+        Sets the text formats for each highlight level and reformats the displayed month.
+        """
+        self.highlight_formats = formats
+        self.setDateTextFormat(QDate(), QTextCharFormat())
+        self._applied_levels.clear()
+        self.apply_visible_highlights()
+
+    def set_highlight_levels(self, levels: dict[str, int]):
+        """
+        Replaces all highlighted dates, only the dates with a changed highlight level get reformatted.
+        :param levels: Highlight level for each highlighted ISO date string.
+        """
+        self._highlight_levels = dict(levels)
+        self.apply_visible_highlights()
+
+    def update_highlight_levels(self, changed_levels: dict[str, int | None]):
+        """
+        Updates highlight levels of the given dates, removing the highlight for dates set to None.
+        Changed dates outside the displayed month are formatted once their month is shown.
+        """
+        for date, level in changed_levels.items():
+            if level is None:
+                self._highlight_levels.pop(date, None)
+            else:
+                self._highlight_levels[date] = level
+
+        visible_dates = set(self.get_visible_date_strings())
+        for date in changed_levels.keys():
+            if date in visible_dates:
+                self.apply_date_highlight(date)
+
+    def get_visible_date_strings(self) -> list[str]:
+        """
+        Returns ISO date strings of all dates that can be displayed on the current calendar page,
+        including the trailing days of the previous and leading days of the next month.
+        """
+        first_day = QDate(self.yearShown(), self.monthShown(), 1)
+        start = first_day.addDays(-7)
+        return [start.addDays(i).toString(Qt.DateFormat.ISODate) for i in range(49)]
+
+    def apply_visible_highlights(self, *args):
+        for date in self.get_visible_date_strings():
+            self.apply_date_highlight(date)
+
+    def apply_date_highlight(self, date: str):
+        level = self._highlight_levels.get(date, None)
+        if level is not None and not 0 <= level < len(self.highlight_formats):
+            level = None
+
+        if self._applied_levels.get(date, None) == level:
+            return
+
+        text_format = self.highlight_formats[level] if level is not None else QTextCharFormat()
+        self.setDateTextFormat(QDate.fromString(date, Qt.DateFormat.ISODate), text_format)
+
+        if level is None:
+            self._applied_levels.pop(date, None)
+        else:
+            self._applied_levels[date] = level
+
     def handle_date_changed(self):
         date = self.selectedDate()
         print(f"Left-clicked on Date: {date.toString('yyyy-MM-dd')}")
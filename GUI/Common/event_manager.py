@@ -1,5 +1,49 @@
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QTimer
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Iterable
+
+
+class ChangeEntity(Enum):
+    CATALOGUE = "Catalogue"
+    RECIPES = "Recipes"
+    DAILY_INTAKE = "Daily Intake"
+    NUTRITION_TARGETS = "Nutrition Targets"
+    FAVORITES = "Favorites"
+    OTHER = "Other"
+
+
+@dataclass
+class DataChangeEvent:
+    """
+    Typed payload describing a change of the CTR data.
+
+    Changes of the same entity emitted within one event loop turn are merged
+    into a single DataChangeEvent before being dispatched to the subscribers.
+
+    Attributes:
+        entity: Kind of the changed CTR data.
+        item_ids: IDs of the changed Products or Recipes, empty if the change is not item specific.
+        dates: Dates (ISO format strings) of the changed daily intake records.
+        structural: Items were added, removed or renumbered, dependent views require a full refresh.
+        messages: Descriptive messages of all merged changes.
+    """
+    entity: ChangeEntity
+    item_ids: set[int] = field(default_factory=set)
+    dates: set[str] = field(default_factory=set)
+    structural: bool = False
+    messages: list[str] = field(default_factory=list)
+
+    def merge(self, other: "DataChangeEvent") -> None:
+        """
+        Merges another change event of the same entity into this event.
+        """
+        self.item_ids.update(other.item_ids)
+        self.dates.update(other.dates)
+        self.structural = self.structural or other.structural
+        self.messages.extend(other.messages)
 
 
 class EventManager(QObject):
@@ -8,14 +52,20 @@ class EventManager(QObject):
 
     Class provides a centralized mechanism to emit and handle signals, reducing
     coupling between modules and ensuring that only one instance of the EventManager
-    exists across the application
+    exists across the application.
+
+    Changes are not dispatched immediately, all changes emitted within the same event
+    loop turn are coalesced per entity and dispatched once, so a burst of edits (e.g. paste
+    or bulk removal) results in a single update of the subscribed GUI elements.
 
     Signals:
-        - on_data_changed       - Emitted when any CTR data gets changed, used for unsaved data tracking
-        - on_catalogue_update   - Emitted when a catalogue item gets changed, requiring other GUI elements update
-        - on_recipe_update      - Emitted when a recipe gets changed, requiring other GUI elements update
+        - on_data_changed       - Emitted once per dispatched burst of changes, used for unsaved data tracking
+        - on_catalogue_update   - Emitted with a DataChangeEvent when catalogue items get changed
+        - on_recipe_update      - Emitted with a DataChangeEvent when recipes get changed
+        - on_changes_dispatched - Emitted with a list of all DataChangeEvents of the dispatched burst
     """
     _instance = None
+    _initialized = False
 
     def __new__(cls, *args, **kwargs):
         """
@@ -26,11 +76,101 @@ class EventManager(QObject):
         return cls._instance
 
     on_data_changed = Signal(str)
-    on_catalogue_update = Signal()
-    on_recipe_update = Signal()
+    on_catalogue_update = Signal(object)
+    on_recipe_update = Signal(object)
+    on_changes_dispatched = Signal(object)
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        super().__init__()
+        EventManager._initialized = True
+
+        self._pending_changes: dict[ChangeEntity, DataChangeEvent] = {}
+        self._dispatch_scheduled: bool = False
+        self._subscribers: list[tuple[Callable[[list[DataChangeEvent]], None], frozenset[ChangeEntity]]] = []
+
+    def emit_data_changed(self, data: str | None = None,
+                          entity: ChangeEntity = ChangeEntity.OTHER,
+                          item_ids: Iterable[int] | None = None,
+                          dates: Iterable[str] | None = None,
+                          structural: bool = False):
+        """
+        Queues a change of the CTR data for the coalesced dispatch.
+        :param data: Descriptive message of the change.
+        :param entity: Kind of the changed CTR data.
+        :param item_ids: IDs of the changed Products or Recipes.
+        :param dates: Dates of the changed daily intake records.
+        :param structural: Items were added, removed or renumbered.
+        """
+        change = DataChangeEvent(entity=entity,
+                                 item_ids=set(item_ids) if item_ids is not None else set(),
+                                 dates=set(dates) if dates is not None else set(),
+                                 structural=structural,
+                                 messages=[data] if data else [])
+        self.queue_change(change)
+
+    def queue_change(self, change: DataChangeEvent):
+        pending = self._pending_changes.get(change.entity, None)
+        if pending is None:
+            self._pending_changes[change.entity] = change
+        else:
+            pending.merge(change)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            QTimer.singleShot(0, self.dispatch_pending_changes)
+
+    def dispatch_pending_changes(self):
+        """
+        Dispatches all queued changes to the connected signals and subscribers.
+        Can also be called directly to flush the queue synchronously.
+        """
+        self._dispatch_scheduled = False
+        if not self._pending_changes:
+            return
+
+        changes = list(self._pending_changes.values())
+        self._pending_changes = {}
+
+        messages = [msg for change in changes for msg in change.messages]
+        if len(messages) > 1:
+            summary = f"{messages[0]} (+{len(messages) - 1} more changes)"
+        else:
+            summary = messages[0] if messages else ""
+
+        self.on_data_changed.emit(summary)
+        self.on_changes_dispatched.emit(changes)
+
+        for change in changes:
+            if change.entity is ChangeEntity.CATALOGUE:
+                self.on_catalogue_update.emit(change)
+            elif change.entity is ChangeEntity.RECIPES:
+                self.on_recipe_update.emit(change)
+
+        for callback, entities in list(self._subscribers):
+            relevant_changes = [change for change in changes if not entities or change.entity in entities]
+            if relevant_changes:
+                callback(relevant_changes)
+
+    def has_pending_changes(self) -> bool:
+        return bool(self._pending_changes)
+
+    def subscribe(self, callback: Callable[[list[DataChangeEvent]], None],
+                  entities: Iterable[ChangeEntity] | None = None):
+        """
+        Subscribes the callback to the dispatched changes. Callback is called once per dispatched
+        burst with the list of changes, only if any of the changes concerns the selected entities.
+        :param callback: Function accepting a list of DataChangeEvent.
+        :param entities: Entities of interest, all entities if None.
+        """
+        self.unsubscribe(callback)
+        self._subscribers.append((callback, frozenset(entities) if entities is not None else frozenset()))
 
-    def emit_data_changed(self, data: str | None = None):
-        self.on_data_changed.emit(data)
+    def unsubscribe(self, callback: Callable[[list[DataChangeEvent]], None]):
+        self._subscribers = [(subscriber, entities) for subscriber, entities in self._subscribers
+                             if subscriber != callback]
 
 
 _event_manager = None
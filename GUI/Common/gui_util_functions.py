@@ -265,3 +265,27 @@ def table_item_numeric_ne(value: int | float,
     font.setWeight(weight)
     widget_item.setFont(font)
     return widget_item
+
+
+def convert_to_color_at_index(split_line: list, index: int, default_value=QColor(0, 0, 0, 255)) -> QColor:
+    """
+    Function returns a QColor from the split line list containing RGBA values at the given index.
+    Returns the default value when attempting to convert a value at an index that is not contained in the list.
+
+    :param split_line: CSV savefile line.
+    :param index: Index in the CSV savefile line.
+    :param default_value: Default return value, black (RGBA = 0, 0, 0, 255).
+    """
+    if index >= len(split_line):
+        return default_value
+
+    else:
+        try:
+            rgba_list = split_line[index].strip("\n").strip("[]").split(", ")
+            return QColor(*[int(val) for val in rgba_list])
+
+        except ValueError:
+            return default_value
+
+        except TypeError:
+            return default_value
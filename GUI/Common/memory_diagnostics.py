@@ -0,0 +1,74 @@
+
+from Core.memory_report import MemoryUsage, get_resident_memory, release_free_memory
+
+import gc
+
+from PySide6.QtCore import Qt, QDate, QCoreApplication, QEvent
+from PySide6.QtWidgets import QApplication, QComboBox, QTableWidget
+
+
+def count_table_items(table: QTableWidget) -> int:
+    """
+    Returns the number of table items, cell widgets and combobox entries of the table.
+    """
+    n_items = 0
+    for row in range(table.rowCount()):
+        for column in range(table.columnCount()):
+            if table.item(row, column) is not None:
+                n_items += 1
+
+            widget = table.cellWidget(row, column)
+            if widget is not None:
+                n_items += 1
+                if isinstance(widget, QComboBox):
+                    n_items += widget.count()
+    return n_items
+
+
+def process_deleted_objects() -> None:
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    QApplication.processEvents()
+    gc.collect()
+    release_free_memory()
+
+
+def get_table_memory_usage(name: str, table: QTableWidget, refresh_table) -> MemoryUsage:
+    """
+    Returns the resident memory increase and number of items of the table filled by the refresh function.
+    The table is refreshed once before the measurement, so that one-time allocations on first display
+    are excluded, and cleared. Memory is None if resident memory is not available.
+    """
+    refresh_table()
+    table.clearContents()
+    table.setRowCount(0)
+    process_deleted_objects()
+
+    start_memory = get_resident_memory()
+    refresh_table()
+    process_deleted_objects()
+    end_memory = get_resident_memory()
+
+    memory = end_memory - start_memory if start_memory is not None and end_memory is not None else None
+    return MemoryUsage(name, memory, count_table_items(table))
+
+
+def get_main_window_memory_usage(mw) -> list[MemoryUsage]:
+    """
+    Returns the memory usage of the daily intake, catalogue and recipe ingredients tables of the main window.
+    The latest daily intake record and the largest recipe are selected for the measurement.
+    """
+    page_daily_intake = mw.page_daily_intake
+    page_catalogue = mw.page_catalogue
+    page_recipes = mw.page_recipes
+
+    if mw.ctr_data.daily_intake_record:
+        page_daily_intake.selected_date = QDate.fromString(max(mw.ctr_data.daily_intake_record), Qt.DateFormat.ISODate)
+        page_daily_intake.set_current_date()
+
+    recipe = max(mw.ctr_data.recipes_record.values(), key=lambda item: len(item.ingredients))
+    page_recipes.selected_recipe_id = recipe.item_id
+
+    return [get_table_memory_usage("Daily intake table", page_daily_intake.table, page_daily_intake.refresh_table),
+            get_table_memory_usage("Catalogue table", page_catalogue.table, page_catalogue.refresh_table),
+            get_table_memory_usage("Recipe ingredients table", page_recipes.table,
+                                   page_recipes.refresh_ingredients_table)]
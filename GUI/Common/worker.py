@@ -0,0 +1,50 @@
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+import traceback
+from typing import Any, Callable
+
+
+class WorkerSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class Worker(QRunnable):
+    def __init__(self, function: Callable[..., Any], *args, **kwargs):
+        """
+        Runnable executing the function on a thread pool thread. Result of the function is emitted
+        with the finished signal, and the traceback of a raised exception with the failed signal,
+        both received by the connected slots on the GUI thread.
+
+        Function must not access the CTR data or the widgets, its arguments should be copies
+        of the data required for the computation.
+        """
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception:       # noqa
+            self.signals.failed.emit(traceback.format_exc())
+        else:
+            self.signals.finished.emit(result)
+
+
+def run_in_thread_pool(function: Callable[..., Any], on_finished: Callable[[Any], None],
+                       on_failed: Callable[[str], None] | None = None, *args, **kwargs) -> Worker:
+    """
+    Starts the function on the global thread pool and returns its worker.
+    :param on_finished: Slot called with the function result on the GUI thread.
+    :param on_failed: Slot called with the exception traceback, printed if None.
+    """
+    worker = Worker(function, *args, **kwargs)
+    worker.signals.finished.connect(on_finished)
+    worker.signals.failed.connect(on_failed if on_failed is not None else print)
+
+    QThreadPool.globalInstance().start(worker)
+    return worker
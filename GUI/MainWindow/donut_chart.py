@@ -0,0 +1,286 @@
+
+from Core.product import NutritionData
+from GUI.MainWindow.chart_widget import DONUT_CHART_FAT_COLOR, DONUT_CHART_CARBS_COLOR, DONUT_CHART_PROTEIN_COLOR
+
+import math
+import pyqtgraph as pg
+from PySide6.QtGui import QPainter, QFont, QColor, QPicture
+from PySide6.QtCore import QRectF, Qt
+
+
+class DonutChart(pg.GraphicsObject):
+    """
+    A custom pyqtgraph GraphicsObject that draws a segmented donut chart.
+    Each segment represents the calorie contribution from fat, carbs, and protein.
+    The total calories are shown in the center, and each segment is labeled (white text)
+    with its macronutrient name and amount in grams.
+
+    The chart is recorded into a QPicture which is replayed on each paint, and recorded
+    again only when the nutrition data, colors, radius or text orientation change.
+    """
+
+    def __init__(self, nutrition_data: NutritionData,
+                 background_color: QColor = QColor("white"),
+                 text_color: QColor = QColor("black"),
+                 radius: int = 200):
+        super().__init__()
+        self.nutrition_data = nutrition_data
+        self.background_color = background_color
+        self.text_color = text_color
+        self.radius = radius
+
+        self.inner_radius = self.radius * 0.6
+
+        self.colors = [
+            DONUT_CHART_FAT_COLOR,
+            DONUT_CHART_CARBS_COLOR,
+            DONUT_CHART_PROTEIN_COLOR
+        ]
+        self.labels: list[str] = []
+
+        self._picture: QPicture | None = None
+        self._picture_key: tuple | None = None
+
+        self.update_labels()
+
+        # self.total_text_item = pg.TextItem("", anchor=(0.5, 0.5), color="black")
+        # # self.total_text_item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations, True)
+        # self.total_text_item.setParentItem(self)
+        #
+        # self.fat_text_item = pg.TextItem("Fat", anchor=(0.5, 0.5), color="white")
+        # # self.fat_text_item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations, True)
+        # self.fat_text_item.setParentItem(self)
+        #
+        # self.carbs_text_item = pg.TextItem("Carbs", anchor=(0.5, 0.5), color="white")
+        # # self.carbs_text_item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations, True)
+        # self.carbs_text_item.setParentItem(self)
+        #
+        # self.protein_text_item = pg.TextItem("Protein", anchor=(0.5, 0.5), color="white")
+        # # self.protein_text_item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations, True)
+        # self.protein_text_item.setParentItem(self)
+        #
+        # total_font = QFont("Arial", 16, QFont.Bold)
+        # self.total_text_item.setFont(total_font)
+        # seg_font = QFont("Arial", 10, QFont.Bold)
+        # self.fat_text_item.setFont(seg_font)
+        # self.carbs_text_item.setFont(seg_font)
+        # self.protein_text_item.setFont(seg_font)
+
+    def update_labels(self):
+        self.labels = [
+            f"Fat\n{self.nutrition_data.fat:.0f} g",
+            f"Carbs\n{self.nutrition_data.carbs:.0f} g",
+            f"Protein\n{self.nutrition_data.protein:.0f} g",
+        ]
+
+    def set_nutrition_data(self, nutrition_data: NutritionData) -> bool:
+        """
+        Sets the displayed nutrition data, the chart is repainted only if the data has changed.
+        :return: True if the data has changed.
+        """
+        if nutrition_data == self.nutrition_data:
+            return False
+
+        self.nutrition_data = nutrition_data
+        self.update_labels()
+        self.invalidate_picture()
+        return True
+
+    def set_colors(self, background_color: QColor, text_color: QColor) -> None:
+        if background_color == self.background_color and text_color == self.text_color:
+            return
+
+        self.background_color = background_color
+        self.text_color = text_color
+        self.invalidate_picture()
+
+    def invalidate_picture(self) -> None:
+        self._picture = None
+        self._picture_key = None
+        self.update()
+
+    def get_picture_key(self, mirrored: bool) -> tuple:
+        data = self.nutrition_data
+        return (data.calories, data.fat, data.carbs, data.protein,
+                self.background_color.rgba(), self.text_color.rgba(), self.radius, mirrored)
+
+    def record_picture(self, mirrored: bool) -> QPicture:
+        picture = QPicture()
+        painter = QPainter(picture)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        segment_info = self.draw_pie_chart(painter)
+        self.draw_inner_circle(painter)
+        self.draw_segment_labels(painter, segment_info, mirrored=mirrored)
+        self.draw_total_calories(painter, mirrored=mirrored)
+
+        painter.end()
+        return picture
+
+    def paint(self, painter, option, widget) -> None:           # noqa
+        mirrored = painter.transform().m22() < 0
+        picture_key = self.get_picture_key(mirrored)
+
+        if self._picture is None or self._picture_key != picture_key:
+            self._picture = self.record_picture(mirrored)
+            self._picture_key = picture_key
+
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.drawPicture(0, 0, self._picture)
+
+    # def paint(self, painter, option, widget):
+    #     # Enable antialiasing for smooth drawing.
+    #     painter.setRenderHint(QPainter.Antialiasing)
+    #
+    #     # --- Calculate calorie contributions for each macronutrient ---
+    #     fat_cal = self.nutrition_data.fat * 9
+    #     carbs_cal = self.nutrition_data.carbs * 4
+    #     protein_cal = self.nutrition_data.protein * 4
+    #     total_macro_cal = fat_cal + carbs_cal + protein_cal
+    #
+    #     if total_macro_cal > 0:
+    #         perc_fat = fat_cal / total_macro_cal
+    #         perc_carbs = carbs_cal / total_macro_cal
+    #         perc_protein = protein_cal / total_macro_cal
+    #     else:
+    #         perc_fat = perc_carbs = perc_protein = 0
+    #
+    #     # --- Define colors for segments ---
+    #     colors = [QColor("#FF6347"),  # Tomato for Fat
+    #               QColor("#FFD700"),  # Gold for Carbs
+    #               QColor("#90EE90")]  # Light Green for Protein
+    #
+    #     # --- Draw the outer donut segments ---
+    #     rect = QRectF(-self.radius, -self.radius, 2 * self.radius, 2 * self.radius)
+    #     painter.save()
+    #     start_angle = 0.0
+    #     segment_angles = []  # store mid-angles for each segment for positioning labels
+    #     for perc, color in zip([perc_fat, perc_carbs, perc_protein], colors):
+    #         span_angle = perc * 360.0
+    #         painter.setPen(Qt.NoPen)
+    #         painter.setBrush(color)
+    #         # QPainter.drawPie expects angles in 1/16th of a degree.
+    #         painter.drawPie(rect, int(start_angle * 16), int(span_angle * 16))
+    #         if span_angle > 0:
+    #             mid_angle = start_angle + span_angle / 2.0
+    #             segment_angles.append(mid_angle)
+    #         start_angle += span_angle
+    #     painter.restore()
+    #
+    #     # --- Draw inner white circle to create the donut effect ---
+    #     self.inner_radius = self.radius * 0.6
+    #     inner_rect = QRectF(-self.inner_radius, -self.inner_radius, 2 * self.inner_radius, 2 * self.inner_radius)
+    #     painter.save()
+    #     painter.setPen(Qt.NoPen)
+    #     painter.setBrush(QColor("white"))
+    #     painter.drawEllipse(inner_rect)
+    #     painter.restore()
+    #
+    #     # --- Update positions of the text items (they ignore transformations) ---
+    #     # Total calories text centered at (0,0)
+    #     self.total_text_item.setText(f"{self.nutrition_data.calories:.0f} Cal")
+    #     self.total_text_item.setPos(0, 0)
+    #
+    #     # For the segment labels, place them halfway in the donut ring.
+    #     # Use the average radius between outer and inner edges.
+    #     label_radius = (self.radius + self.inner_radius) / 2.0
+    #     if len(segment_angles) >= 3:
+    #         # Fat label (first segment)
+    #         rad = math.radians(segment_angles[0])
+    #         self.fat_text_item.setPos(label_radius * math.cos(rad), label_radius * math.sin(rad))
+    #         # Carbs label (second segment)
+    #         rad = math.radians(segment_angles[1])
+    #         self.carbs_text_item.setPos(label_radius * math.cos(rad), label_radius * math.sin(rad))
+    #         # Protein label (third segment)
+    #         rad = math.radians(segment_angles[2])
+    #         self.protein_text_item.setPos(label_radius * math.cos(rad), label_radius * math.sin(rad))
+
+    def draw_pie_chart(self, painter: QPainter):
+        """
+        Draws the pie chart. Note: QPainter.drawPie expects angles in 1/16th of a degree.
+        """
+        macro_calories = self.nutrition_data.get_macro_calories()
+        fat_cal, carbs_cal, protein_cal = macro_calories
+        total_macro_cal = sum(macro_calories)
+
+        if total_macro_cal > 0:
+            perc_fat = fat_cal / total_macro_cal
+            perc_carbs = carbs_cal / total_macro_cal
+            perc_protein = protein_cal / total_macro_cal
+        else:
+            perc_fat = perc_carbs = perc_protein = 0
+
+        rect = QRectF(-self.radius, -self.radius, 2 * self.radius, 2 * self.radius)
+        painter.save()
+        start_angle = 0.0
+        segment_info = []
+
+        for perc, color, label in zip([perc_fat, perc_carbs, perc_protein], self.colors, self.labels):
+            span_angle = perc * 360.0
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(color)
+            painter.drawPie(rect, int(start_angle * 16), int(span_angle * 16))
+
+            if span_angle > 0:
+                mid_angle = start_angle + span_angle / 2.0
+                segment_info.append((mid_angle, label))
+            start_angle += span_angle
+        painter.restore()
+
+        return segment_info
+
+    def draw_segment_labels(self, painter: QPainter, segment_info: list,
+                            text_color: QColor = QColor("black"), mirrored: bool = False):
+        """
+        Draw segment labels inside the donut segments
+        """
+        painter.save()
+        if mirrored:   # Fix for text mirroring
+            painter.scale(1, -1)
+        label_font = QFont("Arial", 8, QFont.Weight.Bold)
+        painter.setFont(label_font)
+        painter.setPen(text_color)
+
+        label_radius = (self.radius + self.inner_radius) / 2.0
+        for mid_angle, label in segment_info:
+            rad = math.radians(mid_angle)
+            x = label_radius * math.cos(rad)
+            y = label_radius * math.sin(rad)
+            fm = painter.fontMetrics()
+            text_width = fm.horizontalAdvance(label)
+            text_height = fm.height() * 2
+            text_rect = QRectF(x - text_width / 2, y - text_height / 2, text_width, text_height)
+            painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, label)
+        painter.restore()
+
+    def draw_inner_circle(self, painter: QPainter):
+        """
+        Draws inner circle with the same background color to create the donut effect
+        """
+        inner_rect = QRectF(-self.inner_radius, -self.inner_radius, 2 * self.inner_radius, 2 * self.inner_radius)
+        painter.save()
+        painter.setBrush(self.background_color)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawEllipse(inner_rect)
+        painter.restore()
+
+    def draw_total_calories(self, painter: QPainter, mirrored: bool = False):
+        """
+        Draws total calories in the center of the donut chart.
+        """
+        painter.save()
+        if mirrored:   # Fix for text mirroring
+            painter.scale(1, -1)
+        painter.setPen(self.text_color)
+        total_font = QFont("Arial", 16, QFont.Weight.Bold)
+        painter.setFont(total_font)
+        total_text = f"{self.nutrition_data.calories:.0f}\nkcal"
+        fm_total = painter.fontMetrics()
+        total_text_width = fm_total.horizontalAdvance(total_text)
+        total_text_height = fm_total.height() * 2
+        total_text_rect = QRectF(-total_text_width / 2, -total_text_height / 2, total_text_width, total_text_height)
+        painter.drawText(total_text_rect, Qt.AlignmentFlag.AlignCenter, total_text)
+        painter.restore()
+
+    def boundingRect(self):
+        return QRectF(-self.radius, -self.radius, 2 * self.radius, 2 * self.radius)
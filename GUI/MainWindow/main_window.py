@@ -8,37 +8,67 @@ Module for the main window user interface
 
 from PySide6.QtCore import QEvent
 
-from GUI.Common.event_manager import event_manager
+from GUI.Common.event_manager import event_manager, ChangeEntity, DataChangeEvent
 from GUI.Common.dialogs import open_file_dialog, save_file_dialog
 from GUI.Common.gui_util_functions import update_tooltip_style
 from GUI.Dialogs.confirmation import DialogConfirmation
 from GUI.Dialogs.save_before_close import DialogSaveBeforeClose
 from Settings.app_env import Program_Version, get_light_icon, get_dark_icon, desktop_path, get_window_icon, WindowTheme
 from Core.ctr_data import CTRData, SavefileExtension
+from Core.enums import ServingType
+from Core.undo_stack import UndoStack, EditCommand
+from Core.instrumentation import instrumentation
 from Core.csv_data_models import (CTRDataModel, DailyIntakeDataModel, CatalogueDataModel, RecipesDataModel,
                                   InformationDataModel)
-from GUI.MainWindow.page_daily_intake import PageDailyIntake
-from GUI.MainWindow.page_catalogue import PageCatalogue
-from GUI.MainWindow.page_recipes import PageRecipes
-from GUI.Icons import resources     # noqa: F401
+from GUI.MainWindow.page_base import MainWindowPage
 from GUI.UiFiles.PYUI.MainWindow import Ui_MainWindow
 
 import os
-import qdarktheme
+import importlib
 from enum import Enum
-from typing import Any
+from typing import Any, TYPE_CHECKING
 from timeit import default_timer as timer
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QActionGroup, QAction
+from PySide6.QtGui import QActionGroup, QAction, QKeySequence
 from PySide6.QtWidgets import QMainWindow, QApplication, QStackedWidget, QToolBar, QDialog, QMessageBox
 
 from Settings.config_enums import ConfirmationCategory, DialogWindow
 
+if TYPE_CHECKING:
+    from GUI.MainWindow.page_daily_intake import PageDailyIntake
+    from GUI.MainWindow.page_catalogue import PageCatalogue
+    from GUI.MainWindow.page_recipes import PageRecipes
+    from GUI.MainWindow.page_history import PageHistory
+
 
 class MainWindowDisplay(Enum):
     DISPLAY_DAILY_INTAKE = "Daily Intake"
     DISPLAY_CATALOGUE = "Catalogue"
     DISPLAY_RECIPES = "Recipes"
+    DISPLAY_HISTORY = "History"
+
+
+# Page modules are imported on first display of the page, pyqtgraph is loaded only with the history page
+_PAGE_TYPES: dict[MainWindowDisplay, tuple[str, str]] = {
+    MainWindowDisplay.DISPLAY_DAILY_INTAKE: ("GUI.MainWindow.page_daily_intake", "PageDailyIntake"),
+    MainWindowDisplay.DISPLAY_CATALOGUE: ("GUI.MainWindow.page_catalogue", "PageCatalogue"),
+    MainWindowDisplay.DISPLAY_RECIPES: ("GUI.MainWindow.page_recipes", "PageRecipes"),
+    MainWindowDisplay.DISPLAY_HISTORY: ("GUI.MainWindow.page_history", "PageHistory"),
+}
+
+
+def get_page_type(display: MainWindowDisplay) -> type[MainWindowPage]:
+    module_name, class_name = _PAGE_TYPES[display]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def set_qdarktheme(theme: str) -> None:
+    """
+    Applies the qdarktheme style sheet, the package is imported on first use.
+    :param theme: qdarktheme theme name - "dark", "light" or "auto".
+    """
+    import qdarktheme
+    qdarktheme.setup_theme(theme=theme)
 
 
 class CTRMainWindow(QMainWindow):
@@ -61,16 +91,25 @@ class CTRMainWindow(QMainWindow):
         self.setWindowIcon(self.window_icon)
 
         self.actiongroup_display = QActionGroup(self)
+        self.action_history = QAction("History", self)
+        self.action_undo = QAction("Undo", self)
+        self.action_redo = QAction("Redo", self)
+        self.action_merge_data_tracker_savefile = QAction("Merge CTR Data...", self)
 
         self.dont_ask_for_confirmation: list[ConfirmationCategory] = []
 
         self.ctr_data = CTRData(filename="CTR Savefile")
         self._unsaved_data: bool = False
         self.working_directory: str = desktop_path
+        self.undo_stack = UndoStack()
 
-        self.page_daily_intake = PageDailyIntake(self)
-        self.page_catalogue = PageCatalogue(self)
-        self.page_recipes = PageRecipes(self)
+        # Subscribed before the pages are created, so that the cached data is invalidated before the pages update
+        event_manager().subscribe(self.on_daily_intake_data_changed, entities=[ChangeEntity.DAILY_INTAKE])
+        event_manager().subscribe(self.on_item_data_changed, entities=[ChangeEntity.CATALOGUE, ChangeEntity.RECIPES])
+
+        # Pages are constructed and populated on first display, except the initially shown daily intake page
+        self.pages: dict[MainWindowDisplay, MainWindowPage] = {}
+        self.get_page(MainWindowDisplay.DISPLAY_DAILY_INTAKE)
 
         self.dialogs: dict[DialogWindow, Any] = {}
 
@@ -93,26 +132,71 @@ class CTRMainWindow(QMainWindow):
     def setup_initial_theme(self):
         if self.window_theme is WindowTheme.DARK:
             self.set_dark_theme_icons()
-            self.page_daily_intake.set_dark_theme()
-            self.page_catalogue.set_dark_theme_button_icons()
-            self.page_recipes.set_dark_theme_button_icons()
         else:
             self.set_light_theme_icons()
-            self.page_daily_intake.set_light_theme()
-            self.page_catalogue.set_light_theme_button_icons()
-            self.page_recipes.set_light_theme_button_icons()
 
         update_tooltip_style(self.window_theme, self)
 
+    @property
+    def page_daily_intake(self) -> "PageDailyIntake":
+        return self.get_page(MainWindowDisplay.DISPLAY_DAILY_INTAKE)
+
+    @property
+    def page_catalogue(self) -> "PageCatalogue":
+        return self.get_page(MainWindowDisplay.DISPLAY_CATALOGUE)
+
+    @property
+    def page_recipes(self) -> "PageRecipes":
+        return self.get_page(MainWindowDisplay.DISPLAY_RECIPES)
+
+    @property
+    def page_history(self) -> "PageHistory":
+        return self.get_page(MainWindowDisplay.DISPLAY_HISTORY)
+
+    def get_page(self, display: MainWindowDisplay) -> Any:
+        """
+        Returns the main window page, constructing and populating the page from the current tracker data
+        on first access.
+        """
+        page = self.pages.get(display, None)
+        if page is None:
+            with instrumentation().span(f"{display.value} page constructed", log=True):
+                page = get_page_type(display)(self)
+                self.pages[display] = page
+                self.set_page_theme(page)
+                page.refresh_page()
+
+        return page
+
+    def set_page_theme(self, page: MainWindowPage):
+        if self.window_theme is WindowTheme.DARK:
+            page.set_dark_theme()
+        else:
+            page.set_light_theme()
+
+    def refresh_pages(self, displays: list[MainWindowDisplay] | None = None):
+        """
+        Refreshes the constructed pages, postponing the refresh of hidden pages until they are shown.
+        Pages not constructed yet are populated with the current data on construction.
+        :param displays: Pages to refresh, all pages if None.
+        """
+        for display, page in self.pages.items():
+            if displays is None or display in displays:
+                page.refresh_or_mark_dirty()
+
     def setup_dialogs_dictionary(self):
         for dialog_enum in DialogWindow:
             self.dialogs[dialog_enum] = None
 
     def setup_main_window_display_toggles(self):
+        self.action_history.setCheckable(True)
+        self.main_window.toolBar_navigation.addAction(self.action_history)
+
         buttons: dict[QAction, MainWindowDisplay] = {
             self.main_window.action_daily_intake: MainWindowDisplay.DISPLAY_DAILY_INTAKE,
             self.main_window.action_catalogue: MainWindowDisplay.DISPLAY_CATALOGUE,
-            self.main_window.action_recipes: MainWindowDisplay.DISPLAY_RECIPES}
+            self.main_window.action_recipes: MainWindowDisplay.DISPLAY_RECIPES,
+            self.action_history: MainWindowDisplay.DISPLAY_HISTORY}
 
         for action, data in buttons.items():
             action.setData(data)
@@ -123,6 +207,7 @@ class CTRMainWindow(QMainWindow):
         self.main_window.action_daily_intake.triggered.connect(self.switch_main_window_display)
         self.main_window.action_catalogue.triggered.connect(self.switch_main_window_display)
         self.main_window.action_recipes.triggered.connect(self.switch_main_window_display)
+        self.action_history.triggered.connect(self.switch_main_window_display)
 
     def setup_menubar_buttons(self):
         self.main_window.action_theme_fusion.triggered.connect(self.setup_fusion_theme)
@@ -132,6 +217,9 @@ class CTRMainWindow(QMainWindow):
     def setup_menubar_actions(self):
         # File menu
         self.main_window.action_menubar_open.triggered.connect(self.dialog_open_data_tracker_savefile)
+        self.main_window.menuFile.insertAction(self.main_window.action_menubar_save,
+                                               self.action_merge_data_tracker_savefile)
+        self.action_merge_data_tracker_savefile.triggered.connect(self.dialog_merge_data_tracker_savefile)
         self.main_window.action_menubar_save.triggered.connect(self.dialog_save_data_tracker_savefile)
         self.main_window.action_menubar_save_as.triggered.connect(self.dialog_save_data_tracker_savefile)
         self.main_window.action_menubar_quit.triggered.connect(self.close)
@@ -153,11 +241,22 @@ class CTRMainWindow(QMainWindow):
         self.main_window.actionOpen.triggered.connect(self.dialog_open_data_tracker_savefile)
         self.main_window.actionSave.triggered.connect(self.dialog_save_data_tracker_savefile)
 
+        self.action_undo.setShortcut(QKeySequence.StandardKey.Undo)
+        self.action_redo.setShortcut(QKeySequence.StandardKey.Redo)
+        self.action_undo.triggered.connect(self.on_undo)
+        self.action_redo.triggered.connect(self.on_redo)
+
+        self.main_window.toolBar_file.addSeparator()
+        self.main_window.toolBar_file.addAction(self.action_undo)
+        self.main_window.toolBar_file.addAction(self.action_redo)
+        self.update_undo_actions()
+
     def enable_event_filters(self):
         self.installEventFilter(self)
 
     def connect_main_window_signals(self):
         event_manager().on_data_changed.connect(self._set_unsaved_data)
+        event_manager().on_data_changed.connect(self.update_undo_actions)
 
     def eventFilter(self, source, event):
         if event.type() == QEvent.Type.Close:
@@ -169,13 +268,75 @@ class CTRMainWindow(QMainWindow):
             return super().eventFilter(source, event)
 
     def _set_unsaved_data(self, msg: str | None = None) -> None:
-        print(f"Data change event;  EventManager ID {id(event_manager())};  Msg: '{msg}'")
-
         if self._unsaved_data:
-            pass
-        else:
-            self._unsaved_data = True
-            self.update_window_title(show_data_name=True)
+            return
+
+        print(f"Unsaved data changes;  Msg: '{msg}'")
+        self._unsaved_data = True
+        self.update_window_title(show_data_name=True)
+
+    def on_daily_intake_data_changed(self, changes: list[DataChangeEvent]) -> None:
+        for change in changes:
+            self.ctr_data.invalidate_daily_intake_totals(change.dates)
+
+    def on_item_data_changed(self, changes: list[DataChangeEvent]) -> None:
+        for change in changes:
+            item_ids = change.item_ids if change.item_ids and not change.structural else None
+            if change.entity is ChangeEntity.CATALOGUE:
+                self.ctr_data.invalidate_name_index(ServingType.PRODUCT)
+                self.ctr_data.invalidate_recipe_totals(product_ids=item_ids)
+            elif change.entity is ChangeEntity.RECIPES:
+                self.ctr_data.invalidate_name_index(ServingType.RECIPE)
+                self.ctr_data.invalidate_recipe_totals(recipe_ids=item_ids)
+
+    def update_undo_actions(self, *args):
+        """
+        Enables the undo / redo actions and updates their tooltips based on the undo history.
+        """
+        self.action_undo.setEnabled(self.undo_stack.can_undo())
+        self.action_redo.setEnabled(self.undo_stack.can_redo())
+        self.action_undo.setToolTip(f"Undo {self.undo_stack.undo_description()}".strip())
+        self.action_redo.setToolTip(f"Redo {self.undo_stack.redo_description()}".strip())
+
+    def on_undo(self):
+        command = self.undo_stack.undo()
+        if command is not None:
+            self.on_undo_stack_changed(command, message=f"Undo {command.description}")
+
+    def on_redo(self):
+        command = self.undo_stack.redo()
+        if command is not None:
+            self.on_undo_stack_changed(command, message=f"Redo {command.description}")
+
+    def on_undo_stack_changed(self, command: EditCommand, message: str):
+        """
+        Dispatches the changes of the undone or redone edit and refreshes the pages displaying the changed data.
+        """
+        entities: set[ChangeEntity] = set()
+        for change in command.get_contexts():
+            if not isinstance(change, DataChangeEvent):
+                continue
+            entities.add(change.entity)
+            event_manager().queue_change(DataChangeEvent(entity=change.entity,
+                                                         item_ids=set(change.item_ids),
+                                                         dates=set(change.dates),
+                                                         structural=change.structural,
+                                                         messages=[message]))
+        event_manager().dispatch_pending_changes()
+
+        displays = []
+        if ChangeEntity.CATALOGUE in entities:
+            displays.append(MainWindowDisplay.DISPLAY_CATALOGUE)
+
+        if ChangeEntity.RECIPES in entities:
+            displays.append(MainWindowDisplay.DISPLAY_RECIPES)
+
+        if entities.intersection([ChangeEntity.DAILY_INTAKE, ChangeEntity.NUTRITION_TARGETS]):
+            displays.append(MainWindowDisplay.DISPLAY_DAILY_INTAKE)
+
+        self.refresh_pages(displays)
+
+        self.update_undo_actions()
 
     def reset_unsaved_data_flag(self):
         self._unsaved_data = False
@@ -196,19 +357,18 @@ class CTRMainWindow(QMainWindow):
             self.setWindowTitle(self.gui_window_title)
 
     def switch_main_window_display(self):
+        """
+        Shows the selected main window page, constructing it on first display
+        or refreshing it if its data changed while the page was hidden.
+        """
         checked_action: QAction = self.actiongroup_display.checkedAction()
         window_display = checked_action.data()
 
         display_stacked_widget: QStackedWidget = self.main_window.stackedWidget_main
 
-        if window_display is MainWindowDisplay.DISPLAY_DAILY_INTAKE:
-            display_stacked_widget.setCurrentIndex(0)
-
-        elif window_display is MainWindowDisplay.DISPLAY_CATALOGUE:
-            display_stacked_widget.setCurrentIndex(1)
-
-        elif window_display is MainWindowDisplay.DISPLAY_RECIPES:
-            display_stacked_widget.setCurrentIndex(2)
+        page: MainWindowPage = self.get_page(window_display)
+        display_stacked_widget.setCurrentWidget(page.page_widget)
+        page.refresh_if_dirty()
 
     def set_dark_theme_icons(self):
         icons = {
@@ -217,6 +377,9 @@ class CTRMainWindow(QMainWindow):
             "dashboard_dark.png": self.main_window.action_daily_intake,
             "catalogue_dark.png": self.main_window.action_catalogue,
             "recipe_dark.png": self.main_window.action_recipes,
+            "calendar_dark.png": self.action_history,
+            "undo_dark.png": self.action_undo,
+            "redo_dark.png": self.action_redo,
         }
 
         for icon, button in icons.items():
@@ -229,6 +392,9 @@ class CTRMainWindow(QMainWindow):
             "dashboard.png": self.main_window.action_daily_intake,
             "catalogue.png": self.main_window.action_catalogue,
             "recipe.png": self.main_window.action_recipes,
+            "calendar.png": self.action_history,
+            "undo.png": self.action_undo,
+            "redo.png": self.action_redo,
         }
 
         for icon, button in icons.items():
@@ -239,13 +405,12 @@ class CTRMainWindow(QMainWindow):
         Sets dark theme to all windows and updates tooltip background / text color
         of the main window and all open dialog windows.
         """
-        qdarktheme.setup_theme(theme="dark")
+        set_qdarktheme("dark")
         self.window_theme = WindowTheme.DARK
 
         self.set_dark_theme_icons()
-        self.page_daily_intake.set_dark_theme()
-        self.page_catalogue.set_dark_theme_button_icons()
-        self.page_recipes.set_dark_theme_button_icons()
+        for page in self.pages.values():
+            page.set_dark_theme()
         update_tooltip_style(self.window_theme, self)
 
         for dialog in self.dialogs.values():
@@ -262,13 +427,12 @@ class CTRMainWindow(QMainWindow):
         The dialog has to implement a update_icon_theme function to enable icon
         update on change in the selected theme.
         """
-        qdarktheme.setup_theme(theme="light")
+        set_qdarktheme("light")
         self.window_theme = WindowTheme.LIGHT
 
         self.set_light_theme_icons()
-        self.page_daily_intake.set_light_theme()
-        self.page_catalogue.set_light_theme_button_icons()
-        self.page_recipes.set_light_theme_button_icons()
+        for page in self.pages.values():
+            page.set_light_theme()
         update_tooltip_style(self.window_theme, self)
 
         for dialog in self.dialogs.values():
@@ -282,7 +446,7 @@ class CTRMainWindow(QMainWindow):
         Sets the default Windows system theme to all windows and updates tooltip background / text color
         of the main window and all open dialog windows.
         """
-        qdarktheme.setup_theme(theme="auto")
+        set_qdarktheme("auto")
         self.set_light_theme_icons()
         self.window_theme = WindowTheme.FUSION
 
@@ -294,23 +458,62 @@ class CTRMainWindow(QMainWindow):
         """
         Method executes setup of the Main window on opening of a CTR Data savefile.
         """
-        self.page_daily_intake.refresh_table()
-        self.page_daily_intake.update_intake_target_inputs()
-        self.page_catalogue.refresh_table()
-        self.page_recipes.refresh_recipes_list()
-        self.page_recipes.refresh_ingredients_table()
+        self.undo_stack.clear()
+        self.update_undo_actions()
+        self.refresh_pages()
 
     def import_daily_intake(self, filepath: str):
         DailyIntakeDataModel(filepath=filepath).read_savefile(self.ctr_data)
-        self.page_daily_intake.refresh_table()
+        self.undo_stack.clear()
+        self.update_undo_actions()
+        self.ctr_data.invalidate_daily_intake_totals()
+        self.refresh_pages([MainWindowDisplay.DISPLAY_DAILY_INTAKE, MainWindowDisplay.DISPLAY_HISTORY])
+
+    def ask_merge_or_replace(self, window_title: str, message: str) -> bool | None:
+        """
+        Asks whether to merge the imported data into the current data, or to replace it.
+        Returns True for merge, False for replace and None if the import was cancelled.
+        """
+        message_box = QMessageBox(self)
+        message_box.setWindowTitle(window_title)
+        message_box.setText(message)
+        merge_button = message_box.addButton("Merge", QMessageBox.ButtonRole.AcceptRole)
+        replace_button = message_box.addButton("Replace", QMessageBox.ButtonRole.DestructiveRole)
+        message_box.addButton(QMessageBox.StandardButton.Cancel)
+        message_box.exec()
+
+        if message_box.clickedButton() not in [merge_button, replace_button]:
+            return None
+        return message_box.clickedButton() is merge_button
 
     def import_catalogue(self, filepath: str):
-        CatalogueDataModel(filepath=filepath).read_savefile(self.ctr_data)
-        self.page_catalogue.refresh_table()
+        merge = False
+        if len(self.ctr_data.product_catalogue) > 1:
+            merge = self.ask_merge_or_replace("Import Catalogue",
+                                              "Merge the imported Products into the current catalogue,\n"
+                                              "or replace the current catalogue?")
+            if merge is None:
+                return
+
+        CatalogueDataModel(filepath=filepath, merge=merge).read_savefile(self.ctr_data)
+        self.undo_stack.clear()
+        self.update_undo_actions()
+        self.refresh_pages([MainWindowDisplay.DISPLAY_CATALOGUE])
 
     def import_recipes(self, filepath: str):
-        RecipesDataModel(filepath=filepath).read_savefile(self.ctr_data)
-        self.page_recipes.refresh_recipes_list()
+        merge = False
+        if len(self.ctr_data.recipes_record) > 1:
+            merge = self.ask_merge_or_replace("Import Recipes",
+                                              "Merge the imported recipes into the current recipes,\n"
+                                              "or replace the current recipes?")
+            if merge is None:
+                return
+
+        # Ingredient Product IDs are read as catalogue IDs, recipes of another catalogue are merged with the CTR Data
+        RecipesDataModel(filepath=filepath, merge=merge).read_savefile(self.ctr_data)
+        self.undo_stack.clear()
+        self.update_undo_actions()
+        self.refresh_pages([MainWindowDisplay.DISPLAY_RECIPES])
 
     def dialog_open_data_tracker_savefile(self):
         file = open_file_dialog(
@@ -323,6 +526,18 @@ class CTRMainWindow(QMainWindow):
             self.ctr_data = CTRDataModel(filepath=file).read_savefile()
             self.setup_on_ctr_data_open()
 
+    def dialog_merge_data_tracker_savefile(self):
+        file = open_file_dialog(
+            parent=self,
+            window_title="Merge CTR Data",
+            name_filter=f"CTR (*{SavefileExtension.CTR_DATA.value})",
+            export_dir=desktop_path)
+
+        if file:
+            CTRDataModel(filepath=file).merge_savefile(self.ctr_data)
+            self.setup_on_ctr_data_open()
+            self._set_unsaved_data("CTR Data merged")
+
     def dialog_save_data_tracker_savefile(self):
         file = save_file_dialog(
             parent=self,
@@ -543,9 +758,9 @@ def setup_initial_theme(
         theme: WindowTheme = WindowTheme.DARK
 ) -> WindowTheme:
     if theme is WindowTheme.LIGHT:
-        qdarktheme.setup_theme(theme="light")
+        set_qdarktheme("light")
     elif theme is WindowTheme.DARK:
-        qdarktheme.setup_theme(theme="dark")
+        set_qdarktheme("dark")
     else:
         app.setStyle("Fusion")
 
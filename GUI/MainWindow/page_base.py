@@ -1,12 +1,18 @@
 
 from Core.ctr_data import CTRData
+from Core.undo_stack import UndoStack
 from GUI.UiFiles.PYUI.MainWindow import Ui_MainWindow
 
+from PySide6.QtWidgets import QWidget
+
 
 class MainWindowPage:
     def __init__(self, mw):
         self.mw = mw   # CTR Main window
 
+        # Page displays outdated data, to be refreshed when the page is shown
+        self.dirty: bool = False
+
     @property
     def main_window(self) -> Ui_MainWindow:
         if hasattr(self.mw, "main_window"):
@@ -21,3 +27,49 @@ class MainWindowPage:
         else:
             raise AttributeError()
 
+    @property
+    def undo_stack(self) -> UndoStack:
+        if hasattr(self.mw, "undo_stack"):
+            return self.mw.undo_stack
+        else:
+            raise AttributeError()
+
+    @property
+    def page_widget(self) -> QWidget:
+        """
+        Main window stacked widget page containing the page elements.
+        """
+        raise NotImplementedError
+
+    def is_page_visible(self) -> bool:
+        return self.main_window.stackedWidget_main.currentWidget() is self.page_widget
+
+    def set_dark_theme(self) -> None:
+        ...
+
+    def set_light_theme(self) -> None:
+        ...
+
+    def refresh_page(self) -> None:
+        """
+        Refreshes all page elements from the current tracker data.
+        """
+        raise NotImplementedError
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+
+    def refresh_if_dirty(self) -> None:
+        if self.dirty:
+            self.dirty = False
+            self.refresh_page()
+
+    def refresh_or_mark_dirty(self) -> None:
+        """
+        Refreshes the page if it is currently shown, otherwise the refresh is postponed until the page is shown.
+        """
+        if self.is_page_visible():
+            self.dirty = False
+            self.refresh_page()
+        else:
+            self.mark_dirty()
@@ -3,16 +3,18 @@
 from Core.product import Product
 from Core.enums import ProductCategory
 from Core.units import MeasurementUnit
+from Core.undo_stack import DictInsert, DictRemove
+from Core.instrumentation import instrumentation
 from GUI.MainWindow.page_base import MainWindowPage
-from GUI.Common.event_manager import event_manager
-from GUI.Common.custom_widgets import (CustomDataTable, DoubleSpinBoxDelegate,
-                                       AutoCompleteDelegate, new_table_item_ne, new_table_item, ComboBoxDelegate)
+from GUI.Common.event_manager import event_manager, ChangeEntity, DataChangeEvent
+from GUI.Common.custom_widgets import (CustomDataTable, DoubleSpinBoxDelegate, AutoCompleteDelegate,
+                                       CompletionModel, new_table_item_ne, new_table_item, ComboBoxDelegate)
 
 from enum import Enum, auto
-from timeit import default_timer as timer
+from typing import Any
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QCursor
-from PySide6.QtWidgets import QMainWindow, QLayout, QTableWidgetItem, QHeaderView, QMenu, QInputDialog
+from PySide6.QtWidgets import QMainWindow, QLayout, QTableWidgetItem, QHeaderView, QMenu, QInputDialog, QWidget
 
 from Settings.app_env import get_dark_icon, get_light_icon
 
@@ -50,6 +52,13 @@ _NUTRITION_DATA_COLUMNS: list[TableCol] = [
     TableCol.PROTEIN
 ]
 
+_NUMERIC_COLUMNS: list[TableCol] = [
+    TableCol.PACKAGING_AMOUNT,
+    TableCol.DENSITY,
+    TableCol.PRICE,
+    *_NUTRITION_DATA_COLUMNS
+]
+
 
 class PageCatalogue(MainWindowPage):
     def __init__(self, mw: QMainWindow):
@@ -77,6 +86,8 @@ class PageCatalogue(MainWindowPage):
             TableCol.FILLER,
         ]
 
+        self.ac_delegate = AutoCompleteDelegate(self.table)
+
         self.setup_page()
 
     def setup_page(self) -> None:
@@ -88,6 +99,20 @@ class PageCatalogue(MainWindowPage):
         self.setup_cbox_delegates()
         self.table.set_rmb_action_method(self.custom_rmb_action_menu)
 
+    @property
+    def page_widget(self) -> QWidget:
+        return self.main_window.page_catalogue
+
+    def set_dark_theme(self) -> None:
+        self.set_dark_theme_button_icons()
+
+    def set_light_theme(self) -> None:
+        self.set_light_theme_button_icons()
+
+    def refresh_page(self) -> None:
+        self.refresh_table()
+        self.refresh_completion_models()
+
     def set_dark_theme_button_icons(self) -> None:
         icons = {
             "cancel_dark.png": self.main_window.pushButton_clear_catalogue_search,
@@ -135,6 +160,10 @@ class PageCatalogue(MainWindowPage):
         self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_catalogue_data)
         self.table.set_column_non_editable(column_index=self.column.index(TableCol.FILLER))
 
+        self.table.numeric_input_columns = [self.column.index(column) for column in _NUMERIC_COLUMNS]
+        self.table.set_bulk_paste_method(self.set_pasted_catalogue_data)
+        self.table.set_copied_value_method(self.get_copied_catalogue_value)
+
         self.table.setSortingEnabled(True)
 
     def setup_search_function(self) -> None:
@@ -144,11 +173,35 @@ class PageCatalogue(MainWindowPage):
         self.main_window.lineEdit_catalogue_search.clear()
 
     def setup_auto_complete_delegate(self) -> None:
-        ac_delegate = AutoCompleteDelegate(self.table)
+        self.table.setItemDelegateForColumn(self.column.index(TableCol.NAME), self.ac_delegate)
+        self.table.setItemDelegateForColumn(self.column.index(TableCol.DESCRIPTION), self.ac_delegate)
+        self.table.setItemDelegateForColumn(self.column.index(TableCol.MANUFACTURER), self.ac_delegate)
+
+    def get_completion_model(self, column: TableCol) -> CompletionModel:
+        return self.ac_delegate.get_completion_model(self.column.index(column))
+
+    def refresh_completion_models(self) -> None:
+        """
+        Rebuilds the auto-completion models of the name, description and manufacturer columns from the catalogue.
+        """
+        products = [product for product in self.ctr_data.product_catalogue.values() if product.item_id != 0]
+
+        self.get_completion_model(TableCol.NAME).set_values(
+            product.name for product in products)
+        self.get_completion_model(TableCol.DESCRIPTION).set_values(
+            product.additional_data.description for product in products)
+        self.get_completion_model(TableCol.MANUFACTURER).set_values(
+            product.additional_data.manufacturer for product in products)
 
-        self.table.setItemDelegateForColumn(self.column.index(TableCol.NAME), ac_delegate)
-        self.table.setItemDelegateForColumn(self.column.index(TableCol.DESCRIPTION), ac_delegate)
-        self.table.setItemDelegateForColumn(self.column.index(TableCol.MANUFACTURER), ac_delegate)
+    def add_completion_values(self, product: Product) -> None:
+        self.get_completion_model(TableCol.NAME).add_value(product.name)
+        self.get_completion_model(TableCol.DESCRIPTION).add_value(product.additional_data.description)
+        self.get_completion_model(TableCol.MANUFACTURER).add_value(product.additional_data.manufacturer)
+
+    def remove_completion_values(self, product: Product) -> None:
+        self.get_completion_model(TableCol.NAME).remove_value(product.name)
+        self.get_completion_model(TableCol.DESCRIPTION).remove_value(product.additional_data.description)
+        self.get_completion_model(TableCol.MANUFACTURER).remove_value(product.additional_data.manufacturer)
 
     def setup_custom_spinbox_delegate(self) -> None:
         nutrition_value_delegate = DoubleSpinBoxDelegate(
@@ -234,27 +287,44 @@ class PageCatalogue(MainWindowPage):
         Refreshes the table data from the current tracker data.
         Table itemChanged signal is disconnected for the duration of the data refresh.
         """
-        start = timer()
-        self.table.set_item_changed_signal(connection_status=False, on_changed=self.set_catalogue_data)
-        self.table.save_scroll_bar_location()
-        self.table.clear_table()
+        with instrumentation().span("Catalogue table refreshed", log=True,
+                                    rows=len(self.ctr_data.product_catalogue)):
+            self.table.set_item_changed_signal(connection_status=False, on_changed=self.set_catalogue_data)
+            self.table.save_scroll_bar_location()
+            self.table.clear_table()
 
-        self.table.setRowCount(len(self.ctr_data.product_catalogue))
-        for index, item in enumerate(self.ctr_data.product_catalogue.values()):
-            self.table.update_table_row(row=index, row_items=self.row_items_dictionary(item))
+            self.table.setRowCount(len(self.ctr_data.product_catalogue))
+            for index, item in enumerate(self.ctr_data.product_catalogue.values()):
+                self.table.update_table_row(row=index, row_items=self.row_items_dictionary(item))
 
-        self.table.restore_scroll_bar_location()
-        self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_catalogue_data)
-        end = timer()
-        print(f"Catalogue table refreshed in {end - start} s")
+            self.table.restore_scroll_bar_location()
+            self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_catalogue_data)
 
     @staticmethod
     def get_selected_category(item: QTableWidgetItem) -> ProductCategory | None:
-        return item.data(Qt.ItemDataRole.UserRole)
+        """
+        Returns the category selected with the combobox delegate, or matching the pasted item text.
+        """
+        category = item.data(Qt.ItemDataRole.UserRole)
+        if isinstance(category, ProductCategory) and category.value == item.text():
+            return category
+        try:
+            return ProductCategory(item.text())
+        except ValueError:
+            return None
 
     @staticmethod
     def get_selected_unit(item: QTableWidgetItem) -> MeasurementUnit | None:
-        return item.data(Qt.ItemDataRole.UserRole)
+        """
+        Returns the unit selected with the combobox delegate, or matching the pasted item text.
+        """
+        unit = item.data(Qt.ItemDataRole.UserRole)
+        if isinstance(unit, MeasurementUnit) and unit.value == item.text():
+            return unit
+        try:
+            return MeasurementUnit(item.text())
+        except ValueError:
+            return None
 
     def get_selected_item(self, selected_row: int | None = None) -> Product | None:
         """
@@ -267,6 +337,31 @@ class PageCatalogue(MainWindowPage):
 
         return self.ctr_data.product_catalogue.get(item_id, None)
 
+    def get_copied_catalogue_value(self, row: int, column: int) -> Any:
+        """
+        Returns the catalogue data value shown in the table cell, copied instead of the displayed rounded text.
+        """
+        item = self.get_selected_item(selected_row=row)
+        if item is None:
+            return None
+
+        values = {
+            TableCol.ID: item.item_id,
+            TableCol.NAME: item.name,
+            TableCol.CATEGORY: item.category,
+            TableCol.DESCRIPTION: item.additional_data.description,
+            TableCol.MANUFACTURER: item.additional_data.manufacturer,
+            TableCol.PACKAGING_AMOUNT: item.additional_data.packaging_amount,
+            TableCol.PACKAGING_UNIT: item.additional_data.packaging_unit,
+            TableCol.DENSITY: item.additional_data.density,
+            TableCol.PRICE: item.additional_data.price,
+            TableCol.CALORIES: item.nutrition_data.calories,
+            TableCol.FAT: item.nutrition_data.fat,
+            TableCol.CARBS: item.nutrition_data.carbs,
+            TableCol.PROTEIN: item.nutrition_data.protein,
+        }
+        return values.get(self.column[column], None)
+
     def get_selected_items(self) -> list[Product]:
         selected_item_ids = self.table.get_selected_ids(id_column_index=self.column.index(TableCol.ID))
         selected_items: list = []
@@ -310,22 +405,32 @@ class PageCatalogue(MainWindowPage):
         menu.exec_(QCursor.pos())
 
     def on_add_new_catalogue_item(self) -> None:
-        self.ctr_data.add_product("New Food Product")
+        new_product = self.ctr_data.add_product("New Food Product")
+        self.add_completion_values(new_product)
+        self.record_structural_change(DictInsert, new_product, "Add Product")
 
-        event_manager().emit_data_changed(f"Catalogue Page: Added a new Product")
+        event_manager().emit_data_changed(f"Catalogue Page: Added a new Product", ChangeEntity.CATALOGUE,
+                                          item_ids=[new_product.item_id], structural=True)
         self.refresh_table()
 
     def on_duplicate_catalogue_item(self, selected_row: int) -> None:
         item_id = self.table.get_current_integer_value(self.column.index(TableCol.ID), selected_row)
         duplicate_product = self.ctr_data.duplicate_product(product_id=item_id)
+        if duplicate_product is None:
+            return
+        self.add_completion_values(duplicate_product)
+        self.record_structural_change(DictInsert, duplicate_product, "Duplicate Product")
 
-        event_manager().emit_data_changed(f"Catalogue Page: Duplicated product {duplicate_product.identifier_string}")
+        event_manager().emit_data_changed(f"Catalogue Page: Duplicated product {duplicate_product.identifier_string}",
+                                          ChangeEntity.CATALOGUE, structural=True)
         self.refresh_table()
 
     def on_renumber_product_ids(self):
         self.ctr_data.renumber_products()
+        self.undo_stack.clear()
 
-        event_manager().emit_data_changed(f"Catalogue Page: Renumbered all product IDs")
+        event_manager().emit_data_changed(f"Catalogue Page: Renumbered all product IDs",
+                                          ChangeEntity.CATALOGUE, structural=True)
         self.refresh_table()
 
     def on_set_product_id(self, selected_row: int):
@@ -344,8 +449,10 @@ class PageCatalogue(MainWindowPage):
 
         if confirmation:
             self.ctr_data.set_product_id(product, new_id=value)
+            self.undo_stack.clear()
 
-            event_manager().emit_data_changed(f"Catalogue Page: Changed product {product.name} ID to {value}")
+            event_manager().emit_data_changed(f"Catalogue Page: Changed product {product.name} ID to {value}",
+                                              ChangeEntity.CATALOGUE, structural=True)
             self.refresh_table()
 
     def on_add_to_daily_intake(self, selected_row: int) -> None:
@@ -353,11 +460,33 @@ class PageCatalogue(MainWindowPage):
 
     def on_remove_catalogue_item(self, selected_row: int) -> None:
         item_id = self.table.get_current_integer_value(self.column.index(TableCol.ID), selected_row)
-        self.ctr_data.remove_product(product_id=item_id)
+        product = self.ctr_data.product_catalogue.get(item_id, None)
+        if not self.ctr_data.remove_product(product_id=item_id):
+            return
+        self.remove_completion_values(product)
+        self.record_structural_change(DictRemove, product, "Remove Product")
 
-        event_manager().emit_data_changed(f"Catalogue Page: Removed product ID {item_id}")
+        event_manager().emit_data_changed(f"Catalogue Page: Removed product ID {item_id}",
+                                          ChangeEntity.CATALOGUE, item_ids=[item_id], structural=True)
         self.refresh_table()
 
+    def record_structural_change(self, command_type: type[DictInsert], product: Product, description: str) -> None:
+        """
+        Records the already applied insertion or removal of the product into the undo history.
+        """
+        self.undo_stack.push(command_type(self.ctr_data.product_catalogue, product.item_id, product,
+                                          description=f"{description} {product.identifier_string}",
+                                          context=DataChangeEvent(ChangeEntity.CATALOGUE,
+                                                                  item_ids={product.item_id}, structural=True)))
+
+    def set_product_value(self, product: Product, target: Any, attribute: str, value: Any) -> None:
+        """
+        Sets the attribute value of the product (or its additional / nutrition data) and records the undo history.
+        """
+        self.undo_stack.set_attribute(target, attribute, value,
+                                      description=f"Change {attribute} of {product.identifier_string}",
+                                      context=DataChangeEvent(ChangeEntity.CATALOGUE, item_ids={product.item_id}))
+
     def set_catalogue_data(self, changed_item: QTableWidgetItem) -> None:
         """
         Modifies catalogue data based on the changed QTableWidgetItem.
@@ -385,46 +514,115 @@ class PageCatalogue(MainWindowPage):
         elif column in _NUTRITION_DATA_COLUMNS:
             self.set_item_nutrition_data(item, row_index)
 
-    def set_item_name(self, item: Product, row: int) -> None:
-        item.name = self.table.get_current_string_value(self.column.index(TableCol.NAME), row)
+    def set_pasted_catalogue_data(self, pasted_cells: list[tuple[int, int]]) -> None:
+        """
+        Modifies catalogue data of all cells pasted into the table in a single batch.
+        Each changed column group is applied once per row, followed by a single data change event
+        and a single table refresh.
+        """
+        pasted_columns: dict[int, set[TableCol]] = {}
+        for row, column_index in pasted_cells:
+            pasted_columns.setdefault(row, set()).add(self.column[column_index])
+
+        changed_ids = []
+        with self.undo_stack.group("Paste Catalogue Data",
+                                   context=DataChangeEvent(ChangeEntity.CATALOGUE, structural=True)):
+            for row, columns in pasted_columns.items():
+                item: Product = self.get_selected_item(selected_row=row)
+                if item is None:
+                    continue
 
-        event_manager().emit_data_changed(f"Catalogue Page: Changed name for {item.identifier_string}")
+                if TableCol.NAME in columns:
+                    self.set_item_name(item, row, emit=False)
 
-    def set_item_category(self, widget_item: QTableWidgetItem, item: Product) -> None:
+                if TableCol.CATEGORY in columns:
+                    self.set_item_category(self.table.item(row, self.column.index(TableCol.CATEGORY)), item,
+                                           emit=False)
+
+                if TableCol.PACKAGING_UNIT in columns:
+                    self.set_packaging_unit(self.table.item(row, self.column.index(TableCol.PACKAGING_UNIT)), item,
+                                            emit=False)
+
+                if columns.intersection(_ADDITIONAL_DATA_COLUMNS):
+                    self.set_item_additional_data(item, row, emit=False)
+
+                if columns.intersection(_NUTRITION_DATA_COLUMNS):
+                    self.set_item_nutrition_data(item, row, emit=False)
+
+                changed_ids.append(item.item_id)
+
+        if not changed_ids:
+            return
+
+        event_manager().emit_data_changed(f"Catalogue Page: Pasted data of {len(changed_ids)} products",
+                                          ChangeEntity.CATALOGUE, item_ids=changed_ids)
+        self.refresh_table()
+
+    def set_item_name(self, item: Product, row: int, emit: bool = True) -> None:
+        previous_name = item.name
+        self.set_product_value(item, item, "name",
+                               self.table.get_current_string_value(self.column.index(TableCol.NAME), row))
+        self.get_completion_model(TableCol.NAME).replace_value(previous_name, item.name)
+
+        if emit:
+            event_manager().emit_data_changed(f"Catalogue Page: Changed name for {item.identifier_string}",
+                                              ChangeEntity.CATALOGUE, item_ids=[item.item_id])
+
+    def set_item_category(self, widget_item: QTableWidgetItem, item: Product, emit: bool = True) -> None:
         category = self.get_selected_category(widget_item)
         if category is None:
             category = ProductCategory.OTHER
-        item.category = category
+        self.set_product_value(item, item, "category", category)
 
-        event_manager().emit_data_changed(f"Catalogue Page: Changed category to {category.value} "
-                                          f"for {item.identifier_string}")
+        if emit:
+            event_manager().emit_data_changed(f"Catalogue Page: Changed category to {category.value} "
+                                              f"for {item.identifier_string}",
+                                              ChangeEntity.CATALOGUE, item_ids=[item.item_id])
 
-    def set_item_additional_data(self, item: Product, row: int) -> None:
+    def set_item_additional_data(self, item: Product, row: int, emit: bool = True) -> None:
         data = item.additional_data
+        previous_description = data.description
+        previous_manufacturer = data.manufacturer
+
+        for column, attribute in [(TableCol.DESCRIPTION, "description"),
+                                  (TableCol.MANUFACTURER, "manufacturer")]:
+            self.set_product_value(item, data, attribute,
+                                   self.table.get_current_string_value(self.column.index(column), row))
+
+        for column, attribute in [(TableCol.PACKAGING_AMOUNT, "packaging_amount"),
+                                  (TableCol.PRICE, "price")]:
+            self.set_product_value(item, data, attribute,
+                                   self.table.get_current_float_value(self.column.index(column), row))
 
-        data.description = self.table.get_current_string_value(self.column.index(TableCol.DESCRIPTION), row)
-        data.manufacturer = self.table.get_current_string_value(self.column.index(TableCol.MANUFACTURER), row)
-        data.packaging_amount = self.table.get_current_float_value(self.column.index(TableCol.PACKAGING_AMOUNT), row)
-        data.price = self.table.get_current_float_value(self.column.index(TableCol.PRICE), row)
+        self.get_completion_model(TableCol.DESCRIPTION).replace_value(previous_description, data.description)
+        self.get_completion_model(TableCol.MANUFACTURER).replace_value(previous_manufacturer, data.manufacturer)
 
-        event_manager().emit_data_changed(f"Catalogue Page: Changed additional data of {item.identifier_string}")
+        if emit:
+            event_manager().emit_data_changed(f"Catalogue Page: Changed additional data of {item.identifier_string}",
+                                              ChangeEntity.CATALOGUE, item_ids=[item.item_id])
 
-    def set_packaging_unit(self, widget_item: QTableWidgetItem, item: Product) -> None:
+    def set_packaging_unit(self, widget_item: QTableWidgetItem, item: Product, emit: bool = True) -> None:
         unit = self.get_selected_unit(widget_item)
         if unit is None:
             unit = MeasurementUnit.KG
 
-        item.additional_data.packaging_unit = unit
+        self.set_product_value(item, item.additional_data, "packaging_unit", unit)
 
-        event_manager().emit_data_changed(f"Catalogue Page: Changed packaging unit to {unit.value} "
-                                          f"for {item.identifier_string}")
+        if emit:
+            event_manager().emit_data_changed(f"Catalogue Page: Changed packaging unit to {unit.value} "
+                                              f"for {item.identifier_string}",
+                                              ChangeEntity.CATALOGUE, item_ids=[item.item_id])
 
-    def set_item_nutrition_data(self, item: Product, row: int) -> None:
+    def set_item_nutrition_data(self, item: Product, row: int, emit: bool = True) -> None:
         data = item.nutrition_data
 
-        data.calories = self.table.get_current_float_value(self.column.index(TableCol.CALORIES), row)
-        data.fat = self.table.get_current_float_value(self.column.index(TableCol.FAT), row)
-        data.carbs = self.table.get_current_float_value(self.column.index(TableCol.CARBS), row)
-        data.protein = self.table.get_current_float_value(self.column.index(TableCol.PROTEIN), row)
+        for column, attribute in [(TableCol.CALORIES, "calories"),
+                                  (TableCol.FAT, "fat"),
+                                  (TableCol.CARBS, "carbs"),
+                                  (TableCol.PROTEIN, "protein")]:
+            self.set_product_value(item, data, attribute,
+                                   self.table.get_current_float_value(self.column.index(column), row))
 
-        event_manager().emit_data_changed(f"Catalogue Page: Changed nutrition data of {item.identifier_string}")
+        if emit:
+            event_manager().emit_data_changed(f"Catalogue Page: Changed nutrition data of {item.identifier_string}",
+                                              ChangeEntity.CATALOGUE, item_ids=[item.item_id])
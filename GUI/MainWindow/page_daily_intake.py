@@ -1,11 +1,16 @@
 
 from Core.daily_intake import DailyIntake
 from Core.serving import Serving
-from Core.product import NutritionData
+from Core.product import Product, NutritionData
+from Core.recipe import Recipe
 from Core.enums import ServingType
+from Core.undo_stack import AttributeEdit, DictInsert, DictRemove, ListInsert, ListRemove
+from Core.instrumentation import instrumentation
+from Core.portion_solver import PortionSolution, get_portion_candidates, solve_portions
 from GUI.MainWindow.page_base import MainWindowPage
 from GUI.MainWindow.chart_widget import DailyIntakeWidget, DonutChartTargetWidget
-from GUI.Common.event_manager import event_manager
+from GUI.Common.event_manager import event_manager, ChangeEntity, DataChangeEvent
+from GUI.Common.worker import Worker, run_in_thread_pool
 from GUI.Common.custom_widgets import (CustomDataTable, CustomTableWidgetItem, SearchableComboBox,
                                        DoubleSpinBoxDelegate, new_table_item_ne, new_table_item,
                                        CustomCalendarWidget)
@@ -13,6 +18,7 @@ from Settings.app_env import get_dark_icon, get_light_icon
 from Settings.config_enums import ConfirmationCategory
 
 from enum import Enum, auto
+from typing import Any
 # from timeit import default_timer as timer
 from PySide6.QtCore import Qt, QSize, QDate, QPoint
 from PySide6.QtGui import QTextCharFormat, QBrush, QColor, QCursor, QIcon
@@ -20,6 +26,14 @@ from PySide6.QtWidgets import (QLayout, QHeaderView, QTableWidgetItem, QSplitter
                                QVBoxLayout, QWidget, QSpinBox, QAbstractSpinBox, QHBoxLayout)
 
 
+# Calendar highlight colors: no calorie target, shades of consumed calories relative to the target, over target
+_CALENDAR_HIGHLIGHT_COLORS = ["#388e3c", "#c8e6c9", "#81c784", "#388e3c", "#f9a825", "#c62828"]
+_CALENDAR_HIGHLIGHT_RATIO_LIMITS = [0.5, 0.8, 1.05, 1.2]
+
+# Serving attributes modified when changing the Product or Recipe of the serving
+_SERVING_ITEM_ATTRIBUTES = ["item_id", "item_name", "item_type", "nutrition_data"]
+
+
 class NutritionTargetInput(Enum):
     CALORIES = "Calories"
     FAT = "Fat"
@@ -74,6 +88,9 @@ class PageDailyIntake(MainWindowPage):
 
         self.selected_date: QDate = QDate.currentDate()
 
+        # Running portion solver worker, referenced until its result is received
+        self.portion_worker: Worker | None = None
+
         self.setup_page()
 
     @property
@@ -97,6 +114,36 @@ class PageDailyIntake(MainWindowPage):
         self.update_calendar_display()
         self.table.set_lmb_action_method(self.toggle_favorite_selection)
         self.table.set_rmb_action_method(self.custom_rmb_action_menu)
+        self.setup_event_subscriptions()
+
+    def setup_event_subscriptions(self) -> None:
+        event_manager().subscribe(self.on_serving_items_changed,
+                                  entities=[ChangeEntity.CATALOGUE, ChangeEntity.RECIPES])
+        event_manager().subscribe(self.on_daily_intake_changed,
+                                  entities=[ChangeEntity.DAILY_INTAKE, ChangeEntity.NUTRITION_TARGETS])
+
+    def on_serving_items_changed(self, changes: list[DataChangeEvent]) -> None:
+        """
+        Refreshes the serving item selection of the displayed daily intake record after Products or Recipes
+        were added, removed or renumbered on other pages, or if the changed items are served in the displayed record.
+        """
+        intake_data = self.get_intake_data(date=self.current_date_string)
+        served_items = set() if intake_data is None else set(intake_data.get_item_counts())
+
+        for change in changes:
+            item_type = ServingType.PRODUCT if change.entity is ChangeEntity.CATALOGUE else ServingType.RECIPE
+            if change.structural or any((item_type, item_id) in served_items for item_id in change.item_ids):
+                self.refresh_or_mark_dirty()
+                return
+
+    @property
+    def page_widget(self) -> QWidget:
+        return self.main_window.page_daily_intake
+
+    def refresh_page(self) -> None:
+        self.refresh_table()
+        self.update_intake_target_inputs()
+        self.highlight_all_dates_with_data()
 
     def setup_daily_intake_table(self) -> None:
         headers = [
@@ -118,6 +165,12 @@ class PageDailyIntake(MainWindowPage):
         self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_daily_intake_data)
         # self.table.setSortingEnabled(True)
 
+        self.table.numeric_input_columns = [self.column.index(TableCol.PORTION)]
+        self.table.numeric_display_columns = [self.column.index(column) for column in
+                                              [TableCol.CALORIES, TableCol.FAT, TableCol.CARBS, TableCol.PROTEIN]]
+        self.table.set_bulk_paste_method(self.set_pasted_daily_intake_data)
+        self.table.set_copied_value_method(self.get_copied_serving_value)
+
     def setup_custom_spinbox_delegate(self) -> None:
         portion_value_delegate = DoubleSpinBoxDelegate(
             self.table, max_val=9999.0, min_val=0.0, decimals=1, decimals_display=0, val_step=5.0)
@@ -178,6 +231,7 @@ class PageDailyIntake(MainWindowPage):
             item_name.addItems(self.ctr_data.get_all_product_names())
             item_index = item_name.findText(serving.item_name)
             item_name.setCurrentIndex(item_index)
+            item_name.set_search_function(lambda text: self.ctr_data.search_item_names(ServingType.PRODUCT, text))
             item_name.currentIndexChanged.connect(self.set_product_item)
 
         elif item_type is ServingType.RECIPE:
@@ -185,6 +239,7 @@ class PageDailyIntake(MainWindowPage):
             item_name.addItems(self.ctr_data.get_all_recipe_names())
             item_index = item_name.findText(serving.item_name)
             item_name.setCurrentIndex(item_index)
+            item_name.set_search_function(lambda text: self.ctr_data.search_item_names(ServingType.RECIPE, text))
             item_name.currentIndexChanged.connect(self.set_recipe_item)
 
         font = item_name.lineEdit().font()
@@ -248,27 +303,64 @@ class PageDailyIntake(MainWindowPage):
         else:
             return None
 
+    def get_or_add_intake_data(self, date: str) -> DailyIntake:
+        """
+        Returns the daily intake data of the given date, adding a new daily intake record if it does not exist.
+        """
+        intake_data = self.get_intake_data(date)
+        if intake_data is not None:
+            return intake_data
+
+        intake_data = self.ctr_data.add_daily_intake(date=date)
+        self.undo_stack.push(DictInsert(self.ctr_data.daily_intake_record, date, intake_data,
+                                        context=self.get_change_context(date, structural=True)))
+        event_manager().emit_data_changed(f"Daily Intake Page: Added a new daily intake record for date {date}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[date], structural=True)
+        return intake_data
+
+    def record_intake_data_replacement(self, date: str, previous_intake_data: DailyIntake | None,
+                                       description: str) -> None:
+        """
+        Records the already applied replacement of the daily intake record of the given date into the undo history.
+        :param date: Date of the replaced daily intake record.
+        :param previous_intake_data: Replaced daily intake record, None if the record did not exist.
+        :param description: Descriptive message of the replacement.
+        """
+        with self.undo_stack.group(description, context=self.get_change_context(date, structural=True)):
+            if previous_intake_data is not None:
+                self.undo_stack.push(DictRemove(self.ctr_data.daily_intake_record, date, previous_intake_data))
+            self.undo_stack.push(DictInsert(self.ctr_data.daily_intake_record, date,
+                                            self.ctr_data.daily_intake_record[date]))
+
+    @staticmethod
+    def get_change_context(date: str, structural: bool = False) -> DataChangeEvent:
+        """
+        Returns the change of the daily intake record of the given date, recorded with the undo history.
+        """
+        return DataChangeEvent(ChangeEntity.DAILY_INTAKE, dates={date}, structural=structural)
+
     def refresh_table(self) -> None:
         """
         Refreshes the table data from the current tracker data.
         Table itemChanged signal is disconnected for the duration of the data refresh.
         """
-        self.table.set_item_changed_signal(connection_status=False, on_changed=self.set_daily_intake_data)
-        self.table.save_scroll_bar_location()
-        self.table.clear_table()
-
-        intake_data = self.get_intake_data(date=self.current_date_string)
-        if intake_data is not None:
-            for product_index, item in enumerate(intake_data.consumed_products):
-                self.table.add_table_row(self.row_items_dictionary(product_index, item))
-            for recipe_index, item in enumerate(intake_data.consumed_recipes):
-                self.table.add_table_row(self.row_items_dictionary(recipe_index, item))
-        else:
-            print(f"No daily intake data for calendar date {self.current_date_string}")
+        with instrumentation().span("Daily intake table refreshed", date=self.current_date_string):
+            self.table.set_item_changed_signal(connection_status=False, on_changed=self.set_daily_intake_data)
+            self.table.save_scroll_bar_location()
+            self.table.clear_table()
+
+            intake_data = self.get_intake_data(date=self.current_date_string)
+            if intake_data is not None:
+                for product_index, item in enumerate(intake_data.consumed_products):
+                    self.table.add_table_row(self.row_items_dictionary(product_index, item))
+                for recipe_index, item in enumerate(intake_data.consumed_recipes):
+                    self.table.add_table_row(self.row_items_dictionary(recipe_index, item))
+            else:
+                print(f"No daily intake data for calendar date {self.current_date_string}")
 
-        self.add_summary_row()
-        self.table.restore_scroll_bar_location()
-        self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_daily_intake_data)
+            self.add_summary_row()
+            self.table.restore_scroll_bar_location()
+            self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_daily_intake_data)
 
     def refresh_table_row(self, serving: Serving, serving_index: int, selected_row: int) -> None:
         """
@@ -365,6 +457,7 @@ class PageDailyIntake(MainWindowPage):
         self.main_window.frame_calendar.setMaximumHeight(200)
         self.main_window.verticalLayout_frame_calendar.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.calendar.set_rmb_action_method(self.action_menu_calendar_selection)
+        self.setup_calendar_highlight_formats()
 
     def on_intake_target_data_change(self) -> None:
         """
@@ -388,8 +481,11 @@ class PageDailyIntake(MainWindowPage):
             carbs=carbs_target,
             protein=protein_target)
 
-        self.ctr_data.nutrition_targets = target_data
-        event_manager().emit_data_changed(f"Daily Intake Page: Changed daily intake nutrition targets")
+        self.undo_stack.set_attribute(self.ctr_data, "nutrition_targets", target_data,
+                                      description="Change nutrition targets",
+                                      context=DataChangeEvent(ChangeEntity.NUTRITION_TARGETS))
+        event_manager().emit_data_changed(f"Daily Intake Page: Changed daily intake nutrition targets",
+                                          ChangeEntity.NUTRITION_TARGETS)
 
         self.update_intake_target_charts(data=nutrition_data)
 
@@ -534,6 +630,38 @@ class PageDailyIntake(MainWindowPage):
         else:
             return None
 
+    def get_copied_serving_value(self, row: int, column: int) -> Any:
+        """
+        Returns the daily intake data value shown in the table cell, copied instead of the displayed rounded text.
+        Summary row values are the totals of the daily intake record.
+        """
+        intake_data = self.get_intake_data(date=self.current_date_string)
+        if intake_data is None:
+            return None
+
+        item = self.table.item(row, self.column.index(TableCol.PORTION))
+        if isinstance(item, CustomTableWidgetItem) and item.identifier_type is ServingType.PRODUCT:
+            serving = intake_data.consumed_products[item.identifier_id]
+        elif isinstance(item, CustomTableWidgetItem) and item.identifier_type is ServingType.RECIPE:
+            serving = intake_data.consumed_recipes[item.identifier_id]
+        else:
+            serving = None
+
+        if serving is not None:
+            nutrition_data = serving.get_consumed_nutrition_values()
+            values = {TableCol.NAME: serving.item_name, TableCol.PORTION: serving.portion}
+        else:
+            nutrition_data = intake_data.get_total_consumed_nutrition_data()
+            values = {}
+
+        values.update({
+            TableCol.CALORIES: nutrition_data.calories,
+            TableCol.FAT: nutrition_data.fat,
+            TableCol.CARBS: nutrition_data.carbs,
+            TableCol.PROTEIN: nutrition_data.protein,
+        })
+        return values.get(self.column[column], None)
+
     def get_selected_servings(self, selected_table_rows: list[int]) -> list[Serving]:
         """
         Returns all selected servings in the table based on selected table rows.
@@ -597,6 +725,7 @@ class PageDailyIntake(MainWindowPage):
         menu.addAction("Add New Recipe", self.add_new_recipe)
         menu.addSeparator()
         menu.addAction("Duplicate Previous", self.duplicate_previous_date_record)
+        menu.addAction("Suggest Portions From Favorites", self.suggest_favorite_portions)
         menu.addAction("Refresh Table", self.refresh_table)
 
         menu.exec_(QCursor.pos())
@@ -635,53 +764,116 @@ class PageDailyIntake(MainWindowPage):
 
         menu.exec_(QCursor.pos())
 
-    def highlight_dates_with_data(self, dates: list[QDate]) -> None:
-        format_highlight = QTextCharFormat()
-        format_highlight.setBackground(QBrush(QColor("green")))
+    def setup_calendar_highlight_formats(self) -> None:
+        formats: list[QTextCharFormat] = []
+        for color in _CALENDAR_HIGHLIGHT_COLORS:
+            text_format = QTextCharFormat()
+            text_format.setBackground(QBrush(QColor(color)))
+            formats.append(text_format)
+
+        self.calendar.set_highlight_formats(formats)
+
+    def get_calendar_highlight_level(self, date: str) -> int | None:
+        """
+        Returns the calendar highlight level for the given date, shading the date by consumed
+        calories relative to the calorie target. Level 0 is used if no calorie target is set.
+        Returns None for dates without daily intake data.
+        """
+        intake_data = self.get_intake_data(date)
+        if intake_data is None or not intake_data.has_data:
+            return None
+
+        calorie_target = self.ctr_data.nutrition_targets.calories
+        if calorie_target <= 0:
+            return 0
+
+        total = self.ctr_data.get_daily_intake_total(date)
+        ratio = total.calories / calorie_target
+
+        for level, ratio_limit in enumerate(_CALENDAR_HIGHLIGHT_RATIO_LIMITS, start=1):
+            if ratio <= ratio_limit:
+                return level
 
-        for entry in dates:
-            self.calendar.setDateTextFormat(entry, format_highlight)
+        return len(_CALENDAR_HIGHLIGHT_COLORS) - 1
 
-    def highlight_all_dates_with_data(self):
-        all_dates_w_data = [QDate.fromString(date, format=Qt.DateFormat.ISODate)
-                            for date in self.ctr_data.daily_intake_record.keys()]
+    def highlight_all_dates_with_data(self) -> None:
+        levels: dict[str, int] = {}
+        for date in self.ctr_data.daily_intake_record.keys():
+            level = self.get_calendar_highlight_level(date)
+            if level is not None:
+                levels[date] = level
 
-        self.highlight_dates_with_data(all_dates_w_data)
+        self.calendar.set_highlight_levels(levels)
 
-    def clear_all_date_formats(self):
-        formatted_dates = self.calendar.dateTextFormat()
-        for date in formatted_dates.keys():
-            self.calendar.setDateTextFormat(date, QTextCharFormat())
+    def highlight_dates(self, dates: set[str]) -> None:
+        """
+        Updates the calendar highlight only for the given dates, removing the highlight of dates without data.
+        """
+        self.calendar.update_highlight_levels({date: self.get_calendar_highlight_level(date) for date in dates})
+
+    def clear_all_date_formats(self) -> None:
+        self.calendar.set_highlight_levels({})
+
+    def on_daily_intake_changed(self, changes: list[DataChangeEvent]) -> None:
+        if not self.is_page_visible():
+            self.mark_dirty()
+            return
+
+        changed_dates: set[str] = set()
+        for change in changes:
+            if change.entity is ChangeEntity.NUTRITION_TARGETS:
+                self.highlight_all_dates_with_data()
+                return
+            changed_dates.update(change.dates)
+
+        self.highlight_dates(changed_dates)
 
     def add_new_product(self) -> None:
         date = self.current_date_string
-        intake_data = self.get_intake_data(date)
 
-        if intake_data is None:
-            intake_data = self.ctr_data.add_daily_intake(date=date)
-            event_manager().emit_data_changed(f"Daily Intake Page: Added a new daily intake record for date {date}")
+        with self.undo_stack.group(f"Add Product serving to {date}", context=self.get_change_context(date)):
+            intake_data = self.get_or_add_intake_data(date)
 
-        serving = Serving(item_type=ServingType.PRODUCT)
-        intake_data.add_consumed_product(serving)
+            serving = Serving(item_type=ServingType.PRODUCT)
+            intake_data.add_consumed_product(serving)
+            self.undo_stack.push(ListInsert(intake_data.consumed_products, len(intake_data.consumed_products) - 1,
+                                            serving))
 
-        event_manager().emit_data_changed(f"Daily Intake Page: Added a new Product to daily intake for {date}")
+        event_manager().emit_data_changed(f"Daily Intake Page: Added a new Product to daily intake for {date}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[date])
 
         self.refresh_table()
+        self.show_item_suggestions(row=len(intake_data.consumed_products) - 1)
 
     def add_new_recipe(self) -> None:
         date = self.current_date_string
-        intake_data = self.get_intake_data(date)
 
-        if intake_data is None:
-            intake_data = self.ctr_data.add_daily_intake(date=date)
-            event_manager().emit_data_changed(f"Daily Intake Page: Added a new daily intake record for date {date}")
+        with self.undo_stack.group(f"Add Recipe serving to {date}", context=self.get_change_context(date)):
+            intake_data = self.get_or_add_intake_data(date)
 
-        serving = Serving(item_type=ServingType.RECIPE)
-        intake_data.add_consumed_recipe(serving)
+            serving = Serving(item_type=ServingType.RECIPE)
+            intake_data.add_consumed_recipe(serving)
+            self.undo_stack.push(ListInsert(intake_data.consumed_recipes, len(intake_data.consumed_recipes) - 1,
+                                            serving))
 
-        event_manager().emit_data_changed(f"Daily Intake Page: Added a new recipe to daily intake for {date}")
+        event_manager().emit_data_changed(f"Daily Intake Page: Added a new recipe to daily intake for {date}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[date])
 
         self.refresh_table()
+        self.show_item_suggestions(row=len(intake_data.consumed_products) + len(intake_data.consumed_recipes) - 1)
+
+    def show_item_suggestions(self, row: int) -> None:
+        """
+        Focuses the item combobox of the table row and shows the most used items of its type.
+        """
+        column = self.column.index(TableCol.NAME)
+        combobox = self.table.cellWidget(row, column)
+        if not isinstance(combobox, SearchableComboBox):
+            return
+
+        self.table.setCurrentCell(row, column)
+        combobox.setFocus()
+        combobox.on_text_edited("")
 
     def duplicate_previous_date_record(self) -> None:
         """
@@ -715,13 +907,98 @@ class PageDailyIntake(MainWindowPage):
         )
 
         if confirmation:
+            previous_intake_data = self.get_intake_data(self.current_date_string)
             self.ctr_data.duplicate_daily_intake(date_string=previous_date_string,
                                                  override_date_string=self.current_date_string)
+            self.record_intake_data_replacement(self.current_date_string, previous_intake_data,
+                                                description=f"Override daily intake of {self.current_date_string}")
             event_manager().emit_data_changed(f"Daily Intake Page: Overridden daily intake record of date "
-                                              f"{self.current_date_string} with data from {previous_date_string}")
+                                              f"{self.current_date_string} with data from {previous_date_string}",
+                                              ChangeEntity.DAILY_INTAKE, dates=[self.current_date_string])
 
             self.refresh_table()
 
+    def suggest_favorite_portions(self) -> None:
+        """
+        Solves the portions of the favorite Products and Recipes closing the gap between the consumed nutrition data
+        of the current date and the nutrition targets. Portions are solved on a worker thread, with the copies of
+        the favorite items nutrition data.
+        """
+        if self.portion_worker is not None:
+            return
+
+        if self.ctr_data.nutrition_targets == NutritionData():
+            QMessageBox.information(self.mw, "Nutrition Targets Not Set",
+                                    "Set the daily nutrition targets to get the suggested portions.")
+            return
+
+        candidates = get_portion_candidates(self.ctr_data)
+        if not candidates:
+            QMessageBox.information(self.mw, "No Favorite Items",
+                                    "Mark Products or Recipes as favorites to get the suggested portions.")
+            return
+
+        intake_data = self.get_intake_data(date=self.current_date_string)
+        consumed = NutritionData() if intake_data is None else intake_data.get_total_consumed_nutrition_data()
+        targets = NutritionData(**vars(self.ctr_data.nutrition_targets))
+
+        date = self.current_date_string
+        self.portion_worker = run_in_thread_pool(solve_portions,
+                                                 lambda solution: self.on_portions_solved(solution, date),
+                                                 self.on_portion_solver_failed,
+                                                 consumed, targets, candidates)
+
+    def on_portion_solver_failed(self, error: str) -> None:
+        self.portion_worker = None
+        print(f"Portion solver failed:\n{error}")
+
+    def on_portions_solved(self, solution: PortionSolution, date: str) -> None:
+        """
+        Shows the suggested portions and adds them as servings to the daily intake record of the solved date.
+        """
+        self.portion_worker = None
+
+        if not solution.portions:
+            QMessageBox.information(self.mw, "No Suggested Portions",
+                                    f"Favorite items can not bring the daily intake of {date} closer to the targets.")
+            return
+
+        portion_lines = "\n".join(f"{solved.portion:.0f} g  {solved.candidate.name}" for solved in solution.portions)
+        total = solution.total
+        confirmation = self.mw.confirm_action(
+            message=f"Suggested portions for {date}:\n{portion_lines}\n\n"
+                    f"Total: {total.calories:.0f} kcal, fat {total.fat:.0f} g, "
+                    f"carbs {total.carbs:.0f} g, protein {total.protein:.0f} g",
+            window_title="Suggested Portions",
+            accept_label="Add Servings",
+            do_not_ask_enabled=False
+        )
+
+        if not confirmation:
+            return
+
+        with self.undo_stack.group(f"Add {len(solution.portions)} suggested servings to {date}",
+                                   context=self.get_change_context(date)):
+            intake_data = self.get_or_add_intake_data(date)
+
+            for solved in solution.portions:
+                candidate = solved.candidate
+                serving = Serving(candidate.item_id, candidate.name, candidate.item_type, round(solved.portion))
+                serving.nutrition_data = NutritionData(**vars(candidate.nutrition_data))
+
+                if candidate.item_type is ServingType.RECIPE:
+                    intake_data.add_consumed_recipe(serving)
+                    servings_list = intake_data.consumed_recipes
+                else:
+                    intake_data.add_consumed_product(serving)
+                    servings_list = intake_data.consumed_products
+                self.undo_stack.push(ListInsert(servings_list, len(servings_list) - 1, serving))
+
+        event_manager().emit_data_changed(f"Daily Intake Page: Added {len(solution.portions)} suggested servings "
+                                          f"to daily intake for {date}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[date])
+        self.refresh_table()
+
     def set_previous_date(self) -> None:
         """
         Sets the previous calendar day in the daily intake table.
@@ -761,8 +1038,11 @@ class PageDailyIntake(MainWindowPage):
 
             if tomorrows_date_string not in self.ctr_data.daily_intake_record.keys():
                 self.ctr_data.duplicate_todays_daily_intake(date_string=tomorrows_date_string)
+                self.record_intake_data_replacement(tomorrows_date_string, None,
+                                                    description=f"Duplicate daily intake to {tomorrows_date_string}")
                 event_manager().emit_data_changed(f"Daily Intake Page: Added a new daily intake record for "
-                                                  f"tomorrows' date ({tomorrows_date_string}) by duplicating todays record.")
+                                                  f"tomorrows' date ({tomorrows_date_string}) by duplicating todays record.",
+                                                  ChangeEntity.DAILY_INTAKE, dates=[tomorrows_date_string], structural=True)
             else:
                 print(f"Tomorrows date {tomorrows_date_string} already exists in CTR data. "
                       f"Skipping daily intake record duplication.")
@@ -802,12 +1082,10 @@ class PageDailyIntake(MainWindowPage):
             return
 
         event_manager().emit_data_changed(f"Daily Intake Page: Setting Product item in row {selected_row} to "
-                                          f"{product.identifier_string} for daily intake {intake_data.date}")
+                                          f"{product.identifier_string} for daily intake {intake_data.date}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[intake_data.date])
 
-        serving.update_item(item=product,
-                            new_item_id=product.item_id,
-                            new_item_name=product.name,
-                            new_item_type=product.item_type)
+        self.update_serving_item(serving, product, date=intake_data.date)
 
         self.refresh_table()
         """Setting of current cell after refreshing the table ensures focus on the
@@ -815,6 +1093,22 @@ class PageDailyIntake(MainWindowPage):
            in combination with custom wheelEvent filtering based on focus"""
         self.table.setCurrentCell(selected_row, self.column.index(TableCol.NAME))
 
+    def update_serving_item(self, serving: Serving, item: Product | Recipe, date: str) -> None:
+        """
+        Sets the Product or Recipe of the serving and records the changed serving attributes into the undo history.
+        """
+        previous_values = {attribute: getattr(serving, attribute) for attribute in _SERVING_ITEM_ATTRIBUTES}
+
+        serving.update_item(item=item,
+                            new_item_id=item.item_id,
+                            new_item_name=item.name,
+                            new_item_type=item.item_type)
+
+        with self.undo_stack.group(f"Set serving item {item.identifier_string}",
+                                   context=self.get_change_context(date)):
+            for attribute, previous_value in previous_values.items():
+                self.undo_stack.push(AttributeEdit(serving, attribute, previous_value, getattr(serving, attribute)))
+
     def set_recipe_item(self, recipe_id: int) -> None:
         """
         Method sets the recipe of the consumable object in the daily calorie
@@ -844,12 +1138,10 @@ class PageDailyIntake(MainWindowPage):
             return
 
         event_manager().emit_data_changed(f"Daily Intake Page: Setting Recipe item in row {selected_row} to "
-                                          f"{recipe.identifier_string} for daily intake {intake_data.date}")
+                                          f"{recipe.identifier_string} for daily intake {intake_data.date}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[intake_data.date])
 
-        serving.update_item(item=recipe,
-                            new_item_id=recipe.item_id,
-                            new_item_name=recipe.name,
-                            new_item_type=recipe.item_type)
+        self.update_serving_item(serving, recipe, date=intake_data.date)
 
         self.refresh_table()
         """Setting of current cell after refreshing the table ensures focus on the
@@ -878,7 +1170,8 @@ class PageDailyIntake(MainWindowPage):
         # print(f"Favorite status for {serving.identifier_string} set in {end - start} s")
 
         event_manager().emit_data_changed(f"Daily Intake Page: Toggled serving favorite status "
-                                          f"for {serving.identifier_string} to {favorite_status}")
+                                          f"for {serving.identifier_string} to {favorite_status}",
+                                          ChangeEntity.FAVORITES, item_ids=[serving.item_id])
 
         self.refresh_table()
 
@@ -909,12 +1202,54 @@ class PageDailyIntake(MainWindowPage):
             print(f"Error, changed serving at row {row} column {changed_item.column()} is None!")
             return
 
-        serving.portion = self.table.get_current_float_value(self.column.index(TableCol.PORTION), row)
+        self.set_serving_portion(serving, row, date=intake_data.date)
 
         event_manager().emit_data_changed(f"Daily Intake Page: Changed serving portion size "
-                                          f"for {serving.identifier_string}")
+                                          f"for {serving.identifier_string}",
+                                          ChangeEntity.DAILY_INTAKE, dates=[intake_data.date])
         self.refresh_table_row(serving, serving_index=item_index, selected_row=row)
 
+    def set_serving_portion(self, serving: Serving, row: int, date: str) -> None:
+        portion = self.table.get_current_float_value(self.column.index(TableCol.PORTION), row)
+        self.undo_stack.set_attribute(serving, "portion", portion,
+                                      description=f"Change portion of {serving.identifier_string}",
+                                      context=self.get_change_context(date))
+
+    def set_pasted_daily_intake_data(self, pasted_cells: list[tuple[int, int]]) -> None:
+        """
+        Modifies serving portions of all rows pasted into the daily intake table in a single batch,
+        followed by a single data change event and a single table refresh.
+        """
+        intake_data = self.get_intake_data(date=self.current_date_string)
+        if intake_data is None:
+            print(f"No daily intake data for calendar date {self.current_date_string}")
+            return None
+
+        changed_servings = 0
+        with self.undo_stack.group("Paste portion sizes", context=self.get_change_context(intake_data.date)):
+            for row in sorted({row for row, _ in pasted_cells}):
+                serving_data = self.get_selected_serving_data(row)
+                if serving_data is None:
+                    continue
+                item_index, item_type = serving_data
+
+                if item_type is ServingType.PRODUCT:
+                    serving = intake_data.consumed_products[item_index]
+                elif item_type is ServingType.RECIPE:
+                    serving = intake_data.consumed_recipes[item_index]
+                else:
+                    continue
+
+                self.set_serving_portion(serving, row, date=intake_data.date)
+                changed_servings += 1
+
+        if not changed_servings:
+            return None
+
+        event_manager().emit_data_changed(f"Daily Intake Page: Pasted portion sizes of {changed_servings} servings",
+                                          ChangeEntity.DAILY_INTAKE, dates=[intake_data.date])
+        self.refresh_table()
+
     def on_go_to_product(self, serving: Serving) -> None:
         print(f"Navigating to Product {serving.item_name}... WIP - Not Implemented!")
 
@@ -941,9 +1276,13 @@ class PageDailyIntake(MainWindowPage):
         if confirmation:
             index = intake_data.consumed_products.index(serving)
             intake_data.consumed_products.pop(index)
+            self.undo_stack.push(ListRemove(intake_data.consumed_products, index, serving,
+                                            description=f"Remove serving {serving.item_name}",
+                                            context=self.get_change_context(intake_data.date)))
 
             event_manager().emit_data_changed(f"Daily Intake Page: Removed serving {serving.item_name} at "
-                                              f"index {index} from consumed products list.")
+                                              f"index {index} from consumed products list.",
+                                              ChangeEntity.DAILY_INTAKE, dates=[intake_data.date])
             self.refresh_table()
 
     def on_remove_recipe_item(self, serving):
@@ -966,9 +1305,13 @@ class PageDailyIntake(MainWindowPage):
         if confirmation:
             index = intake_data.consumed_recipes.index(serving)
             intake_data.consumed_recipes.pop(index)
+            self.undo_stack.push(ListRemove(intake_data.consumed_recipes, index, serving,
+                                            description=f"Remove serving {serving.item_name}",
+                                            context=self.get_change_context(intake_data.date)))
 
             event_manager().emit_data_changed(f"Daily Intake Page: Removed serving {serving.item_name} at "
-                                              f"index {index} from consumed recipes list.")
+                                              f"index {index} from consumed recipes list.",
+                                              ChangeEntity.DAILY_INTAKE, dates=[intake_data.date])
             self.refresh_table()
 
     def on_remove_multiple_servings(self, servings: list[Serving]) -> None:
@@ -984,16 +1327,23 @@ class PageDailyIntake(MainWindowPage):
         )
 
         if confirmation:
-            for serving in servings:
-                if serving.item_type is ServingType.PRODUCT and serving in intake_data.consumed_products:
-                    index = intake_data.consumed_products.index(serving)
-                    intake_data.consumed_products.pop(index)
-                elif serving.item_type is ServingType.RECIPE and serving in intake_data.consumed_recipes:
-                    index = intake_data.consumed_recipes.index(serving)
-                    intake_data.consumed_recipes.pop(index)
+            with self.undo_stack.group(f"Remove {len(servings)} servings",
+                                       context=self.get_change_context(intake_data.date)):
+                for serving in servings:
+                    if serving.item_type is ServingType.PRODUCT and serving in intake_data.consumed_products:
+                        servings_list = intake_data.consumed_products
+                    elif serving.item_type is ServingType.RECIPE and serving in intake_data.consumed_recipes:
+                        servings_list = intake_data.consumed_recipes
+                    else:
+                        continue
+
+                    index = servings_list.index(serving)
+                    servings_list.pop(index)
+                    self.undo_stack.push(ListRemove(servings_list, index, serving))
 
             event_manager().emit_data_changed(f"Daily Intake Page: Removed {len(servings)} from "
-                                              f"{self.current_date_string} daily intake record.")
+                                              f"{self.current_date_string} daily intake record.",
+                                              ChangeEntity.DAILY_INTAKE, dates=[self.current_date_string])
             self.refresh_table()
 
     def on_remove_daily_intake_record(self, date_string: str):
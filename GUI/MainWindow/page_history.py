@@ -0,0 +1,235 @@
+
+from Core.intake_history import IntakeHistory, HISTORY_METRICS
+from GUI.MainWindow.page_base import MainWindowPage
+from GUI.MainWindow.chart_widget import (get_background_color, get_text_color, DONUT_CHART_FAT_COLOR,
+                                         DONUT_CHART_CARBS_COLOR, DONUT_CHART_PROTEIN_COLOR)
+from GUI.Common.event_manager import event_manager, ChangeEntity, DataChangeEvent
+from Settings.app_env import WindowTheme
+
+import datetime
+import numpy as np
+import pyqtgraph as pg
+from enum import Enum
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox
+
+
+class HistoryZoom(Enum):
+    AUTO = "Auto"
+    DAILY = "Daily"
+    WEEKLY = "Weekly"
+    MONTHLY = "Monthly"
+
+
+# Downsampling buckets of the zoom levels, in days and in calendar months
+_ZOOM_BUCKETS = {
+    HistoryZoom.DAILY: (1, 0),
+    HistoryZoom.WEEKLY: (7, 0),
+    HistoryZoom.MONTHLY: (1, 1),
+}
+
+# Largest visible range in days displayed at daily and weekly resolution with automatic zoom
+_AUTO_ZOOM_DAILY_LIMIT = 180
+_AUTO_ZOOM_WEEKLY_LIMIT = 3 * 365
+
+_DEFAULT_VISIBLE_DAYS = 90
+
+_UNIX_EPOCH_DAY = datetime.date(1970, 1, 1).toordinal()
+_SECONDS_PER_DAY = 86400
+
+_METRIC_COLORS = {
+    "calories": QColor(70, 130, 180),
+    "fat": DONUT_CHART_FAT_COLOR,
+    "carbs": DONUT_CHART_CARBS_COLOR,
+    "protein": DONUT_CHART_PROTEIN_COLOR,
+}
+
+
+class PageHistory(MainWindowPage):
+    def __init__(self, mw):
+        """
+        Main window page displaying consumed calories and macronutrients per day
+        over time, compared to the daily nutrition targets.
+
+        Curves are built from pre-aggregated daily totals and only the visible range is plotted.
+        Larger ranges are downsampled to the minimum and maximum value per week or calendar month.
+        """
+        super().__init__(mw)
+        self.mw = mw
+
+        self.page = QWidget()
+        self.zoom_cbox = QComboBox()
+        self.calories_plot = pg.PlotWidget(axisItems={"bottom": pg.DateAxisItem()})
+        self.macros_plot = pg.PlotWidget(axisItems={"bottom": pg.DateAxisItem()})
+
+        self.legend: pg.LegendItem | None = None
+        self.curves: dict[str, pg.PlotDataItem] = {}
+        self.target_lines: dict[str, pg.InfiniteLine] = {}
+
+        self.history = IntakeHistory()
+        self.zoom: HistoryZoom = HistoryZoom.DAILY
+
+        self.setup_page()
+
+    def setup_page(self) -> None:
+        self.setup_layout()
+        self.setup_zoom_cbox()
+        self.setup_plots()
+        self.setup_event_subscriptions()
+
+    def setup_layout(self) -> None:
+        controls_layout = QHBoxLayout()
+        controls_layout.addWidget(QLabel("Zoom:"))
+        controls_layout.addWidget(self.zoom_cbox)
+        controls_layout.addStretch()
+
+        layout = QVBoxLayout(self.page)
+        layout.addLayout(controls_layout)
+        layout.addWidget(self.calories_plot, stretch=1)
+        layout.addWidget(self.macros_plot, stretch=1)
+
+        self.main_window.stackedWidget_main.addWidget(self.page)
+
+    def setup_zoom_cbox(self) -> None:
+        for zoom in HistoryZoom:
+            self.zoom_cbox.addItem(zoom.value, zoom)
+        self.zoom_cbox.currentIndexChanged.connect(self.update_curves)
+
+    def setup_plots(self) -> None:
+        self.macros_plot.setXLink(self.calories_plot)
+        self.legend = self.macros_plot.addLegend(offset=(10, 10))
+
+        for plot_widget, label in [(self.calories_plot, "Calories [kcal]"), (self.macros_plot, "Macros [g]")]:
+            plot_widget.setLabel("left", label)
+            plot_widget.showGrid(x=True, y=True, alpha=0.2)
+            plot_widget.setMouseEnabled(x=True, y=False)
+            plot_widget.getViewBox().enableAutoRange(x=False, y=True)
+            plot_widget.getViewBox().setAutoVisible(y=True)
+
+        for metric in HISTORY_METRICS:
+            plot_widget = self.calories_plot if metric == "calories" else self.macros_plot
+            color = _METRIC_COLORS[metric]
+
+            self.curves[metric] = plot_widget.plot(pen=pg.mkPen(color, width=2), name=metric.capitalize())
+
+            target_line = pg.InfiniteLine(angle=0, movable=False,
+                                          pen=pg.mkPen(color, width=1, style=Qt.PenStyle.DashLine))
+            plot_widget.addItem(target_line)
+            self.target_lines[metric] = target_line
+
+        self.calories_plot.sigXRangeChanged.connect(self.update_curves)
+
+    def setup_event_subscriptions(self) -> None:
+        event_manager().subscribe(self.on_data_changed,
+                                  entities=[ChangeEntity.DAILY_INTAKE, ChangeEntity.NUTRITION_TARGETS])
+
+    @property
+    def page_widget(self) -> QWidget:
+        return self.page
+
+    def refresh_page(self) -> None:
+        self.refresh_history()
+
+    def set_dark_theme(self) -> None:
+        self.update_theme_colors(theme=WindowTheme.DARK)
+
+    def set_light_theme(self) -> None:
+        self.update_theme_colors(theme=WindowTheme.LIGHT)
+
+    def update_theme_colors(self, theme: WindowTheme) -> None:
+        background_color = get_background_color(theme=theme)
+        text_color = get_text_color(theme=theme)
+
+        for plot_widget in [self.calories_plot, self.macros_plot]:
+            plot_widget.setBackground(background_color)
+            for axis in ["left", "bottom"]:
+                plot_widget.getAxis(axis).setTextPen(text_color)
+
+        if self.legend is not None:
+            self.legend.setLabelTextColor(text_color)
+
+    def on_data_changed(self, changes: list[DataChangeEvent]) -> None:
+        if not self.is_page_visible():
+            self.mark_dirty()
+            return
+
+        changed_dates: set[str] = set()
+        for change in changes:
+            if change.entity is ChangeEntity.NUTRITION_TARGETS:
+                self.update_target_lines()
+            changed_dates.update(change.dates)
+
+        if changed_dates:
+            self.history.update_dates(self.ctr_data, changed_dates)
+            self.update_curves()
+
+    def refresh_history(self) -> None:
+        """
+        Rebuilds the intake history from the current tracker data and shows the most recent days.
+        """
+        self.history = IntakeHistory.from_ctr_data(self.ctr_data)
+        self.update_target_lines()
+
+        if len(self.history):
+            last_day = self.history.days[-1]
+        else:
+            last_day = datetime.date.today().toordinal()
+
+        self.calories_plot.setXRange(self.get_timestamp(last_day - _DEFAULT_VISIBLE_DAYS),
+                                     self.get_timestamp(last_day + 1), padding=0)
+        self.update_curves()
+
+    def update_target_lines(self) -> None:
+        targets = self.ctr_data.nutrition_targets
+
+        for metric, target_line in self.target_lines.items():
+            value = getattr(targets, metric)
+            target_line.setPos(value)
+            target_line.setVisible(value > 0)
+
+    @staticmethod
+    def get_timestamp(day: int) -> float:
+        return float((day - _UNIX_EPOCH_DAY) * _SECONDS_PER_DAY)
+
+    @staticmethod
+    def get_day(timestamp: float) -> int:
+        return int(timestamp // _SECONDS_PER_DAY) + _UNIX_EPOCH_DAY
+
+    def get_zoom(self, visible_days: int) -> HistoryZoom:
+        """
+        Returns the selected zoom level, or the level of the visible range with automatic zoom.
+        """
+        zoom: HistoryZoom = self.zoom_cbox.currentData()
+        if zoom in _ZOOM_BUCKETS:
+            return zoom
+
+        if visible_days <= _AUTO_ZOOM_DAILY_LIMIT:
+            return HistoryZoom.DAILY
+        elif visible_days <= _AUTO_ZOOM_WEEKLY_LIMIT:
+            return HistoryZoom.WEEKLY
+        else:
+            return HistoryZoom.MONTHLY
+
+    def update_curves(self, *args) -> None:
+        """
+        Updates the curves with the data of the visible range, extended by the visible
+        range width on both sides to keep panning smooth.
+        """
+        (x_min, x_max), _ = self.calories_plot.getViewBox().viewRange()
+        start_day = self.get_day(x_min)
+        end_day = self.get_day(x_max)
+        visible_days = max(end_day - start_day, 1)
+
+        self.zoom = self.get_zoom(visible_days)
+        bucket_days, bucket_months = _ZOOM_BUCKETS[self.zoom]
+
+        for metric, curve in self.curves.items():
+            days, values = self.history.get_series(metric,
+                                                   start_day=start_day - visible_days,
+                                                   end_day=end_day + visible_days,
+                                                   bucket_days=bucket_days,
+                                                   bucket_months=bucket_months)
+
+            timestamps = (np.asarray(days, dtype=float) - _UNIX_EPOCH_DAY) * _SECONDS_PER_DAY
+            curve.setData(timestamps, np.asarray(values, dtype=float))
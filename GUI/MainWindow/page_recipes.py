@@ -1,20 +1,22 @@
 
 from Core.product import Product, NutritionData
-from Core.enums import ProductCategory
+from Core.enums import ProductCategory, ServingType
 from Core.recipe import Recipe
 from Core.ingredient import Ingredient, AmountDefinition, NetAmountDefinition
+from Core.undo_stack import DictInsert, DictRemove
+from Core.instrumentation import instrumentation
 from GUI.MainWindow.page_base import MainWindowPage
-from GUI.Common.event_manager import event_manager
+from GUI.Common.event_manager import event_manager, ChangeEntity, DataChangeEvent
 from GUI.Common.custom_widgets import (CustomDataTable, new_table_item_ne, new_table_item,
                                        SearchableComboBox, CustomListWidget, CustomTableWidgetItem,
                                        DoubleSpinBoxDelegate, CustomTextEdit, ComboClickFilter)
 
 from enum import Enum, auto
-from timeit import default_timer as timer
+from typing import Any
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QCursor, QColor, QFont
 from PySide6.QtWidgets import (QTableWidgetItem, QHeaderView, QMenu, QListWidgetItem, QSplitter,
-                               QComboBox, QDoubleSpinBox, QInputDialog, QMessageBox)
+                               QComboBox, QDoubleSpinBox, QInputDialog, QMessageBox, QWidget)
 
 from Settings.app_env import get_dark_icon, get_light_icon
 from Settings.config_enums import ConfirmationCategory
@@ -83,6 +85,46 @@ class PageRecipes(MainWindowPage):
         self.setup_relative_amount_ingredient_cbox()
         self.setup_search_function()
         self.setup_identifier_label_fonts()
+        self.setup_event_subscriptions()
+
+    def setup_event_subscriptions(self) -> None:
+        event_manager().subscribe(self.on_catalogue_changed, entities=[ChangeEntity.CATALOGUE])
+
+    def on_catalogue_changed(self, changes: list[DataChangeEvent]) -> None:
+        """
+        Refreshes the ingredients table only if the changed Products are used in the selected recipe.
+        The refresh is postponed until the page is shown if the page is hidden.
+        """
+        if not self.is_page_visible():
+            self.mark_dirty()
+            return
+
+        recipe: Recipe = self.get_recipe(recipe_id=self.selected_recipe_id)
+        if recipe is None:
+            return
+
+        changed_ids: set[int] = set()
+        for change in changes:
+            if change.structural:
+                self.refresh_ingredients_table()
+                return
+            changed_ids.update(change.item_ids)
+
+        if any(ingredient.product.item_id in changed_ids for ingredient in recipe.ingredients.values()):
+            self.refresh_ingredients_table()
+
+    @property
+    def page_widget(self) -> QWidget:
+        return self.main_window.page_recipes
+
+    def set_dark_theme(self) -> None:
+        self.set_dark_theme_button_icons()
+
+    def set_light_theme(self) -> None:
+        self.set_light_theme_button_icons()
+
+    def refresh_page(self) -> None:
+        self.refresh_selected_recipe()
 
     def set_dark_theme_button_icons(self) -> None:
         icons = {
@@ -142,6 +184,14 @@ class PageRecipes(MainWindowPage):
 
         # self.table.setSortingEnabled(True)
 
+        self.table.numeric_input_columns = [self.column.index(TableCol.AMOUNT),
+                                            self.column.index(TableCol.NET_AMOUNT)]
+        self.table.numeric_display_columns = [self.column.index(column) for column in
+                                              [TableCol.NET_MASS, TableCol.PRICE, TableCol.CALORIES,
+                                               TableCol.FAT, TableCol.CARBS, TableCol.PROTEIN]]
+        self.table.set_bulk_paste_method(self.set_pasted_recipe_data)
+        self.table.set_copied_value_method(self.get_copied_ingredient_value)
+
     def setup_custom_spinbox_delegate(self) -> None:
         nutrition_value_delegate = DoubleSpinBoxDelegate(
             self.table, max_val=9999.0, min_val=0.0, decimals=1, decimals_display=1)
@@ -337,6 +387,7 @@ class PageRecipes(MainWindowPage):
         item_name.lineEdit().installEventFilter(self.filter)
         item_name.addItems(self.ctr_data.get_all_product_names())
         item_name.setCurrentIndex(ingredient.product.item_id)
+        item_name.set_search_function(lambda text: self.ctr_data.search_item_names(ServingType.PRODUCT, text))
         item_name.currentIndexChanged.connect(self.set_ingredient_product_item)
         font = item_name.lineEdit().font()
         font.setBold(True)
@@ -471,6 +522,19 @@ class PageRecipes(MainWindowPage):
 
         self.recipes_list.blockSignals(False)
 
+    def refresh_selected_recipe(self) -> None:
+        """
+        Refreshes the recipes list and all GUI elements of the currently selected recipe from the current tracker data.
+        """
+        self.refresh_recipes_list()
+
+        recipe = self.get_recipe(recipe_id=self.selected_recipe_id)
+        if recipe is None:
+            self.table.clear_table()
+            return
+
+        self.update_gui_on_recipe_selection(recipe)
+
     def refresh_ingredients_table(self) -> None:
         """
         Refreshes the table data from the current tracker data.
@@ -481,21 +545,20 @@ class PageRecipes(MainWindowPage):
             print("No currently selected recipe to show!")
             return
 
-        start = timer()
-        self.table.set_item_changed_signal(connection_status=False, on_changed=self.set_recipe_data)
-        self.table.save_scroll_bar_location()
-        self.table.clear_table()
+        with instrumentation().span("Recipe ingredients table refreshed", log=True,
+                                    recipe=recipe.identifier_string, rows=len(recipe.ingredients)):
+            self.table.set_item_changed_signal(connection_status=False, on_changed=self.set_recipe_data)
+            self.table.save_scroll_bar_location()
+            self.table.clear_table()
 
-        for item in recipe.ingredients.values():
-            self.table.add_table_row(row_items=self.row_items_dictionary(item))
+            for item in recipe.ingredients.values():
+                self.table.add_table_row(row_items=self.row_items_dictionary(item))
 
-        self.table.add_table_row(row_items=self.summary_row_items_total())
-        self.table.add_table_row(row_items=self.summary_row_items_total_per_100_grams())
+            self.table.add_table_row(row_items=self.summary_row_items_total())
+            self.table.add_table_row(row_items=self.summary_row_items_total_per_100_grams())
 
-        self.table.restore_scroll_bar_location()
-        self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_recipe_data)
-        end = timer()
-        print(f"Recipe ingredients table refreshed for {recipe.identifier_string} in {end - start} s")
+            self.table.restore_scroll_bar_location()
+            self.table.set_item_changed_signal(connection_status=True, on_changed=self.set_recipe_data)
 
     def refresh_ingredients_table_row(self, ingredient: Ingredient, selected_row: int | None = None) -> None:
         """
@@ -552,6 +615,43 @@ class PageRecipes(MainWindowPage):
 
         return recipe.get_ingredient(item_id)
 
+    def get_copied_ingredient_value(self, row: int, column: int) -> Any:
+        """
+        Returns the recipe data value shown in the table cell, copied instead of the displayed rounded text.
+        Summary row values are the totals and the totals per 100 g of the selected recipe.
+        """
+        recipe = self.get_recipe(recipe_id=self.selected_recipe_id)
+        if recipe is None:
+            return None
+
+        ingredient = self.get_selected_ingredient(selected_row=row)
+        if ingredient is not None:
+            nutrition_data = ingredient.get_nutrition_data()
+            values = {
+                TableCol.ID: ingredient.item_id,
+                TableCol.INGREDIENT: ingredient.product.name,
+                TableCol.AMOUNT: ingredient.amount,
+                TableCol.NET_AMOUNT: ingredient.get_net_amount(),
+                TableCol.NET_MASS: ingredient.get_net_mass(),
+                TableCol.PRICE: ingredient.get_price(),
+            }
+        elif row == self.table.rowCount() - 2:
+            nutrition_data = recipe.get_total_nutrition_data()
+            values = {TableCol.NET_MASS: recipe.get_total_net_mass(), TableCol.PRICE: recipe.get_total_price()}
+        elif row == self.table.rowCount() - 1:
+            nutrition_data = recipe.get_total_nutrition_data_per_100g()
+            values = {TableCol.NET_MASS: 100.0, TableCol.PRICE: recipe.get_price_per_100g()}
+        else:
+            return None
+
+        values.update({
+            TableCol.CALORIES: nutrition_data.calories,
+            TableCol.FAT: nutrition_data.fat,
+            TableCol.CARBS: nutrition_data.carbs,
+            TableCol.PROTEIN: nutrition_data.protein,
+        })
+        return values.get(self.column[column], None)
+
     def get_amount_definition(self) -> AmountDefinition:
         cbox: QComboBox = self.main_window.comboBox_ingredient_amount_definition
         return cbox.itemData(cbox.currentIndex())
@@ -632,9 +732,13 @@ class PageRecipes(MainWindowPage):
             description="Recipe preparation instructions / Description / Notes"
         )
         self.selected_recipe_id = new_recipe.item_id
+        self.undo_stack.push(DictInsert(self.ctr_data.recipes_record, new_recipe.item_id, new_recipe,
+                                        description=f"Add recipe {new_recipe.identifier_string}",
+                                        context=self.get_change_context(new_recipe, structural=True)))
 
         event_manager().emit_data_changed(f"Recipes Page: Added a new recipe ID {new_recipe.item_id} and set as"
-                                          f" current recipe ID {self.selected_recipe_id}")
+                                          f" current recipe ID {self.selected_recipe_id}",
+                                          ChangeEntity.RECIPES, item_ids=[new_recipe.item_id], structural=True)
 
         self.update_gui_on_recipe_selection(new_recipe)
         self.refresh_recipes_list()
@@ -648,9 +752,13 @@ class PageRecipes(MainWindowPage):
         product = Product(0, "", ProductCategory.OTHER)
         new_ingredient = Ingredient(item_id=0, product=product)
         new_ingredient = recipe.add_ingredient(new_ingredient)
+        self.undo_stack.push(DictInsert(recipe.ingredients, new_ingredient.item_id, new_ingredient,
+                                        description=f"Add ingredient to recipe {recipe.identifier_string}",
+                                        context=self.get_change_context(recipe)))
 
         event_manager().emit_data_changed(f"Recipes Page: Added a new ingredient for recipe ID "
-                                          f"{self.selected_recipe_id}")
+                                          f"{self.selected_recipe_id}",
+                                          ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
         self.refresh_ingredients_table()
         self.update_relative_amount_cbox(recipe, selected_ingredient=new_ingredient)
 
@@ -670,11 +778,12 @@ class PageRecipes(MainWindowPage):
             return
 
         recipe_name = list_item.text()
-        recipe.name = recipe_name
+        self.set_recipe_value(recipe, recipe, "name", recipe_name)
         self.refresh_recipes_list()
         self.update_recipe_identifier(recipe.identifier_string)
 
-        event_manager().emit_data_changed(f"Recipes Page: Renamed recipe ID {recipe_id} to {recipe_name}")
+        event_manager().emit_data_changed(f"Recipes Page: Renamed recipe ID {recipe_id} to {recipe_name}",
+                                          ChangeEntity.RECIPES, item_ids=[recipe_id])
 
     def on_set_recipe_id(self, recipe_id: int):
         recipe: Recipe = self.get_recipe(recipe_id=recipe_id)
@@ -692,9 +801,11 @@ class PageRecipes(MainWindowPage):
 
         if confirmation:
             self.ctr_data.set_recipe_id(recipe, new_id=value)
+            self.undo_stack.clear()
 
             event_manager().emit_data_changed(f"Recipes Page: Changed recipe ID "
-                                              f"{recipe.name} to {value}")
+                                              f"{recipe.name} to {value}",
+                                              ChangeEntity.RECIPES, item_ids=[recipe.item_id], structural=True)
             self.refresh_recipes_list()
 
     def on_set_ingredient_id(self, selected_row: int):
@@ -717,9 +828,11 @@ class PageRecipes(MainWindowPage):
 
         if confirmation:
             recipe.set_ingredient_id(ingredient, new_id=value)
+            self.undo_stack.clear()
 
             event_manager().emit_data_changed(f"Recipes Page: Changed recipe ingredient ID "
-                                              f"{ingredient.product.name} to {value}")
+                                              f"{ingredient.product.name} to {value}",
+                                              ChangeEntity.RECIPES, item_ids=[recipe.item_id])
             self.refresh_ingredients_table()
 
     def on_remove_recipe(self, recipe_id: int) -> None:
@@ -735,8 +848,12 @@ class PageRecipes(MainWindowPage):
 
         if confirmation:
             self.ctr_data.remove_recipe(recipe_id)
+            self.undo_stack.push(DictRemove(self.ctr_data.recipes_record, recipe_id, recipe,
+                                            description=f"Remove recipe {recipe.identifier_string}",
+                                            context=self.get_change_context(recipe, structural=True)))
 
-            event_manager().emit_data_changed(f"Recipes Page: Removed recipe ID {recipe_id}")
+            event_manager().emit_data_changed(f"Recipes Page: Removed recipe ID {recipe_id}",
+                                              ChangeEntity.RECIPES, item_ids=[recipe_id], structural=True)
             self.refresh_recipes_list()
             self.refresh_ingredients_table()
 
@@ -762,9 +879,11 @@ class PageRecipes(MainWindowPage):
         if confirmation:
             recipe.remove_ingredient(ingredient_id)
             recipe.renumber_ingredients()
+            self.undo_stack.clear()
 
             event_manager().emit_data_changed(f"Recipes Page: Removed recipe {recipe.identifier_string} "
-                                              f"ingredient ID {ingredient_id}")
+                                              f"ingredient ID {ingredient_id}",
+                                              ChangeEntity.RECIPES, item_ids=[recipe.item_id])
             self.refresh_ingredients_table()
             self.update_relative_inputs(recipe=recipe, ingredient=None)
 
@@ -911,11 +1030,12 @@ class PageRecipes(MainWindowPage):
         if ingredient is None:
             return
 
-        ingredient.product = product
+        self.set_recipe_value(recipe, ingredient, "product", product)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed ingredient Product item of recipe ID "
                                           f"{self.selected_recipe_id} at row {selected_row} "
-                                          f"to {product.identifier_string}")
+                                          f"to {product.identifier_string}",
+                                          ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
         self.refresh_ingredients_table()
         """Setting of current cell after refreshing the table ensures focus on the
            searchable combobox, enabling continuous scrolling to select the desired item,
@@ -939,10 +1059,11 @@ class PageRecipes(MainWindowPage):
             print("Recipe is None! Can't set recipe mass calc method")
             return
 
-        recipe.net_mass_data.adjust_for_evaporation = checked
+        self.set_recipe_value(recipe, recipe.net_mass_data, "adjust_for_evaporation", checked)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed calculation with water evaporation option "
-                                          f"to {checked} for recipe {recipe.identifier_string}")
+                                          f"to {checked} for recipe {recipe.identifier_string}",
+                                          ChangeEntity.RECIPES, item_ids=[recipe.item_id])
 
     def set_recipe_description(self):
         """
@@ -955,10 +1076,11 @@ class PageRecipes(MainWindowPage):
             print("Recipe is None! Can't set recipe description")
             return
         description = self.description_input.toPlainText()
-        recipe.additional_data.description = description
+        self.set_recipe_value(recipe, recipe.additional_data, "description", description)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed description for "
-                                          f"recipe {recipe.identifier_string}")
+                                          f"recipe {recipe.identifier_string}",
+                                          ChangeEntity.RECIPES, item_ids=[recipe.item_id])
 
     def set_recipe_measured_mass(self):
         """
@@ -970,10 +1092,11 @@ class PageRecipes(MainWindowPage):
             return
 
         value = self.main_window.doubleSpinBox_recipe_measured_mass.value()
-        recipe.net_mass_data.measured_value = value
+        self.set_recipe_value(recipe, recipe.net_mass_data, "measured_value", value)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed measured net mass for "
-                                          f"recipe {recipe.identifier_string}")
+                                          f"recipe {recipe.identifier_string}",
+                                          ChangeEntity.RECIPES, item_ids=[recipe.item_id])
         self.update_calculated_recipe_details(recipe=recipe)
         self.refresh_summary_total_rows()
 
@@ -987,13 +1110,36 @@ class PageRecipes(MainWindowPage):
             return
 
         value = self.main_window.doubleSpinBox_mass_reduction.value()
-        recipe.net_mass_data.reduction = value
+        self.set_recipe_value(recipe, recipe.net_mass_data, "reduction", value)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed net mass reduction for "
-                                          f"recipe {recipe.identifier_string}")
+                                          f"recipe {recipe.identifier_string}",
+                                          ChangeEntity.RECIPES, item_ids=[recipe.item_id])
         self.update_calculated_recipe_details(recipe=recipe)
         self.refresh_summary_total_rows()
 
+    @staticmethod
+    def get_change_context(recipe: Recipe, structural: bool = False) -> DataChangeEvent:
+        """
+        Returns the change of the given recipe, recorded with the undo history.
+        """
+        return DataChangeEvent(ChangeEntity.RECIPES, item_ids={recipe.item_id}, structural=structural)
+
+    def set_recipe_value(self, recipe: Recipe, target: Any, attribute: str, value: Any) -> None:
+        """
+        Sets the attribute value of the recipe (or its ingredient / data) and records the undo history.
+        """
+        self.undo_stack.set_attribute(target, attribute, value,
+                                      description=f"Change {attribute} of recipe {recipe.identifier_string}",
+                                      context=self.get_change_context(recipe))
+
+    def set_ingredient_amounts(self, ingredient: Ingredient, row: int) -> None:
+        recipe = self.get_recipe(recipe_id=self.selected_recipe_id)
+        self.set_recipe_value(recipe, ingredient, "amount",
+                              self.table.get_current_float_value(self.column.index(TableCol.AMOUNT), row))
+        self.set_recipe_value(recipe, ingredient, "net_amount",
+                              self.table.get_current_float_value(self.column.index(TableCol.NET_AMOUNT), row))
+
     def set_recipe_data(self, changed_item: QTableWidgetItem) -> None:
         """
         Method modifies recipe data (gross and net amount) based on user inputs in the ingredients table.
@@ -1004,13 +1150,40 @@ class PageRecipes(MainWindowPage):
         if ingredient is None:
             return
 
-        ingredient.amount = self.table.get_current_float_value(self.column.index(TableCol.AMOUNT), row_index)
-        ingredient.net_amount = self.table.get_current_float_value(self.column.index(TableCol.NET_AMOUNT), row_index)
+        self.set_ingredient_amounts(ingredient, row_index)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed ingredient {ingredient.identifier_string} "
-                                          f"amounts of recipe ID {self.selected_recipe_id}")
+                                          f"amounts of recipe ID {self.selected_recipe_id}",
+                                          ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
         self.refresh_ingredients_table_row(ingredient)
 
+    def set_pasted_recipe_data(self, pasted_cells: list[tuple[int, int]]) -> None:
+        """
+        Method modifies amounts of all ingredients pasted into the ingredients table in a single batch,
+        followed by a single data change event and a single table refresh.
+        """
+        recipe = self.get_recipe(recipe_id=self.selected_recipe_id)
+        if recipe is None:
+            return
+
+        changed_ingredients = 0
+        with self.undo_stack.group("Paste ingredient amounts", context=self.get_change_context(recipe)):
+            for row in sorted({row for row, _ in pasted_cells}):
+                ingredient: Ingredient = self.get_selected_ingredient(selected_row=row)
+                if ingredient is None:
+                    continue
+
+                self.set_ingredient_amounts(ingredient, row)
+                changed_ingredients += 1
+
+        if not changed_ingredients:
+            return
+
+        event_manager().emit_data_changed(f"Recipes Page: Pasted amounts of {changed_ingredients} ingredients "
+                                          f"of recipe ID {self.selected_recipe_id}",
+                                          ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
+        self.refresh_ingredients_table()
+
     def set_ingredient_amount_definition(self):
         """
         Method sets the currently selected ingredient amount definition attribute based on user selection.
@@ -1020,10 +1193,12 @@ class PageRecipes(MainWindowPage):
             return
 
         definition = self.get_amount_definition()
-        ingredient.amount_definition = definition
+        self.set_recipe_value(self.get_recipe(recipe_id=self.selected_recipe_id), ingredient,
+                              "amount_definition", definition)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed ingredient {ingredient.identifier_string} "
-                                          f"amount definition to {definition.value}")
+                                          f"amount definition to {definition.value}",
+                                          ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
 
         selected_row = self.table.currentRow()
         self.refresh_ingredients_table()
@@ -1069,7 +1244,8 @@ class PageRecipes(MainWindowPage):
 
         else:
             event_manager().emit_data_changed(f"Recipes Page: Changed ingredient {curr_ingredient.identifier_string} "
-                                              f"amount relative to {rel_ingredient.identifier_string}")
+                                              f"amount relative to {rel_ingredient.identifier_string}",
+                                              ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
 
         selected_row = self.table.currentRow()
         self.refresh_ingredients_table()
@@ -1087,10 +1263,12 @@ class PageRecipes(MainWindowPage):
             return
 
         definition = self.get_net_amount_definition()
-        ingredient.net_amount_definition = definition
+        self.set_recipe_value(self.get_recipe(recipe_id=self.selected_recipe_id), ingredient,
+                              "net_amount_definition", definition)
 
         event_manager().emit_data_changed(f"Recipes Page: Changed ingredient {ingredient.identifier_string} "
-                                          f"net amount definition to {definition.value}")
+                                          f"net amount definition to {definition.value}",
+                                          ChangeEntity.RECIPES, item_ids=[self.selected_recipe_id])
 
         selected_row = self.table.currentRow()
         self.refresh_ingredients_table()
@@ -3,18 +3,18 @@ from __future__ import annotations
 from enum import Enum
 
 from GUI.Common.gui_util_functions import get_filepath
+from Settings.version import Program_Version     # noqa: F401
+from Core.memory_report import get_object_size      # noqa: F401
 
 import os
-import sys
 import subprocess
 from PySide6.QtGui import QIcon
 
 
-Program_Version = "0.0.0"
+user_profile_path = os.environ.get("USERPROFILE", os.path.expanduser("~"))
 
-
-working_directory = os.path.join(os.path.join(os.environ["USERPROFILE"]), "Desktop\\CTR\\")
-desktop_path = os.path.join(os.path.join(os.environ["USERPROFILE"]), "Desktop\\")
+working_directory = os.path.join(user_profile_path, "Desktop\\CTR\\")
+desktop_path = os.path.join(user_profile_path, "Desktop\\")
 configs_directory = working_directory + "Config Files\\"
 
 config_filename = "settings.ini"
@@ -27,17 +27,34 @@ light_theme_icon_path: str = ":/Light theme/"
 dark_theme_icon_path: str = ":/Dark theme/"
 
 
+_icon_resources_registered: bool = False
+
+
 class WindowTheme(Enum):
     FUSION = "Fusion"
     LIGHT = "Light"
     DARK = "Dark"
 
 
+def register_icon_resources() -> None:
+    """
+    Function registers the compiled icon resources with Qt on first call.
+    The resources module is large, so it is imported only once icons are requested.
+    """
+    global _icon_resources_registered
+    if _icon_resources_registered:
+        return
+
+    from GUI.Icons import resources     # noqa: F401
+    _icon_resources_registered = True
+
+
 def get_light_icon(icon: str) -> QIcon:
     """
     Function returns a Light theme icon from the resources file.
     :param icon: Icon name including file extension.
     """
+    register_icon_resources()
     return QIcon(f"{light_theme_icon_path}{icon}")
 
 
@@ -46,6 +63,7 @@ def get_dark_icon(icon: str) -> QIcon:
     Function returns a Dark theme icon from the resources file.
     :param icon: Icon name including file extension.
     """
+    register_icon_resources()
     return QIcon(f"{dark_theme_icon_path}{icon}")
 
 
@@ -53,6 +71,7 @@ def get_window_icon() -> QIcon:
     """
     Function returns a logo from the resources file for use in window icons.
     """
+    register_icon_resources()
     return QIcon(f"{light_theme_icon_path}logo.png")
 
 
@@ -88,26 +107,3 @@ def get_physical_CPU_cores() -> int | None:
     except Exception as e:
         print(f"Raised exception getting physical cores: {e}")
         return get_cpu_count()
-
-
-def get_object_size(obj, seen=None):
-    """
-    Recursively find the size of objects including referenced objects, bytes.
-    """
-    if seen is None:
-        seen = set()
-    obj_id = id(obj)
-    if obj_id in seen:
-        return 0
-    seen.add(obj_id)
-    size = sys.getsizeof(obj)
-    if isinstance(obj, dict):
-        size += sum(get_object_size(k, seen) + get_object_size(v, seen) for k, v in obj.items())
-    elif isinstance(obj, (list, tuple, set, frozenset)):
-        size += sum(get_object_size(i, seen) for i in obj)
-    elif hasattr(obj, '__dict__'):
-        size += get_object_size(vars(obj), seen)
-    elif hasattr(obj, '__slots__'):
-        size += sum(
-            get_object_size(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
-    return size
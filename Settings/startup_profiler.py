@@ -0,0 +1,59 @@
+
+from contextlib import contextmanager
+from timeit import default_timer as timer
+from typing import Iterator
+
+
+class StartupProfiler:
+    def __init__(self):
+        """
+        Measures the duration of the application startup phases, e.g. module imports,
+        resource registration, main window construction, savefile load and first paint.
+
+        Phases are recorded in the order they are started and reported together with
+        the total time elapsed since the profiler was created.
+        """
+        self.start_time: float = timer()
+        self.phases: dict[str, float] = {}
+        self._phase_start: dict[str, float] = {}
+
+    def start_phase(self, name: str) -> None:
+        self._phase_start[name] = timer()
+
+    def end_phase(self, name: str) -> float:
+        """
+        Ends the started phase and returns its duration in seconds.
+        """
+        start = self._phase_start.pop(name, None)
+        if start is None:
+            print(f"Startup phase '{name}' was not started!")
+            return 0.0
+
+        duration = timer() - start
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+        return duration
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        self.start_phase(name)
+        try:
+            yield
+        finally:
+            self.end_phase(name)
+
+    def get_total_time(self) -> float:
+        return timer() - self.start_time
+
+    def get_report(self) -> str:
+        total_time = self.get_total_time()
+        name_width = max([len(name) for name in self.phases] + [len("Total")])
+
+        lines = ["Startup timing report:"]
+        for name, duration in self.phases.items():
+            lines.append(f"  {name:<{name_width}}  {duration * 1000:9.1f} ms")
+        lines.append(f"  {'Total':<{name_width}}  {total_time * 1000:9.1f} ms")
+
+        return "\n".join(lines)
+
+    def print_report(self) -> None:
+        print(self.get_report())
@@ -0,0 +1,3 @@
+
+# Kept free of GUI and Qt imports, so that the Core package can be used without PySide6
+Program_Version = "0.0.0"
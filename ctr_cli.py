@@ -0,0 +1,228 @@
+"""
+CTR - Calorie Tracker & Recipes
+
+Command line tool for batch operations on CTR savefiles, without the graphical user interface.
+
+    python ctr_cli.py info "CTR Savefile.ct"
+    python ctr_cli.py validate *.ct --jobs 4
+    python ctr_cli.py convert "CTR Savefile.ct" --to .ct --compression deflated --output-dir Converted
+    python ctr_cli.py export-range "CTR Savefile.ct" --start 2025-01-01 --end 2025-01-31 --to .ctd
+    python ctr_cli.py recompute "CTR Savefile.ct" --in-place
+    python ctr_cli.py recompute "CTR Savefile.ct" --recipe 12 --start 2025-01-01 --in-place
+    python ctr_cli.py generate Generated --preset large --seed 1
+    python ctr_cli.py memory "CTR Savefile.ct" --top 15 --gui
+
+"""
+
+from Core.batch_operations import (BatchTask, BatchResult, run_batch_task, SAVEFILE_EXTENSIONS,
+                                   ZIP_COMPRESSION_METHODS)
+from Core.dataset_generator import DATASET_PRESETS, generate_ctr_data, write_generated_savefiles
+from Core.memory_report import get_savefile_memory_report, format_memory_report
+
+import os
+import sys
+import json
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import replace
+from timeit import default_timer as timer
+from typing import Iterable
+
+
+def get_iso_date(value: str) -> str:
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a date in ISO format, such as 2024-12-31")
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ctr_cli", description="Batch operations on CTR savefiles.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_subparser(command: str, description: str) -> argparse.ArgumentParser:
+        subparser = subparsers.add_parser(command, help=description, description=description)
+        subparser.add_argument("files", nargs="+", help="CTR savefiles, " + ", ".join(SAVEFILE_EXTENSIONS))
+        subparser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                               help="Number of worker processes, default: number of CPUs")
+        subparser.add_argument("-v", "--verbose", action="store_true",
+                               help="Print the progress messages of savefile reading and writing")
+        subparser.add_argument("--trace", metavar="FILE",
+                               help="Write the timing of all processed files to a Chrome trace JSON file")
+        return subparser
+
+    add_subparser("info", "Print summary statistics of the savefiles.")
+    add_subparser("validate", "Check the consistency of the savefile data.")
+
+    convert = add_subparser("convert", "Convert the savefiles to another savefile format or compression.")
+    convert.add_argument("--to", dest="extension", choices=SAVEFILE_EXTENSIONS,
+                         help="Output savefile format, default: format of the input file")
+    convert.add_argument("--compression", choices=list(ZIP_COMPRESSION_METHODS), default="stored",
+                         help="Zip compression of CTR Data savefiles, default: stored")
+    convert.add_argument("-o", "--output-dir", dest="output_directory")
+
+    export_range = add_subparser("export-range", "Export the daily intake records within a date range.")
+    export_range.add_argument("--start", dest="start_date", type=get_iso_date, help="First included date")
+    export_range.add_argument("--end", dest="end_date", type=get_iso_date, help="Last included date")
+    export_range.add_argument("--to", dest="extension", choices=SAVEFILE_EXTENSIONS,
+                              help="Output savefile format, default: daily intake savefile")
+    export_range.add_argument("-o", "--output-dir", dest="output_directory")
+
+    recompute = add_subparser("recompute",
+                              "Update the serving nutrition data to the current catalogue and recipe data.")
+    item = recompute.add_mutually_exclusive_group()
+    item.add_argument("--product", dest="product_id", type=int,
+                      help="Update only the servings of the Product with the given ID")
+    item.add_argument("--recipe", dest="recipe_id", type=int,
+                      help="Update only the servings of the Recipe with the given ID")
+    recompute.add_argument("--start", dest="start_date", type=get_iso_date,
+                           help="First updated date, with --product or --recipe")
+    recompute.add_argument("--end", dest="end_date", type=get_iso_date,
+                           help="Last updated date, with --product or --recipe")
+    recompute.add_argument("--in-place", action="store_true", help="Overwrite the input savefiles")
+    recompute.add_argument("-o", "--output-dir", dest="output_directory")
+
+    description = "Generate savefiles with synthetic data for benchmarks and load tests."
+    generate = subparsers.add_parser("generate", help=description, description=description)
+    generate.add_argument("output_directory", help="Directory of the generated savefiles")
+    generate.add_argument("--preset", choices=list(DATASET_PRESETS), default="small",
+                          help="Dataset size preset, default: small")
+    generate.add_argument("--products", type=int, help="Number of products, overrides the preset")
+    generate.add_argument("--recipes", type=int, help="Number of recipes, overrides the preset")
+    generate.add_argument("--years", type=float, help="Years of daily intake records, overrides the preset")
+    generate.add_argument("--seed", type=int, default=0, help="Random generator seed, default: 0")
+    generate.add_argument("--name", default="Generated", help="Savefile name, default: Generated")
+    generate.add_argument("--to", dest="extensions", nargs="+", choices=SAVEFILE_EXTENSIONS,
+                          help="Savefile formats, default: .ct .ctc .ctr .ctd")
+
+    description = "Report the memory used by the savefile data after loading."
+    memory = subparsers.add_parser("memory", help=description, description=description)
+    memory.add_argument("files", nargs="+", help="CTR savefiles, " + ", ".join(SAVEFILE_EXTENSIONS))
+    memory.add_argument("--top", type=int, default=10, help="Number of reported allocation sites, default: 10")
+    memory.add_argument("--gui", action="store_true",
+                        help="Also load the data into the main window on the Qt offscreen platform "
+                             "and report the memory of the page tables")
+
+    return parser
+
+
+def run_batch_tasks(tasks: list[BatchTask], jobs: int = 1) -> Iterable[BatchResult]:
+    """
+    Runs the batch tasks in a process pool, or in the current process for a single task or job.
+    Results are returned in the order of the given tasks.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return map(run_batch_task, tasks)
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+        return list(executor.map(run_batch_task, tasks))
+
+
+def generate_savefiles(args: argparse.Namespace) -> int:
+    overrides = {key: value for key, value in [("products", args.products), ("recipes", args.recipes),
+                                               ("years", args.years)] if value is not None}
+    size = replace(DATASET_PRESETS[args.preset], **overrides)
+
+    start = timer()
+    ctr_data = generate_ctr_data(size, seed=args.seed)
+    print(f"Generated {size.products} products, {size.recipes} recipes and "
+          f"{len(ctr_data.daily_intake_record)} days of daily intake in {timer() - start:.3f} s")
+
+    for filepath in write_generated_savefiles(ctr_data, args.output_directory, args.name, args.extensions):
+        print(f"{filepath}: {os.path.getsize(filepath) / 1024:.1f} kB")
+
+    return 0
+
+
+def get_offscreen_main_window():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PySide6.QtWidgets import QApplication
+    from GUI.MainWindow.main_window import CTRMainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    return CTRMainWindow(app)
+
+
+def print_memory_reports(args: argparse.Namespace) -> int:
+    """
+    Reports the memory of each savefile loaded in the current process, one file at a time.
+    """
+    mw = None
+
+    n_failed = 0
+    for filepath in args.files:
+        if not os.path.exists(filepath):
+            print(f"{filepath}: FAILED")
+            print(f"    Error: Path {filepath} does not exist!")
+            n_failed += 1
+            continue
+
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            report, ctr_data = get_savefile_memory_report(filepath, top=args.top)
+
+            if args.gui:
+                from GUI.Common.memory_diagnostics import get_main_window_memory_usage
+
+                mw = mw or get_offscreen_main_window()
+                mw.ctr_data = ctr_data
+                mw.setup_on_ctr_data_open()
+                report.qt_sections = get_main_window_memory_usage(mw)
+
+        print(f"{filepath}:")
+        for line in format_memory_report(report):
+            print(f"    {line}")
+
+    return 1 if n_failed else 0
+
+
+def main(arguments: list[str] | None = None) -> int:
+    args = get_argument_parser().parse_args(arguments)
+
+    if args.command == "generate":
+        return generate_savefiles(args)
+
+    if args.command == "memory":
+        return print_memory_reports(args)
+
+    options = {key: value for key, value in vars(args).items()
+               if key not in ["command", "files", "jobs", "verbose", "trace"]}
+
+    if args.command in ["export-range", "recompute"] and args.start_date and args.end_date and args.start_date > args.end_date:
+        print(f"Error: Start date {args.start_date} is after end date {args.end_date}!")
+        return 2
+
+    if options.get("output_directory"):
+        os.makedirs(options["output_directory"], exist_ok=True)
+
+    tasks = [BatchTask(args.command, filepath, options, args.verbose, trace=args.trace is not None)
+             for filepath in args.files]
+
+    n_failed = 0
+    trace_events = []
+    for result in run_batch_tasks(tasks, jobs=args.jobs):
+        trace_events.extend(result.trace_events)
+
+        status = "OK" if result.success else "FAILED"
+        print(f"{result.filepath}: {status}")
+        for message in result.messages:
+            print(f"    {message}")
+
+        if not result.success:
+            n_failed += 1
+
+    if len(tasks) > 1:
+        print(f"{len(tasks) - n_failed} of {len(tasks)} files processed successfully.")
+
+    if args.trace is not None:
+        with open(args.trace, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        print(f"Chrome trace with {len(trace_events)} events written to {args.trace}")
+
+    return 1 if n_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,16 +9,48 @@ Main CTR Python module
 
 """
 
-from GUI.MainWindow.main_window import *
-import sys
+from Settings.startup_profiler import StartupProfiler
+
+startup_profiler = StartupProfiler()
+
+with startup_profiler.measure("Import"):
+    from GUI.MainWindow.main_window import CTRMainWindow, setup_initial_theme
+    from Settings.app_env import WindowTheme, desktop_path, register_icon_resources
+    from Core.csv_data_models import CTRDataModel
+    from PySide6.QtCore import QObject, QEvent, QTimer
+    from PySide6.QtWidgets import QApplication
+    import sys
 
 debug_mode = True
 
+
+class FirstPaintEventFilter(QObject):
+    """
+    Ends the first paint startup phase once the first paint event of the main window has been processed.
+    """
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            QTimer.singleShot(0, self.on_first_paint)
+        return False
+
+    @staticmethod
+    def on_first_paint():
+        startup_profiler.end_phase("First paint")
+        startup_profiler.print_report()
+
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window_theme = setup_initial_theme(app=app, theme=WindowTheme.DARK)
 
-    mw = CTRMainWindow(app, window_theme)
+    with startup_profiler.measure("Resource registration"):
+        register_icon_resources()
+
+    with startup_profiler.measure("Theme setup"):
+        window_theme = setup_initial_theme(app=app, theme=WindowTheme.DARK)
+
+    with startup_profiler.measure("Window construction"):
+        mw = CTRMainWindow(app, window_theme)
 
 
     def load_test_savefiles(
@@ -39,7 +71,12 @@ if __name__ == '__main__':
 
     if debug_mode:
         mw.setup_test_button()
-        # load_test_savefiles()
-        load_test_ctr_savefile()
+        with startup_profiler.measure("Savefile load"):
+            # load_test_savefiles()
+            load_test_ctr_savefile()
+
+    startup_profiler.start_phase("First paint")
+    first_paint_filter = FirstPaintEventFilter()
+    mw.installEventFilter(first_paint_filter)
 
     app.exec()